@@ -28,7 +28,6 @@ except ImportError:
 from src.core.config import Config
 from src.core.logger import setup_logging
 from src.core.disk_manager import DiskManager
-from src.core.system_monitor import SystemMonitor
 from src.core.safety_validator import SafetyValidator, SafetyLevel, ValidationResult
 from src.plugins.plugin_manager import PluginManager
 from src.utils.doc_builder import PhoenixDocsBuilder
@@ -493,6 +492,150 @@ def system_info(ctx):
     click.echo("For basic system info, use standard tools like 'lscpu', 'free', 'lsblk'.")
 
 
+
+@cli.command(name="fleet-match")
+@click.option('--inventory', '-i', required=True, type=click.Path(exists=True, dir_okay=False),
+              help='CSV, JSON or JSONL export of machine records')
+@click.option('--output', '-o', default='-', show_default=True, help='JSONL results file ("-" for stdout)')
+@click.option('--max-results', type=click.IntRange(1, 20), default=3, show_default=True,
+              help='Profile matches to report per machine')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: one per CPU; 1 runs in-process)')
+def fleet_match(inventory: str, output: str, max_results: int, workers: Optional[int]):
+    """Match an asset inventory against hardware profiles and stream JSONL results."""
+    from src.core.fleet_matcher import FleetMatcher, load_inventory
+
+    matcher = FleetMatcher(workers=workers, max_results=max_results)
+    started = time.time()
+    try:
+        with click.open_file(output, 'w', encoding='utf-8') as out:
+            summary = matcher.write_jsonl(load_inventory(inventory), out)
+    except (ValueError, OSError) as exc:
+        click.echo(f"{Fore.RED}❌ Could not process inventory: {exc}{Style.RESET_ALL}", err=True)
+        sys.exit(1)
+
+    color = Fore.GREEN if not summary["errors"] else Fore.YELLOW
+    click.echo(f"{color}✅ {summary['matched']}/{summary['machines']} machines matched, "
+               f"{summary['oclp_required']} need OCLP, {summary['errors']} invalid records "
+               f"in {time.time() - started:.1f}s{Style.RESET_ALL}", err=True)
+
+
+@cli.command(name="oclp-prewarm")
+@click.option('--model', 'models', multiple=True, help='Limit to a Mac model identifier (repeatable)')
+@click.option('--macos', 'versions', multiple=True, help='Limit to a macOS version (repeatable)')
+@click.option('--cpu-budget', type=click.FloatRange(0.0, 1.0), default=0.5, show_default=True,
+              help='Share of logical CPUs the warm job may use')
+@click.option('--max-workers', type=int, default=None, help='Override the worker count from the CPU budget')
+@click.option('--retry-failed', is_flag=True, help='Retry pairs that failed in an earlier run')
+@click.option('--report', '-r', default=None, help='Write a JSON report of every pair')
+@click.option('--dry-run', is_flag=True, help='List the pairs that would be warmed')
+@click.pass_context
+def oclp_prewarm(ctx, models, versions, cpu_budget: float, max_workers: Optional[int],
+                 retry_failed: bool, report: Optional[str], dry_run: bool):
+    """Pre-build OpenCore EFIs for the OCLP compatibility matrix into the build cache."""
+    from src.core.oclp_prewarm import OCLPPrewarmer, PrewarmStatus, prewarm_targets
+
+    targets = prewarm_targets(list(models), list(versions))
+    click.echo(f"{Fore.YELLOW}{Style.BRIGHT}🔥 OCLP PREWARM ({len(targets)} model/macOS pairs){Style.RESET_ALL}")
+    if dry_run:
+        for model_id, version in targets:
+            click.echo(f"  🍎 {model_id} → macOS {version}")
+        return
+
+    status_colors = {
+        PrewarmStatus.BUILT: Fore.GREEN,
+        PrewarmStatus.CACHED: Fore.CYAN,
+        PrewarmStatus.FAILED: Fore.RED,
+        PrewarmStatus.SKIPPED: Fore.YELLOW,
+    }
+
+    def on_pair_finished(result):
+        color = status_colors.get(result.status, "")
+        click.echo(f"  {color}{result.status.value.upper():<8}{Style.RESET_ALL} {result.pair}: {result.message}")
+
+    prewarmer = OCLPPrewarmer(config=ctx.obj['config'], cpu_budget=cpu_budget, max_workers=max_workers,
+                              retry_failed=retry_failed, progress_callback=on_pair_finished)
+    click.echo(f"Using {prewarmer.workers} worker process(es)")
+    try:
+        prewarm_report = prewarmer.run(list(models), list(versions))
+    except KeyboardInterrupt:
+        click.echo(f"{Fore.YELLOW}Prewarm interrupted - finished pairs stay cached, rerun to resume{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if report:
+        prewarm_report.write(report)
+        click.echo(f"{Fore.CYAN}📄 Report: {report}{Style.RESET_ALL}")
+    ready = prewarm_report.count(PrewarmStatus.BUILT) + prewarm_report.count(PrewarmStatus.CACHED)
+    color = Fore.GREEN if prewarm_report.success else Fore.RED
+    click.echo(f"{color}✅ {ready}/{len(prewarm_report.results)} EFIs cached "
+               f"in {prewarm_report.finished_at - prewarm_report.started_at:.0f}s{Style.RESET_ALL}")
+    if not prewarm_report.success:
+        sys.exit(1)
+
+
+@cli.command(name="batch-build")
+@click.option('--manifest', '-m', required=True, type=click.Path(exists=True, dir_okay=False),
+              help='YAML or JSON manifest of build jobs')
+@click.option('--report', '-r', default='batch_report.json', show_default=True,
+              help='Where to write the per-stick JSON report')
+@click.option('--max-parallel', type=int, default=None, help='Override the manifest worker limit')
+@click.option('--force', is_flag=True, help='Force operation without confirmation')
+@click.option('--dry-run', is_flag=True, help='Show what would be done without actually doing it')
+def batch_build(manifest: str, report: str, max_parallel: Optional[int], force: bool, dry_run: bool):
+    """Build several deployment drives in parallel from a manifest."""
+    from src.core.batch_builder import BatchManifest, BatchBuilder, BatchJobStatus
+
+    try:
+        batch_manifest = BatchManifest.load(manifest)
+    except (ValueError, OSError) as exc:
+        click.echo(f"{Fore.RED}❌ Invalid manifest: {exc}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if max_parallel is not None:
+        batch_manifest.max_parallel = max_parallel
+
+    click.echo(f"{Fore.YELLOW}{Style.BRIGHT}📋 BATCH BUILD ({len(batch_manifest.jobs)} drives){Style.RESET_ALL}")
+    for job in batch_manifest.jobs:
+        target = job.device or f"serial {job.device_serial}"
+        click.echo(f"  💾 {job.job_id}: {job.recipe} / {job.hardware_profile} → {target}")
+
+    if dry_run:
+        click.echo(f"{Fore.BLUE}🔍 DRY RUN - no devices were touched{Style.RESET_ALL}")
+        return
+
+    if not force:
+        click.echo(f"{Fore.RED}{Style.BRIGHT}⚠️  ALL DATA on every listed device will be erased{Style.RESET_ALL}")
+        if not click.confirm(f"{Fore.YELLOW}Continue with the batch build?{Style.RESET_ALL}"):
+            click.echo("Operation cancelled.")
+            return
+
+    status_colors = {
+        BatchJobStatus.SUCCESS: Fore.GREEN,
+        BatchJobStatus.FAILED: Fore.RED,
+        BatchJobStatus.SKIPPED: Fore.YELLOW,
+        BatchJobStatus.CANCELLED: Fore.YELLOW,
+    }
+
+    def on_job_finished(result):
+        color = status_colors.get(result.status, "")
+        click.echo(f"  {color}{result.status.value.upper():<9}{Style.RESET_ALL} {result.job_id} "
+                   f"({result.device_path or result.device_serial}): {result.message}")
+
+    batch = BatchBuilder(batch_manifest, progress_callback=on_job_finished)
+    try:
+        batch_report = batch.run()
+    except KeyboardInterrupt:
+        batch.cancel()
+        click.echo(f"{Fore.YELLOW}Batch build interrupted{Style.RESET_ALL}")
+        sys.exit(1)
+
+    batch_report.write(report)
+    color = Fore.GREEN if batch_report.success else Fore.RED
+    click.echo(f"{color}✅ {batch_report.succeeded}/{len(batch_report.results)} drives built "
+               f"in {batch_report.finished_at - batch_report.started_at:.0f}s{Style.RESET_ALL}")
+    click.echo(f"{Fore.CYAN}📄 Report: {report}{Style.RESET_ALL}")
+    if not batch_report.success:
+        sys.exit(1)
+
 if __name__ == '__main__':
     cli()
 @cli.command(name="build-phoenix-docs")
@@ -0,0 +1,333 @@
+"""
+BootForge Artifact Store
+Content-addressed cache for expensive build outputs (patched Windows images,
+OCLP builds) with least-recently-used eviction under a size budget.
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+
+META_FILE = "meta.json"
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+# Fingerprints kept in digests.json; the least recently used are dropped past this
+DIGEST_MEMO_MAX_ENTRIES = 1024
+
+
+@dataclass
+class ArtifactEntry:
+    """One cached artifact set stored under its key"""
+    key: str
+    path: Path
+    size_bytes: int
+    created_at: float
+    last_access: float
+    files: List[str] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Per file: size in bytes and SHA-256, recorded when the file was stored
+    file_sizes: Dict[str, int] = field(default_factory=dict)
+    digests: Dict[str, str] = field(default_factory=dict)
+
+    def file(self, name: str) -> Path:
+        return self.path / name
+
+
+class ArtifactStore:
+    """Content-addressed artifact cache
+
+    Each entry lives in objects/<key[:2]>/<key>/ next to a meta.json that holds
+    its size and last access time. Entries are assembled in a scratch directory
+    and renamed into place, so concurrent writers (threads or processes) never
+    expose partial artifacts. When the store grows past max_bytes the least
+    recently used entries are evicted.
+
+    Files are always copied in and out, never hard-linked, so a caller
+    rewriting its own file can't alter a cached one. Entries whose files no
+    longer match their recorded size (on get) or digest (on fetch) are evicted.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, name: str = "artifacts"):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.name = name
+        self.objects_dir = self.root / "objects"
+        self.scratch_dir = self.root / "tmp"
+        self._lock = threading.RLock()
+        self._digest_memo_file = self.root / "digests.json"
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.scratch_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(material: Dict[str, Any]) -> str:
+        """Stable key for a description of the inputs that produced an artifact"""
+        canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def file_digest(self, path: str) -> str:
+        """SHA-256 of a file, memoized by (path, size, mtime) across runs
+        
+        The memo keeps the DIGEST_MEMO_MAX_ENTRIES most recently used files.
+        """
+        file_path = Path(path).resolve()
+        st = file_path.stat()
+        memo_key = f"{file_path}|{st.st_size}|{st.st_mtime_ns}"
+
+        with self._lock:
+            memo = self._read_json(self._digest_memo_file) or {}
+            if memo_key in memo:
+                # Entries are kept oldest first; refresh a hit only once it is in the
+                # older half, so most lookups don't rewrite the file
+                keys = list(memo)
+                if keys.index(memo_key) < len(keys) - DIGEST_MEMO_MAX_ENTRIES // 2:
+                    memo[memo_key] = memo.pop(memo_key)
+                    self._write_json(self._digest_memo_file, memo)
+                return memo[memo_key]
+
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+
+        with self._lock:
+            memo = self._read_json(self._digest_memo_file) or {}
+            # Drop stale fingerprints of the same file
+            prefix = f"{file_path}|"
+            memo = {k: v for k, v in memo.items() if not k.startswith(prefix)}
+            memo[memo_key] = digest
+            for stale in list(memo)[:-DIGEST_MEMO_MAX_ENTRIES]:
+                del memo[stale]
+            self._write_json(self._digest_memo_file, memo)
+        return digest
+
+    def get(self, key: str) -> Optional[ArtifactEntry]:
+        """Look up an entry and mark it as recently used"""
+        with self._lock:
+            entry = self._load_entry(key)
+            if entry is None:
+                return None
+            if not all(self._file_intact(entry, name) for name in entry.files):
+                self.logger.warning(f"{self.name} entry {key[:12]} is incomplete or corrupted, discarding")
+                self.evict(key)
+                return None
+
+            entry.last_access = time.time()
+            self._save_meta(entry)
+            return entry
+
+    def contains(self, key: str) -> bool:
+        return self._entry_dir(key).joinpath(META_FILE).is_file()
+
+    def put(self, key: str, files: Dict[str, str],
+            metadata: Optional[Dict[str, Any]] = None) -> Optional[ArtifactEntry]:
+        """Store copies of files under key
+
+        Returns the entry, or None when the artifact is larger than the whole
+        budget and is therefore not cached.
+        """
+        size = sum(os.path.getsize(source) for source in files.values())
+        if size > self.max_bytes:
+            self.logger.info(f"{self.name}: artifact of {size} bytes exceeds the cache budget, not cached")
+            return None
+
+        staging = self.scratch_dir / f"{key}.{uuid.uuid4().hex}"
+        staging.mkdir(parents=True)
+        try:
+            file_sizes = {}
+            digests = {}
+            for name, source in files.items():
+                destination = staging / name
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                file_sizes[name], digests[name] = self._copy_hashed(Path(source), destination)
+                # The store owns this copy; protect it from in-place edits
+                destination.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+            now = time.time()
+            entry = ArtifactEntry(key, self._entry_dir(key), sum(file_sizes.values()), now, now,
+                                  sorted(files), dict(metadata or {}), file_sizes, digests)
+            self._write_json(staging / META_FILE, self._meta_dict(entry))
+
+            with self._lock:
+                entry.path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.rename(staging, entry.path)
+                except OSError:
+                    if not self.contains(key):
+                        raise
+                    # Another writer stored the same key first; keep theirs
+                    self._remove_tree(staging)
+                    return self.get(key)
+
+                self.logger.info(f"{self.name}: cached {key[:12]} ({size / (1024 * 1024):.1f} MB)")
+                self._enforce_budget(keep=key)
+            return entry
+        finally:
+            if staging.exists():
+                self._remove_tree(staging)
+
+    def fetch(self, key: str, name: str, destination: str) -> bool:
+        """Copy one cached file to destination; False on a miss or a corrupted entry
+
+        The copy is written next to destination and renamed over it, so
+        destination is never left half-written.
+        """
+        entry = self.get(key)
+        if entry is None or name not in entry.files:
+            return False
+
+        target = Path(destination)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            _, digest = self._copy_hashed(entry.file(name), temp_path)
+            expected = entry.digests.get(name)
+            if expected and digest != expected:
+                self.logger.warning(f"{self.name} entry {key[:12]} failed verification, discarding")
+                self.evict(key)
+                return False
+            os.replace(temp_path, target)
+        except FileNotFoundError:
+            # Evicted by another process between lookup and copy
+            return False
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return True
+
+    def evict(self, key: str) -> bool:
+        """Remove one entry"""
+        with self._lock:
+            path = self._entry_dir(key)
+            if not path.exists():
+                return False
+            self._remove_tree(path)
+            return True
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            for entry in self.entries():
+                self.evict(entry.key)
+
+    def entries(self) -> List[ArtifactEntry]:
+        """All complete entries, least recently used first"""
+        found = []
+        for meta_file in self.objects_dir.glob(f"*/*/{META_FILE}"):
+            entry = self._load_entry(meta_file.parent.name)
+            if entry:
+                found.append(entry)
+        return sorted(found, key=lambda e: e.last_access)
+
+    def total_size(self) -> int:
+        return sum(entry.size_bytes for entry in self.entries())
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict least recently used entries until the store fits max_bytes"""
+        entries = self.entries()
+        total = sum(entry.size_bytes for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.key == keep:
+                continue
+            self.evict(entry.key)
+            total -= entry.size_bytes
+            self.logger.info(f"{self.name}: evicted {entry.key[:12]} ({entry.size_bytes} bytes)")
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / key
+
+    def _load_entry(self, key: str) -> Optional[ArtifactEntry]:
+        path = self._entry_dir(key)
+        meta = self._read_json(path / META_FILE)
+        if not meta:
+            return None
+        return ArtifactEntry(
+            key=key,
+            path=path,
+            size_bytes=meta.get("size_bytes", 0),
+            created_at=meta.get("created_at", 0.0),
+            last_access=meta.get("last_access", 0.0),
+            files=meta.get("files", []),
+            metadata=meta.get("metadata", {}),
+            file_sizes=meta.get("file_sizes", {}),
+            digests=meta.get("digests", {})
+        )
+
+    def _save_meta(self, entry: ArtifactEntry):
+        self._write_json(entry.path / META_FILE, self._meta_dict(entry))
+
+    @staticmethod
+    def _meta_dict(entry: ArtifactEntry) -> Dict[str, Any]:
+        return {
+            "size_bytes": entry.size_bytes,
+            "created_at": entry.created_at,
+            "last_access": entry.last_access,
+            "files": entry.files,
+            "metadata": entry.metadata,
+            "file_sizes": entry.file_sizes,
+            "digests": entry.digests,
+        }
+
+    @staticmethod
+    def _file_intact(entry: ArtifactEntry, name: str) -> bool:
+        """Cheap check on lookup: the file exists with its recorded size"""
+        try:
+            size = entry.file(name).stat().st_size
+        except OSError:
+            return False
+        return name not in entry.file_sizes or size == entry.file_sizes[name]
+
+    @staticmethod
+    def _copy_hashed(source: Path, destination: Path) -> Tuple[int, str]:
+        """Copy source to a new file at destination; returns (size, SHA-256) of what was copied"""
+        sha256 = hashlib.sha256()
+        size = 0
+        with open(source, 'rb') as src, open(destination, 'xb') as dst:
+            for chunk in iter(lambda: src.read(HASH_CHUNK_SIZE), b''):
+                sha256.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+        return size, sha256.hexdigest()
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        """Write via a temporary file so readers never see half a document"""
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _remove_tree(path: Path):
+        """rmtree that also handles the read-only files the store creates"""
+        def make_writable(func, target, _exc):
+            os.chmod(target, stat.S_IWUSR | stat.S_IRUSR)
+            func(target)
+
+        # onerror is deprecated from 3.12 in favour of onexc
+        if sys.version_info >= (3, 12):
+            shutil.rmtree(path, onexc=make_writable)
+        else:
+            shutil.rmtree(path, onerror=make_writable)
@@ -0,0 +1,519 @@
+"""
+BootForge Batch Builder
+Headless orchestrator that builds many deployment drives from a manifest,
+running jobs on different devices in parallel within per-hub bandwidth budgets.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import platform
+import tempfile
+import threading
+from enum import Enum
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional, Callable, Any
+from dataclasses import dataclass, field, asdict
+
+import yaml
+
+from src.core.models import DeploymentType
+from src.core.usb_builder import StorageBuilder, StorageBuilderEngine
+
+
+DEFAULT_HUB = "default"
+
+# Sustained write rate reserved for one stick, and the default budget of a hub.
+# A USB 2.0 hub tops out around 35-40 MB/s in practice.
+DEFAULT_STICK_MBPS = 20.0
+DEFAULT_HUB_MBPS = 40.0
+
+_USB_PORT_RE = re.compile(r"^\d+-[\d.]+$")
+_USB_ROOT_RE = re.compile(r"^usb\d+$")
+
+
+class BatchJobStatus(Enum):
+    """Final state of a batch job"""
+    PENDING = "pending"
+    SUCCESS = "success"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class BatchJob:
+    """One drive to build: recipe, hardware profile and the target stick"""
+    job_id: str
+    recipe: str
+    hardware_profile: str
+    device_serial: Optional[str] = None
+    device: Optional[str] = None
+    source_files: Dict[str, str] = field(default_factory=dict)
+    bandwidth_mbps: Optional[float] = None
+
+
+@dataclass
+class BatchManifest:
+    """Parsed batch manifest"""
+    jobs: List[BatchJob]
+    max_parallel: int = 0                       # 0 = one worker per job
+    stick_mbps: float = DEFAULT_STICK_MBPS
+    hub_mbps: float = DEFAULT_HUB_MBPS
+    hub_overrides: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "BatchManifest":
+        """Load a manifest from a YAML or JSON file"""
+        manifest_path = Path(path)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if manifest_path.suffix.lower() == ".json":
+                data = json.load(f)
+            else:
+                data = yaml.safe_load(f)
+        return cls.from_dict(data or {}, base_dir=manifest_path.parent)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base_dir: Optional[Path] = None) -> "BatchManifest":
+        """Build a manifest from parsed data; job fields fall back to 'defaults'"""
+        defaults = data.get("defaults", {}) or {}
+        raw_jobs = data.get("jobs") or []
+        if not raw_jobs:
+            raise ValueError("Batch manifest contains no jobs")
+
+        jobs = []
+        for index, raw in enumerate(raw_jobs, start=1):
+            merged = dict(defaults)
+            merged.update(raw or {})
+            merged["source_files"] = {**defaults.get("source_files", {}),
+                                      **(raw or {}).get("source_files", {})}
+
+            for required in ("recipe", "hardware_profile"):
+                if not merged.get(required):
+                    raise ValueError(f"Job {index} is missing '{required}'")
+            if not merged.get("device_serial") and not merged.get("device"):
+                raise ValueError(f"Job {index} needs a device_serial or device")
+
+            source_files = {}
+            for name, source in merged["source_files"].items():
+                source_path = Path(os.path.expanduser(str(source)))
+                if base_dir and not source_path.is_absolute():
+                    source_path = base_dir / source_path
+                source_files[name] = str(source_path)
+
+            jobs.append(BatchJob(
+                job_id=str(merged.get("id") or f"job-{index:03d}"),
+                recipe=merged["recipe"],
+                hardware_profile=merged["hardware_profile"],
+                device_serial=merged.get("device_serial"),
+                device=merged.get("device"),
+                source_files=source_files,
+                bandwidth_mbps=merged.get("bandwidth_mbps")
+            ))
+
+        job_ids = [job.job_id for job in jobs]
+        duplicates = sorted({job_id for job_id in job_ids if job_ids.count(job_id) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate job ids in manifest: {', '.join(duplicates)}")
+
+        bandwidth = data.get("bandwidth", {}) or {}
+        return cls(
+            jobs=jobs,
+            max_parallel=int(data.get("max_parallel", 0)),
+            stick_mbps=float(bandwidth.get("per_stick_mbps", DEFAULT_STICK_MBPS)),
+            hub_mbps=float(bandwidth.get("per_hub_mbps", DEFAULT_HUB_MBPS)),
+            hub_overrides={str(hub): float(mbps) for hub, mbps in (bandwidth.get("hubs", {}) or {}).items()}
+        )
+
+
+@dataclass
+class BatchJobResult:
+    """Per-stick outcome recorded in the batch report"""
+    job_id: str
+    recipe: str
+    hardware_profile: str
+    device_serial: Optional[str]
+    device_path: Optional[str] = None
+    hub: Optional[str] = None
+    status: BatchJobStatus = BatchJobStatus.PENDING
+    message: str = ""
+    prep_key: Optional[str] = None
+    prep_shared: bool = False
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    build_timings: Dict[str, float] = field(default_factory=dict)
+    source_digests: Dict[str, str] = field(default_factory=dict)
+    log_tail: List[str] = field(default_factory=list)
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["status"] = self.status.value
+        data["duration_seconds"] = round(self.duration_seconds, 2)
+        return data
+
+
+@dataclass
+class BatchReport:
+    """Result of a batch run"""
+    results: List[BatchJobResult]
+    started_at: float
+    finished_at: float
+    cancelled: bool = False
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.status == BatchJobStatus.SUCCESS)
+
+    @property
+    def success(self) -> bool:
+        return not self.cancelled and self.succeeded == len(self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(self.finished_at - self.started_at, 2),
+            "cancelled": self.cancelled,
+            "total": len(self.results),
+            "succeeded": self.succeeded,
+            "jobs": [r.to_dict() for r in self.results]
+        }
+
+    def write(self, path: str):
+        """Write the report as JSON"""
+        report_path = Path(path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+@dataclass
+class PreparedSources:
+    """Device-independent build artifacts shared by jobs with identical inputs"""
+    key: str
+    success: bool
+    source_digests: Dict[str, str] = field(default_factory=dict)
+    staging_dir: Optional[Path] = None
+    grub_config: Any = None
+    error: str = ""
+
+
+def resolve_usb_hub(device_path: str, sysfs_root: str = "/sys") -> str:
+    """Identify the USB hub a block device hangs off (Linux sysfs), else DEFAULT_HUB
+
+    The sysfs path of a USB disk runs through .../usbN/N-P[.P...]/...; the hub is
+    the parent of the last port component, which is usbN for root-hub ports.
+    """
+    if platform.system() != "Linux" and sysfs_root == "/sys":
+        return DEFAULT_HUB
+
+    device_name = os.path.basename(device_path)
+    if not device_name.startswith("nvme") and not device_name.startswith("mmcblk"):
+        device_name = device_name.rstrip("0123456789")
+
+    block_path = Path(sysfs_root) / "block" / device_name
+    try:
+        resolved = os.path.realpath(block_path)
+    except OSError:
+        return DEFAULT_HUB
+
+    parts = Path(resolved).parts
+    ports = [i for i, part in enumerate(parts) if _USB_PORT_RE.match(part)]
+    if not ports:
+        return DEFAULT_HUB
+
+    parent = parts[ports[-1] - 1]
+    if _USB_PORT_RE.match(parent) or _USB_ROOT_RE.match(parent):
+        return parent
+    return DEFAULT_HUB
+
+
+class HubBandwidthGovernor:
+    """Admits builds onto a hub only while their reserved write rates fit its budget
+
+    A build that would exceed the budget waits until enough running builds on the
+    same hub finish. A single build is always admitted so oversized reservations
+    cannot deadlock the batch. Work with no hub (nothing written to a device) is
+    never charged.
+    """
+
+    def __init__(self, default_budget_mbps: float = DEFAULT_HUB_MBPS,
+                 budgets: Optional[Dict[str, float]] = None):
+        self.default_budget_mbps = default_budget_mbps
+        self.budgets = dict(budgets or {})
+        self._in_use: Dict[str, float] = {}
+        self._active: Dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def budget_for(self, hub: str) -> float:
+        return self.budgets.get(hub, self.default_budget_mbps)
+
+    def in_use(self, hub: str) -> float:
+        with self._condition:
+            return self._in_use.get(hub, 0.0)
+
+    def active_builds(self, hub: str) -> int:
+        with self._condition:
+            return self._active.get(hub, 0)
+
+    def acquire(self, hub: Optional[str], mbps: float,
+                is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Reserve bandwidth on hub; returns False if cancelled while waiting"""
+        if not hub:
+            return True
+        is_cancelled = is_cancelled or (lambda: False)
+        with self._condition:
+            while True:
+                if is_cancelled():
+                    return False
+                # Count builds rather than test the float sum, which may not return to exactly 0.0
+                active = self._active.get(hub, 0)
+                used = self._in_use.get(hub, 0.0)
+                if active == 0 or used + mbps <= self.budget_for(hub):
+                    self._active[hub] = active + 1
+                    self._in_use[hub] = used + mbps
+                    return True
+                self._condition.wait(timeout=0.5)
+
+    def release(self, hub: Optional[str], mbps: float):
+        if not hub:
+            return
+        with self._condition:
+            active = self._active.get(hub, 0) - 1
+            if active > 0:
+                self._active[hub] = active
+                self._in_use[hub] = max(0.0, self._in_use.get(hub, 0.0) - mbps)
+            else:
+                self._active.pop(hub, None)
+                self._in_use.pop(hub, None)
+            self._condition.notify_all()
+
+
+class BatchBuilder:
+    """Builds every job in a manifest, sharing preparation between identical inputs"""
+
+    PREP_WORKERS = 2
+    LOG_TAIL_LINES = 20
+
+    def __init__(self, manifest: BatchManifest,
+                 engine: Optional[StorageBuilderEngine] = None,
+                 builder_factory: Callable[[], StorageBuilder] = StorageBuilder,
+                 workspace: Optional[Path] = None,
+                 sysfs_root: str = "/sys",
+                 progress_callback: Optional[Callable[[BatchJobResult], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.manifest = manifest
+        self.engine = engine or StorageBuilderEngine()
+        self.builder_factory = builder_factory
+        self.workspace = Path(workspace) if workspace else None
+        self.sysfs_root = sysfs_root
+        self.progress_callback = progress_callback
+        self.governor = HubBandwidthGovernor(manifest.hub_mbps, manifest.hub_overrides)
+        self.is_cancelled = False
+
+        self._lock = threading.Lock()
+        self._device_locks: Dict[str, threading.Lock] = {}
+        self._prep_futures: Dict[str, Future] = {}
+        self._active_builders: List[StorageBuilder] = []
+
+    def cancel(self):
+        """Stop scheduling jobs and cancel builds that are running"""
+        self.is_cancelled = True
+        with self._lock:
+            for builder in self._active_builders:
+                builder.cancel_build()
+
+    def resolve_devices(self) -> Dict[str, str]:
+        """Map attached device serials to device paths"""
+        serials = {}
+        for device in self.engine.get_suitable_devices():
+            if device.serial:
+                serials.setdefault(device.serial, device.path)
+        return serials
+
+    def run(self) -> BatchReport:
+        """Run all jobs and return the per-stick report"""
+        started_at = time.time()
+        results = [BatchJobResult(job.job_id, job.recipe, job.hardware_profile, job.device_serial)
+                   for job in self.manifest.jobs]
+
+        owns_workspace = self.workspace is None
+        workspace = self.workspace or Path(tempfile.mkdtemp(prefix="bootforge_batch_"))
+
+        try:
+            needs_lookup = any(job.device_serial and not job.device for job in self.manifest.jobs)
+            serial_map = self.resolve_devices() if needs_lookup else {}
+
+            runnable = []
+            for job, result in zip(self.manifest.jobs, results):
+                if self._validate_job(job, result, serial_map):
+                    runnable.append((job, result))
+
+            max_parallel = self.manifest.max_parallel or len(runnable) or 1
+            with ThreadPoolExecutor(max_workers=self.PREP_WORKERS,
+                                    thread_name_prefix="bootforge_batch_prep") as prep_pool, \
+                    ThreadPoolExecutor(max_workers=max_parallel,
+                                       thread_name_prefix="bootforge_batch") as job_pool:
+                for job, result in runnable:
+                    result.prep_key = self._prep_key(job)
+                    self._submit_prep(prep_pool, job, result, workspace)
+
+                futures = [job_pool.submit(self._run_job, job, result) for job, result in runnable]
+                try:
+                    for future in futures:
+                        future.result()
+                except KeyboardInterrupt:
+                    # Let running builders roll back before the pools shut down
+                    self.cancel()
+                    raise
+        finally:
+            if owns_workspace:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+        report = BatchReport(results, started_at, time.time(), cancelled=self.is_cancelled)
+        self.logger.info(f"Batch finished: {report.succeeded}/{len(results)} drives built")
+        return report
+
+    def _validate_job(self, job: BatchJob, result: BatchJobResult,
+                      serial_map: Dict[str, str]) -> bool:
+        """Check recipe/profile names and resolve the target device"""
+        if job.recipe not in self.engine.recipes:
+            return self._finish(result, BatchJobStatus.SKIPPED, f"Recipe not found: {job.recipe}")
+        if job.hardware_profile not in self.engine.hardware_profiles:
+            return self._finish(result, BatchJobStatus.SKIPPED,
+                                f"Hardware profile not found: {job.hardware_profile}")
+
+        device_path = job.device or serial_map.get(job.device_serial or "")
+        if not device_path:
+            return self._finish(result, BatchJobStatus.SKIPPED,
+                                f"Device with serial {job.device_serial} is not attached")
+
+        result.device_path = device_path
+        result.hub = resolve_usb_hub(device_path, self.sysfs_root)
+        return True
+
+    def _prep_key(self, job: BatchJob) -> str:
+        """Identity of a job's preparation inputs: recipe plus source file fingerprints"""
+        sha256 = hashlib.sha256(job.recipe.encode())
+        for name, path in sorted(job.source_files.items()):
+            try:
+                stat = os.stat(path)
+                fingerprint = f"{name}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+            except OSError:
+                fingerprint = f"{name}|{os.path.abspath(path)}|missing"
+            sha256.update(fingerprint.encode())
+        return sha256.hexdigest()[:16]
+
+    def _submit_prep(self, pool: ThreadPoolExecutor, job: BatchJob,
+                     result: BatchJobResult, workspace: Path):
+        """Schedule preparation once per distinct key"""
+        with self._lock:
+            if result.prep_key in self._prep_futures:
+                result.prep_shared = True
+                return
+            self._prep_futures[result.prep_key] = pool.submit(
+                self._prepare, job, result.prep_key, workspace / result.prep_key)
+
+    def _prepare(self, job: BatchJob, key: str, prep_dir: Path) -> PreparedSources:
+        """Hash sources and stage payloads once for all jobs sharing key"""
+        try:
+            recipe = self.engine.recipes[job.recipe]
+            # Preparation is shared by every device, so it has none and no hub to charge
+            grub_config = None
+            if recipe.deployment_type == DeploymentType.MULTIBOOT:
+                grub_config = self.engine.grub_manager.create_multiboot_config(recipe, "")
+
+            builder = self.builder_factory()
+            builder.configure_build(recipe, "", self.engine.hardware_profiles[job.hardware_profile],
+                                    job.source_files, grub_config)
+            if not builder.prepare_sources(prep_dir):
+                return PreparedSources(key, False, error="Source preparation failed")
+
+            self.logger.info(f"Prepared sources {key} for {job.recipe}")
+            return PreparedSources(key, True, dict(builder.source_digests),
+                                   builder.payload_staging_dir, grub_config)
+        except Exception as e:
+            self.logger.error(f"Error preparing sources {key}: {e}")
+            return PreparedSources(key, False, error=str(e))
+
+    def _run_job(self, job: BatchJob, result: BatchJobResult):
+        """Build one stick once its preparation, device and hub bandwidth are available"""
+        prepared: PreparedSources = self._prep_futures[result.prep_key].result()
+        if not prepared.success:
+            self._finish(result, BatchJobStatus.FAILED, prepared.error)
+            return
+        if self.is_cancelled:
+            self._finish(result, BatchJobStatus.CANCELLED, "Batch cancelled")
+            return
+
+        mbps = float(job.bandwidth_mbps or self.manifest.stick_mbps)
+        hub = result.hub if result.device_path else None
+        with self._device_lock(result.device_path):
+            if not self.governor.acquire(hub, mbps, lambda: self.is_cancelled):
+                self._finish(result, BatchJobStatus.CANCELLED, "Batch cancelled")
+                return
+            try:
+                self._build(job, result, prepared)
+            finally:
+                self.governor.release(hub, mbps)
+
+    def _build(self, job: BatchJob, result: BatchJobResult, prepared: PreparedSources):
+        """Run a StorageBuilder synchronously on the worker thread"""
+        builder = self.builder_factory()
+        builder.configure_build(self.engine.recipes[job.recipe], result.device_path,
+                                self.engine.hardware_profiles[job.hardware_profile],
+                                job.source_files, prepared.grub_config)
+        builder.use_prepared_sources(prepared.source_digests, prepared.staging_dir)
+
+        with self._lock:
+            self._active_builders.append(builder)
+        result.started_at = time.time()
+        try:
+            builder.run()
+        except Exception as e:
+            self.logger.error(f"Batch job {job.job_id} raised: {e}")
+        finally:
+            with self._lock:
+                self._active_builders.remove(builder)
+
+        result.build_timings = dict(builder.build_timings)
+        result.source_digests = dict(builder.source_digests)
+        result.log_tail = list(builder.build_log[-self.LOG_TAIL_LINES:])
+
+        if builder.build_successful:
+            self._finish(result, BatchJobStatus.SUCCESS, "Build completed")
+        elif builder.is_cancelled:
+            self._finish(result, BatchJobStatus.CANCELLED, "Build cancelled")
+        else:
+            errors = [line for line in builder.build_log if " ERROR: " in line]
+            self._finish(result, BatchJobStatus.FAILED,
+                         errors[-1].split(" ERROR: ", 1)[1] if errors else "Build failed")
+
+    def _device_lock(self, device_path: str) -> threading.Lock:
+        """Jobs that target the same device run one after another"""
+        with self._lock:
+            return self._device_locks.setdefault(device_path, threading.Lock())
+
+    def _finish(self, result: BatchJobResult, status: BatchJobStatus, message: str) -> bool:
+        """Record a final job state; returns False so validation can short-circuit"""
+        result.status = status
+        result.message = message
+        if result.started_at is None:
+            result.started_at = time.time()
+        result.finished_at = time.time()
+        level = logging.INFO if status == BatchJobStatus.SUCCESS else logging.WARNING
+        self.logger.log(level, f"Batch job {result.job_id}: {status.value} - {message}")
+        if self.progress_callback:
+            self.progress_callback(result)
+        return False
@@ -0,0 +1,190 @@
+"""
+BootForge Build Graph
+Dependency-graph executor for storage builds. Device-independent preparation
+(hashing, payload staging, config rendering) runs in worker threads while
+device operations run one at a time on the device lane.
+"""
+
+import time
+import logging
+import threading
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Callable
+from dataclasses import dataclass, field
+
+
+class TaskLane(Enum):
+    """Execution lane for a build task"""
+    PREP = "prep"        # Device-independent work, runs in the worker pool
+    DEVICE = "device"    # Touches the target device, serialized
+
+
+class TaskState(Enum):
+    """Lifecycle state of a build task"""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+@dataclass
+class BuildTask:
+    """Single node in the build graph"""
+    name: str
+    action: Callable[[], bool]
+    depends_on: List[str] = field(default_factory=list)
+    lane: TaskLane = TaskLane.PREP
+    description: str = ""
+    state: TaskState = TaskState.PENDING
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Wall-clock duration of the task in seconds"""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class BuildGraphResult:
+    """Outcome of a build graph run"""
+    success: bool
+    cancelled: bool = False
+    failed_task: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+
+class BuildGraph:
+    """Runs build tasks in dependency order with prep work overlapping device work"""
+
+    def __init__(self, max_workers: int = 4,
+                 is_cancelled: Optional[Callable[[], bool]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max(1, max_workers)
+        self.is_cancelled = is_cancelled or (lambda: False)
+        self.tasks: Dict[str, BuildTask] = {}
+        self._device_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def add_task(self, name: str, action: Callable[[], bool],
+                 depends_on: Optional[List[str]] = None,
+                 lane: TaskLane = TaskLane.PREP,
+                 description: str = "") -> BuildTask:
+        """Register a task; dependencies may be added in any order"""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate build task: {name}")
+
+        task = BuildTask(
+            name=name,
+            action=action,
+            depends_on=list(depends_on or []),
+            lane=lane,
+            description=description or name
+        )
+        self.tasks[name] = task
+        return task
+
+    def topological_order(self) -> List[str]:
+        """Return task names in a valid execution order, raising on bad graphs"""
+        for task in self.tasks.values():
+            for dependency in task.depends_on:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Task {task.name} depends on unknown task {dependency}")
+
+        remaining = {name: set(task.depends_on) for name, task in self.tasks.items()}
+        order: List[str] = []
+
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks: {', '.join(sorted(remaining))}")
+
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return order
+
+    def run(self, on_task_started: Optional[Callable[[BuildTask], None]] = None,
+            on_task_finished: Optional[Callable[[BuildTask], None]] = None) -> BuildGraphResult:
+        """Execute the graph; stops scheduling new work on the first failure"""
+        self.topological_order()  # Validate before touching anything
+
+        start_time = time.time()
+        result = BuildGraphResult(success=True)
+        running: Dict[Future, BuildTask] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="bootforge_build") as executor:
+            while True:
+                halted = not result.success or result.cancelled
+                if not halted and self.is_cancelled():
+                    result.cancelled = True
+                    result.success = False
+                    halted = True
+
+                if not halted:
+                    for task in self._ready_tasks():
+                        task.state = TaskState.RUNNING
+                        if on_task_started:
+                            on_task_started(task)
+                        running[executor.submit(self._execute, task)] = task
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    if task.state == TaskState.FAILED and result.success:
+                        result.success = False
+                        result.failed_task = task.name
+                    if on_task_finished:
+                        on_task_finished(task)
+
+        for task in self.tasks.values():
+            if task.state == TaskState.PENDING:
+                task.state = TaskState.SKIPPED
+            result.timings[task.name] = task.duration
+
+        result.elapsed_seconds = time.time() - start_time
+        return result
+
+    def _ready_tasks(self) -> List[BuildTask]:
+        """Pending tasks whose dependencies have all completed"""
+        return [
+            task for task in self.tasks.values()
+            if task.state == TaskState.PENDING and
+            all(self.tasks[dep].state == TaskState.DONE for dep in task.depends_on)
+        ]
+
+    def _execute(self, task: BuildTask):
+        """Run a single task, holding the device lock for device-lane work"""
+        lock = self._device_lock if task.lane == TaskLane.DEVICE else None
+        if lock:
+            lock.acquire()
+
+        task.started_at = time.time()
+        try:
+            ok = task.action()
+            task.state = TaskState.DONE if ok else TaskState.FAILED
+            if not ok:
+                task.error = f"{task.name} reported failure"
+        except Exception as e:
+            self.logger.error(f"Build task {task.name} raised: {e}")
+            task.state = TaskState.FAILED
+            task.error = str(e)
+        finally:
+            task.finished_at = time.time()
+            if lock:
+                lock.release()
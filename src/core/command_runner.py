@@ -0,0 +1,295 @@
+"""
+BootForge Command Runner
+Shared asynchronous runner for external tools (parted, mkfs, mount, diskutil,
+diskpart, wimlib) with timeouts, cancellation, live output and latency metrics.
+"""
+
+import os
+import re
+import time
+import codecs
+import asyncio
+import logging
+import threading
+import subprocess
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from dataclasses import dataclass
+
+
+CommandArgs = Union[str, Sequence[str]]
+
+# Called as output_callback(command_name, stream_name, line)
+OutputCallback = Callable[[str, str, str], None]
+
+_LINE_SPLIT_RE = re.compile(r"[\r\n]+")
+
+
+@dataclass
+class CommandResult:
+    """Outcome of one command; field names match subprocess.CompletedProcess"""
+    args: Any
+    returncode: int
+    stdout: Any = ""
+    stderr: Any = ""
+    duration: float = 0.0
+    cancelled: bool = False
+
+    def check_returncode(self):
+        if self.returncode != 0:
+            raise subprocess.CalledProcessError(self.returncode, self.args, self.stdout, self.stderr)
+
+
+@dataclass
+class CommandStats:
+    """Latency statistics for one tool"""
+    command: str
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    cancellations: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "cancellations": self.cancellations,
+            "total_seconds": round(self.total_seconds, 3),
+            "mean_seconds": round(self.mean_seconds, 3),
+            "max_seconds": round(self.max_seconds, 3),
+        }
+
+
+def command_name(args: CommandArgs) -> str:
+    """Tool name used for metrics: the executable, skipping a leading sudo"""
+    tokens = args.split() if isinstance(args, str) else [str(a) for a in args]
+    while tokens and os.path.basename(tokens[0]) == "sudo":
+        tokens = tokens[1:]
+    return os.path.basename(tokens[0]) if tokens else ""
+
+
+class CommandRunner:
+    """Runs external commands on a shared asyncio loop
+
+    Calls are synchronous for the caller but never block each other: every
+    command is a coroutine on one background event loop, so independent
+    commands issued from different threads, or together through run_many(),
+    execute concurrently. Cancellable commands are terminated as soon as
+    is_cancelled() turns true instead of running to completion.
+    """
+
+    POLL_INTERVAL = 0.1
+    TERMINATE_GRACE = 3.0
+    READ_CHUNK = 4096
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+
+    def __init__(self, is_cancelled: Optional[Callable[[], bool]] = None,
+                 output_callback: Optional[OutputCallback] = None,
+                 default_timeout: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.is_cancelled = is_cancelled or (lambda: False)
+        self.output_callback = output_callback
+        self.default_timeout = default_timeout
+        self._stats: Dict[str, CommandStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        """Start the shared event loop thread on first use"""
+        with cls._loop_lock:
+            if cls._loop is None or cls._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever,
+                                          name="bootforge_commands", daemon=True)
+                thread.start()
+                cls._loop = loop
+            return cls._loop
+
+    def run(self, args: CommandArgs, timeout: Optional[float] = None,
+            input: Optional[Union[str, bytes]] = None, text: bool = True,
+            check: bool = False, shell: bool = False, cwd: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None, cancellable: bool = True,
+            capture_output: bool = True) -> CommandResult:
+        """Run a command and wait for it, like subprocess.run
+
+        Output is captured (and streamed to output_callback) unless
+        capture_output is False, in which case it goes to this process's
+        stdout/stderr and the result's stdout/stderr are None. Raises
+        FileNotFoundError for a missing executable, subprocess.TimeoutExpired
+        on timeout and subprocess.CalledProcessError when check is set. A
+        cancelled command returns with cancelled=True and a non-zero returncode.
+        """
+        coro = self.run_async(args, timeout=timeout, input=input, text=text, check=check,
+                              shell=shell, cwd=cwd, env=env, cancellable=cancellable,
+                              capture_output=capture_output)
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    def run_many(self, commands: Sequence[CommandArgs], **kwargs) -> List[CommandResult]:
+        """Run independent commands concurrently; results keep the input order"""
+        async def gather():
+            return await asyncio.gather(*(self.run_async(args, **kwargs) for args in commands),
+                                        return_exceptions=True)
+
+        results = asyncio.run_coroutine_threadsafe(gather(), self._get_loop()).result()
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    async def run_async(self, args: CommandArgs, timeout: Optional[float] = None,
+                        input: Optional[Union[str, bytes]] = None, text: bool = True,
+                        check: bool = False, shell: bool = False, cwd: Optional[str] = None,
+                        env: Optional[Dict[str, str]] = None,
+                        cancellable: bool = True, capture_output: bool = True) -> CommandResult:
+        """Coroutine form of run() for callers already on an event loop"""
+        name = command_name(args)
+        timeout = timeout if timeout is not None else self.default_timeout
+        stdin = subprocess.PIPE if input is not None else subprocess.DEVNULL
+        output = subprocess.PIPE if capture_output else None
+
+        start = time.monotonic()
+        if shell:
+            command_line = args if isinstance(args, str) else subprocess.list2cmdline(list(args))
+            process = await asyncio.create_subprocess_shell(
+                command_line, stdin=stdin, stdout=output, stderr=output, cwd=cwd, env=env)
+        else:
+            argv = [str(a) for a in ([args] if isinstance(args, str) else args)]
+            process = await asyncio.create_subprocess_exec(
+                *argv, stdin=stdin, stdout=output, stderr=output, cwd=cwd, env=env)
+
+        # Readers start before stdin is fed, so a child filling its output pipes can't deadlock
+        readers = asyncio.gather(self._pump(process.stdout, name, "stdout"),
+                                 self._pump(process.stderr, name, "stderr"))
+        writer = None
+        if input is not None:
+            writer = asyncio.ensure_future(self._feed(process.stdin,
+                                                      input.encode() if isinstance(input, str) else input))
+
+        timed_out = cancelled = False
+        while process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                if cancellable and self.is_cancelled():
+                    cancelled = True
+                elif timeout is not None and time.monotonic() - start > timeout:
+                    timed_out = True
+                else:
+                    continue
+                await self._terminate(process)
+
+        if writer is not None:
+            if not writer.done():
+                # The child exited without reading all of its input
+                writer.cancel()
+                process.stdin.close()
+            await asyncio.gather(writer, return_exceptions=True)
+        stdout_bytes, stderr_bytes = await readers
+        duration = time.monotonic() - start
+        self._record(name, duration, process.returncode, timed_out, cancelled)
+
+        if capture_output:
+            stdout = stdout_bytes.decode(errors="replace") if text else stdout_bytes
+            stderr = stderr_bytes.decode(errors="replace") if text else stderr_bytes
+        else:
+            stdout = stderr = None
+        if timed_out:
+            raise subprocess.TimeoutExpired(args, timeout, stdout, stderr)
+
+        result = CommandResult(args, process.returncode, stdout, stderr, duration, cancelled)
+        if check:
+            result.check_returncode()
+        return result
+
+    @staticmethod
+    async def _feed(stream: asyncio.StreamWriter, data: bytes):
+        """Write a command's input and close its stdin; a child that exits early is not an error"""
+        try:
+            stream.write(data)
+            await stream.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    async def _pump(self, stream: Optional[asyncio.StreamReader], name: str, stream_name: str) -> bytes:
+        """Collect a pipe while forwarding complete lines (\\n or \\r terminated)"""
+        if stream is None:
+            return b""
+        collected = bytearray()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        while True:
+            chunk = await stream.read(self.READ_CHUNK)
+            if not chunk:
+                break
+            collected.extend(chunk)
+            if self.output_callback:
+                pending += decoder.decode(chunk)
+                *lines, pending = _LINE_SPLIT_RE.split(pending)
+                self._forward(name, stream_name, lines)
+        if self.output_callback:
+            self._forward(name, stream_name, [pending + decoder.decode(b"", final=True)])
+        return bytes(collected)
+
+    def _forward(self, name: str, stream_name: str, lines: List[str]):
+        for line in lines:
+            if line.strip():
+                try:
+                    self.output_callback(name, stream_name, line.rstrip())
+                except Exception as e:
+                    self.logger.debug(f"Output callback failed: {e}")
+
+    async def _terminate(self, process: asyncio.subprocess.Process):
+        """SIGTERM, then SIGKILL if the process ignores it"""
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), self.TERMINATE_GRACE)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    def _record(self, name: str, duration: float, returncode: int,
+                timed_out: bool, cancelled: bool):
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, CommandStats(name))
+            stats.calls += 1
+            stats.total_seconds += duration
+            stats.max_seconds = max(stats.max_seconds, duration)
+            if timed_out:
+                stats.timeouts += 1
+            elif cancelled:
+                stats.cancellations += 1
+            elif returncode != 0:
+                stats.failures += 1
+        self.logger.debug(f"{name} finished in {duration:.2f}s (rc={returncode})")
+
+    @property
+    def metrics(self) -> Dict[str, CommandStats]:
+        """Snapshot of per-tool latency statistics"""
+        with self._stats_lock:
+            return {name: CommandStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    def metrics_summary(self) -> Dict[str, Dict[str, Any]]:
+        """JSON-friendly per-tool statistics"""
+        return {name: stats.to_dict() for name, stats in sorted(self.metrics.items())}
+
+    def reset_metrics(self):
+        with self._stats_lock:
+            self._stats.clear()
@@ -126,6 +126,10 @@ class Config:
         """Get temporary directory path"""
         return Path(self._config.temp_dir)
     
+    def get_cache_dir(self) -> Path:
+        """Get cache directory path"""
+        return self.app_dir / "cache"
+    
     def get_log_dir(self) -> Path:
         """Get log directory path"""
         return self.app_dir / "logs"
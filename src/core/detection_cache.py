@@ -0,0 +1,214 @@
+"""
+BootForge Hardware Detection Cache
+Process-wide, disk-backed cache of DetectedHardware so every wizard page and
+pipeline shares one detection of the machine instead of re-probing it.
+"""
+
+import os
+import copy
+import time
+import uuid
+import pickle
+import hashlib
+import logging
+import platform
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, Union
+
+import psutil
+
+from src.core.config import Config
+
+if TYPE_CHECKING:
+    from src.core.hardware_detector import DetectedHardware
+
+
+# Bump when DetectedHardware changes shape; older cache files are ignored
+DETECTION_CACHE_VERSION = 1
+DETECTION_CACHE_FILE = "hardware_detection.pickle"
+# Seconds a detection stays valid even when nothing about the machine changed
+DETECTION_CACHE_TTL = 3600.0
+
+# raw_data entries safe to persist; the rest can hold full vendor tool dumps (serials, UUIDs)
+_PERSISTED_RAW_DATA = ("probe_timings",)
+
+# Directories whose entries change when PCI/USB devices, disks or NICs are hot-plugged
+_HOTPLUG_DIRS = ("sys/bus/pci/devices", "sys/bus/usb/devices", "sys/block", "sys/class/net")
+
+
+def _read_first(root: Path, *paths: str) -> str:
+    """Contents of the first readable file among the paths"""
+    for path in paths:
+        try:
+            value = (root / path).read_text(errors="replace").strip()
+        except (IOError, OSError):
+            continue
+        if value:
+            return value
+    return ""
+
+
+def persistable_copy(hardware: "DetectedHardware") -> "DetectedHardware":
+    """Copy of a detection without identifying data: serial number, MAC addresses, raw tool output"""
+    stored = copy.deepcopy(hardware)
+    stored.system_serial = None
+    for adapter in stored.network_adapters:
+        adapter.pop("mac_address", None)
+    stored.raw_data = {key: value for key, value in stored.raw_data.items() if key in _PERSISTED_RAW_DATA}
+    return stored
+
+
+def machine_fingerprint(root: Union[str, Path] = "/") -> str:
+    """Identify this machine and boot: DMI product UUID (or machine-id) plus the boot ID"""
+    root = Path(root)
+    if (root / "proc/sys/kernel/random/boot_id").exists():
+        # product_uuid is root-only; machine-id is a per-install stand-in for everyone else
+        machine = _read_first(root, "sys/class/dmi/id/product_uuid", "etc/machine-id", "var/lib/dbus/machine-id")
+        boot = _read_first(root, "proc/sys/kernel/random/boot_id")
+    else:
+        machine = f"{platform.node()}:{uuid.getnode():012x}"
+        boot = str(psutil.boot_time())
+    return f"{machine}|{boot}"
+
+
+def hotplug_stamp(root: Union[str, Path] = "/") -> str:
+    """Digest of the attached devices, which changes when hardware is hot-plugged"""
+    root = Path(root)
+    digest = hashlib.sha256()
+    if (root / "sys").is_dir():
+        for directory in _HOTPLUG_DIRS:
+            try:
+                names = sorted(entry.name for entry in (root / directory).iterdir())
+            except OSError:
+                names = []
+            digest.update(f"{directory}:{','.join(names)}\n".encode())
+    else:
+        disks = sorted(partition.device for partition in psutil.disk_partitions(all=False))
+        digest.update(f"disks:{','.join(disks)}\nnet:{','.join(sorted(psutil.net_if_addrs()))}\n".encode())
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """DetectedHardware cached in memory and on disk
+
+    Entries are keyed by the machine fingerprint and the hot-plug stamp, so a
+    reboot, a different machine or a device change misses; entries older than
+    the TTL are re-detected as well. Concurrent callers share one in-flight
+    detection, and every caller gets its own copy of the result.
+
+    The disk copy is private to the user (mode 0600) and leaves out
+    identifying data (see persistable_copy()); the in-memory copy is complete.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, ttl: float = DETECTION_CACHE_TTL,
+                 root: Union[str, Path] = "/"):
+        self.logger = logging.getLogger(__name__)
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[str, float, "DetectedHardware"]] = None
+        self._in_flight: Optional[Future] = None
+
+    def cache_key(self) -> str:
+        """Key the current machine state maps to"""
+        parts = [str(DETECTION_CACHE_VERSION), platform.system(),
+                 machine_fingerprint(self.root), hotplug_stamp(self.root)]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def get_or_detect(self, detect: Callable[[], Optional["DetectedHardware"]],
+                      force_refresh: bool = False) -> Optional["DetectedHardware"]:
+        """Cached detection for the current machine state, running detect() on a miss"""
+        key = self.cache_key()
+        with self._lock:
+            if not force_refresh:
+                hardware = self._lookup(key)
+                if hardware is not None:
+                    return copy.deepcopy(hardware)
+            future = self._in_flight
+            leader = future is None
+            if leader:
+                future = self._in_flight = Future()
+
+        if not leader:
+            hardware = future.result()
+            return copy.deepcopy(hardware) if hardware is not None else None
+
+        hardware = None
+        try:
+            hardware = detect()
+            if hardware is not None:
+                self._store(key, hardware)
+        finally:
+            with self._lock:
+                self._in_flight = None
+            future.set_result(hardware)
+        return copy.deepcopy(hardware) if hardware is not None else None
+
+    def invalidate(self):
+        """Forget the cached detection, in memory and on disk"""
+        with self._lock:
+            self._entry = None
+            try:
+                self._cache_path().unlink()
+            except OSError:
+                pass
+
+    def _cache_path(self) -> Path:
+        if self.cache_file is not None:
+            return self.cache_file
+        return Config().get_cache_dir() / DETECTION_CACHE_FILE
+
+    def _fresh(self, created: float) -> bool:
+        return 0 <= time.time() - created < self.ttl
+
+    def _lookup(self, key: str) -> Optional["DetectedHardware"]:
+        if self._entry and self._entry[0] == key and self._fresh(self._entry[1]):
+            return self._entry[2]
+
+        cache_path = self._cache_path()
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get("key") == key and self._fresh(cached.get("created", -1)):
+                self._entry = (key, cached["created"], cached["hardware"])
+                return cached["hardware"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.debug(f"Ignoring unreadable detection cache {cache_path}: {e}")
+        return None
+
+    def _store(self, key: str, hardware: "DetectedHardware"):
+        created = time.time()
+        stored = copy.deepcopy(hardware)
+        with self._lock:
+            self._entry = (key, created, stored)
+
+        cache_path = self._cache_path()
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({"key": key, "created": created, "hardware": persistable_copy(stored)}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            self.logger.debug(f"Could not write detection cache {cache_path}: {e}")
+
+
+_detection_cache: Optional[DetectionCache] = None
+_detection_cache_lock = threading.Lock()
+
+
+def get_detection_cache() -> DetectionCache:
+    """Process-wide detection cache shared by every HardwareDetector"""
+    global _detection_cache
+    if _detection_cache is None:
+        with _detection_cache_lock:
+            if _detection_cache is None:
+                _detection_cache = DetectionCache()
+    return _detection_cache
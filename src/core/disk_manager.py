@@ -8,14 +8,15 @@ import time
 import logging
 import hashlib
 import shutil
-import subprocess
 import platform
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Callable
 from dataclasses import dataclass
-from PyQt6.QtCore import QThread, pyqtSignal, QObject
 import psutil
 
+from src.core.events import Signal, WorkerThread
+from src.core.command_runner import CommandRunner
+
 
 @dataclass
 class DiskInfo:
@@ -44,13 +45,13 @@ class WriteProgress:
     current_operation: str
 
 
-class DiskWriter(QThread):
+class DiskWriter(WorkerThread):
     """Disk writing thread with progress monitoring"""
     
     # Signals
-    progress_updated = pyqtSignal(WriteProgress)
-    operation_completed = pyqtSignal(bool, str)  # success, message
-    operation_started = pyqtSignal(str)  # operation description
+    progress_updated = Signal(WriteProgress)
+    operation_completed = Signal(bool, str)  # success, message
+    operation_started = Signal(str)  # operation description
     
     def __init__(self):
         super().__init__()
@@ -60,6 +61,7 @@ class DiskWriter(QThread):
         self.verify_after_write = True
         self.buffer_size = 1024 * 1024  # 1MB buffer
         self.is_cancelled = False
+        self.command_runner = CommandRunner(is_cancelled=lambda: self.is_cancelled)
     
     def write_image(self, source_path: str, target_device: str, verify: bool = True):
         """Start disk writing operation"""
@@ -149,13 +151,13 @@ class DiskWriter(QThread):
                 partitions = psutil.disk_partitions()
                 for partition in partitions:
                     if partition.device.startswith(self.target_device):
-                        subprocess.run(['umount', partition.device], 
+                        self.command_runner.run(['umount', partition.device], 
                                      capture_output=True, check=False)
                         self.logger.info(f"Unmounted {partition.device}")
                         
             elif system == "Darwin":  # macOS
                 # Use diskutil to unmount
-                subprocess.run(['diskutil', 'unmountDisk', self.target_device], 
+                self.command_runner.run(['diskutil', 'unmountDisk', self.target_device], 
                              capture_output=True, check=False)
                 self.logger.info(f"Unmounted {self.target_device}")
                 
@@ -174,7 +176,7 @@ class DiskWriter(QThread):
                         
                         # Dismount all volumes on this disk using correct PowerShell cmdlet pipeline
                         ps_command = f"$ErrorActionPreference='Stop'; Get-Partition -DiskNumber {disk_num} | Get-Volume | Dismount-Volume -Force -Confirm:$false"
-                        result = subprocess.run(
+                        result = self.command_runner.run(
                             ['powershell', '-NoProfile', '-NonInteractive', '-Command', ps_command],
                             capture_output=True,
                             text=True,
@@ -307,6 +309,7 @@ class DiskManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.writer = DiskWriter()
+        self.command_runner = CommandRunner()
     
     def get_removable_drives(self) -> List[DiskInfo]:
         """Get list of removable drives suitable for writing"""
@@ -600,7 +603,7 @@ class DiskManager:
             if system == "Linux":
                 # Read from /proc/partitions or use lsblk
                 try:
-                    result = subprocess.run(['lsblk', '-J', '-o', 'NAME,SIZE,TYPE,REMOVABLE,MODEL'], 
+                    result = self.command_runner.run(['lsblk', '-J', '-o', 'NAME,SIZE,TYPE,REMOVABLE,MODEL'], 
                                           capture_output=True, text=True, check=False)
                     if result.returncode == 0:
                         import json
@@ -619,7 +622,7 @@ class DiskManager:
             elif system == "Windows":
                 # Use wmic to get physical drive info
                 try:
-                    result = subprocess.run(['wmic', 'diskdrive', 'get', 'size,model,deviceid', '/format:csv'], 
+                    result = self.command_runner.run(['wmic', 'diskdrive', 'get', 'size,model,deviceid', '/format:csv'], 
                                           capture_output=True, text=True, check=False)
                     if result.returncode == 0:
                         lines = result.stdout.strip().split('\n')[1:]  # Skip header
@@ -680,12 +683,12 @@ class DiskManager:
             
             if system == "Linux":
                 if filesystem.lower() == "fat32":
-                    result = subprocess.run(
+                    result = self.command_runner.run(
                         ['mkfs.fat', '-F', '32', device_path],
                         capture_output=True, text=True
                     )
                 elif filesystem.lower() == "ntfs":
-                    result = subprocess.run(
+                    result = self.command_runner.run(
                         ['mkfs.ntfs', '-f', device_path],
                         capture_output=True, text=True
                     )
@@ -697,7 +700,7 @@ class DiskManager:
             elif system == "Windows":
                 # Use Windows format command
                 drive_letter = device_path.rstrip('\\')
-                result = subprocess.run(
+                result = self.command_runner.run(
                     ['format', f'{drive_letter}:', '/fs:fat32', '/q'],
                     capture_output=True, text=True
                 )
@@ -706,7 +709,7 @@ class DiskManager:
             elif system == "Darwin":  # macOS
                 # Use diskutil
                 fs_type = "MS-DOS FAT32" if filesystem.lower() == "fat32" else "ExFAT"
-                result = subprocess.run(
+                result = self.command_runner.run(
                     ['diskutil', 'eraseDisk', fs_type, 'BOOTFORGE', device_path],
                     capture_output=True, text=True
                 )
@@ -0,0 +1,632 @@
+"""
+BootForge Driver Repository
+Indexes local Windows driver folders by the hardware IDs their INF files
+declare, so matching a machine's devices is a lookup instead of a scan.
+"""
+
+import os
+import re
+import posixpath
+import json
+import time
+import codecs
+import shutil
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+
+
+# Bump when the INF parser or table layout changes; old indexes are rebuilt
+INDEX_SCHEMA_VERSION = 1
+
+# Models section decorations (NTamd64.10.0...) -> DriverPackage architecture
+INF_ARCHITECTURES = {
+    "amd64": "x64",
+    "x86": "x86",
+    "arm64": "arm64",
+    "arm": "arm",
+    "ia64": "ia64",
+}
+
+_PCI_ID = re.compile(r"^PCI\\VEN_([0-9A-F]{4})&DEV_([0-9A-F]{4})"
+                     r"(?:&SUBSYS_([0-9A-F]{8}))?(?:&REV_([0-9A-F]{2}))?(?:&CC_([0-9A-F]{2,6}))?")
+_USB_ID = re.compile(r"^USB\\VID_([0-9A-F]{4})&PID_([0-9A-F]{4})(?:&REV_([0-9A-F]{4}))?")
+
+
+@dataclass
+class InfModel:
+    """One device an INF installs: a [Models] section line"""
+    hardware_id: str
+    description: str = ""
+    architecture: str = "any"
+
+
+@dataclass
+class InfDriver:
+    """The parts of an INF file BootForge needs to match and stage a driver"""
+    inf_path: str
+    driver_class: str = ""
+    provider: str = ""
+    version: str = ""
+    date: str = ""
+    catalog: str = ""
+    models: List[InfModel] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)  # Relative to the INF directory
+
+    @property
+    def date_key(self) -> Tuple[int, int, int]:
+        """DriverVer date as (year, month, day) for newest-first ordering"""
+        match = re.match(r"(\d{1,2})/(\d{1,2})/(\d{4})", self.date)
+        if not match:
+            return (0, 0, 0)
+        month, day, year = (int(part) for part in match.groups())
+        return (year, month, day)
+
+    @property
+    def version_key(self) -> Tuple[int, ...]:
+        return tuple(int(part) for part in re.findall(r"\d+", self.version))
+
+
+@dataclass
+class DriverMatch:
+    """Best repository driver for one device"""
+    hardware_id: str     # Device ID that matched an INF model
+    rank: int            # Position in the device's ID list; 0 is the most specific
+    description: str
+    driver: InfDriver
+
+
+# ----------------------------------------------------------------------
+# INF parsing
+# ----------------------------------------------------------------------
+
+def read_inf_text(path: Union[str, Path]) -> str:
+    """Decode an INF file; driver packs mix UTF-16, UTF-8 and ANSI files"""
+    raw = Path(path).read_bytes()
+    if raw.startswith(codecs.BOM_UTF16_LE) or raw.startswith(codecs.BOM_UTF16_BE):
+        return raw.decode("utf-16", errors="replace")
+    if raw.startswith(codecs.BOM_UTF8):
+        return raw[3:].decode("utf-8", errors="replace")
+    if len(raw) > 1 and raw[1] == 0:
+        return raw.decode("utf-16-le", errors="replace")
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("cp1252", errors="replace")
+
+
+def _strip_comment(line: str) -> str:
+    """Drop a ';' comment that is not inside double quotes"""
+    in_quotes = False
+    for position, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ";" and not in_quotes:
+            return line[:position]
+    return line
+
+
+def parse_inf_sections(text: str) -> Dict[str, List[str]]:
+    """Section name (lower case) -> logical lines, comments and continuations resolved"""
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    pending = ""
+    for raw_line in text.splitlines():
+        line = _strip_comment(raw_line).strip()
+        if line.endswith("\\") and not line.endswith("\\\\"):
+            pending += line[:-1]
+            continue
+        line, pending = (pending + line).strip(), ""
+        if not line:
+            continue
+        if line.startswith("[") and "]" in line:
+            name = line[1:line.index("]")].strip().lower()
+            current = sections.setdefault(name, [])
+        elif current is not None:
+            current.append(line)
+    return sections
+
+
+def _split_fields(value: str) -> List[str]:
+    """Comma separated INF fields, quotes removed"""
+    fields, current, in_quotes = [], [], False
+    for char in value:
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "," and not in_quotes:
+            fields.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    fields.append("".join(current).strip())
+    return fields
+
+
+def _key_value(line: str) -> Tuple[str, str]:
+    key, sep, value = line.partition("=")
+    if not sep:
+        return "", line.strip()
+    return key.strip(), value.strip()
+
+
+def _expand(value: str, strings: Dict[str, str]) -> str:
+    """Substitute %token% references from the [Strings] section"""
+    def replace(match):
+        token = match.group(1)
+        if not token:
+            return "%"
+        return strings.get(token.lower(), match.group(0))
+    return re.sub(r"%([^%]*)%", replace, value).strip().strip('"')
+
+
+def _decoration_architecture(decoration: str) -> str:
+    match = re.match(r"nt(amd64|x86|arm64|arm|ia64)?", decoration.lower())
+    if not match:
+        return "any"
+    return INF_ARCHITECTURES.get(match.group(1) or "", "any")
+
+
+def parse_inf(path: Union[str, Path]) -> InfDriver:
+    """Parse the [Version], [Manufacturer]/[Models] and source file sections"""
+    sections = parse_inf_sections(read_inf_text(path))
+
+    strings: Dict[str, str] = {}
+    for name, lines in sections.items():
+        if name == "strings" or name.startswith("strings."):
+            for line in lines:
+                key, value = _key_value(line)
+                strings.setdefault(key.strip('"').lower(), value.strip('"'))
+
+    driver = InfDriver(inf_path=str(path))
+    for line in sections.get("version", []):
+        key, value = _key_value(line)
+        key = key.lower()
+        if key == "class":
+            driver.driver_class = _expand(value, strings)
+        elif key == "provider":
+            driver.provider = _expand(value, strings)
+        elif key == "driverver":
+            fields = _split_fields(value)
+            driver.date = fields[0]
+            driver.version = fields[1] if len(fields) > 1 else ""
+        elif key.startswith("catalogfile") and not driver.catalog:
+            driver.catalog = _expand(value, strings)
+
+    seen = set()
+    for line in sections.get("manufacturer", []):
+        _, value = _key_value(line)
+        fields = [f for f in _split_fields(value) if f]
+        if not fields:
+            continue
+        base = fields[0]
+        models_sections = [(base, "any")] + [(f"{base}.{decoration}", _decoration_architecture(decoration))
+                                             for decoration in fields[1:]]
+        for section_name, architecture in models_sections:
+            for model_line in sections.get(section_name.lower(), []):
+                description, value = _key_value(model_line)
+                ids = _split_fields(value)[1:]
+                for hardware_id in ids:
+                    hardware_id = normalize_hardware_id(_expand(hardware_id, strings))
+                    if hardware_id and (hardware_id, architecture) not in seen:
+                        seen.add((hardware_id, architecture))
+                        driver.models.append(InfModel(hardware_id, _expand(description, strings),
+                                                      architecture))
+
+    driver.files = _source_files(sections, driver.catalog)
+    return driver
+
+
+def _source_files(sections: Dict[str, List[str]], catalog: str) -> List[str]:
+    """Files the package ships, from [SourceDisksNames] and [SourceDisksFiles]"""
+    disk_paths: Dict[str, str] = {}
+    for name, lines in sections.items():
+        if name == "sourcedisksnames" or name.startswith("sourcedisksnames."):
+            for line in lines:
+                disk_id, value = _key_value(line)
+                fields = _split_fields(value)
+                disk_paths[disk_id] = fields[3] if len(fields) > 3 else ""
+
+    files = {catalog} if catalog else set()
+    for name, lines in sections.items():
+        if name == "sourcedisksfiles" or name.startswith("sourcedisksfiles."):
+            for line in lines:
+                file_name, value = _key_value(line)
+                if not file_name:
+                    continue
+                fields = _split_fields(value)
+                parts = [disk_paths.get(fields[0], ""), fields[1] if len(fields) > 1 else "", file_name]
+                relative = "/".join(p.replace("\\", "/").strip("/") for p in parts if p.strip("\\/ "))
+                files.add(relative)
+    return sorted(files)
+
+
+def _package_relative(path: str) -> Optional[str]:
+    """Normalized package-relative form of an INF file path, None if it leaves the package"""
+    relative = posixpath.normpath(path.replace("\\", "/"))
+    first = relative.split("/", 1)[0]
+    if relative in (".", "..") or relative.startswith(("/", "../")) or first.endswith(":"):
+        return None
+    return relative
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    return path == root or root in path.parents
+
+
+# ----------------------------------------------------------------------
+# Hardware IDs
+# ----------------------------------------------------------------------
+
+def normalize_hardware_id(value: str) -> str:
+    """Upper-case bus\\id form without a device instance suffix"""
+    value = value.strip().strip('"').replace("/", "\\").upper()
+    parts = value.split("\\")
+    return "\\".join(parts[:2]) if len(parts) > 2 else value
+
+
+def pci_hardware_ids(vendor: str, device: str, subsystem: Optional[str] = None,
+                     revision: Optional[str] = None, class_code: Optional[str] = None) -> List[str]:
+    """Hardware and compatible IDs Windows derives for a PCI device, most specific first"""
+    base = f"PCI\\VEN_{vendor.upper()}&DEV_{device.upper()}"
+    ids = []
+    if subsystem:
+        if revision:
+            ids.append(f"{base}&SUBSYS_{subsystem.upper()}&REV_{revision.upper()}")
+        ids.append(f"{base}&SUBSYS_{subsystem.upper()}")
+    if class_code:
+        class_code = class_code.upper()
+        ids.extend(f"{base}&CC_{class_code[:length]}" for length in (6, 4) if len(class_code) >= length)
+    if revision:
+        ids.append(f"{base}&REV_{revision.upper()}")
+    ids.append(base)
+    if class_code:
+        ids.extend(f"PCI\\VEN_{vendor.upper()}&CC_{class_code[:length]}"
+                   for length in (6, 4) if len(class_code) >= length)
+        ids.extend(f"PCI\\CC_{class_code[:length]}" for length in (6, 4, 2) if len(class_code) >= length)
+    return list(dict.fromkeys(ids))
+
+
+def usb_hardware_ids(vendor: str, product: str, revision: Optional[str] = None) -> List[str]:
+    base = f"USB\\VID_{vendor.upper()}&PID_{product.upper()}"
+    return ([f"{base}&REV_{revision.upper()}"] if revision else []) + [base]
+
+
+def device_hardware_ids(device_id: str) -> List[str]:
+    """Expand one reported device ID into the IDs an INF may list for it"""
+    device_id = normalize_hardware_id(device_id)
+    pci = _PCI_ID.match(device_id)
+    if pci:
+        vendor, device, subsystem, revision, class_code = pci.groups()
+        return [device_id] + [i for i in pci_hardware_ids(vendor, device, subsystem, revision, class_code)
+                              if i != device_id]
+    usb = _USB_ID.match(device_id)
+    if usb:
+        return list(dict.fromkeys([device_id] + usb_hardware_ids(*usb.groups())))
+    return [device_id]
+
+
+def hardware_device_ids(hardware: Any) -> List[List[str]]:
+    """Per-device ID lists for a DetectedHardware, most specific ID first
+
+    Devices carry "hardware_id"/"hardware_ids" (Windows PnP IDs) or
+    "pci_id" ("8086:15b8") with optional "pci_class" and "pci_revision"
+    as recorded by the hardware detector.
+    """
+    devices = []
+    groups = (hardware.gpus, hardware.network_adapters, hardware.storage_devices,
+              hardware.raw_data.get("devices", []))
+    for group in groups:
+        for device in group:
+            if not isinstance(device, dict):
+                continue
+            ids: List[str] = []
+            reported = device.get("hardware_ids") or []
+            if device.get("hardware_id"):
+                reported = [device["hardware_id"]] + list(reported)
+            for device_id in reported:
+                ids.extend(device_hardware_ids(device_id))
+            pci_id = device.get("pci_id")
+            if pci_id and ":" in pci_id:
+                vendor, device_code = pci_id.split(":", 1)
+                ids.extend(pci_hardware_ids(vendor, device_code, device.get("pci_subsystem"),
+                                            device.get("pci_revision"), device.get("pci_class")))
+            ids = list(dict.fromkeys(ids))
+            if ids and ids not in devices:
+                devices.append(ids)
+    return devices
+
+
+# ----------------------------------------------------------------------
+# Repository
+# ----------------------------------------------------------------------
+
+class DriverRepository:
+    """Local driver folders with a persistent hardware-ID index
+
+    The index is a SQLite database keyed by hardware ID. Scans are
+    incremental: an INF is re-parsed only when its size or modification
+    time changed, so a large driver pack is parsed once and afterwards
+    matching is a single indexed query.
+    """
+
+    def __init__(self, index_path: Union[str, Path], roots: Iterable[Union[str, Path]]):
+        self.logger = logging.getLogger(__name__)
+        self.index_path = Path(index_path)
+        self.roots = [Path(root).resolve() for root in roots]
+        self._lock = threading.Lock()
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.index_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Create the schema, discarding an index written by another parser version"""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row["value"] != str(INDEX_SCHEMA_VERSION):
+                conn.execute("DROP TABLE IF EXISTS hardware_ids")
+                conn.execute("DROP TABLE IF EXISTS packages")
+                conn.execute("DROP TABLE IF EXISTS roots")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                             (str(INDEX_SCHEMA_VERSION),))
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS roots (
+                    path TEXT PRIMARY KEY,
+                    scanned_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS packages (
+                    id INTEGER PRIMARY KEY,
+                    root TEXT NOT NULL,
+                    inf_path TEXT NOT NULL UNIQUE,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    driver_class TEXT,
+                    provider TEXT,
+                    version TEXT,
+                    date TEXT,
+                    catalog TEXT,
+                    files TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS hardware_ids (
+                    hardware_id TEXT NOT NULL,
+                    package_id INTEGER NOT NULL,
+                    architecture TEXT NOT NULL,
+                    description TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_hardware_id ON hardware_ids(hardware_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_hardware_package ON hardware_ids(package_id)")
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def is_indexed(self, root: Union[str, Path]) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM roots WHERE path = ?",
+                                (str(Path(root).resolve()),)).fetchone() is not None
+
+    def ensure_indexed(self) -> int:
+        """Scan only roots that have never been indexed; returns INF files parsed"""
+        return sum(self.scan_root(root) for root in self.roots if not self.is_indexed(root))
+
+    def scan(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        """Incrementally re-index every root; returns the number of INF files parsed"""
+        return sum(self.scan_root(root, progress_callback) for root in self.roots)
+
+    def scan_root(self, root: Union[str, Path],
+                  progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        """Bring one root's index up to date with the files on disk"""
+        root = Path(root).resolve()
+        if not root.is_dir():
+            self.logger.warning(f"Driver repository {root} not found")
+            return 0
+
+        start_time = time.time()
+        inf_files = []
+        for directory, _, names in os.walk(root):
+            inf_files.extend(os.path.join(directory, name) for name in names
+                             if name.lower().endswith(".inf"))
+
+        with self._lock, self._connect() as conn:
+            known = {row["inf_path"]: (row["id"], row["mtime_ns"], row["size"])
+                     for row in conn.execute("SELECT id, inf_path, mtime_ns, size FROM packages "
+                                             "WHERE root = ?", (str(root),))}
+            parsed = 0
+            for position, inf_path in enumerate(inf_files, 1):
+                try:
+                    st = os.stat(inf_path)
+                except OSError:
+                    continue
+                previous = known.pop(inf_path, None)
+                if previous and previous[1:] == (st.st_mtime_ns, st.st_size):
+                    continue
+                if previous:
+                    self._delete_package(conn, previous[0])
+                self._insert_package(conn, root, inf_path, st)
+                parsed += 1
+                if progress_callback:
+                    progress_callback(position, len(inf_files))
+
+            # INF files that disappeared since the last scan
+            for package_id, _, _ in known.values():
+                self._delete_package(conn, package_id)
+            conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (str(root), time.time()))
+
+        self.logger.info(f"Indexed {root}: {len(inf_files)} INF file(s), {parsed} parsed, "
+                         f"{len(known)} removed in {time.time() - start_time:.1f}s")
+        return parsed
+
+    def _insert_package(self, conn: sqlite3.Connection, root: Path, inf_path: str, st: os.stat_result):
+        try:
+            driver = parse_inf(inf_path)
+        except (OSError, ValueError) as e:
+            # Recorded without models so it is not re-parsed on every scan
+            self.logger.debug(f"Skipping unreadable INF {inf_path}: {e}")
+            driver = InfDriver(inf_path=inf_path)
+
+        cursor = conn.execute(
+            "INSERT INTO packages (root, inf_path, mtime_ns, size, driver_class, provider, version, "
+            "date, catalog, files) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(root), inf_path, st.st_mtime_ns, st.st_size, driver.driver_class, driver.provider,
+             driver.version, driver.date, driver.catalog, json.dumps(driver.files))
+        )
+        conn.executemany(
+            "INSERT INTO hardware_ids (hardware_id, package_id, architecture, description) "
+            "VALUES (?, ?, ?, ?)",
+            [(model.hardware_id, cursor.lastrowid, model.architecture, model.description)
+             for model in driver.models]
+        )
+
+    @staticmethod
+    def _delete_package(conn: sqlite3.Connection, package_id: int):
+        conn.execute("DELETE FROM hardware_ids WHERE package_id = ?", (package_id,))
+        conn.execute("DELETE FROM packages WHERE id = ?", (package_id,))
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def lookup(self, hardware_ids: List[str], architecture: str = "x64") -> List[DriverMatch]:
+        """Every indexed driver declaring one of hardware_ids, ranked by ID position"""
+        ids = [normalize_hardware_id(hardware_id) for hardware_id in hardware_ids]
+        if not ids:
+            return []
+        rank = {hardware_id: position for position, hardware_id in reversed(list(enumerate(ids)))}
+
+        placeholders = ",".join("?" * len(rank))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT h.hardware_id, h.description, p.* FROM hardware_ids h "
+                f"JOIN packages p ON p.id = h.package_id "
+                f"WHERE h.hardware_id IN ({placeholders}) AND h.architecture IN (?, 'any')",
+                list(rank) + [architecture]
+            ).fetchall()
+
+        matches = [DriverMatch(row["hardware_id"], rank[row["hardware_id"]], row["description"] or "",
+                               self._driver_from_row(row)) for row in rows]
+        return sorted(matches, key=lambda m: (m.rank, tuple(-v for v in m.driver.date_key),
+                                              tuple(-v for v in m.driver.version_key), m.driver.inf_path))
+
+    def best_match(self, hardware_ids: List[str], architecture: str = "x64") -> Optional[DriverMatch]:
+        """Most specific ID first, then the newest driver"""
+        matches = self.lookup(hardware_ids, architecture)
+        return matches[0] if matches else None
+
+    def match_hardware(self, hardware: Any, architecture: str = "x64") -> List[DriverMatch]:
+        """Best driver for each detected device, one entry per package"""
+        matches: Dict[str, DriverMatch] = {}
+        for device_ids in hardware_device_ids(hardware):
+            match = self.best_match(device_ids, architecture)
+            if match and match.driver.inf_path not in matches:
+                matches[match.driver.inf_path] = match
+        return list(matches.values())
+
+    @staticmethod
+    def _driver_from_row(row: sqlite3.Row) -> InfDriver:
+        return InfDriver(
+            inf_path=row["inf_path"],
+            driver_class=row["driver_class"] or "",
+            provider=row["provider"] or "",
+            version=row["version"] or "",
+            date=row["date"] or "",
+            catalog=row["catalog"] or "",
+            files=json.loads(row["files"] or "[]")
+        )
+
+    def current(self, inf_path: Union[str, Path]) -> Optional[InfDriver]:
+        """Indexed driver for an INF, rescanning its root first if the row is stale
+
+        Returns None when the INF is no longer in the repository.
+        """
+        inf_path = str(inf_path)
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM packages WHERE inf_path = ?", (inf_path,)).fetchone()
+        try:
+            st = os.stat(inf_path)
+        except OSError:
+            st = None
+        if row is not None and st is not None and (row["mtime_ns"], row["size"]) == (st.st_mtime_ns, st.st_size):
+            return self._driver_from_row(row)
+
+        root = Path(row["root"]) if row is not None else next(
+            (root for root in self.roots if Path(inf_path).is_relative_to(root)), None)
+        if root is None:
+            return None
+        self.logger.info(f"Index entry for {inf_path} is stale, rescanning {root}")
+        self.scan_root(root)
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM packages WHERE inf_path = ?", (inf_path,)).fetchone()
+        return self._driver_from_row(row) if row is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return {
+                "roots": conn.execute("SELECT COUNT(*) FROM roots").fetchone()[0],
+                "packages": conn.execute("SELECT COUNT(*) FROM packages").fetchone()[0],
+                "hardware_ids": conn.execute("SELECT COUNT(*) FROM hardware_ids").fetchone()[0],
+            }
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+
+    def stage(self, driver: InfDriver, destination: Union[str, Path]) -> Path:
+        """Copy one package (INF, catalog and source files) into destination
+
+        Only the files the INF references are copied, not the whole folder
+        of a multi-driver pack. Returns the staged INF path.
+        """
+        inf_path = Path(driver.inf_path)
+        destination = Path(destination)
+        destination.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(inf_path, destination / inf_path.name)
+        package_root, staging_root = inf_path.parent.resolve(), destination.resolve()
+
+        for referenced in driver.files:
+            relative = _package_relative(referenced)
+            if relative is None:
+                self.logger.warning(f"{inf_path.name}: skipping file {referenced} outside the package")
+                continue
+            source = self._find_file(inf_path.parent, relative)
+            if source is None:
+                self.logger.warning(f"{inf_path.name}: referenced file {relative} not found")
+                continue
+            target = destination / relative
+            # Symlinks inside the package could still point elsewhere
+            if not (_is_within(source.resolve(), package_root)
+                    and _is_within(target.resolve(), staging_root)):
+                self.logger.warning(f"{inf_path.name}: skipping file {relative} outside the package")
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+        return destination / inf_path.name
+
+    @staticmethod
+    def _find_file(directory: Path, relative: str) -> Optional[Path]:
+        """Resolve a path from an INF case-insensitively, as Windows would"""
+        current = directory
+        for part in relative.split("/"):
+            candidate = current / part
+            if not candidate.exists():
+                lowered = part.lower()
+                candidate = next((child for child in current.iterdir()
+                                  if child.name.lower() == lowered), None) if current.is_dir() else None
+                if candidate is None:
+                    return None
+            current = candidate
+        return current if current.is_file() else None
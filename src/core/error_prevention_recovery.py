@@ -342,7 +342,8 @@ class CheckpointManager:
             file_checksums=file_checksums,
             metadata={
                 "device_path": device_path,
-                "source_files": [str(f) for f in (source_files or [])]
+                "source_files": [str(f) for f in (source_files or [])],
+                "file_stats": self._file_stats(source_files or [])
             }
         )
         
@@ -354,6 +355,71 @@ class CheckpointManager:
         self.logger.info(f"Checkpoint {checkpoint_id} created successfully")
         return checkpoint
     
+    def save_stage_checkpoint(
+        self,
+        checkpoint_id: str,
+        phase: OperationPhase,
+        input_hash: str,
+        outputs: Dict[str, Any],
+        source_files: List[Path] = None
+    ) -> CheckpointState:
+        """Persist the outputs of a completed workflow stage"""
+        checkpoint = CheckpointState(
+            checkpoint_id=checkpoint_id,
+            timestamp=time.time(),
+            operation_phase=phase,
+            device_state={},
+            file_checksums=self._calculate_file_checksums(source_files or []),
+            metadata={
+                "input_hash": input_hash,
+                "outputs": outputs,
+                "file_stats": self._file_stats(source_files or [])
+            }
+        )
+        
+        # Write then rename so an interrupted save never leaves a torn checkpoint
+        checkpoint_file = self.checkpoint_dir / f"{checkpoint_id}.checkpoint"
+        temp_file = checkpoint_file.with_suffix(".tmp")
+        checkpoint.save_to_file(temp_file)
+        temp_file.replace(checkpoint_file)
+        self.checkpoints[checkpoint_id] = checkpoint
+        
+        self.logger.info(f"Stage checkpoint {checkpoint_id} saved")
+        return checkpoint
+    
+    def load_checkpoint(self, checkpoint_id: str) -> Optional[CheckpointState]:
+        """Load a checkpoint from memory or disk, None if missing or unreadable"""
+        if checkpoint_id in self.checkpoints:
+            return self.checkpoints[checkpoint_id]
+        
+        checkpoint_file = self.checkpoint_dir / f"{checkpoint_id}.checkpoint"
+        if not checkpoint_file.exists():
+            return None
+        try:
+            checkpoint = CheckpointState.load_from_file(checkpoint_file)
+        except Exception as e:
+            self.logger.warning(f"Could not load checkpoint {checkpoint_id}: {e}")
+            return None
+        
+        self.checkpoints[checkpoint_id] = checkpoint
+        return checkpoint
+    
+    def verify_file_checksums(self, checkpoint: CheckpointState) -> bool:
+        """Check that the files a checkpoint was taken against are unchanged
+        
+        The checksum only covers the first MB, so size and mtime are compared too.
+        """
+        files = [Path(f) for f in checkpoint.file_checksums]
+        return (self._calculate_file_checksums(files) == checkpoint.file_checksums
+                and self._file_stats(files) == checkpoint.metadata.get("file_stats"))
+    
+    def discard_checkpoint(self, checkpoint_id: str):
+        """Remove a checkpoint from memory and disk"""
+        self.checkpoints.pop(checkpoint_id, None)
+        checkpoint_file = self.checkpoint_dir / f"{checkpoint_id}.checkpoint"
+        if checkpoint_file.exists():
+            checkpoint_file.unlink()
+    
     def rollback_to_checkpoint(self, checkpoint_id: str) -> bool:
         """Rollback system to a specific checkpoint"""
         try:
@@ -414,6 +480,17 @@ class CheckpointManager:
                     self.logger.warning(f"Could not checksum {file_path}: {e}")
         return checksums
     
+    def _file_stats(self, files: List[Path]) -> Dict[str, List[int]]:
+        """Size and mtime (ns) of each existing file"""
+        stats = {}
+        for file_path in files:
+            try:
+                stat = Path(file_path).stat()
+            except OSError:
+                continue
+            stats[str(file_path)] = [stat.st_size, stat.st_mtime_ns]
+        return stats
+    
     def cleanup_old_checkpoints(self, max_age_hours: int = 24):
         """Clean up old checkpoints"""
         current_time = time.time()
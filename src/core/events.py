@@ -0,0 +1,107 @@
+"""
+BootForge Core Events
+Qt-free signals and worker threads for the build and write engines, so the CLI
+and provisioning services can drive them without PyQt6 or an event loop.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class BoundSignal:
+    """Per-instance signal; slots run synchronously in the emitting thread"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._slots: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot: Callable):
+        """Register a callback for this signal"""
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot: Optional[Callable] = None):
+        """Remove one callback, or all of them when slot is None"""
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+            elif slot in self._slots:
+                self._slots.remove(slot)
+            else:
+                raise TypeError(f"{slot!r} is not connected to {self.name}")
+
+    def emit(self, *args: Any):
+        """Call every connected slot; a failing slot never breaks the emitter"""
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            try:
+                slot(*args)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Error in {self.name} handler: {e}")
+
+
+class Signal:
+    """Class-level signal declaration mirroring pyqtSignal
+
+    Declared on the class as ``progress_updated = Signal(object)``; each instance
+    gets its own BoundSignal on first access.
+    """
+
+    def __init__(self, *types: Any):
+        self.types = types
+        self.name = ""
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        signals: Dict[str, BoundSignal] = instance.__dict__.setdefault("_bound_signals", {})
+        if self.name not in signals:
+            signals[self.name] = BoundSignal(self.name)
+        return signals[self.name]
+
+
+class WorkerThread:
+    """Minimal thread wrapper with the QThread methods the engines rely on"""
+
+    finished = Signal()
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self):
+        """Thread body; subclasses override"""
+
+    def start(self):
+        """Run run() in a new thread"""
+        if self.isRunning():
+            raise RuntimeError(f"{type(self).__name__} is already running")
+        self._thread = threading.Thread(target=self._run_and_notify,
+                                        name=f"bootforge_{type(self).__name__}")
+        self._thread.start()
+
+    def isRunning(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, msecs: Optional[int] = None) -> bool:
+        """Block until the thread finishes; returns False on timeout"""
+        if self._thread is None:
+            return True
+        self._thread.join(None if msecs is None else msecs / 1000.0)
+        return not self._thread.is_alive()
+
+    @staticmethod
+    def msleep(msecs: int):
+        time.sleep(msecs / 1000.0)
+
+    def _run_and_notify(self):
+        try:
+            self.run()
+        finally:
+            self.finished.emit()
@@ -0,0 +1,354 @@
+"""
+BootForge Fleet Matcher
+Matches asset-inventory exports (CSV, JSON or JSONL) against hardware profiles
+in bulk and streams per-machine results with macOS and OCLP recommendations.
+"""
+
+import os
+import re
+import csv
+import copy
+import json
+import logging
+import multiprocessing
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+from src.core.hardware_detector import DetectedHardware, DetectionConfidence, ProfileMatch
+from src.core.hardware_matcher import HardwareMatcher
+from src.core.hardware_profiles import (
+    get_mac_model_data, get_mac_oclp_requirements, get_optimal_macos_version_recommendation,
+)
+
+
+DEFAULT_CHUNK_SIZE = 200
+# Distinct machine shapes each worker remembers; fleets repeat a few hundred configurations
+SHAPE_CACHE_SIZE = 4096
+
+# Inventory column names accepted for each field (compared lower-case, spaces as underscores)
+FIELD_ALIASES = {
+    "asset_id": ("asset_id", "asset_tag", "serial", "serial_number", "id", "hostname", "name"),
+    "model": ("model_identifier", "model_id", "model", "system_model", "hardware_model"),
+    "manufacturer": ("manufacturer", "vendor", "make", "system_manufacturer"),
+    "cpu": ("cpu", "cpu_name", "processor", "chip"),
+    "gpus": ("gpu", "gpus", "graphics", "gpu_name"),
+    "ram": ("ram_gb", "memory_gb", "ram", "memory", "total_ram_gb"),
+    "architecture": ("architecture", "cpu_architecture", "arch"),
+    "platform": ("platform", "os_platform"),
+}
+
+# A Mac record without a known model identifier needs a match at least this good
+RECOMMEND_CONFIDENCE = (DetectionConfidence.EXACT_MATCH, DetectionConfidence.HIGH_CONFIDENCE,
+                        DetectionConfidence.MEDIUM_CONFIDENCE)
+RECOMMEND_MIN_SCORE = 60.0
+
+_MAC_IDENTIFIER = re.compile(r"^(?:MacBook|MacBookAir|MacBookPro|Macmini|MacPro|iMac|iMacPro|Mac)\d+,\d+$")
+_RAM = re.compile(r"(\d+(?:\.\d+)?)\s*(TB|GB|MB)?", re.IGNORECASE)
+_ARCHITECTURES = {"x86_64": "x86_64", "amd64": "x86_64", "x64": "x86_64", "arm64": "arm64", "aarch64": "arm64"}
+
+_worker_state: Optional["_WorkerState"] = None
+
+
+@dataclass(frozen=True)
+class FleetMachine:
+    """One normalised inventory record"""
+    asset_id: str = ""
+    model: str = ""
+    manufacturer: str = ""
+    cpu: str = ""
+    gpus: Tuple[str, ...] = ()
+    ram_gb: Optional[float] = None
+    architecture: str = ""
+    platform: str = ""
+
+    @property
+    def shape(self) -> Tuple[Any, ...]:
+        """Everything that affects matching; machines with the same shape match the same"""
+        return (self.model, self.manufacturer, self.cpu, self.gpus, self.ram_gb, self.architecture, self.platform)
+
+    def to_hardware(self) -> DetectedHardware:
+        return DetectedHardware(
+            system_manufacturer=self.manufacturer or None,
+            system_model=self.model or None,
+            cpu_name=self.cpu or None,
+            cpu_architecture=self.architecture or None,
+            total_ram_gb=self.ram_gb,
+            gpus=[{"name": gpu} for gpu in self.gpus],
+            primary_gpu=self.gpus[0] if self.gpus else None,
+            platform=self.platform,
+            detection_confidence=(DetectionConfidence.HIGH_CONFIDENCE if self.model
+                                  else DetectionConfidence.UNKNOWN),
+        )
+
+
+def _parse_ram(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _RAM.search(str(value))
+    if not match:
+        return None
+    amount = float(match.group(1))
+    unit = (match.group(2) or "GB").upper()
+    return amount * 1024 if unit == "TB" else amount / 1024 if unit == "MB" else amount
+
+
+def _parse_gpus(value: Any) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, (list, tuple)):
+        names = [gpu.get("name", "") if isinstance(gpu, dict) else str(gpu) for gpu in value]
+    else:
+        names = re.split(r"[;|]", str(value))
+    return tuple(name.strip() for name in names if name and name.strip())
+
+
+def normalize_record(record: Dict[str, Any]) -> FleetMachine:
+    """Map an inventory record with any of the FIELD_ALIASES column names onto a FleetMachine"""
+    columns = {str(key).strip().lower().replace(" ", "_"): value for key, value in record.items()}
+
+    def pick(field_name: str) -> Any:
+        for alias in FIELD_ALIASES[field_name]:
+            value = columns.get(alias)
+            if value not in (None, ""):
+                return value
+        return None
+
+    model = str(pick("model") or "").strip()
+    manufacturer = str(pick("manufacturer") or "").strip()
+    cpu = str(pick("cpu") or "").strip()
+    platform = str(pick("platform") or "").strip().lower()
+    if platform in ("macos", "darwin", "osx"):
+        platform = "mac"
+    is_mac = platform == "mac" or bool(_MAC_IDENTIFIER.match(model)) or "apple" in manufacturer.lower()
+    if is_mac:
+        platform = "mac"
+        manufacturer = manufacturer or "Apple Inc."
+
+    architecture = str(pick("architecture") or "").strip().lower()
+    architecture = _ARCHITECTURES.get(architecture, architecture)
+    if not architecture and cpu:
+        cpu_lower = cpu.lower()
+        if re.search(r"\bapple\s+m\d", cpu_lower):
+            architecture = "arm64"
+        elif any(keyword in cpu_lower for keyword in ("intel", "amd", "xeon", "core")):
+            architecture = "x86_64"
+
+    return FleetMachine(
+        asset_id=str(pick("asset_id") or "").strip(),
+        model=model,
+        manufacturer=manufacturer,
+        cpu=cpu,
+        gpus=_parse_gpus(pick("gpus")),
+        ram_gb=_parse_ram(pick("ram")),
+        architecture=architecture,
+        platform=platform,
+    )
+
+
+def load_inventory(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Stream raw records from a CSV, JSON (list or {"machines": [...]}) or JSONL inventory"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif suffix == ".json":
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("machines", data.get("records", []))
+            if not isinstance(data, list):
+                raise ValueError(f"Inventory {path} must hold a list of machine records")
+            yield from data
+        else:
+            raise ValueError(f"Unsupported inventory format: {path.suffix or path.name}")
+
+
+def _describe_match(match: ProfileMatch) -> Dict[str, Any]:
+    return {
+        "profile": match.profile.name,
+        "model": match.profile.model,
+        "platform": match.profile.platform,
+        "score": round(match.match_score, 1),
+        "confidence": match.confidence.value,
+        "reasons": list(match.match_reasons),
+    }
+
+
+def _mac_model_id(machine: FleetMachine, matches: List[ProfileMatch],
+                  model_ids: Dict[str, str]) -> Optional[str]:
+    """Mac model a recommendation can be based on, or None
+
+    Only Mac records get one: the record's own model identifier when it is in
+    the database (model_ids maps lower-cased ids to their spelling), else the
+    best Mac profile match that is confident enough.
+    """
+    if machine.platform != "mac":
+        return None
+    if machine.model.lower() in model_ids:
+        return model_ids[machine.model.lower()]
+    return next((m.profile.model for m in matches
+                 if m.profile.platform == "mac" and m.confidence in RECOMMEND_CONFIDENCE
+                 and m.match_score >= RECOMMEND_MIN_SCORE), None)
+
+
+def _recommend(machine: FleetMachine, matches: List[ProfileMatch],
+               model_ids: Dict[str, str]) -> Dict[str, Any]:
+    """macOS recommendation and OCLP patch needs for a Mac record's model"""
+    model = _mac_model_id(machine, matches, model_ids)
+    if model is None:
+        return {"mac_model": None, "recommended_macos": None, "oclp_required": False,
+                "alternatives": [], "oclp": None}
+
+    recommendation = get_optimal_macos_version_recommendation(model)
+    version = recommendation.get("optimal_version")
+    oclp_required = bool(recommendation.get("oclp_required"))
+    alternatives = [alternative["version"] for alternative in recommendation.get("alternatives", [])]
+
+    # Patch needs for the OCLP route: the recommendation itself, or the newest OCLP alternative
+    oclp_version = version if oclp_required else next(
+        (a["version"] for a in recommendation.get("alternatives", []) if a.get("method") == "OCLP"), None)
+    oclp = None
+    if oclp_version:
+        requirements = get_mac_oclp_requirements(model, oclp_version)
+        oclp = {
+            "macos_version": oclp_version,
+            "compatibility": requirements.get("oclp_compatibility"),
+            "required_patches": list(requirements.get("required_patches", [])),
+            "graphics_patches": list(requirements.get("graphics_patches", [])),
+            "audio_patches": list(requirements.get("audio_patches", [])),
+            "wifi_bluetooth_patches": list(requirements.get("wifi_bluetooth_patches", [])),
+            "usb_patches": list(requirements.get("usb_patches", [])),
+        }
+    return {
+        "mac_model": model,
+        "recommended_macos": version,
+        "oclp_required": oclp_required,
+        "alternatives": alternatives,
+        "oclp": oclp,
+    }
+
+
+class _WorkerState:
+    """Matcher and per-shape results owned by one worker process"""
+
+    def __init__(self, max_results: int):
+        self.max_results = max_results
+        self.matcher = HardwareMatcher()
+        self.mac_model_ids = {model_id.lower(): model_id for model_id in get_mac_model_data()}
+        self.results: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+    def match(self, machines: List[FleetMachine]) -> List[Dict[str, Any]]:
+        pending = {}
+        for machine in machines:
+            if machine.shape not in self.results:
+                pending.setdefault(machine.shape, machine)
+
+        if pending:
+            hardware = [machine.to_hardware() for machine in pending.values()]
+            for shape, matches in zip(pending, self.matcher.find_matching_profiles_batch(hardware, self.max_results)):
+                if len(self.results) >= SHAPE_CACHE_SIZE:
+                    del self.results[next(iter(self.results))]
+                self.results[shape] = {"matches": [_describe_match(m) for m in matches],
+                                       **_recommend(pending[shape], matches, self.mac_model_ids)}
+
+        return [copy.deepcopy(self.results[machine.shape]) for machine in machines]
+
+
+def _init_worker(max_results: int):
+    global _worker_state
+    _worker_state = _WorkerState(max_results)
+
+
+def _match_chunk(chunk: List[Tuple[int, FleetMachine]], state: Optional[_WorkerState] = None) -> List[Dict[str, Any]]:
+    """Worker entry point: match one chunk of machines"""
+    matched = (state or _worker_state).match([machine for _, machine in chunk])
+    return [{"record": index, "asset_id": machine.asset_id, "input_model": machine.model, **result}
+            for (index, machine), result in zip(chunk, matched)]
+
+
+class FleetMatcher:
+    """Bulk profile matching for inventories of thousands of machines
+
+    Records are normalised in the calling process and matched in chunks by a
+    pool of worker processes, each holding one pre-indexed HardwareMatcher.
+    Identical machine configurations are matched once per worker. Results are
+    yielded in input order while later chunks are still being matched.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_results: int = 3,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_results = max_results
+        self.chunk_size = max(1, chunk_size)
+
+    def match(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield one result dict per inventory record"""
+        chunks = self._chunks(records)
+        if self.workers == 1:
+            state = _WorkerState(self.max_results)
+            for chunk, errors in chunks:
+                yield from self._merge(errors, _match_chunk(chunk, state))
+            return
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.max_results,)) as pool:
+            # Keep a bounded window of chunks in flight so huge inventories stream
+            window: Deque = deque()
+            for chunk, errors in chunks:
+                window.append((chunk, errors, pool.submit(_match_chunk, chunk)))
+                if len(window) >= self.workers * 2:
+                    chunk, errors, future = window.popleft()
+                    yield from self._merge(errors, future.result())
+            while window:
+                chunk, errors, future = window.popleft()
+                yield from self._merge(errors, future.result())
+
+    def write_jsonl(self, records: Iterable[Dict[str, Any]], output: IO[str]) -> Dict[str, int]:
+        """Stream results to a JSONL file object and return summary counts"""
+        summary = {"machines": 0, "matched": 0, "oclp_required": 0, "errors": 0}
+        for result in self.match(records):
+            output.write(json.dumps(result, sort_keys=True) + "\n")
+            summary["machines"] += 1
+            if "error" in result:
+                summary["errors"] += 1
+            elif result["matches"]:
+                summary["matched"] += 1
+            if result.get("oclp_required"):
+                summary["oclp_required"] += 1
+        return summary
+
+    def _chunks(self, records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[List[Tuple[int, FleetMachine]], List[Dict[str, Any]]]]:
+        """Normalised (index, machine) chunks plus the records that could not be normalised"""
+        chunk: List[Tuple[int, FleetMachine]] = []
+        errors: List[Dict[str, Any]] = []
+        for index, record in enumerate(records):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("record is not an object")
+                chunk.append((index, normalize_record(record)))
+            except Exception as e:
+                errors.append({"record": index, "error": f"Invalid inventory record: {e}"})
+            if len(chunk) >= self.chunk_size:
+                yield chunk, errors
+                chunk, errors = [], []
+        if chunk or errors:
+            yield chunk, errors
+
+    @staticmethod
+    def _merge(errors: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Interleave normalisation errors back into input order"""
+        if not errors:
+            yield from results
+            return
+        yield from sorted(results + errors, key=lambda result: result["record"])
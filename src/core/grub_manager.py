@@ -5,13 +5,13 @@ Handles GRUB installation and configuration for multi-boot systems
 
 import os
 import logging
-import subprocess
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
 from .models import DeploymentRecipe, PartitionInfo, FileSystem
+from .command_runner import CommandRunner
 
 
 class GRUBBootMode(Enum):
@@ -195,9 +195,10 @@ class GRUBConfig:
 class GRUBManager:
     """Manages GRUB installation and configuration for multi-boot systems"""
     
-    def __init__(self):
+    def __init__(self, command_runner: Optional[CommandRunner] = None):
         self.logger = logging.getLogger(__name__)
         self.grub_config = GRUBConfig()
+        self.command_runner = command_runner or CommandRunner()
         
     def detect_existing_os(self, device_path: str) -> List[OSEntry]:
         """Detect existing operating systems on the device"""
@@ -205,7 +206,7 @@ class GRUBManager:
         
         try:
             # Use blkid to detect filesystems and labels
-            result = subprocess.run(
+            result = self.command_runner.run(
                 ['sudo', 'blkid', device_path + '*'],
                 capture_output=True, text=True, timeout=30
             )
@@ -318,7 +319,7 @@ class GRUBManager:
                     device_path
                 ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            result = self.command_runner.run(cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode == 0:
                 self.logger.info("GRUB installation successful")
@@ -352,7 +353,7 @@ class GRUBManager:
     def update_grub(self) -> bool:
         """Update GRUB configuration"""
         try:
-            result = subprocess.run(
+            result = self.command_runner.run(
                 ['sudo', 'update-grub'],
                 capture_output=True, text=True, timeout=30
             )
@@ -417,7 +418,7 @@ class GRUBManager:
     def get_grub_version(self) -> Optional[str]:
         """Get installed GRUB version"""
         try:
-            result = subprocess.run(
+            result = self.command_runner.run(
                 ['grub-install', '--version'],
                 capture_output=True, text=True, timeout=10
             )
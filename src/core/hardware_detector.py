@@ -9,14 +9,18 @@ import json
 import time
 import logging
 import platform
+import threading
 import subprocess
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
 from src.core.models import HardwareProfile
+from src.core.detection_cache import DetectionCache, get_detection_cache
+from src.core.pci_ids import LazyIDIndex, PCI_IDS_PATHS
 
 
 class DetectionConfidence(Enum):
@@ -110,11 +114,105 @@ class ProfileMatch:
         return confidence_map.get(self.confidence, "Unknown")
 
 
+# lspci -nn: "Ethernet controller [0200]: Intel ... [8086:15b8] (rev 31)"
+_LSPCI_IDS = re.compile(r"\[([0-9a-fA-F]{4})\]:.*\[([0-9a-fA-F]{4}):([0-9a-fA-F]{4})\]"
+                        r"(?:\s*\(rev ([0-9a-fA-F]{2})\))?")
+
+
+def _lspci_ids(line: str) -> Dict[str, str]:
+    """PCI vendor:device, class and revision from one lspci -nn line"""
+    match = _LSPCI_IDS.search(line)
+    if not match:
+        return {}
+    pci_class, vendor, device, revision = match.groups()
+    ids = {"pci_id": f"{vendor.lower()}:{device.lower()}", "pci_class": pci_class.upper()}
+    if revision:
+        ids["pci_revision"] = revision.upper()
+    return ids
+
+
+# Seconds each probe may take before detection moves on without it
+PROBE_TIMEOUT = 60.0
+
+
+def _merge_probe_result(hardware: DetectedHardware, result: DetectedHardware, baseline: DetectedHardware):
+    """Fold what one probe collected into the shared result, in probe order"""
+    for f in fields(DetectedHardware):
+        value = getattr(result, f.name)
+        if value == getattr(baseline, f.name):
+            continue
+        current = getattr(hardware, f.name)
+        if isinstance(value, list):
+            current.extend(value)
+        elif isinstance(value, dict):
+            current.update(value)
+        else:
+            setattr(hardware, f.name, value)
+
+
+# PCI base classes (first byte of the sysfs class attribute)
+PCI_CLASS_NETWORK = 0x02
+PCI_CLASS_DISPLAY = 0x03
+
+# GPU vendor names keyed by PCI vendor ID
+_GPU_VENDORS = {"10de": "NVIDIA", "1002": "AMD", "1022": "AMD", "8086": "Intel"}
+
+# Human-readable names for sysfs PCI devices, from pci.ids when one is installed
+_PCI_NAMES = LazyIDIndex(PCI_IDS_PATHS)
+
+
+def _read_attribute(path: Path) -> Optional[str]:
+    """Contents of one sysfs/procfs attribute, or None when unreadable"""
+    try:
+        return path.read_text(errors="replace").strip()
+    except (IOError, OSError):
+        return None
+
+
+def _sysfs_pci_device(device_dir: Path) -> Optional[Dict[str, str]]:
+    """PCI IDs, class and revision of one /sys/bus/pci/devices entry, in the lspci_ids format"""
+    vendor = _read_attribute(device_dir / "vendor")
+    device = _read_attribute(device_dir / "device")
+    pci_class = _read_attribute(device_dir / "class")
+    if not vendor or not device or not pci_class:
+        return None
+    
+    try:
+        vendor_id, device_id, class_code = int(vendor, 16), int(device, 16), int(pci_class, 16)
+    except ValueError:
+        return None
+    
+    info = {
+        "pci_id": f"{vendor_id:04x}:{device_id:04x}",
+        "pci_class": f"{class_code >> 8:04X}",
+        "pci_address": device_dir.name,
+    }
+    revision = _read_attribute(device_dir / "revision")
+    if revision:
+        try:
+            info["pci_revision"] = f"{int(revision, 16):02X}"
+        except ValueError:
+            pass
+    
+    vendor_name = _PCI_NAMES.vendor_name(vendor_id) or _GPU_VENDORS.get(f"{vendor_id:04x}") or f"PCI vendor {vendor_id:04x}"
+    device_name = _PCI_NAMES.device_name(vendor_id, device_id) or f"device {device_id:04x}"
+    info["name"] = f"{vendor_name} {device_name}"
+    return info
+
+
 class PlatformDetector(ABC):
     """Abstract base class for platform-specific hardware detection"""
     
-    def __init__(self):
+    # Probes run concurrently; a tuple runs in order in one worker because the
+    # later probes read what the earlier ones collected
+    PROBES: Tuple[Union[str, Tuple[str, ...]], ...] = (
+        "system", "cpu", "memory", "gpu", "network", "storage"
+    )
+    
+    def __init__(self, probe_timeout: float = PROBE_TIMEOUT):
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.probe_timeout = probe_timeout
+        self._probe_context = threading.local()
     
     @abstractmethod
     def detect_hardware(self) -> DetectedHardware:
@@ -126,8 +224,69 @@ class PlatformDetector(ABC):
         """Check if detection is available on this platform"""
         pass
     
+    def _run_probes(self, hardware: DetectedHardware):
+        """Run the detection probes concurrently and merge what finished in time
+        
+        Each probe fills its own scratch DetectedHardware, so a probe that
+        fails or misses its deadline leaves nothing half-written behind.
+        Per-probe status and timing are recorded in raw_data["probe_timings"].
+        """
+        groups = [(group,) if isinstance(group, str) else tuple(group) for group in self.PROBES]
+        timings: Dict[str, Dict[str, Any]] = {}
+        start = time.monotonic()
+        
+        executor = ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="hardware-probe")
+        try:
+            futures = []
+            for group in groups:
+                deadline = start + self.probe_timeout * len(group)
+                futures.append((group, deadline, executor.submit(self._run_probe_group, group, hardware.platform, deadline)))
+            
+            for group, deadline, future in futures:
+                try:
+                    result, group_timings = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    self.logger.warning(f"Hardware probe timed out: {', '.join(group)}")
+                    elapsed = round(time.monotonic() - start, 3)
+                    timings.update({name: {"status": "timeout", "seconds": elapsed} for name in group})
+                    continue
+                timings.update(group_timings)
+                _merge_probe_result(hardware, result, DetectedHardware(platform=hardware.platform))
+        finally:
+            # Abandoned probes finish in the background; their commands are capped at the deadline
+            executor.shutdown(wait=False)
+        
+        hardware.raw_data["probe_timings"] = timings
+    
+    def _run_probe_group(self, group: Tuple[str, ...], platform_name: str,
+                         deadline: float) -> Tuple[DetectedHardware, Dict[str, Dict[str, Any]]]:
+        """Run one chain of probes in this worker thread against a scratch result"""
+        self._probe_context.deadline = deadline
+        result = DetectedHardware(platform=platform_name)
+        timings = {}
+        try:
+            for name in group:
+                probe_start = time.monotonic()
+                status = "ok"
+                try:
+                    getattr(self, f"_detect_{name}_info")(result)
+                except Exception as e:
+                    self.logger.error(f"Hardware probe '{name}' failed: {e}")
+                    status = "error"
+                timings[name] = {"status": status, "seconds": round(time.monotonic() - probe_start, 3)}
+        finally:
+            self._probe_context.deadline = None
+        return result, timings
+    
     def _run_command(self, command: List[str], timeout: int = 30) -> Tuple[str, str, int]:
         """Safely run a system command with timeout"""
+        deadline = getattr(self._probe_context, "deadline", None)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "", "Probe deadline exceeded", -1
+            timeout = min(timeout, remaining)
+        
         try:
             result = subprocess.run(
                 command,
@@ -153,23 +312,8 @@ class WindowsDetector(PlatformDetector):
         hardware = DetectedHardware(platform="windows")
         
         try:
-            # Detect system information
-            self._detect_system_info(hardware)
-            
-            # Detect CPU information
-            self._detect_cpu_info(hardware)
-            
-            # Detect memory information
-            self._detect_memory_info(hardware)
-            
-            # Detect GPU information
-            self._detect_gpu_info(hardware)
-            
-            # Detect network adapters
-            self._detect_network_info(hardware)
-            
-            # Detect storage devices
-            self._detect_storage_info(hardware)
+            # Run the system, CPU, memory, GPU, network and storage probes
+            self._run_probes(hardware)
             
             # Set confidence based on detection success
             hardware.detection_confidence = self._calculate_confidence(hardware)
@@ -272,7 +416,7 @@ class WindowsDetector(PlatformDetector):
         """Detect GPU information using Win32_VideoController"""
         command = [
             "powershell", "-Command",
-            "Get-CimInstance Win32_VideoController | Where-Object {$_.Name -notlike '*Remote*'} | Select-Object Name,AdapterCompatibility,DriverVersion,AdapterRAM | ConvertTo-Json"
+            "Get-CimInstance Win32_VideoController | Where-Object {$_.Name -notlike '*Remote*'} | Select-Object Name,AdapterCompatibility,DriverVersion,AdapterRAM,PNPDeviceID | ConvertTo-Json"
         ]
         
         stdout, stderr, returncode = self._run_command(command)
@@ -289,7 +433,8 @@ class WindowsDetector(PlatformDetector):
                             "name": gpu_name,
                             "vendor": gpu.get("AdapterCompatibility"),
                             "driver_version": gpu.get("DriverVersion"),
-                            "memory_bytes": gpu.get("AdapterRAM")
+                            "memory_bytes": gpu.get("AdapterRAM"),
+                            "hardware_id": gpu.get("PNPDeviceID")
                         }
                         hardware.gpus.append(gpu_info)
                         
@@ -306,7 +451,7 @@ class WindowsDetector(PlatformDetector):
         """Detect network adapters using Win32_NetworkAdapter"""
         command = [
             "powershell", "-Command",
-            "Get-CimInstance Win32_NetworkAdapter | Where-Object {$_.PhysicalAdapter -eq $true -and $_.NetConnectionStatus -ne $null} | Select-Object Name,Manufacturer,MACAddress,Speed | ConvertTo-Json"
+            "Get-CimInstance Win32_NetworkAdapter | Where-Object {$_.PhysicalAdapter -eq $true -and $_.NetConnectionStatus -ne $null} | Select-Object Name,Manufacturer,MACAddress,Speed,PNPDeviceID | ConvertTo-Json"
         ]
         
         stdout, stderr, returncode = self._run_command(command)
@@ -322,7 +467,8 @@ class WindowsDetector(PlatformDetector):
                             "name": adapter.get("Name"),
                             "manufacturer": adapter.get("Manufacturer"),
                             "mac_address": adapter.get("MACAddress"),
-                            "speed": adapter.get("Speed")
+                            "speed": adapter.get("Speed"),
+                            "hardware_id": adapter.get("PNPDeviceID")
                         })
                 
                 hardware.raw_data["win32_network_adapter"] = data
@@ -388,30 +534,20 @@ class WindowsDetector(PlatformDetector):
 
 
 class LinuxDetector(PlatformDetector):
-    """Linux-specific hardware detection using system tools"""
+    """Linux-specific hardware detection using sysfs/procfs, falling back to system tools"""
+    
+    def __init__(self, probe_timeout: float = PROBE_TIMEOUT, root: Union[str, Path] = "/"):
+        super().__init__(probe_timeout)
+        # Prefix for /sys and /proc, so detection can run against a captured tree
+        self.root = Path(root)
     
     def detect_hardware(self) -> DetectedHardware:
         """Detect hardware on Linux using various system tools"""
         hardware = DetectedHardware(platform="linux")
         
         try:
-            # Detect system information
-            self._detect_system_info(hardware)
-            
-            # Detect CPU information  
-            self._detect_cpu_info(hardware)
-            
-            # Detect memory information
-            self._detect_memory_info(hardware)
-            
-            # Detect GPU information
-            self._detect_gpu_info(hardware)
-            
-            # Detect network information
-            self._detect_network_info(hardware)
-            
-            # Detect storage information
-            self._detect_storage_info(hardware)
+            # Run the system, CPU, memory, GPU, network and storage probes
+            self._run_probes(hardware)
             
             # Set confidence based on detection success
             hardware.detection_confidence = self._calculate_confidence(hardware)
@@ -427,8 +563,18 @@ class LinuxDetector(PlatformDetector):
         return platform.system().lower() == "linux"
     
     def _detect_system_info(self, hardware: DetectedHardware):
-        """Detect system information using DMI data"""
-        # Try dmidecode first (requires root on some systems)
+        """Detect system information from the sysfs DMI tables, falling back to dmidecode"""
+        dmi_path = self.root / "sys/class/dmi/id"
+        hardware.system_manufacturer = _read_attribute(dmi_path / "sys_vendor") or None
+        hardware.system_model = _read_attribute(dmi_path / "product_name") or None
+        # product_serial is only readable by root
+        hardware.system_serial = _read_attribute(dmi_path / "product_serial") or None
+        
+        if not hardware.system_manufacturer or not hardware.system_model:
+            self._detect_system_info_dmidecode(hardware)
+    
+    def _detect_system_info_dmidecode(self, hardware: DetectedHardware):
+        """Detect system information using dmidecode (requires root on some systems)"""
         dmi_commands = [
             ["dmidecode", "-s", "system-manufacturer"],
             ["dmidecode", "-s", "system-product-name"],
@@ -440,29 +586,14 @@ class LinuxDetector(PlatformDetector):
             stdout, stderr, returncode = self._run_command(cmd)
             dmi_results.append(stdout.strip() if returncode == 0 else "")
         
-        hardware.system_manufacturer = dmi_results[0] if dmi_results[0] else None
-        hardware.system_model = dmi_results[1] if dmi_results[1] else None
-        hardware.system_serial = dmi_results[2] if dmi_results[2] else None
-        
-        # Fallback to /sys/class/dmi/id/ if dmidecode fails
-        if not hardware.system_manufacturer:
-            try:
-                with open("/sys/class/dmi/id/sys_vendor", "r") as f:
-                    hardware.system_manufacturer = f.read().strip()
-            except (IOError, OSError):
-                pass
-        
-        if not hardware.system_model:
-            try:
-                with open("/sys/class/dmi/id/product_name", "r") as f:
-                    hardware.system_model = f.read().strip()
-            except (IOError, OSError):
-                pass
+        hardware.system_manufacturer = hardware.system_manufacturer or dmi_results[0] or None
+        hardware.system_model = hardware.system_model or dmi_results[1] or None
+        hardware.system_serial = hardware.system_serial or dmi_results[2] or None
     
     def _detect_cpu_info(self, hardware: DetectedHardware):
         """Detect CPU information from /proc/cpuinfo"""
         try:
-            with open("/proc/cpuinfo", "r") as f:
+            with open(self.root / "proc/cpuinfo", "r") as f:
                 cpuinfo = f.read()
             
             # Parse CPU information
@@ -484,10 +615,8 @@ class LinuxDetector(PlatformDetector):
                     elif key == "vendor_id":
                         hardware.cpu_manufacturer = value
             
-            # Detect architecture
-            stdout, stderr, returncode = self._run_command(["uname", "-m"])
-            if returncode == 0:
-                arch = stdout.strip()
+            arch = self._machine(cpuinfo)
+            if arch:
                 # Normalize architecture names
                 if arch in ["x86_64", "amd64"]:
                     hardware.cpu_architecture = "x86_64"
@@ -501,10 +630,36 @@ class LinuxDetector(PlatformDetector):
         except (IOError, OSError, ValueError) as e:
             self.logger.warning(f"Failed to read CPU info: {e}")
     
+    def _machine(self, cpuinfo: str) -> str:
+        """uname -m of the system under self.root, empty when unknown
+        
+        platform.machine() describes this host, so a captured tree is read
+        for its own kernel arch or cpuinfo fields instead.
+        """
+        if self.root == Path("/"):
+            return platform.machine().lower()
+        
+        arch_file = _read_attribute(self.root / "proc/sys/kernel/arch")
+        if arch_file:
+            return arch_file.lower()
+        
+        fields = {}
+        for line in cpuinfo.split("\n"):
+            key, sep, value = line.partition(":")
+            if sep:
+                fields.setdefault(key.strip().lower(), value.strip())
+        if fields.get("cpu architecture") == "8":
+            return "aarch64"
+        if fields.get("cpu architecture", "").isdigit():
+            return "armv" + fields["cpu architecture"]
+        if "vendor_id" in fields and "flags" in fields:
+            return "x86_64" if "lm" in fields["flags"].split() else "i686"
+        return ""
+    
     def _detect_memory_info(self, hardware: DetectedHardware):
         """Detect memory information from /proc/meminfo"""
         try:
-            with open("/proc/meminfo", "r") as f:
+            with open(self.root / "proc/meminfo", "r") as f:
                 meminfo = f.read()
             
             # Parse memory information
@@ -520,7 +675,38 @@ class LinuxDetector(PlatformDetector):
         except (IOError, OSError, ValueError) as e:
             self.logger.warning(f"Failed to read memory info: {e}")
     
+    def _sysfs_pci_devices(self) -> Optional[List[Dict[str, str]]]:
+        """PCI devices from /sys/bus/pci/devices, or None when sysfs is not mounted"""
+        devices_path = self.root / "sys/bus/pci/devices"
+        if not devices_path.is_dir():
+            return None
+        
+        devices = []
+        for device_dir in sorted(devices_path.iterdir()):
+            device = _sysfs_pci_device(device_dir)
+            if device:
+                devices.append(device)
+        return devices
+    
     def _detect_gpu_info(self, hardware: DetectedHardware):
+        """Detect GPU information from sysfs PCI devices, falling back to lspci"""
+        devices = self._sysfs_pci_devices()
+        if devices is None:
+            self._detect_gpu_info_lspci(hardware)
+            return
+        
+        for device in devices:
+            if int(device["pci_class"], 16) >> 8 != PCI_CLASS_DISPLAY:
+                continue
+            gpu_info = dict(device)
+            vendor = _GPU_VENDORS.get(device["pci_id"][:4])
+            if vendor:
+                gpu_info["vendor"] = vendor
+            hardware.gpus.append(gpu_info)
+            if not hardware.primary_gpu:
+                hardware.primary_gpu = gpu_info["name"]
+    
+    def _detect_gpu_info_lspci(self, hardware: DetectedHardware):
         """Detect GPU information using lspci"""
         stdout, stderr, returncode = self._run_command(["lspci", "-nn"])
         
@@ -538,7 +724,7 @@ class LinuxDetector(PlatformDetector):
                         else:
                             gpu_name = gpu_line
                         
-                        gpu_info = {"name": gpu_name}
+                        gpu_info = {"name": gpu_name, **_lspci_ids(line)}
                         
                         # Identify vendor
                         gpu_lower = gpu_name.lower()
@@ -557,24 +743,19 @@ class LinuxDetector(PlatformDetector):
             hardware.raw_data["lspci"] = stdout[:1000]  # First 1000 chars only
     
     def _detect_network_info(self, hardware: DetectedHardware):
-        """Detect network adapters using various methods"""
-        # Try using lspci for PCI network cards
-        stdout, stderr, returncode = self._run_command(["lspci", "-nn"])
-        
-        if returncode == 0:
-            lines = stdout.split("\n")
-            for line in lines:
-                if "Ethernet controller" in line or "Network controller" in line:
-                    if ":" in line:
-                        adapter_name = line.split(":", 2)[-1].strip()
-                        if "[" in adapter_name:
-                            adapter_name = adapter_name.split("[")[0].strip()
-                        
-                        hardware.network_adapters.append({"name": adapter_name})
+        """Detect network adapters from sysfs PCI devices (or lspci) and /sys/class/net"""
+        devices = self._sysfs_pci_devices()
+        if devices is None:
+            self._detect_network_info_lspci(hardware)
+        else:
+            hardware.network_adapters.extend(
+                dict(device) for device in devices
+                if int(device["pci_class"], 16) >> 8 == PCI_CLASS_NETWORK
+            )
         
         # Try to get network interface names
         try:
-            net_path = Path("/sys/class/net")
+            net_path = self.root / "sys/class/net"
             if net_path.exists():
                 for interface in net_path.iterdir():
                     if interface.name != "lo":  # Skip loopback
@@ -593,7 +774,47 @@ class LinuxDetector(PlatformDetector):
         except (IOError, OSError):
             pass
     
+    def _detect_network_info_lspci(self, hardware: DetectedHardware):
+        """Detect PCI network cards using lspci"""
+        stdout, stderr, returncode = self._run_command(["lspci", "-nn"])
+        
+        if returncode == 0:
+            lines = stdout.split("\n")
+            for line in lines:
+                if "Ethernet controller" in line or "Network controller" in line:
+                    if ":" in line:
+                        adapter_name = line.split(":", 2)[-1].strip()
+                        if "[" in adapter_name:
+                            adapter_name = adapter_name.split("[")[0].strip()
+                        
+                        hardware.network_adapters.append({"name": adapter_name, **_lspci_ids(line)})
+    
     def _detect_storage_info(self, hardware: DetectedHardware):
+        """Detect storage devices from /sys/block, falling back to lsblk"""
+        block_path = self.root / "sys/block"
+        if not block_path.is_dir():
+            self._detect_storage_info_lsblk(hardware)
+            return
+        
+        for disk in sorted(block_path.iterdir()):
+            # Physical disks have a backing device; loop, ram, zram and dm devices don't.
+            # SCSI peripheral type 5 is an optical drive (lsblk type "rom")
+            if not (disk / "device").exists() or _read_attribute(disk / "device/type") == "5":
+                continue
+            
+            try:
+                # The size attribute is always in 512-byte sectors
+                size_gb = int(_read_attribute(disk / "size") or 0) * 512 / (1024 ** 3)
+            except ValueError:
+                size_gb = 0
+            
+            hardware.storage_devices.append({
+                "name": disk.name,
+                "model": _read_attribute(disk / "device/model") or "",
+                "size_gb": size_gb
+            })
+    
+    def _detect_storage_info_lsblk(self, hardware: DetectedHardware):
         """Detect storage devices using lsblk"""
         stdout, stderr, returncode = self._run_command(["lsblk", "-bno", "NAME,SIZE,MODEL,TYPE"])
         
@@ -651,28 +872,16 @@ class LinuxDetector(PlatformDetector):
 class MacOSDetector(PlatformDetector):
     """macOS-specific hardware detection using system_profiler and ioreg"""
     
+    # CPU details come out of the SPHardwareDataType report the system probe stores
+    PROBES = (("system", "cpu"), "memory", "gpu", "network", "storage")
+    
     def detect_hardware(self) -> DetectedHardware:
         """Detect hardware on macOS using system_profiler"""
         hardware = DetectedHardware(platform="mac")
         
         try:
-            # Detect system information
-            self._detect_system_info(hardware)
-            
-            # Detect CPU information
-            self._detect_cpu_info(hardware)
-            
-            # Detect memory information
-            self._detect_memory_info(hardware)
-            
-            # Detect GPU information
-            self._detect_gpu_info(hardware)
-            
-            # Detect network information
-            self._detect_network_info(hardware)
-            
-            # Detect storage information
-            self._detect_storage_info(hardware)
+            # Run the system, CPU, memory, GPU, network and storage probes
+            self._run_probes(hardware)
             
             # Set confidence based on detection success
             hardware.detection_confidence = self._calculate_confidence(hardware)
@@ -918,14 +1127,19 @@ class MacOSDetector(PlatformDetector):
 class HardwareDetector:
     """Main hardware detection engine"""
     
-    def __init__(self):
+    def __init__(self, probe_timeout: float = PROBE_TIMEOUT, cache: Optional[DetectionCache] = None,
+                 use_cache: bool = True):
         self.logger = logging.getLogger(__name__)
         
+        # Detections are shared process-wide (and across runs) unless caching is disabled
+        self.cache = cache
+        self.use_cache = use_cache
+        
         # Initialize platform-specific detectors
         self.detectors = {
-            "windows": WindowsDetector(),
-            "linux": LinuxDetector(),
-            "mac": MacOSDetector()
+            "windows": WindowsDetector(probe_timeout),
+            "linux": LinuxDetector(probe_timeout),
+            "mac": MacOSDetector(probe_timeout)
         }
         
         # Detect current platform
@@ -945,8 +1159,15 @@ class HardwareDetector:
             self.logger.warning(f"Unknown platform: {system}")
             return "unknown"
     
-    def detect_hardware(self) -> Optional[DetectedHardware]:
-        """Detect hardware on the current platform"""
+    def detect_hardware(self, force_refresh: bool = False) -> Optional[DetectedHardware]:
+        """Detect hardware on the current platform, reusing a cached detection of this machine"""
+        if not self.use_cache:
+            return self._detect_hardware_uncached()
+        cache = self.cache or get_detection_cache()
+        return cache.get_or_detect(self._detect_hardware_uncached, force_refresh)
+    
+    def _detect_hardware_uncached(self) -> Optional[DetectedHardware]:
+        """Run the platform detector"""
         if self.current_platform == "unknown":
             self.logger.error("Cannot detect hardware on unknown platform")
             return None
@@ -4,15 +4,17 @@ Intelligent matching of detected hardware to deployment profiles with confidence
 """
 
 import re
+import heapq
 import logging
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Any, Set
+from dataclasses import dataclass, field
 from enum import Enum
 
 from src.core.hardware_detector import DetectedHardware, DetectionConfidence, ProfileMatch
 from src.core.vendor_database import VendorDatabase
 from src.core.models import HardwareProfile
-from src.core.hardware_profiles import get_default_profiles, get_profiles_by_platform
+from src.core.hardware_profiles import get_default_profiles
 
 
 class MatchCriteria(Enum):
@@ -35,13 +37,248 @@ class MatchReason:
     confidence: float  # 0-1
 
 
+# Manufacturer name -> words that identify its products in profile names/models
+MANUFACTURER_INDICATORS = {
+    "apple": ["mac", "imac", "macbook", "mac mini", "mac pro"],
+    "dell": ["dell", "optiplex", "inspiron", "latitude", "precision"],
+    "hp": ["hp", "hewlett", "pavilion", "envy", "elitebook", "probook"],
+    "lenovo": ["lenovo", "thinkpad", "ideapad", "yoga", "legion"],
+    "asus": ["asus", "asustek", "rog", "zenbook", "vivobook"],
+    "msi": ["msi", "micro-star", "gaming", "prestige"],
+    "microsoft": ["surface", "microsoft"],
+    "samsung": ["samsung", "galaxy book"],
+    "acer": ["acer", "aspire", "predator", "swift"],
+    "alienware": ["alienware", "dell alienware"]
+}
+
+# Per-hardware feature sets kept between find_matching_profiles() calls
+FEATURE_CACHE_SIZE = 256
+
+_WORD_PATTERN = re.compile(r'\w+')
+_MAC_IDENTIFIER_PATTERN = re.compile(r"^[a-z]+\d+,\d+$", re.IGNORECASE)
+
+
+class _SubstringIndex:
+    """Finds which of many strings contain a needle with one scan of a joined text"""
+
+    SEPARATOR = "\x00"
+
+    def __init__(self, texts: List[str]):
+        self.count = len(texts)
+        self.starts = []
+        offset = 0
+        for text in texts:
+            self.starts.append(offset)
+            offset += len(text) + 1
+        self.joined = self.SEPARATOR.join(texts)
+
+    def containing(self, needle: str) -> Set[int]:
+        if not needle or self.SEPARATOR in needle:
+            return set(range(self.count))
+        found = set()
+        position = self.joined.find(needle)
+        while position != -1:
+            index = self._index_at(position)
+            found.add(index)
+            # Continue from the next text; one hit per text is enough
+            next_start = self.starts[index + 1] if index + 1 < self.count else len(self.joined)
+            position = self.joined.find(needle, next_start)
+        return found
+
+    def _index_at(self, position: int) -> int:
+        low, high = 0, self.count - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.starts[middle] <= position:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+
+def _remember(cache: Dict, key: Any, value: Any):
+    """Insert into a small memo dict, dropping the oldest entry when full"""
+    if len(cache) >= FEATURE_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+def _shape_key(profile: HardwareProfile) -> Tuple:
+    """Profile attributes every scorer except model/manufacturer depends on"""
+    return (
+        profile.platform,
+        profile.architecture,
+        profile.cpu_family,
+        profile.year,
+        tuple(profile.gpu_info or ()),
+        tuple(profile.network_adapters or ()),
+        tuple(profile.special_requirements or ())
+    )
+
+
+@lru_cache(maxsize=8192)
+def _model_words(model: str) -> frozenset:
+    """Keyword/model-number tokens of a lowercased model string"""
+    return frozenset(_WORD_PATTERN.findall(model))
+
+
+@lru_cache(maxsize=1024)
+def _extract_cpu_series(cpu_name: str) -> Optional[str]:
+    """Extract CPU series identifier from CPU name (memoized, names repeat across profiles)"""
+    if not cpu_name:
+        return None
+    
+    cpu_lower = cpu_name.lower()
+    
+    # Intel series patterns
+    intel_patterns = [
+        r"core\s*i3",
+        r"core\s*i5", 
+        r"core\s*i7",
+        r"core\s*i9",
+        r"xeon",
+        r"celeron",
+        r"pentium"
+    ]
+    
+    for pattern in intel_patterns:
+        match = re.search(pattern, cpu_lower)
+        if match:
+            return match.group(0).replace(" ", "")
+    
+    # AMD series patterns
+    amd_patterns = [
+        r"ryzen\s*3",
+        r"ryzen\s*5",
+        r"ryzen\s*7", 
+        r"ryzen\s*9",
+        r"threadripper",
+        r"epyc",
+        r"fx"
+    ]
+    
+    for pattern in amd_patterns:
+        match = re.search(pattern, cpu_lower)
+        if match:
+            return match.group(0).replace(" ", "")
+    
+    # Apple series patterns
+    if re.search(r"apple.*m\d+", cpu_lower):
+        match = re.search(r"m\d+(\s+pro|\s+max|\s+ultra)?", cpu_lower)
+        if match:
+            return match.group(0).replace(" ", "")
+    
+    return None
+
+
+class _ProfileIndex:
+    """Inverted indexes over one candidate profile list
+
+    Model tokens and substrings find the profiles the model scorer can reward,
+    manufacturer indicators give the manufacturer score directly, and the
+    remaining attributes (platform, architecture, CPU family, year,
+    GPU/network/special features) are grouped by shape so each distinct
+    shape is scored once per hardware.
+    """
+
+    def __init__(self, profiles: List[HardwareProfile]):
+        self.profiles = profiles
+        self.models = [(p.model or "").lower().strip() for p in profiles]
+        names = [p.name.lower() for p in profiles]
+        raw_models = [p.model.lower() for p in profiles]
+
+        self.model_tokens: Dict[str, Set[int]] = {}
+        self.model_positions: Dict[str, Set[int]] = {}
+        for position, model in enumerate(self.models):
+            if not model:
+                continue
+            self.model_positions.setdefault(model, set()).add(position)
+            for token in _WORD_PATTERN.findall(model):
+                self.model_tokens.setdefault(token, set()).add(position)
+        self.longest_model = max((len(m) for m in self.models), default=0)
+        self.model_text = _SubstringIndex(self.models)
+
+        self.manufacturer_hits: Dict[str, Set[int]] = {}
+        for manufacturer, indicators in MANUFACTURER_INDICATORS.items():
+            self.manufacturer_hits[manufacturer] = {
+                position for position in range(len(profiles))
+                if any(i in names[position] or i in raw_models[position] for i in indicators)
+            }
+        self.name_text = _SubstringIndex(names)
+        self.raw_model_text = _SubstringIndex(raw_models)
+
+        self._model_hit_cache: Dict[str, Set[int]] = {}
+        self._manufacturer_hit_cache: Dict[str, Tuple[Set[int], Set[int]]] = {}
+
+        self.shapes: Dict[Tuple, List[int]] = {}
+        self.shape_of: List[Tuple] = []
+        for position, profile in enumerate(profiles):
+            key = _shape_key(profile)
+            self.shapes.setdefault(key, []).append(position)
+            self.shape_of.append(key)
+
+    def model_hits(self, hardware_model: str) -> Set[int]:
+        """Profiles whose model could score: shared token or substring either way"""
+        hits = self._model_hit_cache.get(hardware_model)
+        if hits is None:
+            hits = self._find_model_hits(hardware_model)
+            _remember(self._model_hit_cache, hardware_model, hits)
+        return hits
+
+    def manufacturer_scores(self, hardware_mfg: str) -> Tuple[Set[int], Set[int]]:
+        """Profiles scoring 100 (product indicator) and 90 (name contains manufacturer)
+
+        Mirrors HardwareMatcher._score_manufacturer_match; every other
+        profile scores 0 for the manufacturer criterion.
+        """
+        tiers = self._manufacturer_hit_cache.get(hardware_mfg)
+        if tiers is None:
+            indicator_hits: Set[int] = set()
+            for manufacturer, positions in self.manufacturer_hits.items():
+                if manufacturer in hardware_mfg:
+                    indicator_hits |= positions
+            name_hits = self.name_text.containing(hardware_mfg) | self.raw_model_text.containing(hardware_mfg)
+            tiers = (indicator_hits, name_hits - indicator_hits)
+            _remember(self._manufacturer_hit_cache, hardware_mfg, tiers)
+        return tiers
+
+    def _find_model_hits(self, hardware_model: str) -> Set[int]:
+        if not hardware_model:
+            return set(range(len(self.profiles)))
+        hits = self.model_text.containing(hardware_model)
+        for token in _WORD_PATTERN.findall(hardware_model):
+            hits |= self.model_tokens.get(token, set())
+        length = len(hardware_model)
+        for start in range(length):
+            for end in range(start + 1, min(length, start + self.longest_model) + 1):
+                hits |= self.model_positions.get(hardware_model[start:end], set())
+        return hits
+
+
+@dataclass
+class _HardwareFeatures:
+    """Per-hardware values extracted once and reused across profiles"""
+    model: str
+    manufacturer: Optional[str]
+    shape_scores: Dict[Tuple, Tuple[float, ...]] = field(default_factory=dict)
+
+
 class HardwareMatcher:
     """Intelligent hardware profile matching engine"""
     
-    def __init__(self):
+    # Order in which _score_profile_match adds up the criteria
+    _SCORE_ORDER = (
+        MatchCriteria.EXACT_MODEL, MatchCriteria.MANUFACTURER_MODEL, MatchCriteria.PLATFORM,
+        MatchCriteria.ARCHITECTURE, MatchCriteria.CPU_FAMILY, MatchCriteria.YEAR,
+        MatchCriteria.SPECIAL_FEATURES
+    )
+    
+    def __init__(self, profiles: Optional[List[HardwareProfile]] = None):
         self.logger = logging.getLogger(__name__)
         self.vendor_db = VendorDatabase()
-        self._available_profiles = get_default_profiles()
+        self._available_profiles = list(profiles) if profiles is not None else get_default_profiles()
+        self._candidate_indexes: Dict[Tuple[str, bool], _ProfileIndex] = {}
+        self._features_cache: Dict[Tuple, _HardwareFeatures] = {}
         
         # Matching weights for different criteria
         self._match_weights = {
@@ -63,14 +300,33 @@ class HardwareMatcher:
             return []
         
         self.logger.info(f"Finding matches for: {detected_hardware.get_summary()}")
+        self.logger.info(f"Found {len(self._get_candidate_index(detected_hardware).profiles)} candidate profiles")
+        
+        results = self._find_matches(detected_hardware, max_results)
         
+        self.logger.info(f"Found {len(results)} matching profiles")
+        for match in results[:3]:  # Log top 3 matches
+            self.logger.info(f"  {match.profile.name}: {match.match_score:.1f}% ({match.confidence.value})")
+        
+        return results
+    
+    def find_matching_profiles_batch(self, hardware_list: List[DetectedHardware],
+                                     max_results: int = 5) -> List[List[ProfileMatch]]:
+        """Match many machines at once, logging one summary instead of every match"""
+        results = [self._find_matches(hardware, max_results) if hardware else [] for hardware in hardware_list]
+        self.logger.info(f"Matched {len(hardware_list)} machines, "
+                         f"{sum(1 for matches in results if matches)} with at least one profile")
+        return results
+    
+    def _find_matches(self, detected_hardware: DetectedHardware, max_results: int) -> List[ProfileMatch]:
+        """Score the indexed shortlist and return the top matches"""
         # Get candidate profiles based on platform
-        candidates = self._get_candidate_profiles(detected_hardware)
-        self.logger.info(f"Found {len(candidates)} candidate profiles")
+        index = self._get_candidate_index(detected_hardware)
         
-        # Score each candidate profile
+        # Score only the shortlist that can reach the top results
+        shortlist = self._shortlist_candidates(detected_hardware, index, max_results)
         profile_matches = []
-        for profile in candidates:
+        for profile in shortlist:
             match = self._score_profile_match(detected_hardware, profile)
             if match.match_score > 0:  # Only include non-zero matches
                 profile_matches.append(match)
@@ -83,22 +339,31 @@ class HardwareMatcher:
         for match in results:
             match.confidence = self._calculate_match_confidence(match.match_score, detected_hardware)
         
-        self.logger.info(f"Found {len(results)} matching profiles")
-        for match in results[:3]:  # Log top 3 matches
-            self.logger.info(f"  {match.profile.name}: {match.match_score:.1f}% ({match.confidence.value})")
-        
         return results
     
     def _get_candidate_profiles(self, detected_hardware: DetectedHardware) -> List[HardwareProfile]:
         """Get candidate profiles based on detected platform"""
-        if not detected_hardware.platform:
+        return list(self._get_candidate_index(detected_hardware).profiles)
+    
+    def _get_candidate_index(self, detected_hardware: DetectedHardware) -> _ProfileIndex:
+        """Indexed candidate list for the detected platform, built once per platform"""
+        include_generic = detected_hardware.detection_confidence == DetectionConfidence.UNKNOWN
+        key = (detected_hardware.platform or "", bool(detected_hardware.platform) and include_generic)
+        index = self._candidate_indexes.get(key)
+        if index is None:
+            index = _ProfileIndex(self._build_candidate_profiles(detected_hardware.platform, include_generic))
+            self._candidate_indexes[key] = index
+        return index
+    
+    def _build_candidate_profiles(self, platform: str, include_generic: bool) -> List[HardwareProfile]:
+        if not platform:
             return self._available_profiles
         
         # Primary platform match
-        platform_profiles = get_profiles_by_platform(detected_hardware.platform)
+        platform_profiles = [p for p in self._available_profiles if p.platform == platform]
         
         # For unknown hardware, also include generic profiles
-        if detected_hardware.detection_confidence == DetectionConfidence.UNKNOWN:
+        if include_generic:
             generic_profiles = [p for p in self._available_profiles 
                              if "generic" in p.model.lower() or "unknown" in p.name.lower()]
             platform_profiles.extend(generic_profiles)
@@ -114,6 +379,115 @@ class HardwareMatcher:
         
         return candidates
     
+    def _hardware_features(self, hardware: DetectedHardware) -> _HardwareFeatures:
+        """Memoized features for every hardware field the scorers read"""
+        key = (
+            hardware.system_model, hardware.system_manufacturer, hardware.platform,
+            hardware.cpu_architecture, hardware.cpu_name,
+            tuple(gpu.get("name", "") for gpu in hardware.gpus),
+            tuple(adapter.get("name", "") for adapter in hardware.network_adapters)
+        )
+        features = self._features_cache.get(key)
+        if features is not None:
+            return features
+        
+        manufacturer = None
+        if hardware.system_manufacturer:
+            manufacturer = self.vendor_db.normalize_vendor_name(
+                hardware.system_manufacturer.lower().strip()).lower()
+        features = _HardwareFeatures(
+            model=(hardware.system_model or "").lower().strip(),
+            manufacturer=manufacturer
+        )
+        _remember(self._features_cache, key, features)
+        return features
+    
+    def _shape_scores(self, hardware: DetectedHardware, features: _HardwareFeatures,
+                      profile: HardwareProfile, shape: Tuple) -> Tuple[float, ...]:
+        """Platform, architecture, CPU, year and feature scores shared by one profile shape"""
+        scores = features.shape_scores.get(shape)
+        if scores is None:
+            scores = (
+                self._score_platform_match(hardware, profile),
+                self._score_architecture_match(hardware, profile),
+                self._score_cpu_match(hardware, profile),
+                self._score_year_match(hardware, profile),
+                self._score_features_match(hardware, profile)
+            )
+            features.shape_scores[shape] = scores
+        return scores
+    
+    def _total_score(self, component_scores: Tuple[float, ...], weights: Tuple[float, ...]) -> float:
+        """Combine scores in the same order and arithmetic as _score_profile_match"""
+        total_score = 0.0
+        for weight, score in zip(weights, component_scores):
+            if score > 0:
+                total_score += score * weight / 100.0
+        return min(total_score, 100.0)
+    
+    def _shortlist_candidates(self, hardware: DetectedHardware, index: _ProfileIndex,
+                              max_results: int) -> List[HardwareProfile]:
+        """Profiles that can make the top max_results, in candidate order
+        
+        The model scorer only runs for profiles the model index hits, and the
+        manufacturer score comes straight from the index. Every other profile
+        scores exactly what its shape and manufacturer tier score, so only the
+        first max_results profiles of each (shape, tier) can win.
+        """
+        if max_results <= 0:
+            return index.profiles
+        
+        features = self._hardware_features(hardware)
+        weights = tuple(self._match_weights[criteria] for criteria in self._SCORE_ORDER)
+        model_hits: Set[int] = set()
+        if hardware.system_model:
+            model_hits = index.model_hits(features.model)
+        indicator_hits: Set[int] = set()
+        name_hits: Set[int] = set()
+        if features.manufacturer is not None:
+            indicator_hits, name_hits = index.manufacturer_scores(features.manufacturer)
+        
+        def manufacturer_score(position: int) -> float:
+            if position in indicator_hits:
+                return 100.0
+            return 90.0 if position in name_hits else 0.0
+        
+        scored: List[Tuple[float, int]] = []
+        for position in model_hits:
+            profile = index.profiles[position]
+            shape_scores = self._shape_scores(hardware, features, profile, index.shape_of[position])
+            score = self._total_score(
+                (self._score_model_match(hardware, profile), manufacturer_score(position)) + shape_scores,
+                weights)
+            if score > 0:
+                scored.append((score, position))
+        
+        tier_count = 1 + bool(indicator_hits) + bool(name_hits)
+        for shape, positions in index.shapes.items():
+            shape_scores = self._shape_scores(hardware, features, index.profiles[positions[0]], shape)
+            tier_scores: Dict[float, float] = {}
+            taken: Dict[float, int] = {}
+            full_tiers = 0
+            for position in positions:
+                if position in model_hits:
+                    continue
+                tier = manufacturer_score(position)
+                count = taken.get(tier, 0)
+                if count >= max_results:
+                    continue
+                if tier not in tier_scores:
+                    tier_scores[tier] = self._total_score((0.0, tier) + shape_scores, weights)
+                if tier_scores[tier] > 0:
+                    scored.append((tier_scores[tier], position))
+                taken[tier] = count + 1
+                if count + 1 == max_results:
+                    full_tiers += 1
+                    if full_tiers == tier_count:
+                        break
+        
+        best = heapq.nsmallest(max_results, scored, key=lambda item: (-item[0], item[1]))
+        return [index.profiles[position] for _, position in sorted(best, key=lambda item: item[1])]
+    
     def _score_profile_match(self, hardware: DetectedHardware, profile: HardwareProfile) -> ProfileMatch:
         """Score how well a hardware profile matches detected hardware"""
         match_reasons = []
@@ -219,7 +593,7 @@ class HardwareMatcher:
         # macOS model identifier matching (e.g., "MacBookPro16,1")
         if hardware.platform == "mac" and profile.platform == "mac":
             # Check if hardware model is a Mac model identifier
-            if re.match(r"^[a-z]+\d+,\d+$", hardware_model, re.IGNORECASE):
+            if _MAC_IDENTIFIER_PATTERN.match(hardware_model):
                 if hardware_model == profile_model:
                     return 100.0
                 # Check if it's a similar model (e.g., MacBookPro16,1 vs MacBookPro16,2)
@@ -234,8 +608,8 @@ class HardwareMatcher:
             return (overlap / total) * 80.0  # Max 80% for partial matches
         
         # Check for common keywords/model numbers
-        hardware_words = set(re.findall(r'\w+', hardware_model))
-        profile_words = set(re.findall(r'\w+', profile_model))
+        hardware_words = _model_words(hardware_model)
+        profile_words = _model_words(profile_model)
         
         if hardware_words and profile_words:
             intersection = hardware_words & profile_words
@@ -257,24 +631,11 @@ class HardwareMatcher:
         # Normalize manufacturer names
         hardware_mfg = self.vendor_db.normalize_vendor_name(hardware_mfg).lower()
         
-        # Check different manufacturer indicators
-        manufacturer_indicators = {
-            "apple": ["mac", "imac", "macbook", "mac mini", "mac pro"],
-            "dell": ["dell", "optiplex", "inspiron", "latitude", "precision"],
-            "hp": ["hp", "hewlett", "pavilion", "envy", "elitebook", "probook"],
-            "lenovo": ["lenovo", "thinkpad", "ideapad", "yoga", "legion"],
-            "asus": ["asus", "asustek", "rog", "zenbook", "vivobook"],
-            "msi": ["msi", "micro-star", "gaming", "prestige"],
-            "microsoft": ["surface", "microsoft"],
-            "samsung": ["samsung", "galaxy book"],
-            "acer": ["acer", "aspire", "predator", "swift"],
-            "alienware": ["alienware", "dell alienware"]
-        }
-        
         profile_name = profile.name.lower()
         profile_model = profile.model.lower()
         
-        for manufacturer, indicators in manufacturer_indicators.items():
+        # Check different manufacturer indicators
+        for manufacturer, indicators in MANUFACTURER_INDICATORS.items():
             if manufacturer in hardware_mfg:
                 # Check if any indicator appears in profile
                 for indicator in indicators:
@@ -472,50 +833,7 @@ class HardwareMatcher:
     
     def _extract_cpu_series(self, cpu_name: str) -> Optional[str]:
         """Extract CPU series identifier from CPU name"""
-        if not cpu_name:
-            return None
-        
-        cpu_lower = cpu_name.lower()
-        
-        # Intel series patterns
-        intel_patterns = [
-            r"core\s*i3",
-            r"core\s*i5", 
-            r"core\s*i7",
-            r"core\s*i9",
-            r"xeon",
-            r"celeron",
-            r"pentium"
-        ]
-        
-        for pattern in intel_patterns:
-            match = re.search(pattern, cpu_lower)
-            if match:
-                return match.group(0).replace(" ", "")
-        
-        # AMD series patterns
-        amd_patterns = [
-            r"ryzen\s*3",
-            r"ryzen\s*5",
-            r"ryzen\s*7", 
-            r"ryzen\s*9",
-            r"threadripper",
-            r"epyc",
-            r"fx"
-        ]
-        
-        for pattern in amd_patterns:
-            match = re.search(pattern, cpu_lower)
-            if match:
-                return match.group(0).replace(" ", "")
-        
-        # Apple series patterns
-        if re.search(r"apple.*m\d+", cpu_lower):
-            match = re.search(r"m\d+(\s+pro|\s+max|\s+ultra)?", cpu_lower)
-            if match:
-                return match.group(0).replace(" ", "")
-        
-        return None
+        return _extract_cpu_series(cpu_name)
     
     def _calculate_match_confidence(self, match_score: float, hardware: DetectedHardware) -> DetectionConfidence:
         """Calculate overall match confidence based on score and hardware detection quality"""
@@ -11,14 +11,24 @@ from .patch_pipeline import (
     PatchCondition, PatchStatus
 )
 from .vendor_database import PatchCapability, SecurityLevel, PatchCompatibility
-from typing import List, Dict, Optional, Any
+from .config import Config
+from typing import List, Dict, Optional, Any, Tuple
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+import os
 import re
+import sys
+import copy
+import pickle
+import hashlib
 import logging
+import threading
 
 
-def get_mac_model_data() -> Dict[str, Dict[str, Any]]:
+def _build_mac_model_data() -> Dict[str, Dict[str, Any]]:
     """
-    Get comprehensive Mac model database with detailed specifications and patch requirements.
+    Build comprehensive Mac model database with detailed specifications and patch requirements.
     
     Returns comprehensive data for Mac models from 2015-2024+ including:
     - Basic hardware specifications 
@@ -694,15 +704,9 @@ def get_mac_model_data() -> Dict[str, Dict[str, Any]]:
     return mac_models
 
 
-def get_enhanced_mac_profiles() -> List[HardwareProfile]:
-    """
-    Get enhanced Mac hardware profiles with comprehensive specifications and patch requirements.
-    
-    Returns a list of HardwareProfile objects for all supported Mac models,
-    including detailed OCLP compatibility, patch requirements, and hardware specifications.
-    """
+def _build_mac_profiles(mac_models: Dict[str, Dict[str, Any]]) -> List[HardwareProfile]:
+    """Build a HardwareProfile for every model in the Mac model database"""
     profiles = []
-    mac_models = get_mac_model_data()
     
     for model_id, model_data in mac_models.items():
         # Create enhanced HardwareProfile with all the new fields
@@ -733,12 +737,12 @@ def get_enhanced_mac_profiles() -> List[HardwareProfile]:
     return profiles
 
 
-def get_default_profiles() -> List[HardwareProfile]:
-    """Get default hardware profiles for common devices including enhanced Mac models and Windows systems"""
+def _build_default_profiles(mac_profiles: List[HardwareProfile]) -> List[HardwareProfile]:
+    """Build default hardware profiles for common devices including enhanced Mac models and Windows systems"""
     profiles = []
     
     # Get comprehensive Mac profiles
-    profiles.extend(get_enhanced_mac_profiles())
+    profiles.extend(mac_profiles)
     
     # Get comprehensive Windows profiles (with bypass support)
     profiles.extend(get_windows_profiles())
@@ -808,31 +812,397 @@ def get_default_profiles() -> List[HardwareProfile]:
     return profiles
 
 
+# ===== HARDWARE KNOWLEDGE BASE =====
+
+# Bump when the layout of HardwareKnowledgeBase or of the pickled artifact changes
+KNOWLEDGE_BASE_VERSION = 2
+KNOWLEDGE_BASE_FILE = "hardware_knowledge_base.pickle"
+
+_SOURCE_FILES = (Path(__file__), Path(__file__).with_name("models.py"))
+
+_knowledge_base: Optional["HardwareKnowledgeBase"] = None
+_knowledge_base_lock = threading.Lock()
+
+
+class FrozenDict(dict):
+    """Read-only dict shared by every caller of the knowledge base
+
+    Still a real dict, so json, asdict() and pickle keep working; copy()
+    returns a plain mutable dict.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Hardware knowledge base data is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into FrozenDicts and lists into tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _freeze_profile(profile: HardwareProfile) -> HardwareProfile:
+    for profile_field in fields(profile):
+        value = getattr(profile, profile_field.name)
+        if isinstance(value, (dict, list)):
+            setattr(profile, profile_field.name, _freeze(value))
+    return profile
+
+
+def _macos_versions_for(profile: HardwareProfile) -> List[str]:
+    """macOS versions a Mac profile runs natively or with patches"""
+    versions = [v for v, native in profile.native_macos_support.items() if native]
+    versions.extend(v for v in profile.required_patches if v not in versions)
+    return versions
+
+
+# Codes stored in PatchRequirementTable.support, in get_model_macos_support() terms
+SUPPORT_STATUSES = ("unsupported", "native", "oclp_full", "oclp_partial", "oclp_experimental")
+_OCLP_SUPPORT_CODES = {"fully_supported": 2, "partially_supported": 3}
+
+# Per-model OCLP detail fields, in get_mac_oclp_requirements() order around required_patches
+_OCLP_PATCH_FIELDS = ("graphics_patches", "audio_patches", "wifi_bluetooth_patches", "usb_patches")
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except ValueError:
+        return (0,)
+
+
+def _iter_bits(bits: int):
+    """Indexes of the set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+@dataclass(frozen=True)
+class PatchRequirementTable:
+    """Patch requirements for every (Mac model, macOS version) pair, compiled once
+
+    Models, versions and patch names are numbered; cell model * len(versions)
+    + version of the dense arrays holds that pair. Patch names are interned, so
+    every cell shares the same string objects, and patch sets are also kept as
+    bitsets over patch_names for reporting queries.
+    """
+    models: Tuple[str, ...]
+    versions: Tuple[str, ...]
+    patch_names: Tuple[str, ...]
+    model_index: Dict[str, int]
+    version_index: Dict[str, int]
+    patch_index: Dict[str, int]
+    # required_patches[version] exactly as listed (None when the model lists none)
+    required: Tuple[Optional[Tuple[str, ...]], ...]
+    required_bits: Tuple[int, ...]
+    # What get_patch_requirements_for_model() answers, after its closest-version fallback
+    resolved: Tuple[Tuple[str, ...], ...]
+    support: Tuple[int, ...]
+    # Per model: versions with a patch list, newest first in the fallback's string order
+    patch_versions: Tuple[Tuple[str, ...], ...]
+    # (patch id, version id) -> bitset over models
+    models_by_patch: Dict[Tuple[int, int], int]
+    oclp_details: Tuple[Dict[str, Any], ...]
+    signatures: Tuple[str, ...]
+
+    @classmethod
+    def build(cls, mac_models: Dict[str, Dict[str, Any]]) -> "PatchRequirementTable":
+        models = tuple(mac_models)
+        versions = set(MATRIX_MACOS_VERSIONS)
+        for model_data in mac_models.values():
+            versions.update(model_data.get("native_macos_support", {}))
+            versions.update(model_data.get("required_patches", {}))
+        versions = tuple(sorted(versions, key=_version_key))
+        version_index = {version: i for i, version in enumerate(versions)}
+
+        patch_index: Dict[str, int] = {}
+
+        def intern_all(names) -> Tuple[str, ...]:
+            interned = tuple(sys.intern(name) for name in names)
+            for name in interned:
+                patch_index.setdefault(name, len(patch_index))
+            return interned
+
+        required, required_bits, resolved, support = [], [], [], []
+        patch_versions, oclp_details, signatures = [], [], []
+        models_by_patch: Dict[Tuple[int, int], int] = {}
+        for m, model_id in enumerate(models):
+            model_data = mac_models[model_id]
+            native = model_data.get("native_macos_support", {})
+            patches = {version: intern_all(names) for version, names in model_data.get("required_patches", {}).items()}
+            fallback_order = tuple(sorted(patches, reverse=True))
+            oclp_code = _OCLP_SUPPORT_CODES.get(model_data.get("oclp_compatibility"), 4)
+
+            for v, version in enumerate(versions):
+                cell = patches.get(version)
+                required.append(cell)
+                bits = 0
+                for name in cell or ():
+                    bits |= 1 << patch_index[name]
+                    models_by_patch[(patch_index[name], v)] = models_by_patch.get((patch_index[name], v), 0) | 1 << m
+                required_bits.append(bits)
+                resolved.append(cell if cell is not None else
+                                next((patches[k] for k in fallback_order if k <= version), ()))
+                support.append(1 if native.get(version, False) else oclp_code if cell is not None else 0)
+
+            patch_versions.append(fallback_order)
+            oclp_details.append(FrozenDict(
+                model_name=model_data.get("name", model_id),
+                oclp_compatibility=model_data.get("oclp_compatibility", "unknown"),
+                **{name: intern_all(model_data.get(name, ())) for name in _OCLP_PATCH_FIELDS},
+                secure_boot_model=model_data.get("secure_boot_model"),
+                sip_requirements=model_data.get("sip_requirements"),
+                notes=model_data.get("notes", [])
+            ))
+            signatures.append(_create_patch_signature(model_data))
+
+        return cls(
+            models=models,
+            versions=versions,
+            patch_names=tuple(patch_index),
+            model_index=FrozenDict((model_id, m) for m, model_id in enumerate(models)),
+            version_index=FrozenDict(version_index),
+            patch_index=FrozenDict(patch_index),
+            required=tuple(required),
+            required_bits=tuple(required_bits),
+            resolved=tuple(resolved),
+            support=tuple(support),
+            patch_versions=tuple(patch_versions),
+            models_by_patch=FrozenDict(models_by_patch),
+            oclp_details=tuple(oclp_details),
+            signatures=tuple(signatures)
+        )
+
+    def _cell(self, model: str, macos_version: str) -> Optional[int]:
+        m = self.model_index.get(model)
+        v = self.version_index.get(macos_version)
+        if m is None or v is None:
+            return None
+        return m * len(self.versions) + v
+
+    def requirements(self, model: str, macos_version: str) -> Tuple[str, ...]:
+        """Patches for the version, or for the closest earlier version with a patch list"""
+        cell = self._cell(model, macos_version)
+        if cell is not None:
+            return self.resolved[cell]
+        m = self.model_index.get(model)
+        if m is None:
+            return ()
+        # Version outside the table: same fallback, over the versions the model has patches for
+        for version in self.patch_versions[m]:
+            if version <= macos_version:
+                return self.required[self._cell(model, version)]
+        return ()
+
+    def exact_requirements(self, model: str, macos_version: str) -> Optional[Tuple[str, ...]]:
+        """required_patches[macos_version] as listed, or None"""
+        cell = self._cell(model, macos_version)
+        return self.required[cell] if cell is not None else None
+
+    def support_status(self, model: str, macos_version: str) -> Optional[str]:
+        """One of SUPPORT_STATUSES, or None for an unknown model"""
+        if model not in self.model_index:
+            return None
+        cell = self._cell(model, macos_version)
+        return SUPPORT_STATUSES[self.support[cell]] if cell is not None else "unsupported"
+
+    def oclp_requirements(self, model: str, macos_version: str) -> Dict[str, Any]:
+        """get_mac_oclp_requirements() answer for the pair; empty for an unknown model"""
+        m = self.model_index.get(model)
+        if m is None:
+            return {}
+        details = self.oclp_details[m]
+        required = self.exact_requirements(model, macos_version)
+        return {
+            "model_name": details["model_name"],
+            "oclp_compatibility": details["oclp_compatibility"],
+            "required_patches": required if required is not None else [],
+            **{name: details[name] for name in _OCLP_PATCH_FIELDS},
+            "secure_boot_model": details["secure_boot_model"],
+            "sip_requirements": details["sip_requirements"],
+            "notes": details["notes"]
+        }
+
+    def models_requiring(self, patch: str, macos_version: Optional[str] = None) -> List[str]:
+        """Models that need a patch on one macOS version (or on any version)"""
+        p = self.patch_index.get(patch)
+        if p is None:
+            return []
+        if macos_version is None:
+            bits = 0
+            for v in range(len(self.versions)):
+                bits |= self.models_by_patch.get((p, v), 0)
+        else:
+            v = self.version_index.get(macos_version)
+            bits = self.models_by_patch.get((p, v), 0) if v is not None else 0
+        return [self.models[m] for m in _iter_bits(bits)]
+
+    def patch_counts(self, macos_version: str) -> Dict[str, int]:
+        """Number of models needing each patch on a macOS version"""
+        v = self.version_index.get(macos_version)
+        if v is None:
+            return {}
+        counts = {}
+        for p, name in enumerate(self.patch_names):
+            bits = self.models_by_patch.get((p, v), 0)
+            if bits:
+                counts[name] = bin(bits).count("1")
+        return counts
+
+
+@dataclass(frozen=True)
+class HardwareKnowledgeBase:
+    """Immutable snapshot of every hardware profile with lookup indexes
+
+    Built once per process by get_knowledge_base(). Profiles are shared between
+    callers and their dict/list fields are frozen, so treat them as read-only.
+    """
+    mac_models: Dict[str, Dict[str, Any]]
+    profiles: Tuple[HardwareProfile, ...]
+    mac_profiles: Tuple[HardwareProfile, ...]
+    by_model: Dict[str, HardwareProfile]
+    by_platform: Dict[str, Tuple[HardwareProfile, ...]]
+    by_oclp_compatibility: Dict[str, Tuple[HardwareProfile, ...]]
+    native_by_macos_version: Dict[str, Tuple[HardwareProfile, ...]]
+    supported_by_macos_version: Dict[str, Tuple[HardwareProfile, ...]]
+    patch_table: PatchRequirementTable
+
+    @classmethod
+    def build(cls) -> "HardwareKnowledgeBase":
+        """Build the knowledge base from the model databases"""
+        mac_models = _freeze(_build_mac_model_data())
+        mac_profiles = [_freeze_profile(p) for p in _build_mac_profiles(mac_models)]
+        profiles = [_freeze_profile(p) for p in _build_default_profiles(mac_profiles)]
+
+        by_model: Dict[str, HardwareProfile] = {}
+        by_platform: Dict[str, List[HardwareProfile]] = {}
+        for profile in profiles:
+            by_model.setdefault(profile.model, profile)
+            by_platform.setdefault(profile.platform, []).append(profile)
+
+        by_oclp_compatibility: Dict[str, List[HardwareProfile]] = {}
+        native_by_version: Dict[str, List[HardwareProfile]] = {}
+        supported_by_version: Dict[str, List[HardwareProfile]] = {}
+        for profile in mac_profiles:
+            by_oclp_compatibility.setdefault(profile.oclp_compatibility, []).append(profile)
+            for version in _macos_versions_for(profile):
+                supported_by_version.setdefault(version, []).append(profile)
+                if profile.native_macos_support.get(version, False):
+                    native_by_version.setdefault(version, []).append(profile)
+
+        def index(groups: Dict[str, List[HardwareProfile]]) -> Dict[str, Tuple[HardwareProfile, ...]]:
+            return FrozenDict((key, tuple(group)) for key, group in groups.items())
+
+        return cls(
+            mac_models=mac_models,
+            profiles=tuple(profiles),
+            mac_profiles=tuple(mac_profiles),
+            by_model=FrozenDict(by_model),
+            by_platform=index(by_platform),
+            by_oclp_compatibility=index(by_oclp_compatibility),
+            native_by_macos_version=index(native_by_version),
+            supported_by_macos_version=index(supported_by_version),
+            patch_table=PatchRequirementTable.build(mac_models)
+        )
+
+
+def _knowledge_base_stamp() -> str:
+    """Version stamp that changes whenever the profile sources change"""
+    digest = hashlib.sha256(str(KNOWLEDGE_BASE_VERSION).encode())
+    for source in _SOURCE_FILES:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def load_knowledge_base(cache_file: Optional[Path] = None) -> HardwareKnowledgeBase:
+    """Load the knowledge base from its serialized artifact, rebuilding it if stale
+
+    Any problem with the artifact falls back to an in-memory build; the
+    artifact is only an accelerator.
+    """
+    logger = logging.getLogger(__name__)
+    if cache_file is None:
+        cache_file = Config().get_cache_dir() / KNOWLEDGE_BASE_FILE
+
+    try:
+        stamp = _knowledge_base_stamp()
+    except OSError:
+        return HardwareKnowledgeBase.build()
+
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get("stamp") == stamp and isinstance(cached.get("knowledge_base"), HardwareKnowledgeBase):
+            return cached["knowledge_base"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable hardware knowledge base {cache_file}: {e}")
+
+    knowledge_base = HardwareKnowledgeBase.build()
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'wb') as f:
+            pickle.dump({"stamp": stamp, "knowledge_base": knowledge_base}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_file)
+    except Exception as e:
+        logger.debug(f"Could not write hardware knowledge base {cache_file}: {e}")
+    return knowledge_base
+
+
+def get_knowledge_base() -> HardwareKnowledgeBase:
+    """Process-wide hardware knowledge base, built on first use"""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _knowledge_base_lock:
+            if _knowledge_base is None:
+                _knowledge_base = load_knowledge_base()
+    return _knowledge_base
+
+
+def get_mac_model_data() -> Dict[str, Dict[str, Any]]:
+    """
+    Get comprehensive Mac model database with detailed specifications and patch requirements.
+    
+    The returned mapping is shared and read-only; copy() a model entry to modify it.
+    """
+    return get_knowledge_base().mac_models
+
+
+def get_enhanced_mac_profiles() -> List[HardwareProfile]:
+    """
+    Get enhanced Mac hardware profiles with comprehensive specifications and patch requirements.
+    
+    Returns a list of HardwareProfile objects for all supported Mac models,
+    including detailed OCLP compatibility, patch requirements, and hardware specifications.
+    """
+    return list(get_knowledge_base().mac_profiles)
+
+
+def get_default_profiles() -> List[HardwareProfile]:
+    """Get default hardware profiles for common devices including enhanced Mac models and Windows systems"""
+    return list(get_knowledge_base().profiles)
+
+
 def from_mac_model(model: str) -> HardwareProfile:
     """Create hardware profile from Mac model identifier using comprehensive database"""
-    mac_models = get_mac_model_data()
+    knowledge_base = get_knowledge_base()
     
-    if model in mac_models:
-        model_data = mac_models[model]
-        return HardwareProfile(
-            name=model_data["name"],
-            platform="mac",
-            model=model,
-            architecture=model_data["architecture"],
-            year=model_data.get("year"),
-            cpu_family=model_data.get("cpu_family"),
-            oclp_compatibility=model_data.get("oclp_compatibility"),
-            native_macos_support=model_data.get("native_macos_support", {}),
-            required_patches=model_data.get("required_patches", {}),
-            optional_patches=model_data.get("optional_patches", {}),
-            graphics_patches=model_data.get("graphics_patches", []),
-            audio_patches=model_data.get("audio_patches", []),
-            wifi_bluetooth_patches=model_data.get("wifi_bluetooth_patches", []),
-            usb_patches=model_data.get("usb_patches", []),
-            secure_boot_model=model_data.get("secure_boot_model"),
-            sip_requirements=model_data.get("sip_requirements"),
-            notes=model_data.get("notes", [])
-        )
+    if model in knowledge_base.mac_models:
+        return knowledge_base.by_model[model]
     else:
         # Fallback for unknown models
         return HardwareProfile(
@@ -847,8 +1217,7 @@ def from_mac_model(model: str) -> HardwareProfile:
 
 def get_profiles_by_platform(platform: str) -> List[HardwareProfile]:
     """Get hardware profiles filtered by platform"""
-    all_profiles = get_default_profiles()
-    return [profile for profile in all_profiles if profile.platform == platform]
+    return list(get_knowledge_base().by_platform.get(platform, ()))
 
 
 def get_mac_profiles_by_oclp_compatibility(compatibility: str) -> List[HardwareProfile]:
@@ -858,8 +1227,7 @@ def get_mac_profiles_by_oclp_compatibility(compatibility: str) -> List[HardwareP
     Args:
         compatibility: "fully_supported", "partially_supported", "experimental", "unsupported"
     """
-    mac_profiles = get_enhanced_mac_profiles()
-    return [profile for profile in mac_profiles if profile.oclp_compatibility == compatibility]
+    return list(get_knowledge_base().by_oclp_compatibility.get(compatibility, ()))
 
 
 def get_mac_profiles_by_macos_version(macos_version: str, native_only: bool = False) -> List[HardwareProfile]:
@@ -870,21 +1238,11 @@ def get_mac_profiles_by_macos_version(macos_version: str, native_only: bool = Fa
         macos_version: macOS version like "14.0", "13.0", etc.
         native_only: If True, only return profiles with native support
     """
-    mac_profiles = get_enhanced_mac_profiles()
-    compatible_profiles = []
-    
-    for profile in mac_profiles:
-        if native_only:
-            # Only include if natively supported
-            if profile.native_macos_support.get(macos_version, False):
-                compatible_profiles.append(profile)
-        else:
-            # Include if natively supported OR has patches available
-            if (profile.native_macos_support.get(macos_version, False) or 
-                macos_version in profile.required_patches):
-                compatible_profiles.append(profile)
-    
-    return compatible_profiles
+    knowledge_base = get_knowledge_base()
+    if native_only:
+        return list(knowledge_base.native_by_macos_version.get(macos_version, ()))
+    # Natively supported OR has patches available
+    return list(knowledge_base.supported_by_macos_version.get(macos_version, ()))
 
 
 def get_compatible_profiles(deployment_type: DeploymentType) -> List[HardwareProfile]:
@@ -907,7 +1265,12 @@ def get_compatible_profiles(deployment_type: DeploymentType) -> List[HardwarePro
         return all_profiles
 
 
-def get_patch_requirements_for_model(model: str, macos_version: str) -> Dict[str, List[str]]:
+def get_patch_requirement_table() -> PatchRequirementTable:
+    """Compiled (model, macOS version) patch requirements from the knowledge base"""
+    return get_knowledge_base().patch_table
+
+
+def get_patch_requirement_details(model: str, macos_version: str) -> Dict[str, List[str]]:
     """
     Get specific patch requirements for a Mac model and macOS version.
     
@@ -918,35 +1281,64 @@ def get_patch_requirements_for_model(model: str, macos_version: str) -> Dict[str
     Returns:
         Dictionary with patch categories and required patches
     """
-    mac_models = get_mac_model_data()
+    table = get_patch_requirement_table()
+    status = table.support_status(model, macos_version)
     
-    if model not in mac_models:
+    if status is None:
         return {}
     
-    model_data = mac_models[model]
-    
     # Check if native support exists
-    if model_data.get("native_macos_support", {}).get(macos_version, False):
+    if status == "native":
         return {"note": ["This model has native macOS support for this version"]}
     
     # Get required patches for this version
-    required_patches = model_data.get("required_patches", {}).get(macos_version, [])
+    required_patches = table.exact_requirements(model, macos_version)
     
     if not required_patches:
         return {"note": ["No patches available for this macOS version"]}
     
+    details = table.oclp_requirements(model, macos_version)
     return {
-        "required_patches": required_patches,
-        "graphics_patches": model_data.get("graphics_patches", []),
-        "audio_patches": model_data.get("audio_patches", []),
-        "wifi_bluetooth_patches": model_data.get("wifi_bluetooth_patches", []),
-        "usb_patches": model_data.get("usb_patches", []),
-        "sip_requirements": [model_data.get("sip_requirements", "")] if model_data.get("sip_requirements") else [],
-        "secure_boot_model": [model_data.get("secure_boot_model", "")] if model_data.get("secure_boot_model") else [],
-        "notes": model_data.get("notes", [])
+        "required_patches": list(required_patches),
+        **{name: list(details[name]) for name in _OCLP_PATCH_FIELDS},
+        "sip_requirements": [details["sip_requirements"]] if details["sip_requirements"] else [],
+        "secure_boot_model": [details["secure_boot_model"]] if details["secure_boot_model"] else [],
+        "notes": list(details["notes"])
     }
 
 
+def get_models_requiring_patch(patch: str, macos_version: Optional[str] = None) -> List[str]:
+    """Mac model identifiers that need a patch on a macOS version (or on any version)"""
+    return get_patch_requirement_table().models_requiring(patch, macos_version)
+
+
+MATRIX_MACOS_VERSIONS = ["10.15", "11.0", "12.0", "13.0", "14.0", "15.0"]
+
+
+def get_model_macos_support(model_data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Get the support status of one Mac model for every macOS version in the matrix.
+    
+    Returns:
+        Dictionary mapping macOS versions to "native", "oclp_full", "oclp_partial",
+        "oclp_experimental" or "unsupported"
+    """
+    support = {}
+    for version in MATRIX_MACOS_VERSIONS:
+        if model_data.get("native_macos_support", {}).get(version, False):
+            support[version] = "native"
+        elif version in model_data.get("required_patches", {}):
+            if model_data.get("oclp_compatibility") == "fully_supported":
+                support[version] = "oclp_full"
+            elif model_data.get("oclp_compatibility") == "partially_supported":
+                support[version] = "oclp_partial"
+            else:
+                support[version] = "oclp_experimental"
+        else:
+            support[version] = "unsupported"
+    return support
+
+
 def get_macos_compatibility_matrix() -> Dict[str, Dict[str, str]]:
     """
     Get macOS compatibility matrix showing native support vs OCLP requirements.
@@ -956,26 +1348,12 @@ def get_macos_compatibility_matrix() -> Dict[str, Dict[str, str]]:
     """
     compatibility_matrix = {}
     mac_models = get_mac_model_data()
-    
-    # Define macOS versions to check
-    macos_versions = ["10.15", "11.0", "12.0", "13.0", "14.0", "15.0"]
+    table = get_patch_requirement_table()
     
     for model_id, model_data in mac_models.items():
-        model_name = model_data["name"]
-        compatibility_matrix[model_name] = {}
-        
-        for version in macos_versions:
-            if model_data.get("native_macos_support", {}).get(version, False):
-                compatibility_matrix[model_name][version] = "native"
-            elif version in model_data.get("required_patches", {}):
-                if model_data.get("oclp_compatibility") == "fully_supported":
-                    compatibility_matrix[model_name][version] = "oclp_full"
-                elif model_data.get("oclp_compatibility") == "partially_supported":
-                    compatibility_matrix[model_name][version] = "oclp_partial"
-                else:
-                    compatibility_matrix[model_name][version] = "oclp_experimental"
-            else:
-                compatibility_matrix[model_name][version] = "unsupported"
+        compatibility_matrix[model_data["name"]] = {
+            version: table.support_status(model_id, version) for version in MATRIX_MACOS_VERSIONS
+        }
     
     return compatibility_matrix
 
@@ -996,6 +1374,12 @@ def get_hardware_specific_recommendations(model: str, target_macos_version: str)
         - Performance expectations
         - Troubleshooting tips
     """
+    # Callers annotate the result, so each one gets its own copy of the cached answer
+    return copy.deepcopy(_hardware_specific_recommendations(model, target_macos_version))
+
+
+@lru_cache(maxsize=1024)
+def _hardware_specific_recommendations(model: str, target_macos_version: str) -> Dict[str, Any]:
     mac_models = get_mac_model_data()
     
     if model not in mac_models:
@@ -1340,10 +1724,15 @@ def create_mac_patch_sets() -> List[PatchSet]:
 def _group_models_by_patches(mac_data: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     """Group Mac models with similar patch requirements"""
     groups = {}
+    table = get_patch_requirement_table()
     
     for model_id, model_data in mac_data.items():
-        # Create a signature based on patch requirements
-        patch_signature = _create_patch_signature(model_data)
+        # Create a signature based on patch requirements (precompiled for knowledge base models)
+        m = table.model_index.get(model_id)
+        if m is not None and model_data is get_mac_model_data().get(model_id):
+            patch_signature = table.signatures[m]
+        else:
+            patch_signature = _create_patch_signature(model_data)
         
         if patch_signature not in groups:
             groups[patch_signature] = []
@@ -1695,26 +2084,11 @@ def create_mac_hardware_profile(model: str) -> HardwareProfile:
 # === ADDITIONAL HELPER FUNCTIONS FOR OCLP INTEGRATION ===
 
 def get_patch_requirements_for_model(model_id: str, macos_version: str = "13.0") -> List[str]:
-    """Get patch requirements for a specific Mac model and macOS version"""
-    mac_models = get_mac_model_data()
-    
-    if model_id not in mac_models:
-        return []
-    
-    model_data = mac_models[model_id]
-    required_patches = model_data.get("required_patches", {})
-    
-    # Get patches for the specific macOS version
-    if macos_version in required_patches:
-        return required_patches[macos_version]
-    
-    # Fallback to closest version
-    available_versions = sorted(required_patches.keys(), reverse=True)
-    for version in available_versions:
-        if version <= macos_version:
-            return required_patches[version]
+    """Get patch requirements for a specific Mac model and macOS version
     
-    return []
+    Falls back to the closest earlier macOS version the model has patches for.
+    """
+    return list(get_patch_requirement_table().requirements(model_id, macos_version))
 
 
 def is_mac_oclp_compatible(model_id: str) -> bool:
@@ -1757,25 +2131,7 @@ def get_recommended_macos_version_for_model(model_id: str) -> Optional[str]:
 
 def get_mac_oclp_requirements(model_id: str, macos_version: str) -> Dict[str, Any]:
     """Get comprehensive OCLP requirements for a Mac model and macOS version"""
-    mac_models = get_mac_model_data()
-    
-    if model_id not in mac_models:
-        return {}
-    
-    model_data = mac_models[model_id]
-    
-    return {
-        "model_name": model_data.get("name", model_id),
-        "oclp_compatibility": model_data.get("oclp_compatibility", "unknown"),
-        "required_patches": model_data.get("required_patches", {}).get(macos_version, []),
-        "graphics_patches": model_data.get("graphics_patches", []),
-        "audio_patches": model_data.get("audio_patches", []),
-        "wifi_bluetooth_patches": model_data.get("wifi_bluetooth_patches", []),
-        "usb_patches": model_data.get("usb_patches", []),
-        "secure_boot_model": model_data.get("secure_boot_model"),
-        "sip_requirements": model_data.get("sip_requirements"),
-        "notes": model_data.get("notes", [])
-    }
+    return get_patch_requirement_table().oclp_requirements(model_id, macos_version)
 
 
 def get_windows_hardware_profiles() -> List[Dict[str, Any]]:
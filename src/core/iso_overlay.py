@@ -0,0 +1,646 @@
+"""
+BootForge ISO Overlay
+Rebuilds a UDF installer image by streaming it from the source image and
+substituting only the files that were replaced or added - untouched files are
+never copied to a workspace.
+"""
+
+import os
+import stat
+import struct
+import shutil
+import logging
+import binascii
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass
+
+from src.core.iso_reader import (
+    ISOReader, ISOReaderError, ISOEntry, SECTOR_SIZE, COPY_CHUNK_SIZE,
+    UDF_TAG_AVDP, UDF_TAG_PARTITION, UDF_TAG_TERMINATING, UDF_TAG_FILE_ID,
+    UDF_TAG_FILE_ENTRY, UDF_TAG_EXTENDED_FILE_ENTRY
+)
+
+
+# Largest extent one allocation descriptor can describe, kept sector aligned
+MAX_EXTENT_LENGTH = 0x3FFFFFFF & ~(SECTOR_SIZE - 1)
+
+# ISO9660 directory records hold 32-bit sizes
+MAX_ISO9660_FILE_SIZE = 0xFFFFFFFF
+
+# Unique IDs for entries created by the overlay; clear of the low range
+# that mastering tools assign sequentially
+OVERLAY_UNIQUE_ID_BASE = 0x7F000000
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ISOOverlayError(Exception):
+    """Raised when an image cannot be rebuilt as an overlay"""
+
+
+@dataclass
+class _Segment:
+    """A byte range of the output image and where its contents come from"""
+    offset: int
+    length: int
+    kind: str                      # "iso", "file", "bytes" or "zero"
+    source: Union[Path, bytes, None] = None
+    source_offset: int = 0
+
+
+def _sectors(length: int) -> int:
+    return (length + SECTOR_SIZE - 1) // SECTOR_SIZE
+
+
+def _both32(value: int) -> bytes:
+    """ISO9660 both-byte-order 32-bit field"""
+    return struct.pack("<I", value) + struct.pack(">I", value)
+
+
+def _seal_tag(descriptor: bytearray, location: Optional[int] = None,
+              crc_length: Optional[int] = None):
+    """Recompute a UDF descriptor tag's CRC and checksum in place"""
+    if location is not None:
+        struct.pack_into("<I", descriptor, 12, location)
+    if crc_length is not None:
+        struct.pack_into("<H", descriptor, 10, crc_length)
+    crc_length = struct.unpack_from("<H", descriptor, 10)[0]
+    struct.pack_into("<H", descriptor, 8, binascii.crc_hqx(bytes(descriptor[16:16 + crc_length]), 0))
+    descriptor[4] = (sum(descriptor[0:4]) + sum(descriptor[5:16])) & 0xFF
+
+
+def _udf_timestamp(moment: datetime) -> bytes:
+    """12-byte ECMA-167 timestamp in UTC"""
+    return struct.pack("<HhBBBBBBBB", 0x1000, moment.year, moment.month, moment.day,
+                       moment.hour, moment.minute, moment.second,
+                       moment.microsecond // 10000, (moment.microsecond // 100) % 100,
+                       moment.microsecond % 100)
+
+
+class ISOOverlayBuilder:
+    """Write a modified copy of a UDF (or UDF bridge) installer image
+
+    Replaced files keep their directory entries; their data is written over
+    the extents the old version occupied and any growth is appended after
+    the source image. Added files get new file entries and their directory
+    is rewritten; missing directories are created. Everything else,
+    including El Torito boot images, is streamed unchanged from the source.
+    Names that also appear in the ISO9660/Joliet trees are kept contiguous
+    and their records updated.
+    """
+
+    def __init__(self, source_iso: Union[str, Path]):
+        self.logger = logging.getLogger(__name__)
+        self.source_iso = Path(source_iso)
+        self._files: Dict[str, Tuple[str, Path]] = {}
+
+    def put(self, image_path: str, local_path: Union[str, Path]):
+        """Use local_path for image_path, replacing the original if present"""
+        image_path = image_path.replace("\\", "/").strip("/")
+        self._files[image_path.lower()] = (image_path, Path(local_path))
+
+    @property
+    def files(self) -> Dict[str, Path]:
+        return {image_path: local for image_path, local in self._files.values()}
+
+    def write_image(self, output_path: Union[str, Path],
+                    progress_callback: Optional[ProgressCallback] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None) -> int:
+        """Stream the rebuilt image to a file or block device; returns its size"""
+        segments, total = self._plan()
+        output_path = Path(output_path)
+        is_regular = not output_path.exists() or stat.S_ISREG(output_path.stat().st_mode)
+
+        done = 0
+        with open(self.source_iso, 'rb') as source, \
+                open(output_path, 'wb' if is_regular else 'r+b') as out:
+            for segment in segments:
+                if is_cancelled and is_cancelled():
+                    raise InterruptedError("Overlay image write cancelled")
+                if segment.kind == "zero" and is_regular:
+                    # Holes stay sparse in regular files
+                    out.seek(segment.length, os.SEEK_CUR)
+                else:
+                    for chunk in self._segment_chunks(segment, source):
+                        out.write(chunk)
+                done += segment.length
+                if progress_callback:
+                    progress_callback(done, total)
+            if is_regular:
+                out.truncate(total)
+            out.flush()
+            os.fsync(out.fileno())
+
+        self.logger.info(f"Wrote overlay image {output_path} ({total / (1024 * 1024):.1f} MB, "
+                         f"{len(self._files)} file(s) from workspace)")
+        return total
+
+    def copy_tree(self, destination: Union[str, Path], workers: int = 4,
+                  progress_callback: Optional[ProgressCallback] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None) -> int:
+        """Write the merged file tree into a directory, e.g. a mounted USB partition
+
+        Returns the number of files written.
+        """
+        destination = Path(destination)
+        with ISOReader(self.source_iso) as reader:
+            untouched = []
+            for entry in reader.walk("/"):
+                if entry.is_dir:
+                    (destination / entry.path).mkdir(parents=True, exist_ok=True)
+                elif entry.path.lower() not in self._files:
+                    untouched.append(entry.path)
+            written = reader.extract(destination, untouched, workers=workers,
+                                     is_cancelled=is_cancelled, progress_callback=progress_callback)
+
+        for image_path, local in self._files.values():
+            if is_cancelled and is_cancelled():
+                raise InterruptedError("Overlay copy cancelled")
+            target = destination / image_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(local, target)
+
+        self.logger.info(f"Copied {len(written) + len(self._files)} files to {destination}")
+        return len(written) + len(self._files)
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def _plan(self) -> Tuple[List[_Segment], int]:
+        """Work out every byte range of the output image"""
+        try:
+            with ISOReader(self.source_iso, prefer="udf") as reader:
+                return _OverlayPlan(self, reader).build()
+        except ISOReaderError as e:
+            raise ISOOverlayError(f"Cannot read {self.source_iso}: {e}")
+
+    def _segment_chunks(self, segment: _Segment, source):
+        if segment.kind == "bytes":
+            yield segment.source
+            return
+        if segment.kind == "zero":
+            remaining = segment.length
+            while remaining > 0:
+                n = min(COPY_CHUNK_SIZE, remaining)
+                yield bytes(n)
+                remaining -= n
+            return
+
+        handle = source if segment.kind == "iso" else open(segment.source, 'rb')
+        try:
+            handle.seek(segment.source_offset)
+            remaining = segment.length
+            while remaining > 0:
+                chunk = handle.read(min(COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    # Past the end of the source: pad with zeros
+                    chunk = bytes(min(COPY_CHUNK_SIZE, remaining))
+                yield chunk
+                remaining -= len(chunk)
+        finally:
+            if handle is not source:
+                handle.close()
+
+
+class _OverlayPlan:
+    """Computes the output layout for one ISOOverlayBuilder run"""
+
+    def __init__(self, builder: ISOOverlayBuilder, reader: ISOReader):
+        self.logger = builder.logger
+        self.builder = builder
+        self.reader = reader
+        self.source_size = builder.source_iso.stat().st_size
+        self.source_sectors = _sectors(self.source_size)
+        self.next_sector = self.source_sectors
+        self.overlays: List[_Segment] = []
+        self.next_unique_id = OVERLAY_UNIQUE_ID_BASE
+        # Directories created by the overlay: lower-case path -> (FE sector, unique ID)
+        self.new_directories: Dict[str, Tuple[int, int]] = {}
+
+        if reader.filesystem != "udf":
+            raise ISOOverlayError("Overlay rebuild needs a UDF image")
+        if reader.block_size != SECTOR_SIZE:
+            raise ISOOverlayError(f"Unsupported UDF block size {reader.block_size}")
+        partitions = reader.udf_partition_starts
+        if set(partitions) != {0}:
+            raise ISOOverlayError("Overlay rebuild supports single-partition UDF images only")
+        self.partition_start = partitions[0]
+
+        # Other namespaces that may reference the same file data
+        self.iso_readers: List[ISOReader] = []
+        for prefer in ("iso9660", "joliet"):
+            try:
+                other = ISOReader(builder.source_iso, prefer=prefer)
+            except ISOReaderError:
+                continue
+            if other.filesystem == prefer:
+                self.iso_readers.append(other)
+            else:
+                other.close()
+
+    def build(self) -> Tuple[List[_Segment], int]:
+        try:
+            # parent (lower case) -> (parent path, [(name, entry block, unique ID, is directory)])
+            added: Dict[str, Tuple[str, List[Tuple[str, int, int, bool]]]] = {}
+            for image_path, local in sorted(self.builder._files.values()):
+                entry = self.reader.get_entry(image_path)
+                if entry is None:
+                    parent, _, name = image_path.rpartition("/")
+                    self._plan_directory(parent, added)
+                    fe_block, unique_id = self._add_file(local)
+                    added.setdefault(parent.lower(), (parent, []))[1].append(
+                        (name, fe_block, unique_id, False))
+                elif entry.is_dir:
+                    raise ISOOverlayError(f"{image_path} is a directory in the source image")
+                else:
+                    self._replace_file(image_path, entry, local)
+
+            for key, (parent, children) in added.items():
+                if key in self.new_directories:
+                    self._write_new_directory(parent, children)
+                else:
+                    self._add_to_directory(parent, children)
+
+            total_sectors = self.next_sector + 1
+            self._patch_volume_size(total_sectors)
+        finally:
+            for other in self.iso_readers:
+                other.close()
+
+        total = total_sectors * SECTOR_SIZE
+        return self._merge(total), total
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _allocate(self, length: int) -> int:
+        """Reserve sectors after the source image; returns the first sector"""
+        sector = self.next_sector
+        self.next_sector += max(1, _sectors(length))
+        return sector
+
+    def _block(self, sector: int) -> int:
+        """Partition-relative block number of an absolute sector"""
+        return sector - self.partition_start
+
+    def _overlay(self, offset: int, length: int, kind: str,
+                 source: Union[Path, bytes, None] = None, source_offset: int = 0):
+        if length > 0:
+            self.overlays.append(_Segment(offset, length, kind, source, source_offset))
+
+    def _place_data(self, local: Path, size: int,
+                    reusable: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Lay out file data over reusable (sector, length) extents, then appended space
+
+        Returns the new extents as (sector, length) pairs.
+        """
+        extents = []
+        written = 0
+        for sector, capacity in reusable:
+            if written >= size:
+                self._overlay(sector * SECTOR_SIZE, capacity, "zero")
+                continue
+            length = min(capacity, size - written)
+            self._overlay(sector * SECTOR_SIZE, length, "file", local, written)
+            # Clear the rest of the reused extent
+            self._overlay(sector * SECTOR_SIZE + length, capacity - length, "zero")
+            extents.append((sector, length))
+            written += length
+
+        if written < size:
+            remaining = size - written
+            sector = self._allocate(remaining)
+            self._overlay(sector * SECTOR_SIZE, remaining, "file", local, written)
+            # Split the appended run into extents a single descriptor can hold
+            while remaining > 0:
+                length = min(MAX_EXTENT_LENGTH, remaining)
+                extents.append((sector, length))
+                sector += _sectors(length)
+                remaining -= length
+        return extents
+
+    def _replace_file(self, image_path: str, entry: ISOEntry, local: Path):
+        size = local.stat().st_size
+        records = self._iso_records(image_path)
+
+        old_extents = [(offset // SECTOR_SIZE, _sectors(length) * SECTOR_SIZE)
+                       for offset, length in entry.extents
+                       if offset is not None and offset % SECTOR_SIZE == 0]
+        if records:
+            # ISO9660 needs one contiguous extent: write it all after the image
+            if size > MAX_ISO9660_FILE_SIZE:
+                raise ISOOverlayError(f"{image_path} is too large for its ISO9660 record")
+            for sector, length in old_extents:
+                self._overlay(sector * SECTOR_SIZE, length, "zero")
+            extents = self._place_data(local, size, [])
+            for record_offset in records:
+                start = extents[0][0] if extents else 0
+                self._overlay(record_offset + 2, 16, "bytes", _both32(start) + _both32(size))
+        else:
+            extents = self._place_data(local, size, old_extents)
+
+        fe = bytearray(self._read(entry.descriptor_offset, SECTOR_SIZE))
+        self._rewrite_file_entry(fe, size, extents, image_path)
+        self._overlay(entry.descriptor_offset, SECTOR_SIZE, "bytes", bytes(fe))
+        self.logger.debug(f"Overlay replaces {image_path} ({size} bytes, {len(extents)} extent(s))")
+
+    def _add_file(self, local: Path) -> Tuple[int, int]:
+        """Write a new file's data and file entry; returns (entry block, unique ID)"""
+        size = local.stat().st_size
+        extents = self._place_data(local, size, [])
+        fe_sector = self._allocate(SECTOR_SIZE)
+
+        unique_id = self._unique_id()
+        fe = self._new_file_entry(5, unique_id)
+        self._rewrite_file_entry(fe, size, extents, local.name)
+        _seal_tag(fe, location=self._block(fe_sector))
+        self._overlay(fe_sector * SECTOR_SIZE, SECTOR_SIZE, "bytes", bytes(fe))
+        return self._block(fe_sector), unique_id
+
+    def _new_file_entry(self, file_type: int, unique_id: int, link_count: int = 1) -> bytearray:
+        """Blank File Entry of file_type (4 directory, 5 file) to be filled by _rewrite_file_entry"""
+        fe = bytearray(SECTOR_SIZE)
+        now = _udf_timestamp(datetime.now(timezone.utc))
+        struct.pack_into("<HH", fe, 0, UDF_TAG_FILE_ENTRY, self._descriptor_version())
+        # ICB tag: strategy 4, one entry, short allocation descriptors
+        struct.pack_into("<IHHHBB6sH", fe, 16, 0, 4, 0, 1, 0, file_type, bytes(6), 0)
+        struct.pack_into("<IIIHBBI", fe, 36, 0xFFFFFFFF, 0xFFFFFFFF, 0x14A5, link_count, 0, 0, 0)
+        fe[72:84] = fe[84:96] = fe[96:108] = now
+        struct.pack_into("<I", fe, 108, 1)
+        fe[128:160] = b"\x00*BootForge".ljust(32, b"\x00")
+        struct.pack_into("<Q", fe, 160, unique_id)
+        return fe
+
+    def _plan_directory(self, path: str, added: Dict[str, Tuple[str, List[Tuple[str, int, int, bool]]]]):
+        """Reserve a file entry for a directory missing from the source image"""
+        if not path or path.lower() in self.new_directories:
+            return
+        entry = self.reader.get_entry(path)
+        if entry is not None:
+            if not entry.is_dir:
+                raise ISOOverlayError(f"{path} is a file in the source image")
+            return
+
+        parent, _, name = path.rpartition("/")
+        self._plan_directory(parent, added)
+        fe_sector = self._allocate(SECTOR_SIZE)
+        unique_id = self._unique_id()
+        self.new_directories[path.lower()] = (fe_sector, unique_id)
+        added.setdefault(parent.lower(), (parent, []))[1].append(
+            (name, self._block(fe_sector), unique_id, True))
+
+    def _write_new_directory(self, path: str, children: List[Tuple[str, int, int, bool]]):
+        """Write the FIDs and file entry of a directory created by the overlay"""
+        parent_path = path.rpartition("/")[0]
+        if parent_path.lower() in self.new_directories:
+            parent_sector, parent_id = self.new_directories[parent_path.lower()]
+        else:
+            parent = self.reader.get_entry(parent_path or "/")
+            parent_sector = parent.descriptor_offset // SECTOR_SIZE
+            parent_id = self._entry_unique_id(parent)
+
+        data = bytearray(self._make_fid("", self._block(parent_sector), parent_id, 0x0A))
+        for name, fe_block, unique_id, is_dir in children:
+            data += self._make_fid(name, fe_block, unique_id, 0x02 if is_dir else 0)
+        data_sector = self._allocate(len(data))
+        self._relocate_fids(data, self._block(data_sector))
+        self._overlay(data_sector * SECTOR_SIZE, len(data), "bytes", bytes(data))
+
+        fe_sector, unique_id = self.new_directories[path.lower()]
+        subdirectories = sum(1 for child in children if child[3])
+        fe = self._new_file_entry(4, unique_id, link_count=1 + subdirectories)
+        self._rewrite_file_entry(fe, len(data), [(data_sector, len(data))], path)
+        _seal_tag(fe, location=self._block(fe_sector))
+        self._overlay(fe_sector * SECTOR_SIZE, SECTOR_SIZE, "bytes", bytes(fe))
+        self.logger.debug(f"Overlay creates directory /{path} with {len(children)} entries")
+
+    def _entry_unique_id(self, entry: ISOEntry) -> int:
+        fe = self._read(entry.descriptor_offset, 216)
+        offset = 160 if struct.unpack_from("<H", fe, 0)[0] == UDF_TAG_FILE_ENTRY else 200
+        return struct.unpack_from("<Q", fe, offset)[0]
+
+    def _rewrite_file_entry(self, fe: bytearray, size: int,
+                            extents: List[Tuple[int, int]], label: str):
+        """Point a (Extended) File Entry at new extents"""
+        tag = struct.unpack_from("<H", fe, 0)[0]
+        if tag == UDF_TAG_FILE_ENTRY:
+            fixed, ad_fields, blocks_field = 176, 168, 64
+        elif tag == UDF_TAG_EXTENDED_FILE_ENTRY:
+            fixed, ad_fields, blocks_field = 216, 208, 72
+            struct.pack_into("<Q", fe, 64, size)  # Object size
+        else:
+            raise ISOOverlayError(f"No UDF file entry for {label}")
+
+        ea_length = struct.unpack_from("<I", fe, ad_fields)[0]
+        icb_flags = struct.unpack_from("<H", fe, 16 + 18)[0]
+        ad_type = icb_flags & 0x07
+        if ad_type not in (0, 1):
+            ad_type = 0  # Embedded or extended descriptors become short ones
+
+        descriptors = bytearray()
+        for sector, length in extents:
+            if ad_type == 0:
+                descriptors += struct.pack("<II", length, self._block(sector))
+            else:
+                descriptors += struct.pack("<IIH6s", length, self._block(sector), 0, bytes(6))
+
+        end = fixed + ea_length + len(descriptors)
+        if end > SECTOR_SIZE:
+            raise ISOOverlayError(f"Too many extents for the file entry of {label}")
+
+        struct.pack_into("<H", fe, 16 + 18, (icb_flags & ~0x07) | ad_type)
+        struct.pack_into("<Q", fe, 56, size)
+        struct.pack_into("<Q", fe, blocks_field, sum(_sectors(length) for _, length in extents))
+        struct.pack_into("<I", fe, ad_fields + 4, len(descriptors))
+        fe[fixed + ea_length:end] = descriptors
+        fe[end:] = bytes(SECTOR_SIZE - end)
+        _seal_tag(fe, crc_length=end - 16)
+
+    def _add_to_directory(self, parent_path: str, children: List[Tuple[str, int, int, bool]]):
+        """Append File Identifier Descriptors for new files to a directory"""
+        directory = self.reader.get_entry(parent_path or "/")
+        if directory is None or not directory.is_dir:
+            raise ISOOverlayError(f"Directory {parent_path or '/'} not found in the source image")
+
+        data = bytearray(b"".join(self.reader.iter_chunks(directory)))
+        existing = {name.lower() for name in self._fid_names(data)}
+        for name, fe_block, unique_id, is_dir in children:
+            if name.lower() in existing:
+                raise ISOOverlayError(f"{parent_path}/{name} already exists as a deleted or hidden entry")
+            data += self._make_fid(name, fe_block, unique_id, 0x02 if is_dir else 0)
+
+        fe = bytearray(self._read(directory.descriptor_offset, SECTOR_SIZE))
+        # Each new subdirectory's parent entry links back to this directory
+        subdirectories = sum(1 for child in children if child[3])
+        if subdirectories:
+            links = struct.unpack_from("<H", fe, 48)[0]
+            struct.pack_into("<H", fe, 48, min(0xFFFF, links + subdirectories))
+        fe_sector = directory.descriptor_offset // SECTOR_SIZE
+        tag = struct.unpack_from("<H", fe, 0)[0]
+        fixed, ad_fields = (176, 168) if tag == UDF_TAG_FILE_ENTRY else (216, 208)
+        ea_length = struct.unpack_from("<I", fe, ad_fields)[0]
+        embedded = struct.unpack_from("<H", fe, 16 + 18)[0] & 0x07 == 3
+
+        if embedded and fixed + ea_length + len(data) <= SECTOR_SIZE:
+            self._relocate_fids(data, self._block(fe_sector))
+            end = fixed + ea_length + len(data)
+            struct.pack_into("<Q", fe, 56, len(data))
+            struct.pack_into("<I", fe, ad_fields + 4, len(data))
+            fe[fixed + ea_length:end] = data
+            fe[end:] = bytes(SECTOR_SIZE - end)
+            _seal_tag(fe, crc_length=end - 16)
+        else:
+            sector = self._allocate(len(data))
+            self._relocate_fids(data, self._block(sector))
+            self._overlay(sector * SECTOR_SIZE, len(data), "bytes", bytes(data))
+            self._rewrite_file_entry(fe, len(data), [(sector, len(data))], parent_path or "/")
+
+        self._overlay(directory.descriptor_offset, SECTOR_SIZE, "bytes", bytes(fe))
+        self.logger.debug(f"Overlay adds {len(children)} file(s) to /{parent_path}")
+
+    def _make_fid(self, name: str, fe_block: int, unique_id: int, characteristics: int = 0) -> bytes:
+        try:
+            raw_name = b"\x08" + name.encode("latin-1") if name else b""
+        except UnicodeEncodeError:
+            raw_name = b"\x10" + name.encode("utf-16-be")
+        if len(raw_name) > 255:
+            raise ISOOverlayError(f"File name too long for UDF: {name}")
+
+        # long_ad ICB with the UDF unique ID in its implementation use field
+        icb = struct.pack("<IIHHI", SECTOR_SIZE, fe_block, 0, 0, unique_id & 0xFFFFFFFF)
+        fid = bytearray(struct.pack("<HH", UDF_TAG_FILE_ID, self._descriptor_version()) + bytes(12))
+        fid += struct.pack("<HBB", 1, characteristics, len(raw_name)) + icb + struct.pack("<H", 0) + raw_name
+        fid += bytes(-len(fid) % 4)
+        return bytes(fid)
+
+    def _relocate_fids(self, data: bytearray, first_block: int):
+        """Reseal every FID in directory data stored from first_block on"""
+        pos = 0
+        while pos + 38 <= len(data):
+            if struct.unpack_from("<H", data, pos)[0] != UDF_TAG_FILE_ID:
+                break
+            length = (38 + struct.unpack_from("<H", data, pos + 36)[0] + data[pos + 19] + 3) & ~3
+            fid = bytearray(data[pos:pos + length])
+            _seal_tag(fid, location=first_block + pos // SECTOR_SIZE, crc_length=length - 16)
+            data[pos:pos + length] = fid
+            pos += length
+
+    @staticmethod
+    def _fid_names(data: bytes) -> List[str]:
+        names = []
+        pos = 0
+        while pos + 38 <= len(data) and struct.unpack_from("<H", data, pos)[0] == UDF_TAG_FILE_ID:
+            name_length = data[pos + 19]
+            impl_length = struct.unpack_from("<H", data, pos + 36)[0]
+            raw = data[pos + 38 + impl_length:pos + 38 + impl_length + name_length]
+            if raw[:1] == b"\x08":
+                names.append(raw[1:].decode("latin-1"))
+            elif raw[:1] == b"\x10":
+                names.append(raw[1:].decode("utf-16-be", errors="replace"))
+            pos += (38 + impl_length + name_length + 3) & ~3
+        return names
+
+    def _unique_id(self) -> int:
+        self.next_unique_id += 1
+        return self.next_unique_id
+
+    def _descriptor_version(self) -> int:
+        """Version used by the image's own descriptors (2 for NSR02, 3 for NSR03)"""
+        root = self._read(self.reader.root.descriptor_offset, 4)
+        return struct.unpack_from("<H", root, 2)[0] or 2
+
+    def _iso_records(self, image_path: str) -> List[int]:
+        """Offsets of ISO9660/Joliet directory records for the same file"""
+        records = []
+        for other in self.iso_readers:
+            entry = other.get_entry(image_path)
+            if entry is None or entry.is_dir:
+                continue
+            if len(entry.extents) != 1 or entry.descriptor_offset is None:
+                raise ISOOverlayError(f"{image_path} is a multi-extent ISO9660 file")
+            records.append(entry.descriptor_offset)
+        return records
+
+    # ------------------------------------------------------------------
+    # Volume structures
+    # ------------------------------------------------------------------
+
+    def _patch_volume_size(self, total_sectors: int):
+        """Grow the partition, move the closing anchor and update volume sizes"""
+        anchor = bytearray(self._read(256 * SECTOR_SIZE, SECTOR_SIZE))
+        if struct.unpack_from("<H", anchor, 0)[0] != UDF_TAG_AVDP:
+            raise ISOOverlayError("UDF anchor volume descriptor not found at sector 256")
+
+        partition_length = total_sectors - 1 - self.partition_start
+        main_vds = struct.unpack_from("<II", anchor, 16)
+        reserve_vds = struct.unpack_from("<II", anchor, 24)
+        for length, location in (main_vds, reserve_vds):
+            for sector in range(location, location + max(1, length // SECTOR_SIZE)):
+                if not length or sector >= self.source_sectors:
+                    break
+                descriptor = bytearray(self._read(sector * SECTOR_SIZE, SECTOR_SIZE))
+                tag = struct.unpack_from("<H", descriptor, 0)[0]
+                if tag == UDF_TAG_TERMINATING:
+                    break
+                if tag == UDF_TAG_PARTITION:
+                    current = struct.unpack_from("<I", descriptor, 192)[0]
+                    struct.pack_into("<I", descriptor, 192, max(current, partition_length))
+                    _seal_tag(descriptor)
+                    self._overlay(sector * SECTOR_SIZE, SECTOR_SIZE, "bytes", bytes(descriptor))
+
+        # Stale closing anchors would now sit inside the partition
+        for sector in (self.source_sectors - 1, self.source_sectors - 257):
+            if sector > 256:
+                old = self._read(sector * SECTOR_SIZE, 16)
+                if len(old) == 16 and struct.unpack_from("<HH", old, 0)[0] == UDF_TAG_AVDP \
+                        and struct.unpack_from("<I", old, 12)[0] == sector:
+                    self._overlay(sector * SECTOR_SIZE, SECTOR_SIZE, "zero")
+
+        closing = bytearray(anchor)
+        _seal_tag(closing, location=total_sectors - 1)
+        self._overlay((total_sectors - 1) * SECTOR_SIZE, SECTOR_SIZE, "bytes", bytes(closing))
+
+        # ISO9660 primary and supplementary descriptors record the volume size
+        for sector in range(16, 64):
+            descriptor = self._read(sector * SECTOR_SIZE, 8)
+            if descriptor[1:6] != b"CD001" or descriptor[0] == 255:
+                break
+            if descriptor[0] in (1, 2):
+                self._overlay(sector * SECTOR_SIZE + 80, 8, "bytes", _both32(total_sectors))
+
+    def _read(self, offset: int, length: int) -> bytes:
+        return self.reader._read_at(offset, length)
+
+    def _merge(self, total: int) -> List[_Segment]:
+        """Lay overlays over the source image; later overlays win"""
+        segments = [_Segment(0, min(self.source_size, total), "iso", None, 0)]
+        if total > self.source_size:
+            segments.append(_Segment(self.source_size, total - self.source_size, "zero"))
+
+        for overlay in self.overlays:
+            start, end = overlay.offset, overlay.offset + overlay.length
+            merged = []
+            for segment in segments:
+                seg_end = segment.offset + segment.length
+                if seg_end <= start or segment.offset >= end:
+                    merged.append(segment)
+                    continue
+                if segment.offset < start:
+                    merged.append(self._slice(segment, segment.offset, start))
+                if seg_end > end:
+                    merged.append(self._slice(segment, end, seg_end))
+            merged.append(overlay)
+            segments = sorted(merged, key=lambda s: s.offset)
+        return segments
+
+    @staticmethod
+    def _slice(segment: _Segment, start: int, end: int) -> _Segment:
+        shift = start - segment.offset
+        if segment.kind == "bytes":
+            return _Segment(start, end - start, "bytes", segment.source[shift:shift + end - start])
+        return _Segment(start, end - start, segment.kind, segment.source,
+                        segment.source_offset + shift if segment.kind in ("iso", "file") else 0)
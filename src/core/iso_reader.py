@@ -0,0 +1,669 @@
+"""
+BootForge ISO Reader
+Pure-Python streaming reader for ISO9660 (with Joliet and Rock Ridge) and UDF
+images. Lists and extracts files straight from the image file with random
+access - no loop mounts, no root privileges.
+"""
+
+import struct
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Iterator, Callable, Union
+from dataclasses import dataclass, field
+
+
+SECTOR_SIZE = 2048
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+# UDF descriptor tag identifiers (ECMA-167)
+UDF_TAG_AVDP = 2
+UDF_TAG_PARTITION = 5
+UDF_TAG_LOGICAL_VOLUME = 6
+UDF_TAG_TERMINATING = 8
+UDF_TAG_FILE_SET = 256
+UDF_TAG_FILE_ID = 257
+UDF_TAG_FILE_ENTRY = 261
+UDF_TAG_EXTENDED_FILE_ENTRY = 266
+
+JOLIET_ESCAPES = (b'%/@', b'%/C', b'%/E')
+
+
+class ISOReaderError(Exception):
+    """Raised when an image cannot be parsed"""
+
+
+@dataclass
+class ISOEntry:
+    """File or directory inside an ISO image"""
+    path: str                      # POSIX path from the image root, e.g. "EFI/BOOT/BOOTX64.EFI"
+    name: str
+    is_dir: bool
+    size: int
+    # (byte offset in image or None for unrecorded/sparse, length)
+    extents: List[Tuple[Optional[int], int]] = field(default_factory=list, repr=False)
+    inline_data: Optional[bytes] = field(default=None, repr=False)
+    # Image offset of the UDF file entry or ISO9660 directory record describing this entry
+    descriptor_offset: Optional[int] = field(default=None, repr=False)
+
+
+def _le16(data: bytes, offset: int) -> int:
+    return struct.unpack_from('<H', data, offset)[0]
+
+
+def _le32(data: bytes, offset: int) -> int:
+    return struct.unpack_from('<I', data, offset)[0]
+
+
+def _le64(data: bytes, offset: int) -> int:
+    return struct.unpack_from('<Q', data, offset)[0]
+
+
+def _decode_dstring(raw: bytes) -> str:
+    """Decode an OSTA CS0 compressed unicode identifier"""
+    if not raw:
+        return ""
+    compression = raw[0]
+    if compression in (8, 254):
+        return raw[1:].decode('latin-1')
+    if compression in (16, 255):
+        return raw[1:].decode('utf-16-be', errors='replace')
+    raise ISOReaderError(f"Unsupported UDF name compression id {compression}")
+
+
+def _clean_iso_name(name: str) -> str:
+    """Strip ISO9660 version suffix and trailing dot"""
+    if ';' in name:
+        name = name.split(';', 1)[0]
+    if name.endswith('.') and name != '.':
+        name = name[:-1]
+    return name
+
+
+def _is_safe_name(name: str) -> bool:
+    """Whether a directory entry name is a single path component"""
+    return bool(name) and name not in ('.', '..') and not any(c in name for c in '/\\\x00')
+
+
+class ISOReader:
+    """Random-access reader for ISO9660/Joliet/Rock Ridge and UDF images"""
+
+    def __init__(self, image_path: Union[str, Path], prefer: str = "auto"):
+        """
+        Args:
+            image_path: Path to the ISO/UDF image
+            prefer: "auto", "udf", "rockridge", "joliet" or "iso9660"
+        """
+        self.logger = logging.getLogger(__name__)
+        self.image_path = Path(image_path)
+        self._file = open(self.image_path, 'rb')
+        self._lock = threading.Lock()
+        self._children_cache: Dict[str, Dict[str, ISOEntry]] = {}
+
+        self.block_size = SECTOR_SIZE
+        self._pvd_root: Optional[ISOEntry] = None
+        self._joliet_root: Optional[ISOEntry] = None
+        self._has_udf = False
+        self._rock_ridge = False
+        self._susp_skip = 0
+        self._udf_partitions: Dict[int, int] = {}  # partition reference -> start sector
+
+        try:
+            self._parse_volume_descriptors()
+            self.filesystem, self.root = self._select_filesystem(prefer)
+        except Exception:
+            self._file.close()
+            raise
+
+        self.logger.debug(f"Opened {self.image_path.name} as {self.filesystem}")
+
+    def __enter__(self) -> 'ISOReader':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the underlying image file"""
+        self._file.close()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_entry(self, path: str) -> Optional[ISOEntry]:
+        """Look up an entry by path (case-insensitive)"""
+        entry = self.root
+        for part in [p for p in path.replace('\\', '/').split('/') if p]:
+            if not entry.is_dir:
+                return None
+            entry = self._children(entry).get(part.lower())
+            if entry is None:
+                return None
+        return entry
+
+    @property
+    def udf_partition_starts(self) -> Dict[int, int]:
+        """UDF partition reference -> first sector of the partition"""
+        return dict(self._udf_partitions)
+
+    def exists(self, path: str) -> bool:
+        """Check whether a path exists in the image"""
+        return self.get_entry(path) is not None
+
+    def list(self, path: str = "/") -> List[ISOEntry]:
+        """List the direct children of a directory"""
+        entry = self.get_entry(path)
+        if entry is None or not entry.is_dir:
+            raise FileNotFoundError(f"Directory not found in image: {path}")
+        return sorted(self._children(entry).values(), key=lambda e: e.name)
+
+    def walk(self, path: str = "/") -> Iterator[ISOEntry]:
+        """Yield every entry below a directory, depth-first"""
+        entry = self.get_entry(path)
+        if entry is None:
+            raise FileNotFoundError(f"Path not found in image: {path}")
+        if not entry.is_dir:
+            yield entry
+            return
+
+        stack = [entry]
+        while stack:
+            directory = stack.pop()
+            for child in sorted(self._children(directory).values(), key=lambda e: e.name, reverse=True):
+                yield child
+                if child.is_dir:
+                    stack.append(child)
+
+    def read_file(self, path: str) -> bytes:
+        """Read a whole (small) file into memory"""
+        entry = self.get_entry(path)
+        if entry is None or entry.is_dir:
+            raise FileNotFoundError(f"File not found in image: {path}")
+        return self._read_entry_data(entry)
+
+    def iter_chunks(self, entry: ISOEntry, chunk_size: int = COPY_CHUNK_SIZE,
+                    handle=None) -> Iterator[bytes]:
+        """Stream a file's contents in chunks"""
+        if entry.inline_data is not None:
+            yield entry.inline_data[:entry.size]
+            return
+
+        remaining = entry.size
+        for offset, length in entry.extents:
+            length = min(length, remaining)
+            remaining -= length
+            while length > 0:
+                n = min(chunk_size, length)
+                if offset is None:
+                    yield bytes(n)
+                else:
+                    yield self._read_at(offset, n, handle)
+                    offset += n
+                length -= n
+            if remaining <= 0:
+                break
+
+    def extract_file(self, path_or_entry: Union[str, ISOEntry], destination: Union[str, Path]) -> int:
+        """Extract a single file; returns bytes written"""
+        entry = path_or_entry if isinstance(path_or_entry, ISOEntry) else self.get_entry(path_or_entry)
+        if entry is None or entry.is_dir:
+            raise FileNotFoundError(f"File not found in image: {path_or_entry}")
+
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        written = 0
+        # Each extraction gets its own handle so parallel workers never share a file position
+        with open(self.image_path, 'rb') as handle, open(destination, 'wb') as out:
+            for chunk in self.iter_chunks(entry, handle=handle):
+                out.write(chunk)
+                written += len(chunk)
+        return written
+
+    def extract(self, destination: Union[str, Path], paths: Optional[List[str]] = None,
+                workers: int = 4, is_cancelled: Optional[Callable[[], bool]] = None,
+                progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Path]:
+        """
+        Extract selected paths (files or directories), or the whole tree
+
+        Args:
+            destination: Directory to extract into; image layout is preserved
+            paths: Paths inside the image, None for everything
+            workers: Parallel extraction threads
+            is_cancelled: Polled between files to abort early
+            progress_callback: Called with (bytes_done, bytes_total)
+
+        Returns:
+            List of extracted file paths
+        """
+        destination = Path(destination)
+        files: List[ISOEntry] = []
+        directories: List[ISOEntry] = []
+
+        for path in (paths if paths is not None else ["/"]):
+            entry = self.get_entry(path)
+            if entry is None:
+                raise FileNotFoundError(f"Path not found in image: {path}")
+            if entry.is_dir:
+                for child in self.walk(path):
+                    (directories if child.is_dir else files).append(child)
+            else:
+                files.append(entry)
+
+        root = destination.resolve()
+
+        def target_for(entry: ISOEntry) -> Path:
+            # Names are validated while parsing; this keeps any bypass inside destination
+            target = (destination / entry.path).resolve()
+            if target != root and root not in target.parents:
+                raise ISOReaderError(f"Refusing to extract outside destination: {entry.path}")
+            return target
+
+        for directory in directories:
+            target_for(directory).mkdir(parents=True, exist_ok=True)
+
+        total = sum(entry.size for entry in files)
+        done = [0]
+        done_lock = threading.Lock()
+
+        def extract_one(entry: ISOEntry) -> Optional[Path]:
+            if is_cancelled and is_cancelled():
+                return None
+            target = target_for(entry)
+            written = self.extract_file(entry, target)
+            if progress_callback:
+                with done_lock:
+                    done[0] += written
+                    progress_callback(done[0], total)
+            return target
+
+        # Largest files first keeps the pool balanced
+        files.sort(key=lambda e: e.size, reverse=True)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(extract_one, files))
+
+        if is_cancelled and is_cancelled():
+            raise InterruptedError("ISO extraction cancelled")
+
+        return [path for path in results if path is not None]
+
+    # ------------------------------------------------------------------
+    # Low-level I/O
+    # ------------------------------------------------------------------
+
+    def _read_at(self, offset: int, length: int, handle=None) -> bytes:
+        """Read bytes at an absolute image offset"""
+        if handle is not None:
+            handle.seek(offset)
+            return handle.read(length)
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def _read_entry_data(self, entry: ISOEntry) -> bytes:
+        """Read an entry's full contents (directories and small files)"""
+        return b''.join(self.iter_chunks(entry))
+
+    @staticmethod
+    def _data_offset(entry: ISOEntry, position: int) -> Optional[int]:
+        """Image offset of a byte position within an entry's data"""
+        for offset, length in entry.extents:
+            if position < length:
+                return None if offset is None else offset + position
+            position -= length
+        return None
+
+    def _children(self, directory: ISOEntry) -> Dict[str, ISOEntry]:
+        """Directory children keyed by lowercase name, cached"""
+        cached = self._children_cache.get(directory.path)
+        if cached is None:
+            if self.filesystem == "udf":
+                children = self._parse_udf_directory(directory)
+            else:
+                children = self._parse_iso_directory(directory, joliet=self.filesystem == "joliet")
+            cached = {child.name.lower(): child for child in children}
+            self._children_cache[directory.path] = cached
+        return cached
+
+    # ------------------------------------------------------------------
+    # Volume recognition
+    # ------------------------------------------------------------------
+
+    def _parse_volume_descriptors(self):
+        """Scan the volume recognition area for ISO9660 and UDF descriptors"""
+        sector = 16
+        while sector < 64:
+            data = self._read_at(sector * SECTOR_SIZE, SECTOR_SIZE)
+            if len(data) < SECTOR_SIZE:
+                break
+
+            identifier = data[1:6]
+            if identifier == b'CD001':
+                vd_type = data[0]
+                if vd_type == 1 and self._pvd_root is None:
+                    self.block_size = _le16(data, 128)
+                    self._pvd_root = self._root_from_record(data[156:190])
+                elif vd_type == 2 and data[88:91] in JOLIET_ESCAPES:
+                    self._joliet_root = self._root_from_record(data[156:190])
+            elif identifier in (b'NSR02', b'NSR03'):
+                self._has_udf = True
+            elif identifier in (b'BEA01', b'BOOT2'):
+                pass
+            else:
+                # TEA01 or the end of the recognition sequence
+                break
+            sector += 1
+
+        if self._pvd_root is None and not self._has_udf:
+            raise ISOReaderError(f"{self.image_path} is not an ISO9660 or UDF image")
+
+    def _root_from_record(self, record: bytes) -> ISOEntry:
+        """Build the root entry from a volume descriptor's root directory record"""
+        lba = _le32(record, 2)
+        length = _le32(record, 10)
+        return ISOEntry(path="", name="", is_dir=True, size=length,
+                        extents=[(lba * self.block_size, length)])
+
+    def _select_filesystem(self, prefer: str) -> Tuple[str, ISOEntry]:
+        """Pick the richest namespace available, honouring the caller's preference"""
+        if prefer in ("auto", "udf") and self._has_udf:
+            try:
+                return "udf", self._load_udf()
+            except (ISOReaderError, struct.error) as e:
+                if prefer == "udf" or self._pvd_root is None:
+                    raise ISOReaderError(f"UDF parse failed: {e}")
+                self.logger.warning(f"UDF parse failed, falling back to ISO9660: {e}")
+
+        if prefer == "udf":
+            raise ISOReaderError("Image has no UDF file system")
+
+        if self._pvd_root is None:
+            raise ISOReaderError("Image has no ISO9660 file system")
+
+        if prefer in ("auto", "rockridge"):
+            self._detect_rock_ridge()
+            if self._rock_ridge:
+                return "rockridge", self._pvd_root
+
+        if prefer in ("auto", "joliet") and self._joliet_root is not None:
+            return "joliet", self._joliet_root
+
+        return "iso9660", self._pvd_root
+
+    # ------------------------------------------------------------------
+    # ISO9660 / Joliet / Rock Ridge
+    # ------------------------------------------------------------------
+
+    def _detect_rock_ridge(self):
+        """Rock Ridge is signalled by an SUSP "SP" entry on the root "." record"""
+        data = self._read_entry_data(self._pvd_root)
+        if not data or data[0] < 34:
+            return
+        record = data[:data[0]]
+        name_len = record[32]
+        su_start = 33 + name_len + (1 if name_len % 2 == 0 else 0)
+        system_use = record[su_start:]
+        if len(system_use) >= 7 and system_use[0:2] == b'SP' and system_use[4:6] == b'\xbe\xef':
+            self._rock_ridge = True
+            self._susp_skip = system_use[6]
+
+    def _parse_iso_directory(self, directory: ISOEntry, joliet: bool) -> List[ISOEntry]:
+        """Parse ISO9660 directory records, merging multi-extent files"""
+        data = self._read_entry_data(directory)
+        entries: List[ISOEntry] = []
+        pending: Optional[ISOEntry] = None
+        pos = 0
+
+        while pos < len(data):
+            record_len = data[pos]
+            if record_len == 0:
+                # Records never straddle sectors; zero padding means next sector
+                pos = (pos // self.block_size + 1) * self.block_size
+                continue
+
+            record = data[pos:pos + record_len]
+            record_offset = self._data_offset(directory, pos)
+            pos += record_len
+
+            name_len = record[32]
+            raw_name = record[33:33 + name_len]
+            if name_len == 1 and raw_name in (b'\x00', b'\x01'):
+                continue
+
+            if joliet:
+                name = _clean_iso_name(raw_name.decode('utf-16-be', errors='replace'))
+            else:
+                name = _clean_iso_name(raw_name.decode('latin-1'))
+                if self._rock_ridge:
+                    su_start = 33 + name_len + (1 if name_len % 2 == 0 else 0) + self._susp_skip
+                    name = self._rock_ridge_name(record[su_start:]) or name
+            if not _is_safe_name(name):
+                self.logger.warning(f"Skipping unsafe name {name!r} in /{directory.path}")
+                continue
+
+            flags = record[25]
+            extent = (_le32(record, 2) * self.block_size, _le32(record, 10))
+
+            if pending is not None and pending.name == name:
+                pending.extents.append(extent)
+                pending.size += extent[1]
+                target = pending
+            else:
+                target = ISOEntry(
+                    path=f"{directory.path}/{name}" if directory.path else name,
+                    name=name,
+                    is_dir=bool(flags & 0x02),
+                    size=extent[1],
+                    extents=[extent],
+                    descriptor_offset=record_offset
+                )
+                entries.append(target)
+
+            pending = target if flags & 0x80 else None
+
+        return entries
+
+    def _rock_ridge_name(self, system_use: bytes) -> Optional[str]:
+        """Collect the Rock Ridge "NM" alternate name, following "CE" continuations"""
+        parts: List[bytes] = []
+        area = system_use
+        hops = 0
+
+        while area is not None and hops < 8:
+            continuation = None
+            pos = 0
+            while pos + 4 <= len(area):
+                signature = area[pos:pos + 2]
+                entry_len = area[pos + 2]
+                if entry_len < 4:
+                    break
+                if signature == b'NM' and entry_len >= 5:
+                    if not area[pos + 4] & 0x06:  # Skip "." and ".." markers
+                        parts.append(area[pos + 5:pos + entry_len])
+                elif signature == b'CE' and entry_len >= 28:
+                    continuation = (_le32(area, pos + 4), _le32(area, pos + 12), _le32(area, pos + 20))
+                elif signature == b'ST':
+                    break
+                pos += entry_len
+
+            area = None
+            if continuation:
+                block, offset, length = continuation
+                area = self._read_at(block * self.block_size + offset, length)
+                hops += 1
+
+        if not parts:
+            return None
+        return b''.join(parts).decode('utf-8', errors='replace')
+
+    # ------------------------------------------------------------------
+    # UDF
+    # ------------------------------------------------------------------
+
+    def _load_udf(self) -> ISOEntry:
+        """Locate the UDF file set and return the root directory entry"""
+        anchor = self._read_at(256 * SECTOR_SIZE, 512)
+        if len(anchor) < 24 or _le16(anchor, 0) != UDF_TAG_AVDP:
+            raise ISOReaderError("UDF anchor volume descriptor not found at sector 256")
+
+        vds_length = _le32(anchor, 16)
+        vds_location = _le32(anchor, 20)
+
+        partition_starts: Dict[int, int] = {}
+        partition_maps: List[int] = []
+        fsd_location: Optional[Tuple[int, int]] = None
+
+        for index in range(max(1, vds_length // SECTOR_SIZE)):
+            data = self._read_at((vds_location + index) * SECTOR_SIZE, SECTOR_SIZE)
+            tag = _le16(data, 0)
+
+            if tag == UDF_TAG_PARTITION:
+                partition_starts[_le16(data, 22)] = _le32(data, 188)
+            elif tag == UDF_TAG_LOGICAL_VOLUME:
+                self.block_size = _le32(data, 212)
+                fsd_length, fsd_block, fsd_partition = self._long_ad(data, 248)
+                fsd_location = (fsd_partition, fsd_block)
+                map_count = _le32(data, 268)
+                pos = 440
+                for _ in range(map_count):
+                    map_type, map_len = data[pos], data[pos + 1]
+                    if map_type != 1:
+                        raise ISOReaderError(f"Unsupported UDF partition map type {map_type}")
+                    partition_maps.append(_le16(data, pos + 4))
+                    pos += map_len
+            elif tag == UDF_TAG_TERMINATING:
+                break
+
+        if fsd_location is None or not partition_maps:
+            raise ISOReaderError("UDF logical volume descriptor not found")
+
+        for reference, number in enumerate(partition_maps):
+            if number not in partition_starts:
+                raise ISOReaderError(f"UDF partition {number} has no partition descriptor")
+            self._udf_partitions[reference] = partition_starts[number]
+
+        fsd = self._read_at(self._udf_offset(*fsd_location), self.block_size)
+        if _le16(fsd, 0) != UDF_TAG_FILE_SET:
+            raise ISOReaderError("UDF file set descriptor not found")
+
+        _, root_block, root_partition = self._long_ad(fsd, 400)
+        return self._udf_entry(root_partition, root_block, path="", name="")
+
+    def _udf_offset(self, partition_ref: int, block: int) -> int:
+        """Absolute byte offset of a logical block within a partition"""
+        if partition_ref not in self._udf_partitions:
+            raise ISOReaderError(f"Unknown UDF partition reference {partition_ref}")
+        return (self._udf_partitions[partition_ref] + block) * self.block_size
+
+    @staticmethod
+    def _long_ad(data: bytes, offset: int) -> Tuple[int, int, int]:
+        """Decode a long_ad as (length, block, partition reference)"""
+        return _le32(data, offset), _le32(data, offset + 4), _le16(data, offset + 8)
+
+    def _udf_entry(self, partition_ref: int, block: int, path: str, name: str) -> ISOEntry:
+        """Read a (Extended) File Entry ICB and build an ISOEntry"""
+        data = self._read_at(self._udf_offset(partition_ref, block), self.block_size)
+        tag = _le16(data, 0)
+
+        if tag == UDF_TAG_FILE_ENTRY:
+            ea_length, ad_length, ad_start = _le32(data, 168), _le32(data, 172), 176
+        elif tag == UDF_TAG_EXTENDED_FILE_ENTRY:
+            ea_length, ad_length, ad_start = _le32(data, 208), _le32(data, 212), 216
+        else:
+            raise ISOReaderError(f"Expected UDF file entry for {path or '/'}, found tag {tag}")
+
+        file_type = data[16 + 11]
+        ad_type = _le16(data, 16 + 18) & 0x07
+        size = _le64(data, 56)
+        descriptors = data[ad_start + ea_length:ad_start + ea_length + ad_length]
+
+        entry = ISOEntry(path=path, name=name, is_dir=file_type == 4, size=size,
+                         descriptor_offset=self._udf_offset(partition_ref, block))
+        if ad_type == 3:
+            entry.inline_data = descriptors[:size]
+        else:
+            entry.extents = self._udf_extents(descriptors, ad_type, partition_ref)
+        return entry
+
+    def _udf_extents(self, descriptors: bytes, ad_type: int,
+                     partition_ref: int) -> List[Tuple[Optional[int], int]]:
+        """Decode short/long/extended allocation descriptors, following continuations"""
+        sizes = {0: 8, 1: 16, 2: 20}
+        if ad_type not in sizes:
+            raise ISOReaderError(f"Unsupported UDF allocation descriptor type {ad_type}")
+
+        extents: List[Tuple[Optional[int], int]] = []
+        step = sizes[ad_type]
+        hops = 0
+        pos = 0
+
+        while pos + step <= len(descriptors):
+            raw_length = _le32(descriptors, pos)
+            length = raw_length & 0x3FFFFFFF
+            extent_type = raw_length >> 30
+
+            if ad_type == 0:
+                block, part = _le32(descriptors, pos + 4), partition_ref
+            elif ad_type == 1:
+                block, part = _le32(descriptors, pos + 4), _le16(descriptors, pos + 8)
+            else:
+                block, part = _le32(descriptors, pos + 12), _le16(descriptors, pos + 16)
+            pos += step
+
+            if length == 0:
+                break
+            if extent_type == 3:
+                # Next extent of allocation descriptors
+                hops += 1
+                if hops > 64:
+                    raise ISOReaderError("UDF allocation descriptor chain too long")
+                descriptors = self._read_at(self._udf_offset(part, block), length)
+                # Continuation blocks start with an Allocation Extent Descriptor header
+                pos = 24
+                continue
+            if extent_type == 0:
+                extents.append((self._udf_offset(part, block), length))
+            else:
+                extents.append((None, length))
+
+        return extents
+
+    def _parse_udf_directory(self, directory: ISOEntry) -> List[ISOEntry]:
+        """Parse UDF File Identifier Descriptors"""
+        data = self._read_entry_data(directory)
+        entries: List[ISOEntry] = []
+        pos = 0
+
+        while pos + 38 <= len(data):
+            if _le16(data, pos) != UDF_TAG_FILE_ID:
+                break
+
+            characteristics = data[pos + 18]
+            name_len = data[pos + 19]
+            _, block, partition_ref = self._long_ad(data, pos + 20)
+            impl_len = _le16(data, pos + 36)
+            raw_name = data[pos + 38 + impl_len:pos + 38 + impl_len + name_len]
+            pos += (38 + impl_len + name_len + 3) & ~3
+
+            if characteristics & 0x0C:  # Deleted or parent entry
+                continue
+
+            name = _decode_dstring(raw_name)
+            if not _is_safe_name(name):
+                self.logger.warning(f"Skipping unsafe name {name!r} in /{directory.path}")
+                continue
+            path = f"{directory.path}/{name}" if directory.path else name
+            entries.append(self._udf_entry(partition_ref, block, path, name))
+
+        return entries
+
+
+def is_iso_image(path: Union[str, Path]) -> bool:
+    """Check whether a file looks like an ISO9660/UDF image"""
+    try:
+        with ISOReader(path):
+            return True
+    except (ISOReaderError, OSError, struct.error):
+        return False
@@ -10,27 +10,36 @@ import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
-from PyQt6.QtCore import QObject, pyqtSignal
 
+# PyQt6 is only needed for the GUI handler; CLI and headless use run without it
+try:
+    from PyQt6.QtCore import QObject, pyqtSignal
+    HAS_PYQT6 = True
+except ImportError:
+    HAS_PYQT6 = False
 
-class GuiLogHandler(logging.Handler, QObject):
-    """Custom log handler that emits Qt signals for GUI display"""
-    
-    log_message = pyqtSignal(str, str, str)  # level, timestamp, message
-    
-    def __init__(self):
-        logging.Handler.__init__(self)
-        QObject.__init__(self)
+
+if HAS_PYQT6:
+    class GuiLogHandler(logging.Handler, QObject):
+        """Custom log handler that emits Qt signals for GUI display"""
+        
+        log_message = pyqtSignal(str, str, str)  # level, timestamp, message
         
-    def emit(self, record):
-        """Emit log record as Qt signal"""
-        try:
-            timestamp = datetime.fromtimestamp(record.created).strftime('%H:%M:%S')
-            message = self.format(record)
-            self.log_message.emit(record.levelname, timestamp, message)
-        except Exception:
-            # Avoid infinite recursion in case of logging errors
-            pass
+        def __init__(self):
+            logging.Handler.__init__(self)
+            QObject.__init__(self)
+            
+        def emit(self, record):
+            """Emit log record as Qt signal"""
+            try:
+                timestamp = datetime.fromtimestamp(record.created).strftime('%H:%M:%S')
+                message = self.format(record)
+                self.log_message.emit(record.levelname, timestamp, message)
+            except Exception:
+                # Avoid infinite recursion in case of logging errors
+                pass
+else:
+    GuiLogHandler = None
 
 
 class BootForgeLogger:
@@ -89,14 +98,15 @@ class BootForgeLogger:
         root_logger.addHandler(error_handler)
         
         # GUI handler (will be connected later)
-        self.gui_handler = GuiLogHandler()
-        self.gui_handler.setLevel(self.level)
-        self.gui_handler.setFormatter(logging.Formatter('%(message)s'))
-        root_logger.addHandler(self.gui_handler)
+        if GuiLogHandler is not None:
+            self.gui_handler = GuiLogHandler()
+            self.gui_handler.setLevel(self.level)
+            self.gui_handler.setFormatter(logging.Formatter('%(message)s'))
+            root_logger.addHandler(self.gui_handler)
         
         logging.info("BootForge logging system initialized")
     
-    def get_gui_handler(self) -> GuiLogHandler:
+    def get_gui_handler(self) -> Optional["GuiLogHandler"]:
         """Get GUI log handler for connecting to UI"""
         return self.gui_handler
     
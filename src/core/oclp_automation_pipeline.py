@@ -5,10 +5,14 @@ From hardware detection to bootable USB creation in one seamless process
 """
 
 import os
+import json
 import time
 import shutil
+import hashlib
 import logging
+import platform
 import tempfile
+import threading
 from pathlib import Path
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Callable, Any, Union
@@ -36,6 +40,8 @@ from src.core.usb_builder import (
 )
 from src.core.disk_manager import DiskInfo
 from src.core.safety_validator import SafetyLevel
+from src.core.error_prevention_recovery import CheckpointManager, OperationPhase
+from src.core.build_graph import BuildGraph, BuildTask, TaskLane
 
 # Optional imports with fallbacks
 try:
@@ -52,6 +58,18 @@ except ImportError:
     Config = None
 
 
+# Stages whose outputs are checkpointed for resume. Device stages (USB
+# preparation onward) always rerun because the stick may have been swapped.
+CHECKPOINT_PHASES = {
+    "hardware_detection": OperationPhase.VALIDATION,
+    "compatibility_check": OperationPhase.VALIDATION,
+    "macos_acquisition": OperationPhase.PREPARATION,
+    "patch_determination": OperationPhase.PREPARATION,
+    "oclp_configuration": OperationPhase.PREPARATION,
+}
+CHECKPOINT_MAX_AGE_HOURS = 24
+
+
 class PipelineStage(Enum):
     """OCLP automation pipeline stages"""
     INITIALIZING = "initializing"
@@ -76,6 +94,51 @@ class AutomationMode(Enum):
     EXPERT = "expert"                      # Manual control over all stages
 
 
+@dataclass(frozen=True)
+class PipelineStageSpec:
+    """One node of the pipeline's stage dependency graph"""
+    stage: PipelineStage
+    name: str
+    number: int
+    method: str
+    failure_message: str
+    depends_on: Tuple[PipelineStage, ...] = ()
+    lane: TaskLane = TaskLane.PREP
+
+
+# macOS acquisition (a multi-GB download) overlaps patch determination, the
+# OCLP build and USB device selection; only USB creation waits for all three.
+PIPELINE_STAGES = [
+    PipelineStageSpec(PipelineStage.HARDWARE_DETECTION, "Detecting Mac Hardware", 1,
+                      "_execute_stage_1_hardware_detection", "Hardware detection failed"),
+    PipelineStageSpec(PipelineStage.COMPATIBILITY_CHECK, "Checking OCLP Compatibility", 2,
+                      "_execute_stage_2_compatibility_check", "Compatibility check failed",
+                      (PipelineStage.HARDWARE_DETECTION,)),
+    PipelineStageSpec(PipelineStage.MACOS_ACQUISITION, "Acquiring macOS Installer", 3,
+                      "_execute_stage_3_macos_acquisition", "macOS acquisition failed",
+                      (PipelineStage.COMPATIBILITY_CHECK,)),
+    PipelineStageSpec(PipelineStage.PATCH_DETERMINATION, "Determining Required Patches", 4,
+                      "_execute_stage_4_patch_determination", "Patch determination failed",
+                      (PipelineStage.COMPATIBILITY_CHECK,)),
+    PipelineStageSpec(PipelineStage.OCLP_CONFIGURATION, "Configuring OpenCore", 5,
+                      "_execute_stage_5_oclp_configuration", "OCLP configuration failed",
+                      (PipelineStage.PATCH_DETERMINATION,)),
+    PipelineStageSpec(PipelineStage.USB_PREPARATION, "Preparing USB Device", 6,
+                      "_execute_stage_6_usb_preparation", "USB preparation failed",
+                      (PipelineStage.COMPATIBILITY_CHECK,), TaskLane.DEVICE),
+    PipelineStageSpec(PipelineStage.USB_CREATION, "Creating Bootable USB", 7,
+                      "_execute_stage_7_usb_creation", "USB creation failed",
+                      (PipelineStage.MACOS_ACQUISITION, PipelineStage.OCLP_CONFIGURATION,
+                       PipelineStage.USB_PREPARATION), TaskLane.DEVICE),
+    PipelineStageSpec(PipelineStage.FINALIZATION, "Finalizing Deployment", 8,
+                      "_execute_stage_8_finalization", "Finalization failed",
+                      (PipelineStage.USB_CREATION,)),
+]
+STAGE_WORKERS = 3
+# Configuration fields the stages fill in; a checkpoint hashes what the caller asked for
+RESOLVED_CONFIG_FIELDS = ("target_macos_version", "macos_installer_path")
+
+
 @dataclass
 class PipelineConfiguration:
     """Configuration for the OCLP automation pipeline"""
@@ -113,6 +176,10 @@ class PipelineConfiguration:
     detailed_logging: bool = False
     preserve_temp_files: bool = False
     log_output_dir: Optional[Path] = None
+    
+    # Stage checkpoints for resuming a failed run
+    resume_from_checkpoint: bool = True
+    checkpoint_dir: Optional[Path] = None
 
 
 @dataclass
@@ -134,6 +201,10 @@ class PipelineProgress:
     current_operation: str = ""
     detailed_status: str = ""
     
+    # Stages that run concurrently and each stage's own progress (0-100)
+    active_stages: List[str] = field(default_factory=list)
+    stage_progress_by_stage: Dict[str, float] = field(default_factory=dict)
+    
     # Results from each stage
     detected_hardware: Optional[DetectedHardware] = None
     oclp_config: Optional[OCLPConfiguration] = None
@@ -206,12 +277,17 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
             current_stage=self.current_stage,
             stage_name="Initializing",
             stage_number=0,
-            total_stages=9,  # Updated to include macOS acquisition stage
+            total_stages=len(PIPELINE_STAGES),
             stage_progress=0.0,
             overall_progress=0.0
         )
         self.start_time = 0.0
         self.is_cancelled = False
+        # Set only by cancel_pipeline; a failed stage also sets is_cancelled to stop its siblings
+        self._cancel_requested = False
+        self._progress_lock = threading.RLock()
+        # Stage a worker thread is currently executing
+        self._stage_local = threading.local()
         
         # Results and intermediate data
         self.pipeline_result = PipelineResult(success=False, completion_time=0.0, final_stage=self.current_stage)
@@ -242,6 +318,18 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
         self.pending_user_input: Optional[dict] = None
         self.user_input_response: Optional[dict] = None
         
+        # Stage checkpoints
+        checkpoint_dir = self.config.checkpoint_dir
+        if checkpoint_dir is None:
+            if Config:
+                checkpoint_dir = Config().get_cache_dir() / "oclp_pipeline_checkpoints"
+            else:
+                checkpoint_dir = Path(tempfile.gettempdir()) / "bootforge_oclp_pipeline_checkpoints"
+        self.checkpoint_manager = CheckpointManager(checkpoint_dir)
+        self.resumed_stages: List[PipelineStage] = []
+        self._requested_inputs = {name: getattr(self.config, name) for name in RESOLVED_CONFIG_FIELDS}
+        self._resolved_inputs = dict(self._requested_inputs)
+        
         self.logger.info("OCLP Automation Pipeline initialized")
     
     def _emit_signal_safe(self, signal, *args):
@@ -257,34 +345,21 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
         """Main pipeline execution method"""
         try:
             self.start_time = time.time()
+            self.is_cancelled = False
+            self._cancel_requested = False
             self._log_message("INFO", "Starting OCLP automation pipeline")
+            self._snapshot_requested_inputs()
             
-            # Execute pipeline stages in order
-            if not self._execute_stage_1_hardware_detection():
-                return self._handle_pipeline_failure("Hardware detection failed")
-            
-            if not self._execute_stage_2_compatibility_check():
-                return self._handle_pipeline_failure("Compatibility check failed")
-            
-            if not self._execute_stage_3_macos_acquisition():
-                return self._handle_pipeline_failure("macOS acquisition failed")
-            
-            if not self._execute_stage_4_patch_determination():
-                return self._handle_pipeline_failure("Patch determination failed")
-            
-            if not self._execute_stage_5_oclp_configuration():
-                return self._handle_pipeline_failure("OCLP configuration failed")
-            
-            if not self._execute_stage_6_usb_preparation():
-                return self._handle_pipeline_failure("USB preparation failed")
-            
-            if not self._execute_stage_7_usb_creation():
-                return self._handle_pipeline_failure("USB creation failed")
-            
-            if not self._execute_stage_8_finalization():
-                return self._handle_pipeline_failure("Finalization failed")
+            result = self._run_stage_graph()
+            if not result.success:
+                # A stage stopped by a user cancel fails too; report the cancel, not the stage
+                if self._cancel_requested or not result.failed_task:
+                    return self._handle_pipeline_cancelled()
+                failed = next(spec for spec in PIPELINE_STAGES if spec.stage.value == result.failed_task)
+                return self._handle_pipeline_failure(failed.failure_message)
             
             # Success!
+            self._clear_stage_checkpoints()
             self._complete_pipeline_successfully()
             
         except Exception as e:
@@ -292,8 +367,184 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
             self._handle_pipeline_failure(f"Unexpected error: {str(e)}")
         
         finally:
+            self._resolved_inputs = {name: getattr(self.config, name) for name in RESOLVED_CONFIG_FIELDS}
             self._cleanup_pipeline()
     
+    def _snapshot_requested_inputs(self):
+        """Record the caller's values for fields the stages overwrite
+        
+        A value still equal to what the last run resolved was set by the
+        pipeline itself, so the caller's original request stands.
+        """
+        for name in RESOLVED_CONFIG_FIELDS:
+            value = getattr(self.config, name)
+            if value != self._resolved_inputs.get(name):
+                self._requested_inputs[name] = value
+    
+    def _run_stage_graph(self):
+        """Restore checkpointed stages, then run the rest as a dependency graph"""
+        input_hashes: Dict[PipelineStage, str] = {}
+        restored = set()
+        
+        # A stage is restored only when everything it depends on was restored too
+        if self.config.resume_from_checkpoint:
+            for spec in PIPELINE_STAGES:
+                if (spec.stage.value in CHECKPOINT_PHASES
+                        and all(dep in restored for dep in spec.depends_on)):
+                    input_hashes[spec.stage] = self._stage_input_hash(spec, input_hashes)
+                    if self._restore_stage_checkpoint(spec, input_hashes[spec.stage]):
+                        restored.add(spec.stage)
+        
+        graph = BuildGraph(max_workers=STAGE_WORKERS, is_cancelled=lambda: self.is_cancelled)
+        for spec in PIPELINE_STAGES:
+            if spec.stage in restored:
+                continue
+            graph.add_task(
+                spec.stage.value,
+                lambda spec=spec: self._run_stage(spec, input_hashes),
+                depends_on=[dep.value for dep in spec.depends_on if dep not in restored],
+                lane=spec.lane,
+                description=spec.name
+            )
+        
+        def on_task_finished(task: BuildTask):
+            if task.error and not self.is_cancelled:
+                # Stop stages running alongside the failed one
+                self._log_message("ERROR", f"{task.description} failed, stopping parallel stages")
+                self.is_cancelled = True
+        
+        result = graph.run(on_task_finished=on_task_finished)
+        self.logger.info("Stage timings: " + ", ".join(
+            f"{name}={seconds:.1f}s" for name, seconds in result.timings.items()))
+        return result
+    
+    def _run_stage(self, spec: PipelineStageSpec, input_hashes: Dict[PipelineStage, str]) -> bool:
+        """Execute one stage and checkpoint its outputs"""
+        checkpointed = spec.stage.value in CHECKPOINT_PHASES
+        if checkpointed:
+            input_hashes[spec.stage] = self._stage_input_hash(spec, input_hashes)
+        
+        if not getattr(self, spec.method)():
+            return False
+        
+        if checkpointed:
+            self._save_stage_checkpoint(spec.stage, input_hashes[spec.stage])
+        return True
+    
+    # Stage checkpoints
+    
+    def _stage_inputs(self, stage: PipelineStage) -> Dict[str, Any]:
+        """Caller-supplied configuration a stage's outputs depend on"""
+        target_version = self._requested_inputs["target_macos_version"]
+        if stage == PipelineStage.HARDWARE_DETECTION:
+            return {"host": platform.node(), "system": platform.system()}
+        if stage == PipelineStage.COMPATIBILITY_CHECK:
+            return {"target_macos_version": target_version,
+                    "auto_select_macos_version": self.config.auto_select_macos_version}
+        if stage == PipelineStage.MACOS_ACQUISITION:
+            installer = self._requested_inputs["macos_installer_path"]
+            return {"target_macos_version": target_version,
+                    "macos_installer_path": str(installer) if installer else None,
+                    "auto_download_macos": self.config.auto_download_macos,
+                    "macos_cache_dir": str(self.config.macos_cache_dir or "")}
+        if stage == PipelineStage.OCLP_CONFIGURATION:
+            return {"target_macos_version": target_version,
+                    "oclp_app_path": str(self.config.oclp_app_path or "")}
+        return {"target_macos_version": target_version}
+    
+    def _stage_input_hash(self, spec: PipelineStageSpec, input_hashes: Dict[PipelineStage, str]) -> str:
+        """Hash of a stage's inputs chained to the stages it depends on"""
+        material = json.dumps({
+            "stage": spec.stage.value,
+            "inputs": self._stage_inputs(spec.stage),
+            "dependencies": [input_hashes.get(dep, "") for dep in spec.depends_on]
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+    
+    def _stage_outputs(self, stage: PipelineStage) -> Dict[str, Any]:
+        """Results a completed stage leaves for the stages after it"""
+        if stage == PipelineStage.HARDWARE_DETECTION:
+            return {"detected_hardware": self.progress.detected_hardware}
+        if stage == PipelineStage.COMPATIBILITY_CHECK:
+            return {"oclp_config": self.progress.oclp_config,
+                    "target_macos_version": self.config.target_macos_version}
+        if stage == PipelineStage.MACOS_ACQUISITION:
+            return {"macos_installer_path": self.config.macos_installer_path,
+                    "macos_installer_info": self.progress.macos_installer_info}
+        if stage == PipelineStage.OCLP_CONFIGURATION:
+            return {"oclp_build_result": self.pipeline_result.oclp_build_result}
+        return {}
+    
+    def _stage_outputs_valid(self, stage: PipelineStage, outputs: Dict[str, Any]) -> bool:
+        """Check that files a checkpoint points at are still on disk"""
+        if stage == PipelineStage.MACOS_ACQUISITION:
+            installer = outputs.get("macos_installer_path")
+            return installer is None or Path(installer).exists()
+        if stage == PipelineStage.OCLP_CONFIGURATION:
+            build = outputs.get("oclp_build_result")
+            return build is None or not build.efi_folder_path or build.efi_folder_path.exists()
+        return True
+    
+    def _apply_stage_outputs(self, stage: PipelineStage, outputs: Dict[str, Any]):
+        if stage == PipelineStage.HARDWARE_DETECTION:
+            self.progress.detected_hardware = outputs["detected_hardware"]
+            self.pipeline_result.detected_hardware = outputs["detected_hardware"]
+        elif stage == PipelineStage.COMPATIBILITY_CHECK:
+            self.progress.oclp_config = outputs["oclp_config"]
+            self.pipeline_result.oclp_configuration = outputs["oclp_config"]
+            self.config.target_macos_version = outputs["target_macos_version"]
+        elif stage == PipelineStage.MACOS_ACQUISITION:
+            self.config.macos_installer_path = outputs["macos_installer_path"]
+            self.progress.macos_installer_info = outputs["macos_installer_info"]
+        elif stage == PipelineStage.OCLP_CONFIGURATION:
+            self.pipeline_result.oclp_build_result = outputs["oclp_build_result"]
+    
+    def _save_stage_checkpoint(self, stage: PipelineStage, input_hash: str):
+        try:
+            installer = self.config.macos_installer_path
+            source_files = [installer] if (stage == PipelineStage.MACOS_ACQUISITION
+                                           and installer and installer.is_file()) else []
+            self.checkpoint_manager.save_stage_checkpoint(
+                self._checkpoint_id(stage), CHECKPOINT_PHASES[stage.value],
+                input_hash, self._stage_outputs(stage), source_files
+            )
+        except Exception as e:
+            # A missing checkpoint only costs a rerun of this stage
+            self._log_message("WARNING", f"Could not checkpoint {stage.value}: {e}")
+    
+    def _restore_stage_checkpoint(self, spec: PipelineStageSpec, input_hash: str) -> bool:
+        """Skip a stage by restoring its checkpoint; discard stale checkpoints"""
+        stage, stage_name = spec.stage, spec.name
+        checkpoint_id = self._checkpoint_id(stage)
+        checkpoint = self.checkpoint_manager.load_checkpoint(checkpoint_id)
+        if checkpoint is None:
+            return False
+        
+        outputs = checkpoint.metadata.get("outputs", {})
+        age_hours = (time.time() - checkpoint.timestamp) / 3600
+        if (checkpoint.metadata.get("input_hash") != input_hash
+                or age_hours > CHECKPOINT_MAX_AGE_HOURS
+                or not self.checkpoint_manager.verify_file_checksums(checkpoint)
+                or not self._stage_outputs_valid(stage, outputs)):
+            self._log_message("INFO", f"Discarding stale checkpoint for {stage_name}")
+            self.checkpoint_manager.discard_checkpoint(checkpoint_id)
+            return False
+        
+        self._start_stage(stage, stage_name, spec.number)
+        self._apply_stage_outputs(stage, outputs)
+        self.resumed_stages.append(stage)
+        self._update_stage_progress(100.0, f"{stage_name} restored from checkpoint")
+        self._complete_stage(stage_name, True)
+        return True
+    
+    def _clear_stage_checkpoints(self):
+        for stage_value in CHECKPOINT_PHASES:
+            self.checkpoint_manager.discard_checkpoint(self._checkpoint_id(PipelineStage(stage_value)))
+    
+    @staticmethod
+    def _checkpoint_id(stage: PipelineStage) -> str:
+        return f"oclp_pipeline_{stage.value}"
+    
     def _execute_stage_1_hardware_detection(self) -> bool:
         """Stage 1: Detect Mac hardware and system information"""
         self._start_stage(PipelineStage.HARDWARE_DETECTION, "Detecting Mac Hardware", 1)
@@ -530,7 +781,8 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
             speed_text = f"({progress.speed_mbps:.1f} MB/s)" if progress.speed_mbps > 0 else ""
             self._update_stage_progress(
                 stage_progress,
-                f"Downloading macOS installer... {progress.progress_percent:.1f}% {speed_text}"
+                f"Downloading macOS installer... {progress.progress_percent:.1f}% {speed_text}",
+                stage=PipelineStage.MACOS_ACQUISITION
             )
     
     def _handle_images_updated(self):
@@ -613,12 +865,24 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
                 self._log_message("ERROR", "Missing required data for OCLP configuration")
                 return False
             
+            # Reuse an EFI built earlier from identical inputs
+            cached_build = self.oclp_integration.get_cached_build(
+                self.progress.detected_hardware, self.config.target_macos_version
+            )
+            if cached_build:
+                self.pipeline_result.oclp_build_result = cached_build
+                self._log_message("INFO", f"Reused cached OpenCore build: {cached_build.efi_folder_path}")
+                self._update_stage_progress(100.0, "OpenCore configuration restored from cache")
+                self._complete_stage("OCLP Configuration", True)
+                return True
+            
             self._update_stage_progress(10.0, "Preparing OCLP build environment")
             
             # Start OCLP build process (async)
             build_started = self.oclp_integration.prepare_oclp_build_async(
                 self.progress.detected_hardware,
-                progress_callback=self._handle_oclp_progress
+                progress_callback=self._handle_oclp_progress,
+                target_macos_version=self.config.target_macos_version
             )
             
             if not build_started:
@@ -633,7 +897,8 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
             
             while time.time() - start_time < timeout:
                 if self.is_cancelled:
-                    self._log_message("INFO", "OCLP build cancelled by user")
+                    self.oclp_integration.cancel_oclp_build()
+                    self._log_message("INFO", "OCLP build cancelled")
                     return False
                 
                 # Check if build completed
@@ -951,6 +1216,17 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
         self._log_message("ERROR", f"Pipeline failed: {error_message}")
         self.pipeline_failed.emit(error_message, self.pipeline_result)
     
+    def _handle_pipeline_cancelled(self):
+        """Handle a user-requested cancel"""
+        self.current_stage = PipelineStage.CANCELLED
+        self.pipeline_result.success = False
+        self.pipeline_result.completion_time = time.time() - self.start_time
+        self.pipeline_result.final_stage = self.current_stage
+        self.pipeline_result.summary_message = "Pipeline cancelled"
+        
+        self._log_message("WARNING", "Pipeline cancelled")
+        self.pipeline_failed.emit("Pipeline cancelled", self.pipeline_result)
+    
     def _cleanup_pipeline(self):
         """Clean up pipeline resources"""
         try:
@@ -968,11 +1244,16 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
     
     def _start_stage(self, stage: PipelineStage, stage_name: str, stage_number: int):
         """Start a new pipeline stage"""
-        self.current_stage = stage
-        self.progress.current_stage = stage
-        self.progress.stage_name = stage_name
-        self.progress.stage_number = stage_number
-        self.progress.stage_progress = 0.0
+        self._stage_local.stage = stage
+        with self._progress_lock:
+            self.current_stage = stage
+            self.progress.current_stage = stage
+            self.progress.stage_name = stage_name
+            self.progress.stage_number = stage_number
+            self.progress.stage_progress = 0.0
+            self.progress.stage_progress_by_stage[stage.value] = 0.0
+            if stage_name not in self.progress.active_stages:
+                self.progress.active_stages.append(stage_name)
         
         self._log_message("INFO", f"Starting stage {stage_number}: {stage_name}")
         self.stage_started.emit(stage_name, stage_number)
@@ -980,42 +1261,54 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
     
     def _complete_stage(self, stage_name: str, success: bool):
         """Complete current pipeline stage"""
-        self.progress.stage_progress = 100.0
+        with self._progress_lock:
+            self.progress.stage_progress = 100.0
+            self.progress.stage_progress_by_stage[self._thread_stage().value] = 100.0
+            if stage_name in self.progress.active_stages:
+                self.progress.active_stages.remove(stage_name)
         self._update_overall_progress()
         
         self._log_message("INFO" if success else "ERROR", 
                          f"Stage {stage_name} {'completed' if success else 'failed'}")
         self.stage_completed.emit(stage_name, success)
     
-    def _update_stage_progress(self, progress: float, operation: str = ""):
-        """Update progress within current stage"""
-        self.progress.stage_progress = min(100.0, max(0.0, progress))
-        if operation:
-            self.progress.current_operation = operation
-            self.progress.detailed_status = operation
+    def _update_stage_progress(self, progress: float, operation: str = "",
+                               stage: Optional[PipelineStage] = None):
+        """Update progress within current stage (or an explicit stage from callbacks)"""
+        stage = stage or self._thread_stage()
+        with self._progress_lock:
+            self.progress.stage_progress = min(100.0, max(0.0, progress))
+            self.progress.stage_progress_by_stage[stage.value] = self.progress.stage_progress
+            if operation:
+                self.progress.current_operation = operation
+                self.progress.detailed_status = operation
         
         self._update_overall_progress()
     
+    def _thread_stage(self) -> PipelineStage:
+        """Stage executing in the calling thread"""
+        return getattr(self._stage_local, "stage", self.current_stage)
+    
     def _update_overall_progress(self, overall: Optional[float] = None, status: str = ""):
         """Update overall pipeline progress"""
-        if overall is not None:
-            self.progress.overall_progress = overall
-        else:
-            # Calculate based on stage progress
-            base_progress = ((self.progress.stage_number - 1) / self.progress.total_stages) * 100
-            stage_contribution = (self.progress.stage_progress / self.progress.total_stages)
-            self.progress.overall_progress = min(100.0, base_progress + stage_contribution)
-        
-        # Update time estimates
-        self.progress.elapsed_time = time.time() - self.start_time
-        
-        if self.progress.overall_progress > 0:
-            estimated_total = (self.progress.elapsed_time / self.progress.overall_progress) * 100
-            self.progress.estimated_total_time = estimated_total
-            self.progress.estimated_remaining_time = estimated_total - self.progress.elapsed_time
-        
-        if status:
-            self.progress.detailed_status = status
+        with self._progress_lock:
+            if overall is not None:
+                self.progress.overall_progress = overall
+            else:
+                # Average of every stage's own progress, so parallel stages add up
+                total = sum(self.progress.stage_progress_by_stage.values())
+                self.progress.overall_progress = min(100.0, total / self.progress.total_stages)
+            
+            # Update time estimates
+            self.progress.elapsed_time = time.time() - self.start_time
+            
+            if self.progress.overall_progress > 0:
+                estimated_total = (self.progress.elapsed_time / self.progress.overall_progress) * 100
+                self.progress.estimated_total_time = estimated_total
+                self.progress.estimated_remaining_time = estimated_total - self.progress.elapsed_time
+            
+            if status:
+                self.progress.detailed_status = status
         
         # Emit progress signal
         self.progress_updated.emit(self.progress)
@@ -1045,14 +1338,16 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
         if hasattr(oclp_progress, 'overall_progress'):
             stage_progress = oclp_progress.overall_progress
             operation = getattr(oclp_progress, 'current_operation', '')
-            self._update_stage_progress(stage_progress, f"OCLP: {operation}")
+            self._update_stage_progress(stage_progress, f"OCLP: {operation}",
+                                        stage=PipelineStage.OCLP_CONFIGURATION)
     
     def _handle_usb_progress(self, usb_progress):
         """Handle progress updates from USB builder"""
         if hasattr(usb_progress, 'overall_progress'):
             stage_progress = usb_progress.overall_progress
             operation = getattr(usb_progress, 'current_step', '')
-            self._update_stage_progress(stage_progress, f"USB: {operation}")
+            self._update_stage_progress(stage_progress, f"USB: {operation}",
+                                        stage=PipelineStage.USB_CREATION)
     
     def _request_user_input(self, input_type: str, options: dict):
         """Request user input and pause execution"""
@@ -1071,6 +1366,7 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
     
     def cancel_pipeline(self):
         """Cancel the pipeline execution"""
+        self._cancel_requested = True
         self.is_cancelled = True
         self._log_message("INFO", "Pipeline cancellation requested")
     
@@ -1080,7 +1376,7 @@ class OCLPAutomationPipeline(QThread if HAS_PYQT6 else object):
     
     def get_pipeline_result(self) -> Optional[PipelineResult]:
         """Get pipeline result (only available after completion)"""
-        return self.pipeline_result if self.pipeline_result.success or self.pipeline_result.final_stage == PipelineStage.FAILED else None
+        return self.pipeline_result if self.pipeline_result.success or self.pipeline_result.final_stage in (PipelineStage.FAILED, PipelineStage.CANCELLED) else None
     
     # Configuration methods
     
@@ -15,7 +15,7 @@ import tempfile
 from pathlib import Path
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Callable, Any, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 
 # Optional PyQt6 imports for headless operation support
 try:
@@ -26,11 +26,18 @@ except ImportError:
     pyqtSignal = lambda *args: None  # Dummy signal
     HAS_PYQT6 = False
 
+from src.core.config import Config
+from src.core.artifact_store import ArtifactStore
 from src.core.hardware_detector import DetectedHardware, DetectionConfidence
 from src.core.usb_builder import HardwareProfile
 from src.core.hardware_profiles import get_mac_model_data, get_patch_requirements_for_model
 
 
+# Bump when the layout of cached OCLP builds changes
+OCLP_BUILD_CACHE_VERSION = 1
+DEFAULT_OCLP_BUILD_CACHE_GB = 2
+
+
 class OCLPAvailability(Enum):
     """OCLP installation availability status"""
     AVAILABLE = "available"
@@ -257,13 +264,21 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
     log_message = pyqtSignal(str, str)  # level, message
     status_changed = pyqtSignal(str)  # status description
     
-    def __init__(self):
+    def __init__(self, config: Optional[Config] = None):
         if HAS_PYQT6:
             super().__init__()
         self._headless_mode = not HAS_PYQT6
         self.logger = logging.getLogger(self.__class__.__name__)
         self.compatibility_db = OCLPCompatibilityDatabase()
         
+        # Finished EFI trees keyed by their build inputs
+        config = config or Config()
+        cache_gb = float(config.get("oclp_build_cache_gb", DEFAULT_OCLP_BUILD_CACHE_GB))
+        self.build_cache = ArtifactStore(config.get_cache_dir() / "oclp_builds",
+                                         max_bytes=int(cache_gb * 1024 ** 3),
+                                         name="OCLP build cache")
+        self.use_build_cache = True
+        
         # OCLP installation paths - comprehensive discovery
         self.oclp_paths = self._get_comprehensive_oclp_paths()
         
@@ -274,6 +289,8 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
         self.current_build: Optional[OCLPBuildResult] = None
         self.is_cancelled = False
         self.temp_dir: Optional[Path] = None
+        # Organized build output; outlives temp_dir so results stay usable
+        self.output_dir: Optional[Path] = None
         
         # Operation tracking
         self._total_steps = 7
@@ -512,8 +529,38 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
                 notes=["Model not in OCLP database", "Manual configuration may be required"]
             )
     
-    def start_oclp_build(self, hardware: DetectedHardware, target_macos_version: Optional[str] = None) -> bool:
+    def start_oclp_build(self, hardware: DetectedHardware, target_macos_version: Optional[str] = None,
+                         use_cache: bool = True) -> bool:
         """Start OCLP build process for detected hardware"""
+        if not self._prepare_build(hardware, target_macos_version, use_cache):
+            return False
+        
+        # Start the build thread
+        self.start()
+        return True
+    
+    def build_for_model(self, model_identifier: str, target_macos_version: Optional[str] = None,
+                        use_cache: bool = True) -> Optional[OCLPBuildResult]:
+        """Run an OCLP build synchronously in the calling thread"""
+        hardware = DetectedHardware(system_model=model_identifier)
+        if not self._prepare_build(hardware, target_macos_version, use_cache):
+            return None
+        
+        self.run()
+        return self.current_build
+    
+    def cache_key_for(self, model_identifier: str, target_macos_version: Optional[str] = None,
+                      oclp_version: Optional[str] = None) -> Optional[str]:
+        """Build cache key for a model, or None when OCLP cannot build it"""
+        config = self.compatibility_db.get_configuration(model_identifier)
+        if not config or config.compatibility == OCLPCompatibility.UNSUPPORTED:
+            return None
+        return self._build_cache_key(config, target_macos_version or config.recommended_version,
+                                     oclp_version or self.get_oclp_version() or "unknown")
+    
+    def _prepare_build(self, hardware: DetectedHardware, target_macos_version: Optional[str],
+                       use_cache: bool) -> bool:
+        """Resolve the configuration and set the build parameters"""
         if not hardware.system_model:
             self.emit_log("ERROR", "No Mac model identifier found")
             return False
@@ -528,10 +575,8 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
         self.target_model = hardware.system_model
         self.target_config = config
         self.target_macos_version = target_macos_version or config.recommended_version
+        self.use_build_cache = use_cache
         self.is_cancelled = False
-        
-        # Start the build thread
-        self.start()
         return True
     
     def cancel_build(self):
@@ -557,10 +602,23 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
             
             # Create temporary working directory
             self.temp_dir = Path(tempfile.mkdtemp(prefix="bootforge_oclp_"))
+            self.output_dir = Path(tempfile.mkdtemp(prefix="bootforge_oclp_efi_"))
             self.emit_log("INFO", f"Created temporary directory: {self.temp_dir}")
             
-            # Execute build steps
-            if self._execute_build_workflow():
+            # Reuse an EFI built from identical inputs, otherwise run the workflow
+            cache_key = None
+            if self.use_build_cache:
+                cache_key = self._build_cache_key(self.target_config, self.target_macos_version,
+                                                  self.current_build.oclp_version)
+            
+            if cache_key and self._restore_cached_build(cache_key, self.current_build):
+                built = True
+            else:
+                built = self._execute_build_workflow()
+                if built and cache_key:
+                    self._store_build(cache_key)
+            
+            if built:
                 # Build successful
                 self.current_build.success = True
                 self.current_build.build_time = time.time() - start_time
@@ -828,14 +886,21 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
         """Extract and organize build files for USB integration"""
         try:
             # Create organized output structure
-            organized_output = self.temp_dir / "bootforge_oclp_build"
+            organized_output = self.output_dir or self.temp_dir / "bootforge_oclp_build"
             organized_output.mkdir(exist_ok=True)
             
             # Extract EFI folder
             if self.current_build.efi_folder_path:
+                efi_source = self.current_build.efi_folder_path
                 efi_dest = organized_output / "EFI"
-                shutil.copytree(self.current_build.efi_folder_path, efi_dest, dirs_exist_ok=True)
+                shutil.copytree(efi_source, efi_dest, dirs_exist_ok=True)
                 self.current_build.efi_folder_path = efi_dest
+                
+                # Point the bootloader and config.plist at the extracted copies
+                for attr in ("opencore_efi_path", "config_plist_path"):
+                    path = getattr(self.current_build, attr)
+                    if path and path.is_relative_to(efi_source):
+                        setattr(self.current_build, attr, efi_dest / path.relative_to(efi_source))
                 self.emit_log("INFO", f"Extracted EFI folder to: {efi_dest}")
             
             # Extract kext files
@@ -920,6 +985,95 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
             self.logger.error(f"Build validation failed: {e}")
             return False
     
+    def _build_cache_key(self, config: OCLPConfiguration, macos_version: Optional[str],
+                         oclp_version: str) -> str:
+        """Cache key covering everything that shapes the generated EFI"""
+        inputs = asdict(config)
+        inputs["compatibility"] = config.compatibility.value
+        inputs.pop("notes", None)
+        return ArtifactStore.make_key({
+            "cache_version": OCLP_BUILD_CACHE_VERSION,
+            "model_identifier": config.model_identifier,
+            "macos_version": macos_version,
+            "oclp_version": oclp_version,
+            "configuration": inputs
+        })
+    
+    def _store_build(self, cache_key: str) -> bool:
+        """Cache the organized output of a successful build"""
+        try:
+            build = self.current_build
+            files = {
+                path.relative_to(self.output_dir).as_posix(): str(path)
+                for path in sorted(self.output_dir.rglob("*")) if path.is_file()
+            }
+            if not files:
+                return False
+            
+            def relative(path: Optional[Path]) -> Optional[str]:
+                if path and path.is_relative_to(self.output_dir):
+                    return path.relative_to(self.output_dir).as_posix()
+                return None
+            
+            entry = self.build_cache.put(cache_key, files, metadata={
+                "model_identifier": build.model_identifier,
+                "macos_version": self.target_macos_version,
+                "oclp_version": build.oclp_version,
+                "directories": sorted(
+                    path.relative_to(self.output_dir).as_posix()
+                    for path in self.output_dir.rglob("*") if path.is_dir()
+                ),
+                "paths": {
+                    "efi_folder": relative(build.efi_folder_path),
+                    "opencore_efi": relative(build.opencore_efi_path),
+                    "config_plist": relative(build.config_plist_path),
+                    "drivers_folder": relative(build.drivers_folder_path),
+                    "tools_folder": relative(build.tools_folder_path)
+                },
+                "kexts": sorted({relative(k) for k in build.kext_files} - {None}),
+                "warnings": build.warnings
+            })
+            return entry is not None
+            
+        except Exception as e:
+            self.logger.warning(f"Failed to cache OCLP build: {e}")
+            return False
+    
+    def _restore_cached_build(self, cache_key: str, result: OCLPBuildResult) -> bool:
+        """Copy a cached EFI tree into output_dir and fill in result on a hit"""
+        entry = self.build_cache.get(cache_key)
+        if entry is None:
+            self.emit_log("INFO", f"No cached OCLP build for key {cache_key[:12]}, building from scratch")
+            return False
+        
+        try:
+            self._emit_progress(OCLPBuildStatus.EXTRACTING_FILES, "Restoring cached OpenCore build", 80.0)
+            for directory in entry.metadata.get("directories", []):
+                (self.output_dir / directory).mkdir(parents=True, exist_ok=True)
+            for name in entry.files:
+                if not self.build_cache.fetch(cache_key, name, str(self.output_dir / name)):
+                    raise OSError(f"cached file {name} is missing or corrupted")
+        except OSError as e:
+            # Evicted by another process mid-copy; fall back to a real build
+            self.logger.warning(f"Failed to restore cached OCLP build {cache_key[:12]}: {e}")
+            return False
+        
+        paths = entry.metadata.get("paths", {})
+        
+        def resolve(name: str) -> Optional[Path]:
+            return self.output_dir / paths[name] if paths.get(name) else None
+        
+        result.efi_folder_path = resolve("efi_folder")
+        result.opencore_efi_path = resolve("opencore_efi")
+        result.config_plist_path = resolve("config_plist")
+        result.drivers_folder_path = resolve("drivers_folder")
+        result.tools_folder_path = resolve("tools_folder")
+        result.kext_files = [self.output_dir / kext for kext in entry.metadata.get("kexts", [])]
+        result.warnings.extend(entry.metadata.get("warnings", []))
+        result.build_log.append(f"Reused cached OCLP build {cache_key[:12]}")
+        self.emit_log("INFO", f"Reused cached OCLP build {cache_key[:12]} for {result.model_identifier}")
+        return True
+    
     def _emit_progress(self, status: OCLPBuildStatus, step_name: str, overall_progress: float):
         """Emit progress update signal"""
         progress = OCLPProgress(
@@ -1144,14 +1298,15 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
         """Get the current build result"""
         return self.current_build
     
-    def prepare_oclp_build_async(self, hardware: DetectedHardware, progress_callback: Optional[Callable] = None) -> bool:
+    def prepare_oclp_build_async(self, hardware: DetectedHardware, progress_callback: Optional[Callable] = None,
+                                 target_macos_version: Optional[str] = None) -> bool:
         """Prepare and start OCLP build asynchronously"""
         try:
             if progress_callback:
                 self.progress_updated.connect(progress_callback)
             
             # Start the OCLP build for the detected hardware
-            return self.start_oclp_build(hardware)
+            return self.start_oclp_build(hardware, target_macos_version)
             
         except Exception as e:
             self.logger.error(f"Failed to prepare async OCLP build: {e}")
@@ -1163,6 +1318,38 @@ class OCLPIntegration(QThread if HAS_PYQT6 else object):
             return self.current_build
         return None
     
+    def get_cached_build(self, hardware: DetectedHardware,
+                         target_macos_version: Optional[str] = None) -> Optional[OCLPBuildResult]:
+        """Synchronously restore a cached build for hardware, or None on a miss"""
+        config = self.analyze_mac_compatibility(hardware)
+        if not config or config.compatibility == OCLPCompatibility.UNSUPPORTED:
+            return None
+        
+        oclp_version = self.get_oclp_version() or "unknown"
+        cache_key = self._build_cache_key(config, target_macos_version or config.recommended_version,
+                                          oclp_version)
+        if not self.build_cache.contains(cache_key):
+            return None
+        
+        result = OCLPBuildResult(
+            success=False,
+            model_identifier=config.model_identifier,
+            oclp_version=oclp_version,
+            build_time=0.0,
+            configuration=config
+        )
+        start_time = time.time()
+        self.output_dir = Path(tempfile.mkdtemp(prefix="bootforge_oclp_efi_"))
+        if not self._restore_cached_build(cache_key, result):
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+            self.output_dir = None
+            return None
+        
+        result.success = True
+        result.build_time = time.time() - start_time
+        self.current_build = result
+        return result
+    
     def get_supported_models(self) -> List[str]:
         """Get list of Mac models supported by OCLP"""
         return self.compatibility_db.get_all_supported_models()
@@ -1299,13 +1486,15 @@ class OCLPBootForgeIntegration:
             self.logger.error(f"Failed to create OCLP USB recipe: {e}")
             return None
     
-    def prepare_oclp_build_async(self, hardware: DetectedHardware, progress_callback: Optional[Callable] = None) -> bool:
+    def prepare_oclp_build_async(self, hardware: DetectedHardware, progress_callback: Optional[Callable] = None,
+                                 target_macos_version: Optional[str] = None) -> bool:
         """
         Prepare and start an async OCLP build process
         
         Args:
             hardware: Detected hardware information
             progress_callback: Optional callback for progress updates
+            target_macos_version: macOS version to build for (model default if None)
             
         Returns:
             True if build started successfully, False otherwise
@@ -1316,7 +1505,7 @@ class OCLPBootForgeIntegration:
                 self.oclp_integration.progress_updated.connect(progress_callback)
             
             # Start OCLP build
-            success = self.oclp_integration.start_oclp_build(hardware)
+            success = self.oclp_integration.start_oclp_build(hardware, target_macos_version)
             if success:
                 self.logger.info("OCLP build started successfully")
             else:
@@ -1337,6 +1526,20 @@ class OCLPBootForgeIntegration:
         """
         return self.oclp_integration.get_build_result()
     
+    def cancel_oclp_build(self):
+        """Cancel the OCLP build started by prepare_oclp_build_async"""
+        self.oclp_integration.cancel_build()
+    
+    def get_cached_build(self, hardware: DetectedHardware,
+                         target_macos_version: Optional[str] = None) -> Optional[OCLPBuildResult]:
+        """
+        Restore a previously built EFI for identical build inputs
+        
+        Returns:
+            OCLPBuildResult pointing at a fresh copy of the cached EFI, or None on a miss
+        """
+        return self.oclp_integration.get_cached_build(hardware, target_macos_version)
+    
     def validate_mac_for_oclp(self, hardware: DetectedHardware) -> Tuple[bool, List[str], List[str]]:
         """
         Validate a Mac's readiness for OCLP deployment
@@ -1426,10 +1629,10 @@ class OCLPBootForgeIntegration:
     def cleanup_oclp_resources(self):
         """Clean up OCLP integration resources"""
         try:
-            if hasattr(self.oclp_integration, 'temp_dir') and self.oclp_integration.temp_dir:
-                if self.oclp_integration.temp_dir.exists():
-                    shutil.rmtree(self.oclp_integration.temp_dir)
-                    self.logger.info("Cleaned up OCLP temporary resources")
+            for directory in (self.oclp_integration.temp_dir, self.oclp_integration.output_dir):
+                if directory and directory.exists():
+                    shutil.rmtree(directory)
+                    self.logger.info(f"Cleaned up OCLP temporary resources: {directory}")
         except Exception as e:
             self.logger.warning(f"Failed to cleanup OCLP resources: {e}")
 
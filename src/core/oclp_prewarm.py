@@ -0,0 +1,294 @@
+"""
+BootForge OCLP Prewarm
+Background job that fills the OCLP build cache for every supported
+(model, macOS version) pair so deployments never wait on OCLP.
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import multiprocessing
+from enum import Enum
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Callable, Any, Tuple
+from dataclasses import dataclass, field, asdict
+
+from src.core.config import Config
+from src.core.artifact_store import ArtifactStore
+from src.core.hardware_profiles import get_mac_model_data, get_model_macos_support
+from src.core.oclp_integration import OCLPIntegration
+
+
+PREWARM_STATE_FILE = "prewarm_state.json"
+
+# Share of the logical CPUs the warm job may occupy
+DEFAULT_CPU_BUDGET = 0.5
+WORKER_NICENESS = 10
+
+_worker_integration: Optional[OCLPIntegration] = None
+
+
+class PrewarmStatus(Enum):
+    """Outcome for one (model, macOS version) pair"""
+    CACHED = "cached"
+    BUILT = "built"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class PrewarmResult:
+    """What happened to one pair during a warm run"""
+    model_identifier: str
+    macos_version: str
+    status: PrewarmStatus
+    message: str = ""
+    duration_seconds: float = 0.0
+
+    @property
+    def pair(self) -> str:
+        return f"{self.model_identifier}@{self.macos_version}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["status"] = self.status.value
+        data["duration_seconds"] = round(self.duration_seconds, 2)
+        return data
+
+
+@dataclass
+class PrewarmReport:
+    """Result of a warm run"""
+    results: List[PrewarmResult]
+    started_at: float
+    finished_at: float
+    oclp_version: str = "unknown"
+    workers: int = 1
+    cancelled: bool = False
+
+    def count(self, status: PrewarmStatus) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+    @property
+    def success(self) -> bool:
+        return not self.cancelled and self.count(PrewarmStatus.FAILED) == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(self.finished_at - self.started_at, 2),
+            "oclp_version": self.oclp_version,
+            "workers": self.workers,
+            "cancelled": self.cancelled,
+            "counts": {status.value: self.count(status) for status in PrewarmStatus},
+            "pairs": [r.to_dict() for r in self.results]
+        }
+
+    def write(self, path: str):
+        """Write the report as JSON"""
+        report_path = Path(path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def prewarm_targets(models: Optional[List[str]] = None,
+                    versions: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """Every (model, macOS version) pair that needs OCLP, optionally filtered"""
+    targets = []
+    for model_id, model_data in get_mac_model_data().items():
+        if models and model_id not in models:
+            continue
+        for version, status in get_model_macos_support(model_data).items():
+            if status.startswith("oclp_") and (not versions or version in versions):
+                targets.append((model_id, version))
+    return targets
+
+
+def workers_for_budget(cpu_budget: float) -> int:
+    """Number of worker processes that fits in a share of the logical CPUs"""
+    cpu_budget = min(max(cpu_budget, 0.0), 1.0)
+    return max(1, int((os.cpu_count() or 1) * cpu_budget))
+
+
+def _init_worker(niceness: int, config: Optional[Config] = None,
+                 build_cache: Optional[Tuple[str, int, str]] = None):
+    """Run warm builds below interactive work, into the parent's build cache
+
+    config is the parent's configuration and build_cache the (root,
+    max_bytes, name) of the parent's cache, so workers write exactly where
+    the parent reads.
+    """
+    global _worker_integration
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+    _worker_integration = OCLPIntegration(config)
+    if build_cache is not None:
+        root, max_bytes, name = build_cache
+        if _worker_integration.build_cache.root != Path(root):
+            _worker_integration.build_cache = ArtifactStore(Path(root), max_bytes=max_bytes, name=name)
+
+
+def _build_pair(model_identifier: str, macos_version: str) -> Tuple[bool, str, float]:
+    """Worker entry point: build one pair into the shared cache"""
+    if _worker_integration is None:
+        _init_worker(0)
+    integration = _worker_integration
+
+    start_time = time.time()
+    try:
+        result = integration.build_for_model(model_identifier, macos_version)
+        if result is None:
+            return False, "Model is not supported by OCLP", time.time() - start_time
+        if not result.success:
+            message = "; ".join(result.errors) or "OCLP build failed"
+            return False, message, time.time() - start_time
+        return True, f"Built with OCLP {result.oclp_version}", time.time() - start_time
+    finally:
+        # The cache keeps its own copy of the EFI tree
+        if integration.output_dir:
+            shutil.rmtree(integration.output_dir, ignore_errors=True)
+            integration.output_dir = None
+
+
+class OCLPPrewarmer:
+    """Fills the OCLP build cache for the whole compatibility matrix
+
+    Already cached pairs are collected without building, and every finished
+    pair is journalled next to the cache, so an interrupted run picks up where
+    it stopped. Pairs that failed with the same OCLP version are not retried
+    unless retry_failed is set.
+    """
+
+    def __init__(self, integration: Optional[OCLPIntegration] = None,
+                 config: Optional[Config] = None,
+                 cpu_budget: float = DEFAULT_CPU_BUDGET,
+                 max_workers: Optional[int] = None,
+                 retry_failed: bool = False,
+                 progress_callback: Optional[Callable[[PrewarmResult], None]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.integration = integration or OCLPIntegration(config)
+        self.workers = max_workers or workers_for_budget(cpu_budget)
+        self.retry_failed = retry_failed
+        self.progress_callback = progress_callback
+        self.state_file = self.integration.build_cache.root / PREWARM_STATE_FILE
+        self.is_cancelled = False
+
+    def cancel(self):
+        """Stop scheduling builds; running builds finish and are cached"""
+        self.is_cancelled = True
+
+    def run(self, models: Optional[List[str]] = None,
+            versions: Optional[List[str]] = None) -> PrewarmReport:
+        """Warm the cache for the selected pairs and return the report"""
+        started_at = time.time()
+        oclp_version = self.integration.get_oclp_version() or "unknown"
+        state = self._load_state()
+        results: List[PrewarmResult] = []
+        pending: List[PrewarmResult] = []
+
+        for model_id, version in prewarm_targets(models, versions):
+            key = self.integration.cache_key_for(model_id, version, oclp_version)
+            result = PrewarmResult(model_id, version, PrewarmStatus.CANCELLED)
+            results.append(result)
+            previous = state.get(result.pair, {})
+
+            if key is None:
+                self._finish(result, PrewarmStatus.SKIPPED, "Model is not supported by OCLP")
+            elif self.integration.build_cache.contains(key):
+                self._finish(result, PrewarmStatus.CACHED, "Already in the build cache")
+            elif (previous.get("status") == PrewarmStatus.FAILED.value
+                  and previous.get("oclp_version") == oclp_version and not self.retry_failed):
+                self._finish(result, PrewarmStatus.SKIPPED,
+                             f"Failed in an earlier run: {previous.get('message', '')}")
+            else:
+                pending.append(result)
+
+        if pending and not self.is_cancelled:
+            self.logger.info(f"Warming {len(pending)} OCLP builds with {self.workers} worker(s)")
+            try:
+                self._build_pending(pending, state, oclp_version)
+            except KeyboardInterrupt:
+                self.cancel()
+                raise
+
+        report = PrewarmReport(results, started_at, time.time(), oclp_version,
+                               self.workers, cancelled=self.is_cancelled)
+        self.logger.info(f"OCLP prewarm finished: {report.count(PrewarmStatus.BUILT)} built, "
+                         f"{report.count(PrewarmStatus.CACHED)} cached, "
+                         f"{report.count(PrewarmStatus.FAILED)} failed")
+        return report
+
+    def _build_pending(self, pending: List[PrewarmResult], state: Dict[str, Dict[str, Any]],
+                       oclp_version: str):
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(WORKER_NICENESS, self.config, self._build_cache_settings())) as pool:
+            queue = list(pending)
+            running: Dict[Future, PrewarmResult] = {}
+            try:
+                while queue or running:
+                    # Keep at most one build per worker queued so cancel() takes effect quickly
+                    while queue and len(running) < self.workers and not self.is_cancelled:
+                        result = queue.pop(0)
+                        running[pool.submit(_build_pair, result.model_identifier,
+                                            result.macos_version)] = result
+                    if not running:
+                        break
+
+                    done, _ = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = running.pop(future)
+                        try:
+                            built, message, duration = future.result()
+                        except Exception as e:
+                            built, message, duration = False, f"Worker error: {e}", 0.0
+                        result.duration_seconds = duration
+                        status = PrewarmStatus.BUILT if built else PrewarmStatus.FAILED
+                        self._finish(result, status, message)
+
+                        state[result.pair] = {
+                            "status": status.value,
+                            "message": message,
+                            "oclp_version": oclp_version,
+                            "finished_at": time.time()
+                        }
+                        self._save_state(state)
+            finally:
+                for future in running:
+                    future.cancel()
+
+    def _build_cache_settings(self) -> Tuple[str, int, str]:
+        cache = self.integration.build_cache
+        return str(cache.root), cache.max_bytes, cache.name
+
+    def _finish(self, result: PrewarmResult, status: PrewarmStatus, message: str):
+        result.status = status
+        result.message = message
+        if self.progress_callback:
+            self.progress_callback(result)
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, Dict[str, Any]]):
+        """Write via a temporary file so an interrupted run never corrupts the journal"""
+        temp_path = self.state_file.with_name(f".{self.state_file.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.state_file)
@@ -82,36 +82,64 @@ class PatchCondition:
     platform_flags: List[str] = field(default_factory=list)  # Platform-specific flags
     dependency_patches: List[str] = field(default_factory=list)  # Required patches
     exclusion_patterns: List[str] = field(default_factory=list)  # Exclusion rules
+    # (signature, predicate) from the last compile(), reused while the fields are unchanged
+    _compiled: Optional[Tuple[Tuple[Any, ...], Callable[[DetectedHardware, Dict[str, Any]], bool]]] = field(
+        default=None, init=False, repr=False, compare=False)
     
     def matches(self, hardware: DetectedHardware, os_info: Dict[str, Any]) -> bool:
         """Check if conditions are met for this hardware/OS combination"""
+        signature = self.signature()
+        if self._compiled is None or self._compiled[0] != signature:
+            self._compiled = (signature, self.compile())
+        return self._compiled[1](hardware, os_info)
+    
+    def signature(self) -> Tuple[Any, ...]:
+        """Fields matches() depends on; conditions with equal signatures match the same targets"""
+        return (self.os_version, self.hardware_model, self.cpu_architecture,
+                self.minimum_ram_gb, tuple(self.exclusion_patterns))
+    
+    def compile(self) -> Callable[[DetectedHardware, Dict[str, Any]], bool]:
+        """Compile the conditions into a predicate over (hardware, os_info)
+        
+        Patterns are compiled once here; checks for unset fields are left out.
+        """
+        checks = []
+        
         # OS version check
-        if self.os_version and os_info.get("version"):
-            if not re.match(self.os_version, os_info["version"]):
-                return False
+        if self.os_version:
+            os_version = re.compile(self.os_version).match
+            checks.append(lambda hardware, os_info:
+                          not os_info.get("version") or os_version(os_info["version"]) is not None)
         
         # Hardware model check
-        if self.hardware_model and hardware.system_model:
-            if not re.match(self.hardware_model, hardware.system_model):
-                return False
+        if self.hardware_model:
+            hardware_model = re.compile(self.hardware_model).match
+            checks.append(lambda hardware, os_info:
+                          not hardware.system_model or hardware_model(hardware.system_model) is not None)
         
         # CPU architecture check
-        if self.cpu_architecture and hardware.cpu_architecture:
-            if hardware.cpu_architecture != self.cpu_architecture:
-                return False
+        if self.cpu_architecture:
+            cpu_architecture = self.cpu_architecture
+            checks.append(lambda hardware, os_info:
+                          not hardware.cpu_architecture or hardware.cpu_architecture == cpu_architecture)
         
         # RAM requirement check
-        if self.minimum_ram_gb and hardware.total_ram_gb:
-            if hardware.total_ram_gb < self.minimum_ram_gb:
-                return False
+        if self.minimum_ram_gb:
+            minimum_ram_gb = self.minimum_ram_gb
+            checks.append(lambda hardware, os_info:
+                          not hardware.total_ram_gb or not hardware.total_ram_gb < minimum_ram_gb)
         
         # Exclusion patterns check
-        for exclusion in self.exclusion_patterns:
-            model_text = f"{hardware.system_manufacturer} {hardware.system_model}"
-            if re.search(exclusion, model_text, re.IGNORECASE):
-                return False
+        if self.exclusion_patterns:
+            exclusions = [re.compile(pattern, re.IGNORECASE).search for pattern in self.exclusion_patterns]
+            checks.append(lambda hardware, os_info: not any(
+                exclusion(f"{hardware.system_manufacturer} {hardware.system_model}") for exclusion in exclusions))
         
-        return True
+        if not checks:
+            return lambda hardware, os_info: True
+        if len(checks) == 1:
+            return checks[0]
+        return lambda hardware, os_info: all(check(hardware, os_info) for check in checks)
 
 
 @dataclass
@@ -256,30 +284,50 @@ class PatchPlan:
     
     def add_patch_set(self, patch_set: PatchSet) -> bool:
         """Add a patch set to the plan"""
-        try:
-            # Validate compatibility
-            compatible, issues = patch_set.validate_compatibility(self.target_hardware, self.target_os)
-            if not compatible:
-                logging.getLogger(__name__).warning(f"Patch set {patch_set.id} not compatible: {issues}")
-                return False
-            
-            # Check for conflicts
-            for existing_set in self.patch_sets:
-                if patch_set.id in existing_set.conflicts:
-                    logging.getLogger(__name__).warning(f"Patch set {patch_set.id} conflicts with {existing_set.id}")
-                    return False
-            
-            # Add to plan
-            self.patch_sets.append(patch_set)
+        return bool(self.add_patch_sets([patch_set]))
+    
+    def add_patch_sets(self, patch_sets: List[PatchSet], check_compatibility: bool = True) -> List[PatchSet]:
+        """Add patch sets in order, updating the plan once; returns the sets that were added
+        
+        check_compatibility=False skips validate_compatibility() for sets the
+        caller has already matched against this plan's hardware and OS.
+        """
+        logger = logging.getLogger(__name__)
+        conflicting = {}
+        for existing_set in self.patch_sets:
+            for conflict_id in existing_set.conflicts:
+                conflicting.setdefault(conflict_id, existing_set.id)
+        
+        added = []
+        for patch_set in patch_sets:
+            try:
+                # Validate compatibility
+                if check_compatibility:
+                    compatible, issues = patch_set.validate_compatibility(self.target_hardware, self.target_os)
+                    if not compatible:
+                        logger.warning(f"Patch set {patch_set.id} not compatible: {issues}")
+                        continue
+                
+                # Check for conflicts
+                if patch_set.id in conflicting:
+                    logger.warning(f"Patch set {patch_set.id} conflicts with {conflicting[patch_set.id]}")
+                    continue
+                
+                # Add to plan
+                self.patch_sets.append(patch_set)
+                for conflict_id in patch_set.conflicts:
+                    conflicting.setdefault(conflict_id, patch_set.id)
+                added.append(patch_set)
+                
+            except Exception as e:
+                logger.error(f"Failed to add patch set {patch_set.id}: {e}")
+        
+        if added:
             self._update_statistics()
             self._update_execution_plan()
             self._assess_risk()
-            
-            return True
-            
-        except Exception as e:
-            logging.getLogger(__name__).error(f"Failed to add patch set {patch_set.id}: {e}")
-            return False
+        
+        return added
     
     def _update_statistics(self):
         """Update plan statistics"""
@@ -352,6 +400,34 @@ class PatchPlan:
         return " | ".join(summary_parts)
 
 
+@dataclass(frozen=True)
+class _IndexedPatchSet:
+    """A registered PatchSet with its target patterns and action conditions compiled"""
+    patch_set: PatchSet
+    versions: Tuple[str, ...]
+    version_matchers: Tuple[Callable[[str], Any], ...]
+    hardware: Tuple[str, ...]
+    hardware_matchers: Tuple[Callable[[str], Any], ...]
+    # (condition signature, predicate) per conditional action; empty if any action is unconditional
+    conditions: Tuple[Tuple[Tuple[Any, ...], Callable[[DetectedHardware, Dict[str, Any]], bool]], ...]
+    # Sort key for plans: most urgent action priority value
+    priority: Optional[str]
+    
+    @classmethod
+    def compile(cls, patch_set: PatchSet) -> "_IndexedPatchSet":
+        return cls(
+            patch_set=patch_set,
+            versions=tuple(patch_set.target_versions),
+            version_matchers=tuple(re.compile(pattern).match for pattern in patch_set.target_versions),
+            hardware=tuple(patch_set.target_hardware),
+            hardware_matchers=tuple(re.compile(pattern, re.IGNORECASE).search
+                                    for pattern in patch_set.target_hardware),
+            conditions=() if not all(action.conditions for action in patch_set.actions) else
+            tuple((action.conditions.signature(), action.conditions.compile()) for action in patch_set.actions),
+            priority=min((action.priority.value for action in patch_set.actions), default=None)
+        )
+
+
 class PatchPlanner:
     """Plans and orchestrates patch application for detected hardware"""
     
@@ -362,6 +438,8 @@ class PatchPlanner:
         # Patch registry
         self._patch_sets: Dict[str, PatchSet] = {}
         self._hardware_mappings: Dict[str, List[str]] = {}  # hardware_id -> patch_set_ids
+        # OS family -> patch set id -> compiled entry, in registration order
+        self._index: Dict[str, Dict[str, _IndexedPatchSet]] = {}
         
         # Load built-in patches
         self._load_builtin_patches()
@@ -432,9 +510,25 @@ class PatchPlanner:
             self.logger.error(f"Failed to load built-in patches: {e}")
     
     def register_patch_set(self, patch_set: PatchSet) -> bool:
-        """Register a patch set"""
+        """Register a patch set
+        
+        Its patterns and conditions are compiled now; register it again after
+        changing its targets or actions.
+        """
         try:
+            entry = _IndexedPatchSet.compile(patch_set)
+            previous = self._patch_sets.get(patch_set.id)
             self._patch_sets[patch_set.id] = patch_set
+            if previous is not None and previous.target_os != patch_set.target_os:
+                del self._index[previous.target_os][patch_set.id]
+                # Keep the family in registration order, where the replaced set stood
+                family = self._index.setdefault(patch_set.target_os, {})
+                family[patch_set.id] = entry
+                self._index[patch_set.target_os] = {
+                    set_id: family[set_id] for set_id in self._patch_sets if set_id in family
+                }
+            else:
+                self._index.setdefault(patch_set.target_os, {})[patch_set.id] = entry
             self.logger.debug(f"Registered patch set: {patch_set.id}")
             return True
         except Exception as e:
@@ -462,9 +556,11 @@ class PatchPlanner:
             # Find applicable patch sets
             applicable_sets = self._find_applicable_patches(hardware, os_info, requested_patches)
             
-            # Add patch sets to plan
+            # Add patch sets to plan (already matched against this hardware/OS)
+            added = plan.add_patch_sets(applicable_sets, check_compatibility=False)
+            added_ids = {patch_set.id for patch_set in added}
             for patch_set in applicable_sets:
-                if plan.add_patch_set(patch_set):
+                if patch_set.id in added_ids:
                     self.logger.info(f"Added patch set to plan: {patch_set.id}")
                 else:
                     self.logger.warning(f"Failed to add patch set to plan: {patch_set.id}")
@@ -482,35 +578,70 @@ class PatchPlanner:
     
     def _find_applicable_patches(self, hardware: DetectedHardware, os_info: Dict[str, Any],
                                requested_patches: Optional[List[str]] = None) -> List[PatchSet]:
-        """Find patch sets applicable to the hardware/OS combination"""
+        """Find patch sets applicable to the hardware/OS combination
+        
+        Same result as running validate_compatibility() and can_apply() over
+        every registered set, but only sets for the OS family are visited, and
+        each distinct version list, hardware list and action condition is
+        evaluated once per call.
+        """
         applicable = []
         
         try:
-            # Check all registered patch sets
-            for patch_set in self._patch_sets.values():
-                # Skip if specific patches requested and this isn't one
-                if requested_patches and patch_set.id not in requested_patches:
-                    continue
+            os_version = os_info.get("version", "")
+            hardware_model = f"{hardware.system_manufacturer} {hardware.system_model}"
+            # Results for this hardware/OS, keyed by pattern list or condition signature
+            versions_ok: Dict[Tuple[str, ...], bool] = {}
+            hardware_ok: Dict[Tuple[str, ...], bool] = {}
+            conditions_ok: Dict[Tuple[Any, ...], bool] = {}
+            
+            entries = self._index.get(os_info.get("family", ""), {})
+            if requested_patches:
+                # Skip sets that weren't requested
+                entries = {set_id: entries[set_id] for set_id in self._patch_sets
+                           if set_id in entries and set_id in requested_patches}
+            
+            for entry in entries.values():
+                patch_set = entry.patch_set
                 
-                # Check compatibility
-                compatible, issues = patch_set.validate_compatibility(hardware, os_info)
-                if compatible:
-                    # Check if any actions can be applied
-                    applicable_actions = [
-                        action for action in patch_set.actions
-                        if action.can_apply(hardware, os_info)
-                    ]
-                    
-                    if applicable_actions:
-                        self.logger.debug(f"Patch set {patch_set.id} is applicable with {len(applicable_actions)} actions")
-                        applicable.append(patch_set)
-                    else:
-                        self.logger.debug(f"Patch set {patch_set.id} is compatible but no actions applicable")
+                # Check OS version compatibility
+                if entry.versions:
+                    compatible = versions_ok.get(entry.versions)
+                    if compatible is None:
+                        compatible = versions_ok[entry.versions] = any(
+                            match(os_version) for match in entry.version_matchers)
+                    if not compatible:
+                        self.logger.debug(f"Patch set {patch_set.id} not compatible: OS version {os_version}")
+                        continue
+                
+                # Check hardware compatibility
+                if entry.hardware:
+                    compatible = hardware_ok.get(entry.hardware)
+                    if compatible is None:
+                        compatible = hardware_ok[entry.hardware] = any(
+                            search(hardware_model) for search in entry.hardware_matchers)
+                    if not compatible:
+                        self.logger.debug(f"Patch set {patch_set.id} not compatible: hardware {hardware_model}")
+                        continue
+                
+                # Check if any actions can be applied
+                can_apply = bool(patch_set.actions) and not entry.conditions
+                for key, predicate in entry.conditions:
+                    can_apply = conditions_ok.get(key)
+                    if can_apply is None:
+                        can_apply = conditions_ok[key] = predicate(hardware, os_info)
+                    if can_apply:
+                        break
+                
+                if can_apply:
+                    self.logger.debug(f"Patch set {patch_set.id} is applicable")
+                    applicable.append(entry)
                 else:
-                    self.logger.debug(f"Patch set {patch_set.id} not compatible: {issues}")
+                    self.logger.debug(f"Patch set {patch_set.id} is compatible but no actions applicable")
             
             # Sort by priority (critical patches first)
-            applicable.sort(key=lambda ps: min(action.priority.value for action in ps.actions))
+            applicable.sort(key=lambda entry: entry.priority)
+            applicable = [entry.patch_set for entry in applicable]
             
             return applicable
             
@@ -0,0 +1,241 @@
+"""
+BootForge PCI/USB ID Index
+Compiles the standard pci.ids / usb.ids lists into a sorted binary index that
+is memory-mapped and binary-searched, so vendor and device names cost no
+parse time at startup and almost no resident memory.
+"""
+
+import os
+import re
+import mmap
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Bump when the binary layout changes; existing index files are rebuilt
+ID_INDEX_VERSION = 1
+
+_MAGIC = b"BFIDIDX\x00"
+# magic, version, vendor count, device count, source size, source mtime (ns)
+_HEADER = struct.Struct("<8sIIIQQ")
+# key, string offset, string length
+_RECORD = struct.Struct("<III")
+_KEY = struct.Struct("<I")
+
+_VENDOR_LINE = re.compile(r"^([0-9a-fA-F]{4})\s+(.+?)\s*$")
+_DEVICE_LINE = re.compile(r"^\t([0-9a-fA-F]{4})\s+(.+?)\s*$")
+
+_DATA_DIR = Path(__file__).parent / "data"
+
+# Searched in order: a copy vendored next to this module, then the copies
+# distributions ship with pciutils/usbutils (hwdata)
+PCI_IDS_PATHS = [
+    _DATA_DIR / "pci.ids",
+    Path("/usr/share/hwdata/pci.ids"),
+    Path("/usr/share/misc/pci.ids"),
+    Path("/usr/share/pci.ids"),
+    Path("/usr/local/share/pci.ids"),
+]
+USB_IDS_PATHS = [
+    _DATA_DIR / "usb.ids",
+    Path("/usr/share/hwdata/usb.ids"),
+    Path("/usr/share/misc/usb.ids"),
+    Path("/var/lib/usbutils/usb.ids"),
+    Path("/usr/share/usb.ids"),
+]
+
+
+def find_ids_file(candidates: Iterable[Union[str, Path]]) -> Optional[Path]:
+    """First existing ids file among the candidates"""
+    for candidate in candidates:
+        path = Path(candidate)
+        if path.is_file():
+            return path
+    return None
+
+
+def parse_ids(lines: Iterable[str]) -> Iterator[Tuple[int, Optional[int], str]]:
+    """Yield (vendor, device, name) from pci.ids/usb.ids lines; device is None for vendors
+
+    Subsystem/interface lines and the trailing class, language and HID
+    sections are skipped.
+    """
+    vendor = None
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line.startswith("\t"):
+            match = _VENDOR_LINE.match(line)
+            vendor = int(match.group(1), 16) if match else None
+            if match:
+                yield vendor, None, match.group(2)
+            continue
+        if vendor is None:
+            continue
+        match = _DEVICE_LINE.match(line)
+        if match:
+            yield vendor, int(match.group(1), 16), match.group(2)
+
+
+def build_index(source: Union[str, Path], destination: Union[str, Path]) -> Tuple[int, int]:
+    """Compile an ids file into the binary index format; returns (vendors, devices)"""
+    source = Path(source)
+    destination = Path(destination)
+    st = source.stat()
+
+    vendors = {}
+    devices = {}
+    with open(source, 'r', encoding='utf-8', errors='replace') as f:
+        for vendor, device, name in parse_ids(f):
+            if device is None:
+                vendors.setdefault(vendor, name)
+            else:
+                devices.setdefault((vendor << 16) | device, name)
+
+    pool = bytearray()
+    tables = []
+    for entries in (vendors, devices):
+        records = []
+        for key in sorted(entries):
+            encoded = entries[key].encode('utf-8')
+            records.append(_RECORD.pack(key, len(pool), len(encoded)))
+            pool += encoded
+        tables.append(b"".join(records))
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, ID_INDEX_VERSION, len(vendors), len(devices),
+                             st.st_size, st.st_mtime_ns))
+        f.write(tables[0])
+        f.write(tables[1])
+        f.write(pool)
+    os.replace(temp_path, destination)
+    return len(vendors), len(devices)
+
+
+class IDIndex:
+    """Read-only, memory-mapped view of a compiled ids index"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, vendor_count, device_count, size, mtime_ns = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"Not an ids index: {self.path}")
+            self.version = version
+            self.vendor_count = vendor_count
+            self.device_count = device_count
+            self.source_stamp = (size, mtime_ns)
+            self._vendor_table = _HEADER.size
+            self._device_table = self._vendor_table + vendor_count * _RECORD.size
+            self._pool = self._device_table + device_count * _RECORD.size
+            if len(self._map) < self._pool:
+                raise ValueError(f"Truncated ids index: {self.path}")
+        except Exception:
+            self._map.close()
+            raise
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> "IDIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def vendor_name(self, vendor: int) -> Optional[str]:
+        return self._find(self._vendor_table, self.vendor_count, vendor)
+
+    def device_name(self, vendor: int, device: int) -> Optional[str]:
+        return self._find(self._device_table, self.device_count, (vendor << 16) | device)
+
+    def _find(self, table: int, count: int, key: int) -> Optional[str]:
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            record_key = _KEY.unpack_from(self._map, table + middle * _RECORD.size)[0]
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == count:
+            return None
+        record_key, offset, length = _RECORD.unpack_from(self._map, table + low * _RECORD.size)
+        if record_key != key:
+            return None
+        start = self._pool + offset
+        return self._map[start:start + length].decode('utf-8')
+
+
+def open_ids_index(source: Union[str, Path], cache_dir: Union[str, Path]) -> IDIndex:
+    """Map the compiled index for an ids file, compiling it first if missing or stale"""
+    source = Path(source)
+    index_path = Path(cache_dir) / f"{source.name}.idx"
+    st = source.stat()
+
+    try:
+        index = IDIndex(index_path)
+        if index.version == ID_INDEX_VERSION and index.source_stamp == (st.st_size, st.st_mtime_ns):
+            return index
+        index.close()
+    except (OSError, ValueError, struct.error):
+        pass
+
+    vendors, devices = build_index(source, index_path)
+    logging.getLogger(__name__).info(f"Compiled {source} into {index_path}: "
+                                     f"{vendors} vendors, {devices} devices")
+    return IDIndex(index_path)
+
+
+class LazyIDIndex:
+    """Finds, compiles and maps an ids file on first lookup
+
+    Lookups return None when no ids file is available or it cannot be
+    compiled; callers fall back to their own data.
+    """
+
+    def __init__(self, candidates: List[Union[str, Path]], cache_dir: Optional[Union[str, Path]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.candidates = candidates
+        self.cache_dir = cache_dir
+        self._index: Optional[IDIndex] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> Optional[IDIndex]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._index = self._open()
+                    self._loaded = True
+        return self._index
+
+    def _open(self) -> Optional[IDIndex]:
+        source = find_ids_file(self.candidates)
+        if source is None:
+            return None
+        cache_dir = self.cache_dir
+        if cache_dir is None:
+            from src.core.config import Config
+            cache_dir = Config().get_cache_dir() / "ids"
+        try:
+            return open_ids_index(source, cache_dir)
+        except Exception as e:
+            self.logger.warning(f"Could not load ids database {source}: {e}")
+            return None
+
+    def vendor_name(self, vendor: int) -> Optional[str]:
+        index = self.index
+        return index.vendor_name(vendor) if index else None
+
+    def device_name(self, vendor: int, device: int) -> Optional[str]:
+        index = self.index
+        return index.device_name(vendor, device) if index else None
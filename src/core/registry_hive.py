@@ -0,0 +1,673 @@
+"""
+BootForge Registry Hive
+Pure-Python reader/writer for offline Windows registry hives (REGF format),
+used to apply bypass keys to SYSTEM and SOFTWARE without DISM or reg.exe.
+"""
+
+import os
+import time
+import uuid
+import struct
+import logging
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+BASE_BLOCK_SIZE = 4096
+HBIN_HEADER_SIZE = 32
+HBIN_ALIGNMENT = 4096
+NO_CELL = 0xFFFFFFFF
+
+# Largest value stored in a single cell; bigger data needs "db" segments
+MAX_CELL_DATA = 16344
+# Windows switches to an "ri" index root above this many leaf entries
+MAX_LEAF_ENTRIES = 1012
+
+KEY_HIVE_ENTRY = 0x0004
+KEY_NO_DELETE = 0x0008
+KEY_COMP_NAME = 0x0020
+VALUE_COMP_NAME = 0x0001
+
+# Seconds between 1601-01-01 (FILETIME epoch) and 1970-01-01
+FILETIME_EPOCH_OFFSET = 11644473600
+
+# Registry paths as written in bypass definitions -> hive file name
+HIVE_ROOTS = {
+    "HKLM\\SYSTEM": "SYSTEM",
+    "HKLM\\SOFTWARE": "SOFTWARE",
+    "HKEY_LOCAL_MACHINE\\SYSTEM": "SYSTEM",
+    "HKEY_LOCAL_MACHINE\\SOFTWARE": "SOFTWARE",
+}
+
+# Key node layout: signature, flags, timestamp, 15 dwords, name/class lengths
+_NK_FORMAT = struct.Struct("<2sHQ15IHH")
+_VK_FORMAT = struct.Struct("<2sHIIIHH")
+
+
+class RegistryHiveError(Exception):
+    """Raised for malformed hives or edits the writer cannot perform"""
+
+
+class RegistryValueType(IntEnum):
+    """Registry value data types"""
+    REG_NONE = 0
+    REG_SZ = 1
+    REG_EXPAND_SZ = 2
+    REG_BINARY = 3
+    REG_DWORD = 4
+    REG_DWORD_BIG_ENDIAN = 5
+    REG_LINK = 6
+    REG_MULTI_SZ = 7
+    REG_QWORD = 11
+
+
+RegistryValue = Tuple[RegistryValueType, Any]
+
+
+def split_registry_path(registry_path: str) -> Tuple[str, str]:
+    """Split 'HKLM\\SYSTEM\\Setup\\LabConfig' into ('SYSTEM', 'Setup\\LabConfig')"""
+    normalized = registry_path.replace("/", "\\").strip("\\")
+    for root, hive_name in HIVE_ROOTS.items():
+        if normalized.upper() == root.upper():
+            return hive_name, ""
+        if normalized.upper().startswith(root.upper() + "\\"):
+            return hive_name, normalized[len(root) + 1:]
+    raise RegistryHiveError(f"Unsupported registry root in {registry_path}")
+
+
+def parse_value_type(value_type: Union[str, int]) -> RegistryValueType:
+    """Accept 'REG_DWORD' style names as used in bypass definitions, or numbers"""
+    try:
+        if isinstance(value_type, str):
+            return RegistryValueType[value_type.upper()]
+        return RegistryValueType(value_type)
+    except (KeyError, ValueError):
+        raise RegistryHiveError(f"Unsupported registry value type: {value_type}")
+
+
+def encode_value(value_type: RegistryValueType, value: Any) -> bytes:
+    """Serialize a Python value to registry data"""
+    if value_type in (RegistryValueType.REG_SZ, RegistryValueType.REG_EXPAND_SZ,
+                      RegistryValueType.REG_LINK):
+        return (str(value) + "\0").encode("utf-16-le")
+    if value_type == RegistryValueType.REG_DWORD:
+        return struct.pack("<I", int(value) & 0xFFFFFFFF)
+    if value_type == RegistryValueType.REG_DWORD_BIG_ENDIAN:
+        return struct.pack(">I", int(value) & 0xFFFFFFFF)
+    if value_type == RegistryValueType.REG_QWORD:
+        return struct.pack("<Q", int(value) & 0xFFFFFFFFFFFFFFFF)
+    if value_type == RegistryValueType.REG_MULTI_SZ:
+        return ("".join(f"{item}\0" for item in value) + "\0").encode("utf-16-le")
+    return bytes(value)
+
+
+def decode_value(value_type: RegistryValueType, data: bytes) -> Any:
+    """Deserialize registry data to a Python value"""
+    if value_type in (RegistryValueType.REG_SZ, RegistryValueType.REG_EXPAND_SZ,
+                      RegistryValueType.REG_LINK):
+        return data.decode("utf-16-le", errors="replace").split("\0", 1)[0]
+    if value_type == RegistryValueType.REG_DWORD and len(data) >= 4:
+        return struct.unpack_from("<I", data)[0]
+    if value_type == RegistryValueType.REG_DWORD_BIG_ENDIAN and len(data) >= 4:
+        return struct.unpack_from(">I", data)[0]
+    if value_type == RegistryValueType.REG_QWORD and len(data) >= 8:
+        return struct.unpack_from("<Q", data)[0]
+    if value_type == RegistryValueType.REG_MULTI_SZ:
+        return [item for item in data.decode("utf-16-le", errors="replace").split("\0") if item]
+    return bytes(data)
+
+
+def _filetime_now() -> int:
+    return int((time.time() + FILETIME_EPOCH_OFFSET) * 10 ** 7)
+
+
+def _lh_hash(name: str) -> int:
+    """Name hash stored in "lh" subkey lists"""
+    value = 0
+    for char in name.upper():
+        value = (value * 37 + ord(char)) & 0xFFFFFFFF
+    return value
+
+
+def _base_block_checksum(block: bytes) -> int:
+    checksum = 0
+    for (dword,) in struct.iter_unpack("<I", block[:508]):
+        checksum ^= dword
+    if checksum == 0xFFFFFFFF:
+        return 0xFFFFFFFE
+    return checksum or 1
+
+
+def _encode_name(name: str) -> Tuple[bytes, bool]:
+    """Names are stored as ASCII when possible ("compressed"), else UTF-16"""
+    try:
+        return name.encode("ascii"), True
+    except UnicodeEncodeError:
+        return name.encode("utf-16-le"), False
+
+
+class RegistryHive:
+    """An offline registry hive held in memory
+
+    Edits are made in place on the hive image. New cells are appended in
+    fresh hive bins and replaced cells are marked free, so existing cell
+    offsets never move. save() writes the whole hive back once, with a new
+    checksum and sequence numbers, and validates the result first.
+    """
+
+    def __init__(self, data: bytes, path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path) if path else None
+
+        if len(data) < BASE_BLOCK_SIZE + HBIN_HEADER_SIZE or data[:4] != b"regf":
+            raise RegistryHiveError("Not a registry hive (missing regf signature)")
+
+        primary_seq, secondary_seq = struct.unpack_from("<II", data, 4)
+        if primary_seq != secondary_seq:
+            raise RegistryHiveError("Hive is dirty; replay its transaction logs before editing")
+        stored_checksum = struct.unpack_from("<I", data, 508)[0]
+        if stored_checksum != _base_block_checksum(data):
+            raise RegistryHiveError("Hive base block checksum mismatch")
+
+        self.minor_version = struct.unpack_from("<I", data, 24)[0]
+        self.root_offset = struct.unpack_from("<I", data, 36)[0]
+        bins_size = struct.unpack_from("<I", data, 40)[0]
+        if BASE_BLOCK_SIZE + bins_size > len(data):
+            raise RegistryHiveError("Hive is truncated")
+
+        self._data = bytearray(data[:BASE_BLOCK_SIZE + bins_size])
+        self._free_tail: Optional[Tuple[int, int]] = None
+        self._freed_cells: List[Tuple[int, int]] = []
+        self._dirty_keys = set()
+        self.modified = False
+
+        last_cell = self._scan_bins(all_cells=False)
+        if last_cell and last_cell[1] > 0:
+            # Trailing free space in the last bin is used for new cells
+            self._free_tail = last_cell
+
+        if self._key_signature(self.root_offset) != b"nk":
+            raise RegistryHiveError("Root cell is not a key node")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'RegistryHive':
+        with open(path, 'rb') as f:
+            return cls(f.read(), Path(path))
+
+    @classmethod
+    def create(cls, root_name: str = "ROOT", file_name: str = "") -> 'RegistryHive':
+        """Build an empty hive containing only a root key"""
+        # Self-relative security descriptor with no owner, group or ACLs
+        descriptor = struct.pack("<BBHIIII", 1, 0, 0x8004, 0, 0, 0, 0)
+        security_offset = HBIN_HEADER_SIZE
+        sk_payload = struct.pack("<2sHIIII", b"sk", 0, security_offset, security_offset,
+                                 1, len(descriptor)) + descriptor
+        sk_size = (len(sk_payload) + 4 + 7) & ~7
+
+        root_offset = security_offset + sk_size
+        name_bytes, compressed = _encode_name(root_name)
+        flags = KEY_HIVE_ENTRY | KEY_NO_DELETE | (KEY_COMP_NAME if compressed else 0)
+        nk_payload = _NK_FORMAT.pack(
+            b"nk", flags, _filetime_now(), 0, NO_CELL, 0, 0, NO_CELL, NO_CELL, 0, NO_CELL,
+            security_offset, NO_CELL, 0, 0, 0, 0, 0, len(name_bytes), 0) + name_bytes
+        nk_size = (len(nk_payload) + 4 + 7) & ~7
+
+        hbin = bytearray(HBIN_ALIGNMENT)
+        struct.pack_into("<4sII", hbin, 0, b"hbin", 0, HBIN_ALIGNMENT)
+        struct.pack_into("<i", hbin, security_offset, -sk_size)
+        hbin[security_offset + 4:security_offset + 4 + len(sk_payload)] = sk_payload
+        struct.pack_into("<i", hbin, root_offset, -nk_size)
+        hbin[root_offset + 4:root_offset + 4 + len(nk_payload)] = nk_payload
+        free_offset = root_offset + nk_size
+        struct.pack_into("<i", hbin, free_offset, HBIN_ALIGNMENT - free_offset)
+
+        base = bytearray(BASE_BLOCK_SIZE)
+        struct.pack_into("<4sIIQIIIIIII", base, 0, b"regf", 1, 1, _filetime_now(),
+                         1, 5, 0, 1, root_offset, HBIN_ALIGNMENT, 1)
+        encoded_file_name = file_name.encode("utf-16-le")[:64]
+        base[48:48 + len(encoded_file_name)] = encoded_file_name
+        struct.pack_into("<I", base, 508, _base_block_checksum(base))
+        return cls(bytes(base + hbin))
+
+    # ----------------------------------------------------------------- reading
+
+    def has_key(self, key_path: str) -> bool:
+        return self._open_key(key_path) is not None
+
+    def subkeys(self, key_path: str = "") -> List[str]:
+        key = self._require_key(key_path)
+        return [self._key_name(offset) for offset in self._subkey_offsets(key)]
+
+    def values(self, key_path: str = "") -> Dict[str, RegistryValue]:
+        key = self._require_key(key_path)
+        return {self._value_name(offset): self._read_value(offset)
+                for offset in self._value_offsets(key)}
+
+    def get_value(self, key_path: str, name: str) -> Optional[RegistryValue]:
+        key = self._open_key(key_path)
+        if key is None:
+            return None
+        offset = self._find_value(key, name)
+        return self._read_value(offset) if offset is not None else None
+
+    # ----------------------------------------------------------------- writing
+
+    def create_key(self, key_path: str) -> int:
+        """Open key_path, creating missing keys along the way"""
+        key = self.root_offset
+        for name in self._split(key_path):
+            child = self._find_subkey(key, name)
+            key = child if child is not None else self._add_subkey(key, name)
+        return key
+
+    def set_value(self, key_path: str, name: str, value_type: Union[str, int], value: Any):
+        """Create or replace one value, creating its key if needed"""
+        value_type = parse_value_type(value_type)
+        data = encode_value(value_type, value)
+        if len(data) > MAX_CELL_DATA:
+            raise RegistryHiveError(f"Value {name} is too large for a single cell ({len(data)} bytes)")
+
+        key = self.create_key(key_path)
+        data_size, data_offset = self._store_data(data)
+
+        existing = self._find_value(key, name)
+        if existing is not None:
+            old_size, old_offset = struct.unpack_from("<II", self._data, self._payload(existing) + 4)
+            if not old_size & 0x80000000 and old_size <= MAX_CELL_DATA and old_offset != NO_CELL:
+                self._free(old_offset)
+            struct.pack_into("<III", self._data, self._payload(existing) + 4,
+                             data_size, data_offset, int(value_type))
+        else:
+            name_bytes, compressed = _encode_name(name)
+            vk_payload = _VK_FORMAT.pack(b"vk", len(name_bytes), data_size, data_offset,
+                                         int(value_type), VALUE_COMP_NAME if compressed else 0,
+                                         0) + name_bytes
+            vk_offset = self._allocate(vk_payload)
+
+            offsets = self._value_offsets(key) + [vk_offset]
+            list_offset = self._allocate(struct.pack(f"<{len(offsets)}I", *offsets))
+            old_list = self._nk_field(key, 40)
+            if offsets[:-1] and old_list != NO_CELL:
+                self._free(old_list)
+            self._set_nk_field(key, 36, len(offsets))
+            self._set_nk_field(key, 40, list_offset)
+            self._set_nk_field(key, 60, max(self._nk_field(key, 60), len(name) * 2))
+
+        self._set_nk_field(key, 64, max(self._nk_field(key, 64), len(data)))
+        self._touch(key)
+        self.modified = True
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._data)
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        """Seal the base block, validate, and atomically replace the hive file"""
+        target = Path(path) if path else self.path
+        if target is None:
+            raise RegistryHiveError("No path to save the hive to")
+
+        sequence = struct.unpack_from("<I", self._data, 4)[0] + 1
+        struct.pack_into("<IIQ", self._data, 4, sequence, sequence, _filetime_now())
+        struct.pack_into("<I", self._data, 40, len(self._data) - BASE_BLOCK_SIZE)
+        struct.pack_into("<I", self._data, 508, _base_block_checksum(self._data))
+
+        # Parse the sealed image from scratch before anything touches the disk
+        RegistryHive(bytes(self._data)).validate(sorted(self._dirty_keys))
+
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}")
+        with open(temp_path, 'wb') as f:
+            f.write(self._data)
+        os.replace(temp_path, target)
+
+        self.path = target
+        self.modified = False
+        self._dirty_keys.clear()
+        return target
+
+    def validate(self, keys: Optional[List[int]] = None) -> int:
+        """Check the hive structure and return the number of keys checked
+
+        Walks every key from the root, or only the given key cells and their
+        direct subkeys, which keeps validation of large hives after a few
+        edits cheap.
+        """
+        self._scan_bins()
+        recursive = keys is None
+        seen = set()
+        pending = [self.root_offset] if recursive else list(keys)
+        while pending:
+            key = pending.pop()
+            if key in seen:
+                raise RegistryHiveError(f"Key cell {key:#x} is referenced twice")
+            seen.add(key)
+            if self._key_signature(key) != b"nk":
+                raise RegistryHiveError(f"Cell {key:#x} is not a key node")
+            self._key_name(key)
+
+            subkeys = self._subkey_offsets(key)
+            if len(subkeys) != self._nk_field(key, 20):
+                raise RegistryHiveError(f"Subkey count mismatch in key {self._key_name(key)}")
+            for offset in self._value_offsets(key):
+                if self._cell_bytes(offset)[:2] != b"vk":
+                    raise RegistryHiveError(f"Cell {offset:#x} is not a value")
+                self._read_value(offset)
+            if recursive:
+                pending.extend(subkeys)
+            elif any(self._key_signature(offset) != b"nk" for offset in subkeys):
+                raise RegistryHiveError(f"Subkey list of {self._key_name(key)} is corrupt")
+        return len(seen)
+
+    # ----------------------------------------------------------------- cells
+
+    @staticmethod
+    def _payload(offset: int) -> int:
+        """Absolute position of a cell's payload (after its size field)"""
+        return BASE_BLOCK_SIZE + offset + 4
+
+    def _cell_bytes(self, offset: int) -> bytes:
+        if offset == NO_CELL or BASE_BLOCK_SIZE + offset + 4 > len(self._data):
+            raise RegistryHiveError(f"Cell offset {offset:#x} is out of range")
+        size = struct.unpack_from("<i", self._data, BASE_BLOCK_SIZE + offset)[0]
+        if size >= 0:
+            raise RegistryHiveError(f"Cell {offset:#x} is referenced but free")
+        start = self._payload(offset)
+        return bytes(self._data[start:start - 4 - size])
+
+    def _scan_bins(self, all_cells: bool = True) -> Optional[Tuple[int, int]]:
+        """Check that bins (and their cells) tile the hive
+
+        Only the last bin's cells are walked when all_cells is False. Returns
+        the last cell as (offset, size field).
+        """
+        position = 0
+        total = len(self._data) - BASE_BLOCK_SIZE
+        last_cell = None
+        while position < total:
+            start = BASE_BLOCK_SIZE + position
+            signature, bin_offset, bin_size = struct.unpack_from("<4sII", self._data, start)
+            if signature != b"hbin" or bin_offset != position or bin_size < HBIN_ALIGNMENT \
+                    or bin_size % HBIN_ALIGNMENT or position + bin_size > total:
+                raise RegistryHiveError(f"Corrupt hive bin at {position:#x}")
+            if not all_cells and position + bin_size < total:
+                position += bin_size
+                continue
+
+            cell = position + HBIN_HEADER_SIZE
+            while cell < position + bin_size:
+                size = struct.unpack_from("<i", self._data, BASE_BLOCK_SIZE + cell)[0]
+                if size == 0 or abs(size) % 8 or cell + abs(size) > position + bin_size:
+                    raise RegistryHiveError(f"Corrupt cell at {cell:#x}")
+                last_cell = (cell, size)
+                cell += abs(size)
+            position += bin_size
+        return last_cell
+
+    def _allocate(self, payload: bytes) -> int:
+        """Place payload in a new allocated cell and return its offset"""
+        size = (len(payload) + 4 + 7) & ~7
+
+        # Reuse cells freed during this session before growing the hive
+        reuse = next((i for i, (_, free_size) in enumerate(self._freed_cells)
+                      if free_size >= size), None)
+        if reuse is not None:
+            offset, free_size = self._freed_cells.pop(reuse)
+        else:
+            if self._free_tail is None or self._free_tail[1] < size:
+                self._append_bin(size)
+            offset, free_size = self._free_tail
+            self._free_tail = None
+
+        remaining = free_size - size
+        if remaining < 8:
+            size, remaining = free_size, 0
+        start = BASE_BLOCK_SIZE + offset
+        struct.pack_into("<i", self._data, start, -size)
+        self._data[start + 4:start + size] = payload + bytes(size - 4 - len(payload))
+        if remaining:
+            struct.pack_into("<i", self._data, start + size, remaining)
+            if reuse is not None:
+                self._freed_cells.append((offset + size, remaining))
+            else:
+                self._free_tail = (offset + size, remaining)
+        return offset
+
+    def _append_bin(self, cell_size: int):
+        bin_offset = len(self._data) - BASE_BLOCK_SIZE
+        bin_size = (cell_size + HBIN_HEADER_SIZE + HBIN_ALIGNMENT - 1) & ~(HBIN_ALIGNMENT - 1)
+        header = struct.pack("<4sIIQQI", b"hbin", bin_offset, bin_size, 0, _filetime_now(), 0)
+        free_size = bin_size - HBIN_HEADER_SIZE
+        self._data += header + struct.pack("<i", free_size) + bytes(free_size - 4)
+        self._free_tail = (bin_offset + HBIN_HEADER_SIZE, free_size)
+
+    def _free(self, offset: int):
+        start = BASE_BLOCK_SIZE + offset
+        size = struct.unpack_from("<i", self._data, start)[0]
+        if size < 0:
+            struct.pack_into("<i", self._data, start, -size)
+            self._freed_cells.append((offset, -size))
+
+    def _store_data(self, data: bytes) -> Tuple[int, int]:
+        """Value data as (size field, offset field); up to 4 bytes live inline"""
+        if len(data) <= 4:
+            inline = struct.unpack("<I", data.ljust(4, b"\0"))[0]
+            return len(data) | 0x80000000, inline
+        return len(data), self._allocate(data)
+
+    # ----------------------------------------------------------------- keys
+
+    @staticmethod
+    def _split(key_path: str) -> List[str]:
+        return [part for part in key_path.replace("/", "\\").split("\\") if part]
+
+    def _open_key(self, key_path: str) -> Optional[int]:
+        key = self.root_offset
+        for name in self._split(key_path):
+            key = self._find_subkey(key, name)
+            if key is None:
+                return None
+        return key
+
+    def _require_key(self, key_path: str) -> int:
+        key = self._open_key(key_path)
+        if key is None:
+            raise RegistryHiveError(f"Key not found: {key_path}")
+        return key
+
+    def _key_signature(self, key: int) -> bytes:
+        return self._cell_bytes(key)[:2]
+
+    def _nk_field(self, key: int, field_offset: int) -> int:
+        return struct.unpack_from("<I", self._data, self._payload(key) + field_offset)[0]
+
+    def _set_nk_field(self, key: int, field_offset: int, value: int):
+        struct.pack_into("<I", self._data, self._payload(key) + field_offset, value)
+
+    def _touch(self, key: int):
+        struct.pack_into("<Q", self._data, self._payload(key) + 4, _filetime_now())
+        self._dirty_keys.add(key)
+
+    def _key_name(self, key: int) -> str:
+        cell = self._cell_bytes(key)
+        if len(cell) < _NK_FORMAT.size:
+            raise RegistryHiveError(f"Key node {key:#x} is truncated")
+        flags = struct.unpack_from("<H", cell, 2)[0]
+        name_length = struct.unpack_from("<H", cell, 72)[0]
+        raw = cell[76:76 + name_length]
+        return raw.decode("latin-1") if flags & KEY_COMP_NAME else raw.decode("utf-16-le", errors="replace")
+
+    def _subkey_offsets(self, key: int) -> List[int]:
+        return [offset for offset, _ in self._subkey_items(key)]
+
+    def _subkey_items(self, key: int) -> List[Tuple[int, Optional[int]]]:
+        """(subkey offset, lh name hash or None) in list order"""
+        if self._nk_field(key, 20) == 0:
+            return []
+        return self._list_items(self._nk_field(key, 28))
+
+    def _list_items(self, list_offset: int) -> List[Tuple[int, Optional[int]]]:
+        cell = self._cell_bytes(list_offset)
+        signature = cell[:2]
+        count = struct.unpack_from("<H", cell, 2)[0]
+        if signature == b"lh":
+            pairs = struct.unpack_from(f"<{count * 2}I", cell, 4)
+            return list(zip(pairs[0::2], pairs[1::2]))
+        if signature == b"lf":
+            return [(offset, None) for offset in struct.unpack_from(f"<{count * 2}I", cell, 4)[0::2]]
+        if signature == b"li":
+            return [(offset, None) for offset in struct.unpack_from(f"<{count}I", cell, 4)]
+        if signature == b"ri":
+            items = []
+            for sublist in struct.unpack_from(f"<{count}I", cell, 4):
+                items.extend(self._list_items(sublist))
+            return items
+        raise RegistryHiveError(f"Unknown subkey list type {signature!r} at {list_offset:#x}")
+
+    def _list_cells(self, list_offset: int) -> List[int]:
+        """The list cell plus its sublists when it is an index root"""
+        cell = self._cell_bytes(list_offset)
+        if cell[:2] != b"ri":
+            return [list_offset]
+        count = struct.unpack_from("<H", cell, 2)[0]
+        return [list_offset] + list(struct.unpack_from(f"<{count}I", cell, 4))
+
+    def _find_subkey(self, key: int, name: str) -> Optional[int]:
+        wanted = name.upper()
+        wanted_hash = _lh_hash(name)
+        for offset, name_hash in self._subkey_items(key):
+            if name_hash is not None and name_hash != wanted_hash:
+                continue
+            if self._key_name(offset).upper() == wanted:
+                return offset
+        return None
+
+    def _add_subkey(self, parent: int, name: str) -> int:
+        security = self._nk_field(parent, 44)
+        if security != NO_CELL:
+            # New keys share the parent's security descriptor
+            refcount_position = self._payload(security) + 12
+            refcount = struct.unpack_from("<I", self._data, refcount_position)[0]
+            struct.pack_into("<I", self._data, refcount_position, refcount + 1)
+
+        name_bytes, compressed = _encode_name(name)
+        key = self._allocate(_NK_FORMAT.pack(
+            b"nk", KEY_COMP_NAME if compressed else 0, _filetime_now(), 0, parent, 0, 0,
+            NO_CELL, NO_CELL, 0, NO_CELL, security, NO_CELL, 0, 0, 0, 0, 0,
+            len(name_bytes), 0) + name_bytes)
+
+        old_count = self._nk_field(parent, 20)
+        old_list = self._nk_field(parent, 28)
+        # Lists are kept sorted by upper-cased name; binary search the slot
+        items = self._subkey_items(parent)
+        low, high = 0, len(items)
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_name(items[middle][0]).upper() < name.upper():
+                low = middle + 1
+            else:
+                high = middle
+        items.insert(low, (key, _lh_hash(name)))
+        self._set_nk_field(parent, 28, self._write_subkey_list(items))
+        self._set_nk_field(parent, 20, len(items))
+        if old_count and old_list != NO_CELL:
+            for cell in self._list_cells(old_list):
+                self._free(cell)
+
+        # Low 16 bits hold the longest subkey name; the rest are flags
+        packed = self._nk_field(parent, 52)
+        longest = max(packed & 0xFFFF, len(name) * 2)
+        self._set_nk_field(parent, 52, (packed & 0xFFFF0000) | longest)
+        self._touch(parent)
+        self.modified = True
+        return key
+
+    def _write_subkey_list(self, entries: List[Tuple[int, Optional[int]]]) -> int:
+        def leaf(chunk: List[Tuple[int, Optional[int]]]) -> int:
+            payload = bytearray(struct.pack("<2sH", b"lh", len(chunk)))
+            for offset, name_hash in chunk:
+                if name_hash is None:
+                    name_hash = _lh_hash(self._key_name(offset))
+                payload += struct.pack("<II", offset, name_hash)
+            return self._allocate(bytes(payload))
+
+        if len(entries) <= MAX_LEAF_ENTRIES:
+            return leaf(entries)
+        leaves = [leaf(entries[i:i + MAX_LEAF_ENTRIES])
+                  for i in range(0, len(entries), MAX_LEAF_ENTRIES)]
+        return self._allocate(struct.pack(f"<2sH{len(leaves)}I", b"ri", len(leaves), *leaves))
+
+    # ----------------------------------------------------------------- values
+
+    def _value_offsets(self, key: int) -> List[int]:
+        count = self._nk_field(key, 36)
+        if count == 0:
+            return []
+        cell = self._cell_bytes(self._nk_field(key, 40))
+        if len(cell) < count * 4:
+            raise RegistryHiveError(f"Value list of key {self._key_name(key)} is truncated")
+        return list(struct.unpack_from(f"<{count}I", cell))
+
+    def _value_name(self, value: int) -> str:
+        cell = self._cell_bytes(value)
+        name_length, = struct.unpack_from("<H", cell, 2)
+        flags, = struct.unpack_from("<H", cell, 16)
+        raw = cell[20:20 + name_length]
+        return raw.decode("latin-1") if flags & VALUE_COMP_NAME else raw.decode("utf-16-le", errors="replace")
+
+    def _find_value(self, key: int, name: str) -> Optional[int]:
+        wanted = name.upper()
+        for offset in self._value_offsets(key):
+            if self._value_name(offset).upper() == wanted:
+                return offset
+        return None
+
+    def _read_value(self, value: int) -> RegistryValue:
+        cell = self._cell_bytes(value)
+        _, _, data_size, data_offset, raw_type, _, _ = _VK_FORMAT.unpack_from(cell)
+        try:
+            value_type = RegistryValueType(raw_type)
+        except ValueError:
+            value_type = RegistryValueType.REG_BINARY
+
+        if data_size & 0x80000000:
+            length = data_size & 0x7FFFFFFF
+            data = struct.pack("<I", data_offset)[:length]
+        elif data_size == 0:
+            data = b""
+        else:
+            data_cell = self._cell_bytes(data_offset)
+            if data_size > MAX_CELL_DATA and data_cell[:2] == b"db":
+                segment_count, segment_list = struct.unpack_from("<HI", data_cell, 2)
+                segments = struct.unpack_from(f"<{segment_count}I", self._cell_bytes(segment_list))
+                data = b"".join(self._cell_bytes(s)[:MAX_CELL_DATA] for s in segments)[:data_size]
+            else:
+                data = data_cell[:data_size]
+        return value_type, decode_value(value_type, data)
+
+
+def apply_registry_edits(hive_path: Union[str, Path],
+                         edits: Dict[str, Dict[str, Tuple[Union[str, int], Any]]]) -> int:
+    """Apply {key_path: {value_name: (type, value)}} to a hive file in one pass
+
+    The hive is written once and re-read to confirm every value. Returns the
+    number of values written.
+    """
+    hive = RegistryHive.load(hive_path)
+    count = 0
+    for key_path, values in edits.items():
+        for name, (value_type, value) in values.items():
+            hive.set_value(key_path, name, value_type, value)
+            count += 1
+    if not hive.modified:
+        return 0
+    hive.save()
+
+    written = RegistryHive.load(hive_path)
+    for key_path, values in edits.items():
+        for name, (value_type, value) in values.items():
+            expected = parse_value_type(value_type)
+            stored = written.get_value(key_path, name)
+            if stored is None or stored[0] != expected or \
+                    encode_value(stored[0], stored[1]) != encode_value(expected, value):
+                raise RegistryHiveError(f"Verification failed for {key_path}\\{name}")
+    return count
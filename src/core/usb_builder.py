@@ -13,12 +13,11 @@ import logging
 import hashlib
 import tempfile
 import platform
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Callable, Any
 from dataclasses import dataclass, asdict, field
-from PyQt6.QtCore import QThread, pyqtSignal, QObject
 
 from src.core.disk_manager import DiskManager, DiskInfo, WriteProgress
 from src.core.safety_validator import SafetyValidator, SafetyLevel, ValidationResult, DeviceRisk
@@ -31,6 +30,10 @@ from src.core.models import (
 )
 from src.core.hardware_profiles import create_mac_patch_sets
 from src.core.grub_manager import GRUBManager, GRUBBootMode
+from src.core.events import Signal, WorkerThread
+from src.core.command_runner import CommandRunner
+from src.core.build_graph import BuildGraph, BuildTask, TaskLane
+from src.core.iso_reader import ISOReader
 
 
 # Imported from models.py to prevent circular imports
@@ -53,14 +56,17 @@ class BuildProgress:
     logs: List[str] = field(default_factory=list)
 
 
-class StorageBuilder(QThread):
+class StorageBuilder(WorkerThread):
     """Storage Builder thread for creating bootable deployment drives on any storage device"""
     
     # Signals
-    progress_updated = pyqtSignal(object)  # BuildProgress
-    operation_completed = pyqtSignal(bool, str)
-    operation_started = pyqtSignal(str)
-    log_message = pyqtSignal(str, str)  # level, message
+    progress_updated = Signal(object)  # BuildProgress
+    operation_completed = Signal(bool, str)
+    operation_started = Signal(str)
+    log_message = Signal(str, str)  # level, message
+    
+    # Worker threads for device-independent preparation tasks
+    PREP_WORKERS = 4
     
     def __init__(self, safety_level: SafetyLevel = SafetyLevel.STANDARD):
         super().__init__()
@@ -74,34 +80,75 @@ class StorageBuilder(QThread):
         self.build_log: List[str] = []
         self.temp_dir: Optional[Path] = None
         self.rollback_operations: List[Callable] = []  # For rollback on failure
+        self.grub_config = None
+        self.command_runner = CommandRunner(is_cancelled=lambda: self.is_cancelled,
+                                            output_callback=self._on_command_output)
+        self._reset_build_state()
     
-    def start_build(self, recipe: DeploymentRecipe, target_device: str, 
-                   hardware_profile: HardwareProfile, source_files: Dict[str, str]):
-        """Start storage device build operation"""
+    def _reset_build_state(self):
+        """Reset per-build state shared between build graph tasks"""
+        self.partition_mounts: Dict[str, str] = {}
+        self.source_digests: Dict[str, str] = {}
+        self.payload_staging_dir: Optional[Path] = None
+        self.build_timings: Dict[str, float] = {}
+        self._grub_config_text: Optional[str] = None
+        self._sources_prepared = False
+        self._build_successful = False
+        self.command_runner.reset_metrics()
+    
+    def configure_build(self, recipe: DeploymentRecipe, target_device: str,
+                        hardware_profile: HardwareProfile, source_files: Dict[str, str],
+                        grub_config=None):
+        """Set build inputs without starting the thread; headless callers then call run()"""
         self.recipe = recipe
         self.target_device = target_device
         self.hardware_profile = hardware_profile
         self.source_files = source_files
+        self.grub_config = grub_config
         self.is_cancelled = False
         self.build_log = []
         self.rollback_operations = []
-        self.grub_config = None
+        self._reset_build_state()
+    
+    def start_build(self, recipe: DeploymentRecipe, target_device: str, 
+                   hardware_profile: HardwareProfile, source_files: Dict[str, str]):
+        """Start storage device build operation"""
+        self.configure_build(recipe, target_device, hardware_profile, source_files)
         self.start()
     
     def start_multiboot_build(self, recipe: DeploymentRecipe, target_device: str,
                              hardware_profile: HardwareProfile, source_files: Dict[str, str],
                              grub_config):
         """Start multi-boot storage device build operation"""
-        self.recipe = recipe
-        self.target_device = target_device  
-        self.hardware_profile = hardware_profile
-        self.source_files = source_files
-        self.grub_config = grub_config
-        self.is_cancelled = False
-        self.build_log = []
-        self.rollback_operations = []
+        self.configure_build(recipe, target_device, hardware_profile, source_files, grub_config)
         self.start()
     
+    def prepare_sources(self, workspace: Path) -> bool:
+        """Run the device-independent preparation into workspace without touching a device
+        
+        Used by batch builds to prepare identical inputs once and hand the result to
+        several builders through use_prepared_sources().
+        """
+        self.temp_dir = Path(workspace)
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        if not self._hash_source_files():
+            return False
+        if self.recipe and self.recipe.deployment_type == DeploymentType.MULTIBOOT:
+            return self._stage_os_payloads()
+        return True
+    
+    def use_prepared_sources(self, source_digests: Dict[str, str],
+                             payload_staging_dir: Optional[Path] = None):
+        """Reuse preparation artifacts produced by another builder's prepare_sources()"""
+        self.source_digests = dict(source_digests)
+        self.payload_staging_dir = payload_staging_dir
+        self._sources_prepared = True
+    
+    @property
+    def build_successful(self) -> bool:
+        """Whether the last build ran to completion"""
+        return self._build_successful
+    
     def cancel_build(self):
         """Cancel current build operation"""
         self.is_cancelled = True
@@ -118,59 +165,28 @@ class StorageBuilder(QThread):
             if not self._validate_build_inputs():
                 return
             
-            # Calculate total steps
-            total_steps = 7  # Basic steps, may increase based on recipe
-            step = 0
-            
-            # Step 1: Prepare target device
-            step += 1
-            self._emit_progress("Preparing target device", step, total_steps, 0)
-            if not self._prepare_target_device():
-                return
+            # Device-independent preparation overlaps partitioning and formatting
+            graph = self._create_build_graph()
+            total_steps = len(graph)
+            completed_steps = [0]
             
-            # Step 2: Create partition scheme
-            step += 1
-            self._emit_progress("Creating partition scheme", step, total_steps, 0)
-            if not self._create_partition_scheme():
-                return
+            def on_task_started(task: BuildTask):
+                self._emit_progress(task.description, completed_steps[0] + 1, total_steps, 0)
             
-            # Step 3: Format partitions
-            step += 1
-            self._emit_progress("Formatting partitions", step, total_steps, 0)
-            if not self._format_partitions():
-                return
+            def on_task_finished(task: BuildTask):
+                completed_steps[0] += 1
+                self._log_message("DEBUG", f"Build task {task.name} {task.state.value} in {task.duration:.2f}s")
             
-            # Step 4: Mount partitions
-            step += 1
-            self._emit_progress("Mounting partitions", step, total_steps, 0)
-            partition_mounts = self._mount_partitions()
-            if not partition_mounts:
-                return
+            result = graph.run(on_task_started, on_task_finished)
+            self.build_timings = result.timings
             
-            # Step 5: Deploy files based on recipe
-            step += 1
-            self._emit_progress("Deploying files", step, total_steps, 0)
-            if not self._deploy_files(partition_mounts):
-                return
-            
-            # Step 6: Configure bootloader
-            step += 1
-            self._emit_progress("Configuring bootloader", step, total_steps, 0)
-            if self.recipe and self.recipe.deployment_type == DeploymentType.MULTIBOOT:
-                if not self._configure_multiboot_grub(partition_mounts):
-                    return
-            else:
-                if not self._configure_bootloader(partition_mounts):
-                    return
-            
-            # Step 7: Finalize and verify
-            step += 1
-            self._emit_progress("Finalizing build", step, total_steps, 0)
-            if not self._finalize_build(partition_mounts):
+            if not result.success:
+                if result.failed_task:
+                    self._log_message("ERROR", f"Build stopped at task: {result.failed_task}")
                 return
             
             self._build_successful = True
-            self._log_message("INFO", "Storage device build completed successfully")
+            self._log_message("INFO", f"Storage device build completed successfully in {result.elapsed_seconds:.1f}s")
             self.operation_completed.emit(True, "Storage device build completed successfully")
             
         except Exception as e:
@@ -180,11 +196,88 @@ class StorageBuilder(QThread):
         
         finally:
             # Perform rollback if needed
-            if self.is_cancelled or not hasattr(self, '_build_successful'):
+            if self.is_cancelled or not self._build_successful:
                 self._perform_rollback()
             # Cleanup
             self._cleanup_build()
     
+    def _create_build_graph(self) -> BuildGraph:
+        """Create the build dependency graph for the current recipe"""
+        graph = BuildGraph(max_workers=self.PREP_WORKERS, is_cancelled=lambda: self.is_cancelled)
+        is_multiboot = bool(self.recipe and self.recipe.deployment_type == DeploymentType.MULTIBOOT)
+        
+        # Device-independent preparation
+        graph.add_task("hash_sources", self._hash_source_files,
+                       description="Hashing source files")
+        if is_multiboot:
+            graph.add_task("stage_payloads", self._stage_os_payloads,
+                           description="Staging OS payloads")
+            # Staging fills in kernel/initrd paths on the GRUB entries
+            graph.add_task("render_grub_config", self._render_grub_config, ["stage_payloads"],
+                           description="Generating GRUB configuration")
+        
+        # Device operations (serialized on the device lane)
+        graph.add_task("prepare_device", self._prepare_target_device,
+                       lane=TaskLane.DEVICE, description="Preparing target device")
+        graph.add_task("create_partitions", self._create_partition_scheme, ["prepare_device"],
+                       lane=TaskLane.DEVICE, description="Creating partition scheme")
+        graph.add_task("format_partitions", self._format_partitions, ["create_partitions"],
+                       lane=TaskLane.DEVICE, description="Formatting partitions")
+        graph.add_task("mount_partitions", self._mount_partitions_task, ["format_partitions"],
+                       lane=TaskLane.DEVICE, description="Mounting partitions")
+        
+        # Deployment joins both branches
+        deploy_deps = ["mount_partitions"] + (["stage_payloads"] if is_multiboot else [])
+        graph.add_task("deploy_files", lambda: self._deploy_files(self.partition_mounts), deploy_deps,
+                       description="Deploying files")
+        
+        if is_multiboot:
+            graph.add_task("configure_bootloader",
+                           lambda: self._configure_multiboot_grub(self.partition_mounts),
+                           ["deploy_files", "render_grub_config"],
+                           description="Configuring bootloader")
+        else:
+            graph.add_task("configure_bootloader",
+                           lambda: self._configure_bootloader(self.partition_mounts),
+                           ["deploy_files"], description="Configuring bootloader")
+        
+        graph.add_task("finalize", lambda: self._finalize_build(self.partition_mounts),
+                       ["configure_bootloader", "hash_sources"], description="Finalizing build")
+        return graph
+    
+    def _mount_partitions_task(self) -> bool:
+        """Mount partitions and keep the mount points for downstream tasks"""
+        self.partition_mounts = self._mount_partitions()
+        return bool(self.partition_mounts)
+    
+    def _hash_source_files(self) -> bool:
+        """Compute SHA-256 digests of source files for the deployment record"""
+        if self._sources_prepared:
+            return True
+        
+        digests = {}
+        for name, path in self.source_files.items():
+            if self.is_cancelled:
+                return False
+            if not path or not os.path.isfile(path):
+                continue
+            
+            sha256 = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(4 * 1024 * 1024), b''):
+                    sha256.update(chunk)
+            digests[name] = sha256.hexdigest()
+        
+        self.source_digests = digests
+        self._log_message("INFO", f"Hashed {len(digests)} source files")
+        return True
+    
+    def _render_grub_config(self) -> bool:
+        """Generate GRUB configuration text ahead of the bootloader step"""
+        if self.grub_config:
+            self._grub_config_text = self.grub_config.generate_config()
+        return True
+    
     def _validate_build_inputs(self) -> bool:
         """Comprehensive safety validation of build inputs"""
         try:
@@ -286,7 +379,7 @@ class StorageBuilder(QThread):
             
             # Clear any existing partition table
             if platform.system() == "Linux":
-                result = subprocess.run(
+                result = self.command_runner.run(
                     ['sudo', 'wipefs', '-a', self.target_device],
                     capture_output=True, text=True, check=False
                 )
@@ -336,7 +429,7 @@ class StorageBuilder(QThread):
             # Create partition table
             scheme_type = "gpt" if self.recipe.partition_scheme == PartitionScheme.GPT else "msdos"
             
-            result = subprocess.run(
+            result = self.command_runner.run(
                 ['sudo', 'parted', '-s', self.target_device, 'mklabel', scheme_type],
                 capture_output=True, text=True
             )
@@ -348,9 +441,9 @@ class StorageBuilder(QThread):
             # Add rollback operation for partition table creation
             self._partition_table_created = True
             self._add_rollback_operation(
-                lambda: subprocess.run(
+                lambda: self.command_runner.run(
                     ['sudo', 'wipefs', '-a', self.target_device], 
-                    capture_output=True, check=False
+                    capture_output=True, check=False, cancellable=False
                 )
             )
             self._log_message("INFO", "Added rollback operation for partition table")
@@ -365,7 +458,7 @@ class StorageBuilder(QThread):
                     end = f"{current_start + partition.size_mb}MB"
                 
                 # Create partition
-                result = subprocess.run([
+                result = self.command_runner.run([
                     'sudo', 'parted', '-s', self.target_device, 'mkpart',
                     'primary', f"{current_start}MB", end
                 ], capture_output=True, text=True)
@@ -376,7 +469,7 @@ class StorageBuilder(QThread):
                 
                 # Set bootable flag if needed
                 if partition.bootable:
-                    subprocess.run([
+                    self.command_runner.run([
                         'sudo', 'parted', '-s', self.target_device, 'set', str(i), 'boot', 'on'
                     ], capture_output=True, text=True)
                 
@@ -386,7 +479,7 @@ class StorageBuilder(QThread):
                 self._log_message("INFO", f"Created partition {i}: {partition.name} ({partition.size_mb}MB)")
             
             # Inform kernel of partition table changes
-            subprocess.run(['sudo', 'partprobe', self.target_device], 
+            self.command_runner.run(['sudo', 'partprobe', self.target_device], 
                          capture_output=True, text=True)
             
             return True
@@ -408,7 +501,7 @@ class StorageBuilder(QThread):
             self._log_message("INFO", f"Creating GPT partition scheme on {disk_id}")
             
             # Unmount the disk first
-            subprocess.run(['diskutil', 'unmountDisk', 'force', disk_id], 
+            self.command_runner.run(['diskutil', 'unmountDisk', 'force', disk_id], 
                          capture_output=True, text=True)
             
             # Build diskutil partition command
@@ -440,7 +533,7 @@ class StorageBuilder(QThread):
                     partition_cmd.append(f"{partition.size_mb}M")
             
             # Execute partition creation
-            result = subprocess.run(partition_cmd, capture_output=True, text=True)
+            result = self.command_runner.run(partition_cmd, capture_output=True, text=True)
             
             if result.returncode != 0:
                 self._log_message("ERROR", f"Failed to partition disk: {result.stderr}")
@@ -449,9 +542,9 @@ class StorageBuilder(QThread):
             # Add rollback operation
             self._partition_table_created = True
             self._add_rollback_operation(
-                lambda: subprocess.run(
+                lambda: self.command_runner.run(
                     ['diskutil', 'eraseDisk', 'FAT32', 'EMPTY', 'GPT', disk_id], 
-                    capture_output=True, check=False
+                    capture_output=True, check=False, cancellable=False
                 )
             )
             
@@ -546,7 +639,7 @@ class StorageBuilder(QThread):
             self._log_message("DEBUG", f"Diskpart script:\n{chr(10).join(diskpart_script)}")
             
             # Execute diskpart
-            result = subprocess.run(
+            result = self.command_runner.run(
                 ['diskpart', '/s', str(script_path)],
                 capture_output=True, text=True, shell=True
             )
@@ -590,7 +683,7 @@ class StorageBuilder(QThread):
             with open(script_path, 'w') as f:
                 f.write('\n'.join(script_lines))
             
-            result = subprocess.run(
+            result = self.command_runner.run(
                 ['diskpart', '/s', str(script_path)],
                 capture_output=True, text=True, shell=True, check=False
             )
@@ -621,6 +714,7 @@ class StorageBuilder(QThread):
                 self._log_message("INFO", "Windows partitions already formatted by diskpart, skipping")
                 return True
             
+            to_format: List[Tuple[str, PartitionInfo]] = []
             for i, partition in enumerate(self.recipe.partitions, 1):
                 # Build partition device path based on platform conventions
                 if system == "Darwin":  # macOS uses disk2s1, disk2s2, etc.
@@ -656,12 +750,18 @@ class StorageBuilder(QThread):
                 # Skip formatting if filesystem is None (e.g., BIOS boot partition)
                 if partition.filesystem is not None:
                     self._log_message("INFO", f"Formatting {partition_device} as {partition.filesystem.value}")
-                    if not self._format_partition(partition_device, partition):
-                        return False
+                    to_format.append((partition_device, partition))
                 else:
                     self._log_message("INFO", f"Skipping format for {partition_device} (unformatted partition)")
             
-            return True
+            if system != "Linux" or len(to_format) < 2:
+                return all(self._format_partition(device, partition) for device, partition in to_format)
+            
+            # mkfs on separate partitions is independent; run them concurrently
+            with ThreadPoolExecutor(max_workers=len(to_format),
+                                    thread_name_prefix="bootforge_format") as executor:
+                results = list(executor.map(lambda item: self._format_partition(*item), to_format))
+            return all(results)
             
         except Exception as e:
             self._log_message("ERROR", f"Error formatting partitions: {e}")
@@ -691,16 +791,16 @@ class StorageBuilder(QThread):
                     self._log_message("ERROR", f"Unsupported filesystem: {fs.value}")
                     return False
                 
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = self.command_runner.run(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     self._log_message("ERROR", f"Format failed: {result.stderr}")
                     return False
                 
                 # Add rollback operation for this formatted partition
                 self._add_rollback_operation(
-                    lambda dev=device: subprocess.run(
+                    lambda dev=device: self.command_runner.run(
                         ['sudo', 'wipefs', '-a', dev], 
-                        capture_output=True, check=False
+                        capture_output=True, check=False, cancellable=False
                     )
                 )
                 self._log_message("DEBUG", f"Added rollback operation for formatted partition {device}")
@@ -717,7 +817,7 @@ class StorageBuilder(QThread):
                     self._log_message("ERROR", f"Unsupported filesystem for macOS: {fs.value}")
                     return False
                 
-                result = subprocess.run([
+                result = self.command_runner.run([
                     'diskutil', 'eraseVolume', fs_name, partition.label, device
                 ], capture_output=True, text=True)
                 
@@ -800,16 +900,16 @@ class StorageBuilder(QThread):
                 
                 # Mount partition
                 if platform.system() == "Linux":
-                    result = subprocess.run([
+                    result = self.command_runner.run([
                         'sudo', 'mount', partition_device, str(mount_point)
                     ], capture_output=True, text=True)
                     
                     # Add rollback operation for unmounting
                     if result.returncode == 0:
                         self._add_rollback_operation(
-                            lambda mp=str(mount_point): subprocess.run(
+                            lambda mp=str(mount_point): self.command_runner.run(
                                 ['sudo', 'umount', mp], 
-                                capture_output=True, check=False
+                                capture_output=True, check=False, cancellable=False
                             )
                         )
                     
@@ -858,7 +958,7 @@ class StorageBuilder(QThread):
                 # This ensures correct order matching recipe partitions
                 ps_command = f"Get-Partition -DiskNumber {disk_num} | Select-Object PartitionNumber, DriveLetter, Size | ConvertTo-Json"
                 
-                result = subprocess.run(
+                result = self.command_runner.run(
                     ['powershell', '-Command', ps_command],
                     capture_output=True, text=True
                 )
@@ -1438,7 +1538,10 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
                 "hardware_profile": asdict(self.hardware_profile) if self.hardware_profile else None,
                 "deployment_type": self.recipe.deployment_type.value,
                 "build_log": self.build_log,
-                "verification_steps": self.recipe.verification_steps
+                "verification_steps": self.recipe.verification_steps,
+                "source_digests": self.source_digests,
+                "build_timings": self.build_timings,
+                "command_latency": self.command_runner.metrics_summary()
             }
             
             # Write metadata to USB drive (usually on a utilities partition)
@@ -1464,7 +1567,7 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             
             # Sync filesystem
             if platform.system() == "Linux":
-                subprocess.run(['sync'], check=False)
+                self.command_runner.run(['sync'], check=False, cancellable=False)
             
             return True
             
@@ -1477,18 +1580,21 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
         try:
             if platform.system() == "Linux":
                 # Find and unmount all partitions
-                result = subprocess.run(
+                result = self.command_runner.run(
                     ['lsblk', '-ln', '-o', 'NAME,MOUNTPOINT', self.target_device],
-                    capture_output=True, text=True
+                    capture_output=True, text=True, cancellable=False
                 )
                 
+                mounted = []
                 for line in result.stdout.strip().split('\n'):
                     if line.strip():
                         parts = line.split()
                         if len(parts) >= 2 and parts[1] != '':  # Has mount point
-                            device = f"/dev/{parts[0].strip()}"
-                            subprocess.run(['sudo', 'umount', device], 
-                                         capture_output=True, check=False)
+                            mounted.append(f"/dev/{parts[0].strip()}")
+                
+                # Partitions are independent, unmount them concurrently
+                self.command_runner.run_many([['sudo', 'umount', device] for device in mounted],
+                                             cancellable=False)
                             
         except Exception as e:
             self._log_message("WARNING", f"Could not unmount device partitions: {e}")
@@ -1526,9 +1632,9 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             if self.target_device and hasattr(self, '_partition_table_created'):
                 try:
                     if platform.system() == "Linux":
-                        subprocess.run(
+                        self.command_runner.run(
                             ['sudo', 'wipefs', '-a', self.target_device],
-                            capture_output=True, text=True, check=False
+                            capture_output=True, text=True, check=False, cancellable=False
                         )
                     self._log_message("INFO", "Restored device to original state")
                 except Exception as e:
@@ -1554,7 +1660,7 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             
             # Create GRUB manager instance  
             from .grub_manager import GRUBManager, GRUBBootMode
-            grub_manager = GRUBManager()
+            grub_manager = GRUBManager(self.command_runner)
             
             # Write GRUB configuration to EFI System Partition
             efi_mount = partition_mounts.get("EFI System")
@@ -1566,8 +1672,12 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             # Ensure EFI/BOOT directory exists
             os.makedirs(os.path.dirname(grub_cfg_path), exist_ok=True)
             
-            # Generate and write GRUB config
-            if not grub_manager.write_config(grub_cfg_path, self.grub_config):
+            # Write the GRUB config rendered during preparation, or generate it now
+            if self._grub_config_text is not None:
+                with open(grub_cfg_path, 'w') as f:
+                    f.write(self._grub_config_text)
+                self._log_message("INFO", f"GRUB configuration written to {grub_cfg_path}")
+            elif not grub_manager.write_config(grub_cfg_path, self.grub_config):
                 self._log_message("ERROR", "Failed to write GRUB configuration")
                 return False
             
@@ -1579,9 +1689,9 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             # Copy GRUB bootloader files
             self._copy_grub_files(efi_mount)
             
-            # Stage OS installation files
-            if not self._stage_os_payloads():
-                self._log_message("ERROR", "Failed to stage OS payloads")
+            # Copy OS installation files staged during preparation
+            if not self._deploy_staged_payloads(partition_mounts):
+                self._log_message("ERROR", "Failed to deploy staged OS payloads")
                 return False
             
             self._log_message("INFO", "Multi-boot GRUB configuration completed successfully")
@@ -1618,16 +1728,44 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
         except Exception as e:
             self._log_message("WARNING", f"Error copying GRUB files: {e}")
     
+    # Partition that receives each OS type's staged payload
+    PAYLOAD_PARTITIONS = {
+        "windows": "Windows Installer",
+        "macos": "macOS Installer",
+        "linux": "Linux Installer",
+    }
+    
+    # Installer files copied from a Windows ISO (setup needs sources/*.wim)
+    WINDOWS_PAYLOAD_PATHS = ["efi", "boot", "sources", "bootmgr", "bootmgr.efi", "setup.exe"]
+    
+    # Locations of kernel/initrd on common Linux installer ISOs
+    LINUX_KERNEL_DIRS = ["casper", "live", "isolinux", "boot", "images/pxeboot", "install.amd"]
+    
     def _stage_os_payloads(self) -> bool:
-        """Stage operating system installation files to their partitions"""
+        """Stage operating system installation files into the build workspace
+        
+        Runs as a preparation task while the device is partitioned; files land in
+        payload_staging_dir/<os_type>/ laid out as they will appear on the partition.
+        """
         try:
             self._log_message("INFO", "Staging OS installation payloads...")
             
             if not hasattr(self, 'grub_config') or not self.grub_config:
                 return True  # No multi-boot config, skip staging
             
+            if self._sources_prepared:
+                return True  # Payloads were staged once for the whole batch
+            
+            if not self.temp_dir:
+                self.temp_dir = Path(tempfile.mkdtemp(prefix="bootforge_build_"))
+            self.payload_staging_dir = self.temp_dir / "payloads"
+            self.payload_staging_dir.mkdir(parents=True, exist_ok=True)
+            
             # Process each OS entry in GRUB config
             for entry in self.grub_config.entries:
+                if self.is_cancelled:
+                    return False
+                
                 self._log_message("INFO", f"Staging {entry.name} ({entry.os_type})")
                 
                 if entry.os_type == "windows":
@@ -1644,6 +1782,31 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             self._log_message("ERROR", f"Error staging OS payloads: {e}")
             return False
     
+    def _deploy_staged_payloads(self, partition_mounts: Dict[str, str]) -> bool:
+        """Copy staged OS payloads onto their mounted partitions"""
+        try:
+            if not self.payload_staging_dir or not self.payload_staging_dir.exists():
+                return True
+            
+            for os_type, partition_name in self.PAYLOAD_PARTITIONS.items():
+                staged = self.payload_staging_dir / os_type
+                if not staged.exists() or not any(staged.iterdir()):
+                    continue
+                
+                mount = partition_mounts.get(partition_name)
+                if not mount:
+                    self._log_message("WARNING", f"{partition_name} not mounted, skipping {os_type} payload")
+                    continue
+                
+                shutil.copytree(staged, mount, dirs_exist_ok=True)
+                self._log_message("INFO", f"Deployed staged {os_type} payload to {partition_name}")
+            
+            return True
+            
+        except Exception as e:
+            self._log_message("ERROR", f"Error deploying staged payloads: {e}")
+            return False
+    
     def _stage_windows_payload(self, entry):
         """Stage Windows installation files"""
         try:
@@ -1658,15 +1821,18 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
                 self._log_message("WARNING", f"Windows ISO not found for {entry.name}")
                 return
             
-            # Mount Windows ISO and copy EFI boot files
-            iso_mount = f"{self.temp_dir}/windows_iso"
-            os.makedirs(iso_mount, exist_ok=True)
+            self._log_message("INFO", f"Extracting Windows installer files from {windows_iso}")
+            staging = self.payload_staging_dir / "windows"
             
-            # Mount ISO (simplified - would need proper mounting)
-            self._log_message("INFO", f"Extracting Windows EFI files from {windows_iso}")
+            # Read straight from the image - no loop mount or root needed
+            with ISOReader(windows_iso) as reader:
+                wanted = [path for path in self.WINDOWS_PAYLOAD_PATHS if reader.exists(path)]
+                if not reader.exists("efi/boot/bootx64.efi"):
+                    self._log_message("WARNING", f"{windows_iso} has no EFI/BOOT/BOOTX64.EFI - UEFI boot will fail")
+                written = reader.extract(staging, wanted, workers=self.PREP_WORKERS,
+                                         is_cancelled=lambda: self.is_cancelled)
             
-            # In a real implementation, would extract EFI/BOOT/BOOTX64.EFI 
-            # and other necessary files to the EFI System Partition
+            self._log_message("INFO", f"Staged {len(written)} Windows files for {entry.name}")
             
         except Exception as e:
             self._log_message("WARNING", f"Error staging Windows payload: {e}")
@@ -1708,13 +1874,40 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
                 return
             
             self._log_message("INFO", f"Staging Linux installer from {linux_iso}")
-            
-            # In a real implementation, would extract vmlinuz and initrd
-            # from the ISO and copy to the Linux partition
+            staging = self.payload_staging_dir / "linux"
+            
+            # Only the EFI loader, GRUB files and kernel/initrd are needed to boot
+            with ISOReader(linux_iso) as reader:
+                wanted = [path for path in ("EFI/BOOT", "boot/grub") if reader.exists(path)]
+                kernels = []
+                for directory in self.LINUX_KERNEL_DIRS:
+                    if not reader.exists(directory):
+                        continue
+                    for item in reader.list(directory):
+                        name = item.name.lower()
+                        if not item.is_dir and name.startswith(("vmlinuz", "initrd", "linux", "bzimage")):
+                            kernels.append(item.path)
+                written = reader.extract(staging, wanted + kernels, workers=self.PREP_WORKERS,
+                                         is_cancelled=lambda: self.is_cancelled)
+            
+            for path in kernels:
+                name = path.rsplit('/', 1)[-1].lower()
+                if name.startswith("initrd"):
+                    entry.initrd_path = f"/{path}"
+                elif not entry.kernel_path:
+                    entry.kernel_path = f"/{path}"
+            
+            if not entry.kernel_path:
+                self._log_message("WARNING", f"No kernel found in {linux_iso}")
+            self._log_message("INFO", f"Staged {len(written)} Linux files for {entry.name}")
             
         except Exception as e:
             self._log_message("WARNING", f"Error staging Linux payload: {e}")
     
+    def _on_command_output(self, command: str, stream: str, line: str):
+        """Stream external tool output into the build log"""
+        self._log_message("DEBUG", f"{command}: {line}")
+    
     def _emit_progress(self, step_name: str, step_num: int, total_steps: int, step_progress: float):
         """Emit progress update signal"""
         overall_progress = ((step_num - 1) / total_steps) * 100 + (step_progress / total_steps)
@@ -1746,6 +1939,8 @@ For more information, visit: https://dortania.github.io/OpenCore-Legacy-Patcher/
             self.logger.error(message)
         elif level == "WARNING":
             self.logger.warning(message)
+        elif level == "DEBUG":
+            self.logger.debug(message)
         else:
             self.logger.info(message)
 
@@ -1768,6 +1963,7 @@ class StorageBuilderEngine:
         
         # Multi-boot components
         self.grub_manager = GRUBManager()
+        self.command_runner = CommandRunner()
         
         # Load built-in recipes, profiles, and patches
         self._load_builtin_recipes()
@@ -2030,7 +2226,7 @@ class StorageBuilderEngine:
             
             if system == "Darwin":  # macOS
                 # Get Mac model identifier
-                result = subprocess.run(
+                result = self.command_runner.run(
                     ['sysctl', '-n', 'hw.model'],
                     capture_output=True, text=True
                 )
@@ -6,9 +6,72 @@ Enhanced with patch capability flags for hardware-specific OS modifications
 
 import re
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Any, Set
 from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
+
+from src.core.pci_ids import LazyIDIndex, PCI_IDS_PATHS, USB_IDS_PATHS
+
+
+# Distinct CPU/GPU names remembered by identify_cpu / identify_gpu_vendor
+IDENTIFY_CACHE_SIZE = 1024
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Leading text every match of a regex must start with ("" if none)"""
+    depth = 0
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return ""  # top-level alternatives share no prefix
+    prefix = re.match(r"[A-Za-z0-9 ]*", pattern).group(0)
+    if prefix and pattern[len(prefix):len(prefix) + 1] in ("*", "?", "{"):
+        prefix = prefix[:-1]
+    return prefix.lower()
+
+
+class PatternSet:
+    """Case-insensitive regexes matched with one keyword scan per text
+
+    Every pattern is compiled once. A single alternation regex over the
+    patterns' leading keywords finds which keywords occur in the text, and
+    only patterns whose keyword occurred (or that have none) are searched.
+    match_all() returns, per pattern, what re.search(pattern, text,
+    re.IGNORECASE) returns.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        self.keywords = [_literal_prefix(pattern) for pattern in patterns]
+        distinct = sorted({keyword for keyword in self.keywords if keyword}, key=len, reverse=True)
+        # A keyword found in the text also implies every keyword that is its prefix
+        self._implied = {keyword: {other for other in distinct if keyword.startswith(other)}
+                         for keyword in distinct}
+        self._scanner = None
+        if distinct:
+            self._scanner = re.compile("(?=(" + "|".join(map(re.escape, distinct)) + "))", re.IGNORECASE)
+
+    def match_all(self, text: str) -> List[Optional[re.Match]]:
+        # Non-ASCII text may case-fold onto a keyword in ways lower() misses
+        if self._scanner is None or not text.isascii():
+            return [pattern.search(text) for pattern in self.patterns]
+        found: Set[str] = set()
+        for match in self._scanner.finditer(text):
+            keyword = match.group(1).lower()
+            if keyword not in found:
+                found |= self._implied[keyword]
+        return [pattern.search(text) if not keyword or keyword in found else None
+                for pattern, keyword in zip(self.patterns, self.keywords)]
 
 
 class PatchCapability(Enum):
@@ -125,13 +188,25 @@ class DeviceInfo:
 class VendorDatabase:
     """Hardware vendor and device identification database"""
     
-    def __init__(self):
+    def __init__(self, pci_ids_path: Optional[Path] = None, usb_ids_path: Optional[Path] = None,
+                 ids_cache_dir: Optional[Path] = None):
         self.logger = logging.getLogger(__name__)
         self._vendors = {}
         self._devices = {}
+        # Full pci.ids/usb.ids coverage behind the curated tables; compiled and mapped on first miss
+        self._ids_indexes = {
+            "pci": LazyIDIndex([pci_ids_path] if pci_ids_path else PCI_IDS_PATHS, ids_cache_dir),
+            "usb": LazyIDIndex([usb_ids_path] if usb_ids_path else USB_IDS_PATHS, ids_cache_dir),
+        }
+        self._ids_vendors: Dict[Tuple[str, str], Optional[VendorInfo]] = {}
+        self._ids_devices: Dict[Tuple[str, str], Optional[DeviceInfo]] = {}
         self._mac_models = {}
         self._cpu_patterns = {}
         self._gpu_vendors = {}
+        self._cpu_matcher: Optional[PatternSet] = None
+        self._gpu_matcher: Optional[PatternSet] = None
+        self._identify_cpu_cached = lru_cache(maxsize=IDENTIFY_CACHE_SIZE)(self._identify_cpu)
+        self._identify_gpu_cached = lru_cache(maxsize=IDENTIFY_CACHE_SIZE)(self._identify_gpu_vendor)
         
         # Initialize databases
         self._init_pci_vendors()
@@ -465,6 +540,8 @@ class VendorDatabase:
         }
         
         self._cpu_patterns = cpu_patterns
+        self._cpu_pattern_infos = list(cpu_patterns.values())
+        self._cpu_matcher = PatternSet([info["pattern"] for info in self._cpu_pattern_infos])
     
     def _init_gpu_vendors(self):
         """Initialize GPU vendor detection patterns"""
@@ -511,15 +588,60 @@ class VendorDatabase:
         }
         
         self._gpu_vendors = gpu_vendors
+        self._gpu_pattern_vendors = [(pattern, info["vendor"])
+                                     for info in gpu_vendors.values() for pattern in info["patterns"]]
+        self._gpu_matcher = PatternSet([pattern for pattern, _ in self._gpu_pattern_vendors])
     
-    def lookup_vendor(self, vendor_id: str) -> Optional[VendorInfo]:
-        """Look up vendor information by PCI vendor ID"""
-        return self._vendors.get(vendor_id.upper())
+    def lookup_vendor(self, vendor_id: str, bus: str = "pci") -> Optional[VendorInfo]:
+        """Look up vendor information by PCI (or USB) vendor ID"""
+        # The curated tables hold PCI IDs only
+        vendor = self._vendors.get(vendor_id.upper()) if bus == "pci" else None
+        if vendor is not None:
+            return vendor
+        
+        key = (bus, vendor_id.upper())
+        if key not in self._ids_vendors:
+            self._ids_vendors[key] = self._vendor_from_ids(bus, vendor_id)
+        return self._ids_vendors[key]
     
-    def lookup_device(self, vendor_id: str, device_id: str) -> Optional[DeviceInfo]:
-        """Look up device information by PCI vendor:device ID"""
+    def lookup_device(self, vendor_id: str, device_id: str, bus: str = "pci") -> Optional[DeviceInfo]:
+        """Look up device information by PCI (or USB) vendor:device ID"""
         key = f"{vendor_id.upper()}:{device_id.upper()}"
-        return self._devices.get(key)
+        device = self._devices.get(key) if bus == "pci" else None
+        if device is not None:
+            return device
+        
+        if (bus, key) not in self._ids_devices:
+            self._ids_devices[(bus, key)] = self._device_from_ids(bus, vendor_id, device_id)
+        return self._ids_devices[(bus, key)]
+    
+    def _vendor_from_ids(self, bus: str, vendor_id: str) -> Optional[VendorInfo]:
+        """Build vendor information from the pci.ids/usb.ids index"""
+        index = self._ids_indexes.get(bus)
+        try:
+            full_name = index.vendor_name(int(vendor_id, 16)) if index else None
+        except ValueError:
+            return None
+        if full_name is None:
+            return None
+        
+        name = self.normalize_vendor_name(full_name)
+        return VendorInfo(vendor_id.upper(), name, full_name,
+                          patch_compatibility=self._create_vendor_patch_compatibility(vendor_id, name))
+    
+    def _device_from_ids(self, bus: str, vendor_id: str, device_id: str) -> Optional[DeviceInfo]:
+        """Build device information from the pci.ids/usb.ids index"""
+        index = self._ids_indexes.get(bus)
+        try:
+            name = index.device_name(int(vendor_id, 16), int(device_id, 16)) if index else None
+        except ValueError:
+            return None
+        if name is None:
+            return None
+        
+        vendor = self.lookup_vendor(vendor_id, bus)
+        return DeviceInfo(vendor_id.upper(), device_id.upper(), name, "unknown",
+                          patch_compatibility=vendor.patch_compatibility if vendor else None)
     
     def lookup_mac_model(self, model_id: str) -> Optional[Dict[str, Any]]:
         """Look up Mac model information by model identifier"""
@@ -527,6 +649,9 @@ class VendorDatabase:
     
     def identify_cpu(self, cpu_name: str) -> Dict[str, Any]:
         """Identify CPU vendor, family, and architecture from CPU name"""
+        return dict(self._identify_cpu_cached(cpu_name))
+    
+    def _identify_cpu(self, cpu_name: str) -> Dict[str, Any]:
         result = {
             "vendor": "Unknown",
             "family": "Unknown", 
@@ -542,10 +667,7 @@ class VendorDatabase:
         best_match = None
         best_confidence = 0.0
         
-        for pattern_name, pattern_info in self._cpu_patterns.items():
-            pattern = pattern_info["pattern"]
-            match = re.search(pattern, cpu_name, re.IGNORECASE)
-            
+        for pattern_info, match in zip(self._cpu_pattern_infos, self._cpu_matcher.match_all(cpu_name)):
             if match:
                 # Calculate confidence based on pattern specificity
                 confidence = 0.7 + (len(match.group(0)) / len(cpu_name)) * 0.3
@@ -566,6 +688,9 @@ class VendorDatabase:
     
     def identify_gpu_vendor(self, gpu_name: str) -> Dict[str, Any]:
         """Identify GPU vendor from GPU name"""
+        return dict(self._identify_gpu_cached(gpu_name))
+    
+    def _identify_gpu_vendor(self, gpu_name: str) -> Dict[str, Any]:
         result = {
             "vendor": "Unknown",
             "confidence": 0.0
@@ -578,15 +703,14 @@ class VendorDatabase:
         best_confidence = 0.0
         best_vendor = "Unknown"
         
-        for vendor_key, vendor_info in self._gpu_vendors.items():
-            for pattern in vendor_info["patterns"]:
-                if re.search(pattern, gpu_name, re.IGNORECASE):
-                    # Higher confidence for more specific matches
-                    confidence = 0.8 + (len(pattern) / len(gpu_name)) * 0.2
-                    
-                    if confidence > best_confidence:
-                        best_confidence = confidence
-                        best_vendor = vendor_info["vendor"]
+        for (pattern, vendor), match in zip(self._gpu_pattern_vendors, self._gpu_matcher.match_all(gpu_name)):
+            if match:
+                # Higher confidence for more specific matches
+                confidence = 0.8 + (len(pattern) / len(gpu_name)) * 0.2
+                
+                if confidence > best_confidence:
+                    best_confidence = confidence
+                    best_vendor = vendor
         
         result.update({
             "vendor": best_vendor,
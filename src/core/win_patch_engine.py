@@ -15,6 +15,7 @@ import hashlib
 import tempfile
 import platform
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from enum import Enum
@@ -32,7 +33,14 @@ except ImportError:
     winreg = None
 
 from src.core.config import Config
+from src.core.events import Signal
 from src.core.hardware_detector import DetectedHardware, DetectionConfidence
+from src.core.iso_reader import ISOReader, ISOReaderError
+from src.core.iso_overlay import ISOOverlayBuilder, ISOOverlayError
+from src.core.command_runner import CommandRunner
+from src.core.artifact_store import ArtifactStore
+from src.core.driver_repository import DriverRepository, DriverMatch
+from src.core.registry_hive import RegistryHiveError, apply_registry_edits, split_registry_path
 from src.core.models import HardwareProfile, DeploymentRecipe, DeploymentType
 from src.core.patch_pipeline import (
     PatchAction, PatchType, PatchPhase, PatchPriority, PatchCondition, 
@@ -44,6 +52,34 @@ from src.core.safety_validator import (
 )
 
 
+# Bump when patching output changes so cached images are rebuilt
+WIN_PATCH_ENGINE_VERSION = "1.1.0"
+
+# Patched ISOs are several GB each; keep a handful by default
+DEFAULT_IMAGE_CACHE_GB = 40
+
+# The only files an overlay rebuild needs out of the source image
+OVERLAY_EXTRACT_PATHS = ["sources/boot.wim", "sources/install.wim", "sources/install.esd"]
+
+# Editions whose hives are extracted and edited at the same time
+EDITION_WORKERS = 4
+
+# Folder on the install media whose drivers Windows Setup loads by itself
+MEDIA_DRIVER_DIR = "$WinPEDriver$"
+
+# INF [Version] Class -> DriverCategory for repository drivers
+INF_CLASS_CATEGORIES = {
+    "net": "network",
+    "scsiadapter": "storage",
+    "hdc": "storage",
+    "display": "graphics",
+    "media": "audio",
+    "usb": "usb",
+    "bluetooth": "bluetooth",
+    "system": "chipset",
+}
+
+
 class WindowsBypassType(Enum):
     """Types of Windows installation bypasses"""
     TPM_BYPASS = "tpm_bypass"                      # Bypass TPM 2.0 requirement
@@ -115,6 +151,62 @@ class WimPatchOperation:
     error_message: Optional[str] = None
 
 
+@dataclass
+class WimImageInfo:
+    """One image (edition) inside a WIM/ESD file"""
+    index: int
+    name: str = ""
+    description: str = ""
+    edition_id: str = ""
+    architecture: str = ""
+    build: str = ""
+    size_bytes: int = 0
+    
+    @property
+    def edition_name(self) -> str:
+        """Name without the product prefix ("Windows 11 Pro N" -> "Pro N")"""
+        return _WINDOWS_PRODUCT_PREFIX.sub("", self.name)
+    
+    def matches(self, selector: str) -> bool:
+        """Match an index, full name, edition ID or whole edition name ("Pro"), ignoring case"""
+        selector = str(selector).strip().lower()
+        return selector in (str(self.index), self.name.lower(), self.edition_id.lower(),
+                            self.edition_name.lower())
+
+
+_WINDOWS_PRODUCT_PREFIX = re.compile(r"^windows\s+(?:server\s+)?\d+\S*\s+", re.IGNORECASE)
+
+
+def parse_wim_info(output: str) -> List[WimImageInfo]:
+    """Images listed by `wimlib-imagex info` or `dism /Get-WimInfo`"""
+    images: List[WimImageInfo] = []
+    current: Optional[WimImageInfo] = None
+    for line in output.splitlines():
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key, value = key.strip().lower(), value.strip()
+        if key == "index" and value.isdigit():
+            current = WimImageInfo(int(value))
+            images.append(current)
+        elif current is None:
+            continue  # WIM header fields
+        elif key == "name":
+            current.name = value
+        elif key == "description":
+            current.description = value
+        elif key == "edition id":
+            current.edition_id = value
+        elif key == "architecture":
+            current.architecture = value
+        elif key == "build":
+            current.build = value
+        elif key in ("size", "total bytes"):
+            digits = re.sub(r"[^0-9]", "", value)
+            current.size_bytes = int(digits) if digits else 0
+    return images
+
+
 class WinPatchEngine:
     """
     BootForge Windows Patch Engine
@@ -126,6 +218,9 @@ class WinPatchEngine:
     4. Enable Windows 10/11 installation on ANY hardware
     """
     
+    # (image file name, index, status) while editions are being patched
+    image_progress = Signal(str, int, str)
+    
     def __init__(self, config: Config, safety_level: SafetyLevel = SafetyLevel.STANDARD):
         self.logger = logging.getLogger(__name__)
         self.config = config
@@ -142,10 +237,17 @@ class WinPatchEngine:
         self.mount_dir: Optional[Path] = None
         self.temp_iso_dir: Optional[Path] = None
         
+        # Source image the rebuild overlays, set when only the WIMs were extracted
+        self.overlay_source: Optional[str] = None
+        
+        # (wim_path, indexes) being edited through a direct wimlib update
+        self._pending_wim_update: Optional[Tuple[str, List[int]]] = None
+        
         # Operation tracking
         self.current_operations: List[WimPatchOperation] = []
         self.applied_bypasses: List[WindowsBypass] = []
         self.injected_drivers: List[DriverPackage] = []
+        self.patched_editions: List[WimImageInfo] = []
         
         # SECURITY: Audit logging system for all bypass operations
         self.audit_logger = self._setup_audit_logger()
@@ -156,6 +258,17 @@ class WinPatchEngine:
         self.consent_timestamp: Optional[float] = None
         self.bypass_session_id: str = str(uuid.uuid4())
         
+        # External tools run through the shared command runner
+        self.is_cancelled = False
+        self.command_runner = CommandRunner(is_cancelled=lambda: self.is_cancelled,
+                                            output_callback=self._on_command_output)
+        
+        # Patched images keyed by their inputs, reused across calls
+        cache_gb = float(config.get("windows_image_cache_gb", DEFAULT_IMAGE_CACHE_GB))
+        self.image_cache = ArtifactStore(config.get_cache_dir() / "windows_images",
+                                         max_bytes=int(cache_gb * 1024 ** 3),
+                                         name="Windows image cache")
+        
         # Tool paths
         self.dism_path = self._find_dism_executable()
         self.wimlib_path = self._find_wimlib_executable()
@@ -163,6 +276,7 @@ class WinPatchEngine:
         # Initialize bypass database
         self.bypass_database = self._load_bypass_database()
         self.driver_database = self._load_driver_database()
+        self._driver_repository: Optional[DriverRepository] = None
         
         self.logger.info(f"WinPatchEngine initialized with {safety_level.value} safety level")
         self.logger.info(f"DISM: {self.dism_path}, WimLib: {self.wimlib_path}")
@@ -186,7 +300,7 @@ class WinPatchEngine:
         
         # Check if DISM is available via PATH
         try:
-            result = subprocess.run(['dism', '/English', '/?'], 
+            result = self.command_runner.run(['dism', '/English', '/?'], 
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
                 return 'dism'
@@ -195,7 +309,7 @@ class WinPatchEngine:
         
         # Check for wimlib-imagex as alternative
         try:
-            result = subprocess.run(['wimlib-imagex', '--help'], 
+            result = self.command_runner.run(['wimlib-imagex', '--help'], 
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
                 self.logger.info("Using wimlib-imagex as DISM alternative")
@@ -209,7 +323,7 @@ class WinPatchEngine:
     def _find_wimlib_executable(self) -> Optional[str]:
         """Locate wimlib-imagex executable as DISM alternative"""
         try:
-            result = subprocess.run(['wimlib-imagex', '--version'], 
+            result = self.command_runner.run(['wimlib-imagex', '--version'], 
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
                 return 'wimlib-imagex'
@@ -373,10 +487,20 @@ class WinPatchEngine:
         
         return drivers
     
+    def cancel_operation(self):
+        """Cancel the running patch; in-flight tools are terminated"""
+        self.is_cancelled = True
+        self.logger.info("Windows image patching cancelled by user")
+    
+    def _on_command_output(self, command: str, stream: str, line: str):
+        """Forward DISM/wimlib output to the log as it arrives"""
+        self.logger.debug(f"{command}: {line}")
+    
     def patch_windows_image(self, iso_path: str, hardware: DetectedHardware, 
                           windows_version: str, output_path: str,
                           bypasses: Optional[List[WindowsBypassType]] = None,
-                          inject_drivers: bool = True) -> bool:
+                          inject_drivers: bool = True, use_cache: bool = True,
+                          editions: Optional[List[str]] = None) -> bool:
         """
         Main entry point for patching Windows ISO with bypasses and drivers
         
@@ -384,40 +508,52 @@ class WinPatchEngine:
             iso_path: Path to source Windows ISO
             hardware: Detected hardware profile
             windows_version: "10" or "11"
-            output_path: Path for patched ISO
+            output_path: Path for patched ISO, or a mounted USB directory to copy files into
             bypasses: Specific bypasses to apply (None = auto-detect)
             inject_drivers: Whether to inject hardware drivers
+            use_cache: Reuse a previously patched image built from identical inputs
+            editions: install.wim editions to patch - indexes, names, edition IDs
+                or ["all"] (None = config windows_editions, else the first image)
         
         Returns:
             True if patching successful, False otherwise
         """
         try:
+            self.is_cancelled = False
             self.logger.info(f"Starting Windows {windows_version} image patching")
             self.logger.info(f"Source: {iso_path}, Output: {output_path}")
             self.logger.info(f"Hardware: {hardware.get_summary()}")
             
-            # 1. Setup workspace
-            if not self._setup_workspace():
-                return False
-            
-            # 2. Extract ISO
-            if not self._extract_iso(iso_path):
-                return False
-            
-            # 3. Determine required bypasses
+            # 1. Determine required bypasses
             required_bypasses = bypasses or self._determine_required_bypasses(hardware, windows_version)
             self.logger.info(f"Required bypasses: {[b.value for b in required_bypasses]}")
             
-            # 4. Get safety approval for bypasses
+            # 2. Get safety approval for bypasses (also required for cached images)
             if not self._validate_bypass_safety(required_bypasses, hardware):
                 return False
             
+            # 3. Reuse an image patched from identical inputs
+            cache_key = None
+            if use_cache:
+                cache_key = self._image_cache_key(iso_path, hardware, windows_version,
+                                                  required_bypasses, inject_drivers, editions)
+                if self._restore_cached_image(cache_key, output_path):
+                    return True
+            
+            # 4. Setup workspace and extract ISO
+            if not self._setup_workspace():
+                return False
+            
+            if not self._extract_iso(iso_path):
+                return False
+            
             # 5. Patch boot.wim (Windows PE environment)
             if not self._patch_boot_wim(required_bypasses):
                 return False
             
             # 6. Patch install.wim/install.esd (Windows installation)
-            if not self._patch_install_image(required_bypasses, inject_drivers, hardware, windows_version):
+            if not self._patch_install_image(required_bypasses, inject_drivers, hardware,
+                                             windows_version, editions):
                 return False
             
             # 7. Create unattend.xml for automated installation
@@ -428,6 +564,16 @@ class WinPatchEngine:
             if not self._rebuild_iso(output_path):
                 return False
             
+            if cache_key and os.path.isfile(output_path):
+                self.image_cache.put(cache_key, {"image.iso": output_path}, metadata={
+                    "source_iso": os.path.basename(iso_path),
+                    "windows_version": windows_version,
+                    "bypasses": sorted(b.value for b in required_bypasses),
+                    "drivers": [d.name for d in self.injected_drivers],
+                    "editions": [e.name or str(e.index) for e in self.patched_editions],
+                    "engine_version": WIN_PATCH_ENGINE_VERSION
+                })
+            
             self.logger.info(f"Windows {windows_version} patching completed successfully")
             self.logger.info(f"Applied bypasses: {len(self.applied_bypasses)}")
             self.logger.info(f"Injected drivers: {len(self.injected_drivers)}")
@@ -441,6 +587,55 @@ class WinPatchEngine:
         finally:
             self._cleanup_workspace()
     
+    def _image_cache_key(self, iso_path: str, hardware: DetectedHardware, windows_version: str,
+                         bypasses: List[WindowsBypassType], inject_drivers: bool,
+                         editions: Optional[List[str]] = None) -> str:
+        """Cache key covering everything that shapes the patched image"""
+        drivers = self._find_compatible_drivers(hardware, windows_version) if inject_drivers else []
+        unattend = self._generate_unattend_xml_content(hardware, windows_version)
+        return ArtifactStore.make_key({
+            "engine_version": WIN_PATCH_ENGINE_VERSION,
+            "iso_sha256": self.image_cache.file_digest(iso_path),
+            "windows_version": windows_version,
+            "bypasses": sorted(b.value for b in bypasses),
+            "drivers": sorted(self._driver_digest(d) for d in drivers),
+            "editions": [str(e) for e in self._requested_editions(editions) or []],
+            # unattend.xml is generated from the hardware profile
+            "unattend_sha256": hashlib.sha256(unattend.encode()).hexdigest()
+        })
+    
+    def _driver_digest(self, driver: DriverPackage) -> str:
+        """Digest of a driver package's files, or of its descriptor when not on disk"""
+        inf_path = Path(driver.inf_path)
+        if inf_path.is_file():
+            files = [inf_path] + [inf_path.parent / name for name in driver.driver_files]
+            parts = [self.image_cache.file_digest(str(f)) for f in files if f.is_file()]
+            return hashlib.sha256("|".join(parts).encode()).hexdigest()
+        descriptor = asdict(driver)
+        descriptor["category"] = driver.category.value
+        return ArtifactStore.make_key(descriptor)
+    
+    def _restore_cached_image(self, cache_key: str, output_path: str) -> bool:
+        """Deliver a cached patched image to output_path on a hit"""
+        if os.path.isdir(output_path):
+            # Cached entries are whole images; a USB file tree is built fresh
+            return False
+        
+        entry = self.image_cache.get(cache_key)
+        if entry is None:
+            self.logger.info(f"No cached image for key {cache_key[:12]}, patching from scratch")
+            return False
+        
+        if not self.image_cache.fetch(cache_key, "image.iso", output_path):
+            return False
+        
+        self.logger.info(f"Reused cached patched image {cache_key[:12]} -> {output_path}")
+        self.audit_logger.info(
+            f"Cached patched image {cache_key[:12]} delivered to {output_path} "
+            f"(bypasses: {', '.join(entry.metadata.get('bypasses', []))})"
+        )
+        return True
+    
     def _setup_workspace(self) -> bool:
         """Setup temporary workspace for image operations"""
         try:
@@ -464,26 +659,36 @@ class WinPatchEngine:
         """Extract Windows ISO to workspace"""
         try:
             self.logger.info(f"Extracting ISO: {iso_path}")
+            self.overlay_source = None
+            
+            if self._use_overlay_rebuild() and self._extract_overlay_inputs(iso_path):
+                return True
             
             if platform.system() == "Windows":
                 # Use 7-Zip or PowerShell on Windows
-                result = subprocess.run([
+                result = self.command_runner.run([
                     'powershell', '-Command',
                     f'Mount-DiskImage -ImagePath "{iso_path}" -PassThru | Get-Volume | Get-DiskImage | Get-Disk | Get-Partition | Get-Volume | Copy-Item -Destination "{self.temp_iso_dir}" -Recurse'
                 ], capture_output=True, text=True)
             else:
-                # Use mount on Linux/macOS
-                mount_point = self.workspace_dir / "iso_mount"
-                mount_point.mkdir(exist_ok=True)
-                
-                # Mount ISO
-                subprocess.run(['sudo', 'mount', '-o', 'loop', iso_path, str(mount_point)], check=True)
-                
-                # Copy contents
-                subprocess.run(['cp', '-r', f"{mount_point}/.", str(self.temp_iso_dir)], check=True)
-                
-                # Unmount
-                subprocess.run(['sudo', 'umount', str(mount_point)], check=True)
+                try:
+                    # Read the UDF/ISO9660 tree directly - no loop mount or root needed
+                    with ISOReader(iso_path) as reader:
+                        reader.extract(self.temp_iso_dir, workers=4)
+                except ISOReaderError as e:
+                    self.logger.warning(f"Native ISO extraction failed ({e}), falling back to loop mount")
+                    mount_point = self.workspace_dir / "iso_mount"
+                    mount_point.mkdir(exist_ok=True)
+                    
+                    # Mount ISO
+                    self.command_runner.run(['sudo', 'mount', '-o', 'loop', iso_path, str(mount_point)], check=True)
+                    
+                    # Copy contents
+                    self.command_runner.run(['cp', '-r', f"{mount_point}/.", str(self.temp_iso_dir)], check=True)
+                    
+                    # Unmount
+                    self.command_runner.run(['sudo', 'umount', str(mount_point)], check=True,
+                                            cancellable=False)
             
             # Verify sources directory exists
             sources_dir = self.temp_iso_dir / "sources"
@@ -612,30 +817,29 @@ class WinPatchEngine:
             
             self.logger.info("Patching boot.wim with bypass registry keys")
             
-            # Mount boot.wim
-            if not self._mount_wim_image(str(boot_wim_path), 2):  # Index 2 is Windows PE
+            # Open boot.wim for editing
+            if not self._begin_image_edit(str(boot_wim_path), [2]):  # Index 2 is Windows PE
                 return False
             
+            committed = False
             try:
                 # Load registry hive
                 system_hive = self.mount_dir / "Windows" / "System32" / "config" / "SYSTEM"
-                if not system_hive.exists():
+                if not self._image_has_file(str(boot_wim_path), 2, "Windows/System32/config/SYSTEM"):
                     self.logger.error("SYSTEM registry hive not found in boot.wim")
                     return False
                 
                 # Apply registry bypasses
-                for bypass_type in bypasses:
-                    bypass = next((b for b in self.bypass_database if b.bypass_type == bypass_type), None)
-                    if bypass and bypass.registry_keys:
-                        if self._apply_registry_bypass(bypass, system_hive):
-                            self.applied_bypasses.append(bypass)
-                            self.logger.info(f"Applied {bypass.name} to boot.wim")
+                for bypass in self._apply_registry_bypasses(bypasses, system_hive):
+                    self.applied_bypasses.append(bypass)
+                    self.logger.info(f"Applied {bypass.name} to boot.wim")
                 
-                return True
+                committed = True
+                return self._finish_image_edit(commit=True)
                 
             finally:
-                # Unmount and commit changes
-                self._unmount_wim_image(commit=True)
+                if not committed:
+                    self._finish_image_edit(commit=False)
             
         except Exception as e:
             self.logger.error(f"Failed to patch boot.wim: {e}")
@@ -643,7 +847,7 @@ class WinPatchEngine:
     
     def _patch_install_image(self, bypasses: List[WindowsBypassType], 
                            inject_drivers: bool, hardware: DetectedHardware,
-                           windows_version: str) -> bool:
+                           windows_version: str, editions: Optional[List[str]] = None) -> bool:
         """Patch install.wim/install.esd with bypasses and drivers"""
         try:
             # Find install image (WIM or ESD)
@@ -658,43 +862,227 @@ class WinPatchEngine:
                 self.logger.error("install.wim/install.esd not found")
                 return False
             
-            self.logger.info(f"Patching {install_path.name}")
-            
-            # Get image info to find Windows edition index
-            image_index = self._get_windows_edition_index(str(install_path), windows_version)
-            if not image_index:
+            # Work out which editions (image indexes) to patch
+            images = self._get_wim_images(str(install_path))
+            selected = self._select_editions(images, editions)
+            if not selected:
                 self.logger.error("Could not determine Windows edition index")
                 return False
             
-            # Mount install image
-            if not self._mount_wim_image(str(install_path), image_index):
-                return False
+            indexes = [image.index for image in selected]
+            self.logger.info(f"Patching {install_path.name} edition(s): "
+                             f"{', '.join(image.name or str(image.index) for image in selected)}")
             
-            try:
-                # Apply registry bypasses
-                system_hive = self.mount_dir / "Windows" / "System32" / "config" / "SYSTEM"
-                for bypass_type in bypasses:
-                    bypass = next((b for b in self.bypass_database if b.bypass_type == bypass_type), None)
-                    if bypass and bypass.registry_keys:
-                        self._apply_registry_bypass(bypass, system_hive)
-                
-                # Inject drivers if requested
-                if inject_drivers:
-                    self._inject_hardware_drivers(hardware, windows_version)
-                
-                # Apply any file modifications
-                self._apply_file_modifications(bypasses)
-                
-                return True
-                
-            finally:
-                # Unmount and commit changes
-                self._unmount_wim_image(commit=True)
+            if self._use_direct_wim_update():
+                # All editions share one staged overlay and per-edition hive copies
+                patched = self._patch_install_indexes(install_path, indexes, bypasses,
+                                                      inject_drivers, hardware, windows_version)
+            else:
+                # A WIM can only have one image mounted read-write at a time
+                patched = all(
+                    self._patch_install_indexes(install_path, [index], bypasses,
+                                                inject_drivers, hardware, windows_version)
+                    for index in indexes
+                )
+            
+            if patched:
+                self.patched_editions = selected
+                self._audit_patched_editions(install_path.name, selected, bypasses)
+            return patched
             
         except Exception as e:
             self.logger.error(f"Failed to patch install image: {e}")
             return False
     
+    def _patch_install_indexes(self, install_path: Path, indexes: List[int],
+                               bypasses: List[WindowsBypassType], inject_drivers: bool,
+                               hardware: DetectedHardware, windows_version: str) -> bool:
+        """Apply bypasses, drivers and file modifications to one edit of install.wim"""
+        for index in indexes:
+            self.image_progress.emit(install_path.name, index, "staging")
+        
+        # Open install image for editing
+        if not self._begin_image_edit(str(install_path), indexes):
+            return False
+        
+        committed = False
+        try:
+            # Apply registry bypasses
+            system_hive = self.mount_dir / "Windows" / "System32" / "config" / "SYSTEM"
+            self._apply_registry_bypasses(bypasses, system_hive)
+            
+            # Inject drivers if requested
+            if inject_drivers:
+                self._inject_hardware_drivers(hardware, windows_version)
+            
+            # Apply any file modifications
+            self._apply_file_modifications(bypasses)
+            
+            committed = True
+            return self._finish_image_edit(commit=True)
+            
+        finally:
+            if not committed:
+                self._finish_image_edit(commit=False)
+    
+    def _requested_editions(self, editions: Optional[List[str]]) -> Optional[List[str]]:
+        """Edition selectors from the caller or the windows_editions setting"""
+        requested = editions if editions is not None else self.config.get("windows_editions")
+        if isinstance(requested, (str, int)):
+            requested = [requested]
+        return list(requested) if requested else None
+    
+    def _select_editions(self, images: List[WimImageInfo],
+                         editions: Optional[List[str]] = None) -> List[WimImageInfo]:
+        """Images matching the requested editions, in index order"""
+        requested = self._requested_editions(editions)
+        if not images:
+            return []
+        if not requested:
+            return images[:1]
+        if any(str(selector).lower() == "all" for selector in requested):
+            return list(images)
+        
+        selected = [image for image in images
+                    if any(image.matches(selector) for selector in requested)]
+        for selector in requested:
+            matching = [image for image in images if image.matches(selector)]
+            if not matching:
+                self.logger.warning(f"No edition matching '{selector}' in install image")
+            elif len(matching) > 1:
+                # Patching every match could touch editions the caller never asked for
+                self.logger.error(f"Edition '{selector}' is ambiguous: "
+                                  f"{', '.join(f'{i.index} ({i.name})' for i in matching)}; "
+                                  f"select by index instead")
+                return []
+        return selected
+    
+    def _audit_patched_editions(self, image_name: str, editions: List[WimImageInfo],
+                                bypasses: List[WindowsBypassType]):
+        """One merged audit record for every edition patched in this session"""
+        self.audit_logger.info(f"EDITIONS_PATCHED: Session {self.bypass_session_id} ({image_name})")
+        for edition in editions:
+            label = edition.name or "unnamed image"
+            if edition.edition_id:
+                label += f" [{edition.edition_id}]"
+            self.audit_logger.info(f"  Index {edition.index}: {label}")
+        self.audit_logger.info(f"  Bypasses: {[b.value for b in bypasses]}")
+    
+    def _use_direct_wim_update(self) -> bool:
+        """Edit WIMs with batched wimlib updates instead of mount/commit cycles
+        
+        Native DISM keeps the mount path because driver injection needs a
+        mounted image; wimlib appends only the changed files to the WIM.
+        """
+        if not self.wimlib_path or self.dism_path not in (None, 'wimlib-imagex'):
+            return False
+        return bool(self.config.get("windows_direct_wim_update", True))
+    
+    def _begin_image_edit(self, wim_path: str, indexes: List[int]) -> bool:
+        """Prepare self.mount_dir as the place where image edits are written
+        
+        In direct update mode mount_dir is an empty overlay directory; every
+        file written there replaces or adds the same path inside the image
+        when the edit is finished.
+        """
+        if not self._use_direct_wim_update():
+            self.mount_dir = self.workspace_dir / "mount"
+            return self._mount_wim_image(wim_path, indexes[0])
+        
+        overlay_dir = self.workspace_dir / f"overlay_{Path(wim_path).stem}"
+        if overlay_dir.exists():
+            shutil.rmtree(overlay_dir)
+        overlay_dir.mkdir(parents=True)
+        
+        self.mount_dir = overlay_dir
+        self._pending_wim_update = (wim_path, list(indexes))
+        self.logger.info(f"Staging edits for {wim_path} index(es) {indexes} (direct update)")
+        return True
+    
+    def _finish_image_edit(self, commit: bool = True) -> bool:
+        """Write staged edits into the image, or discard them"""
+        if self._pending_wim_update is None:
+            return self._unmount_wim_image(commit=commit)
+        
+        wim_path, indexes = self._pending_wim_update
+        self._pending_wim_update = None
+        try:
+            if not commit:
+                self.logger.info(f"Discarded staged edits for {wim_path}")
+                return True
+            return self._apply_wim_updates(wim_path, indexes, self.mount_dir)
+        finally:
+            shutil.rmtree(self.mount_dir, ignore_errors=True)
+            for index in indexes:
+                shutil.rmtree(self._edition_overlay_dir(self.mount_dir, index), ignore_errors=True)
+    
+    def _apply_wim_updates(self, wim_path: str, indexes: List[int], overlay_dir: Path) -> bool:
+        """Add every file under overlay_dir to each image with one update per index
+        
+        wimlib-imagex update appends only the new file data and rewrites the
+        image metadata; unchanged resources are neither recompressed nor
+        recaptured. Identical files added to several indexes are stored once.
+        Files staged for a single edition (its registry hives) are added to
+        that index's update only.
+        """
+        shared = self._build_wim_update_commands(overlay_dir)
+        image_name = Path(wim_path).name
+        start_time = time.time()
+        updated = 0
+        for index in indexes:
+            edition_dir = self._edition_overlay_dir(overlay_dir, index)
+            commands = shared + (self._build_wim_update_commands(edition_dir)
+                                 if edition_dir.is_dir() else [])
+            if not commands:
+                continue
+            
+            # Updates append to the same WIM file, so they run one after another
+            self.image_progress.emit(image_name, index, "updating")
+            result = self.command_runner.run(
+                [self.wimlib_path, 'update', wim_path, str(index)],
+                input="\n".join(commands) + "\n", capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                self.image_progress.emit(image_name, index, "failed")
+                self.logger.error(f"Failed to update {wim_path} index {index}: {result.stderr}")
+                return False
+            self.image_progress.emit(image_name, index, "updated")
+            updated += 1
+        
+        if not updated:
+            self.logger.info(f"No changes staged for {wim_path}")
+            return True
+        
+        self.logger.info(f"Updated {len(shared)} shared file(s) in {wim_path} "
+                         f"index(es) {indexes} in {time.time() - start_time:.1f}s")
+        return True
+    
+    @staticmethod
+    def _edition_overlay_dir(overlay_dir: Path, index: int) -> Path:
+        """Staging directory for files that differ between editions"""
+        return overlay_dir.with_name(f"{overlay_dir.name}_{index}")
+    
+    def _build_wim_update_commands(self, overlay_dir: Path) -> List[str]:
+        """wimlib update 'add' commands mapping overlay files to image paths"""
+        commands = []
+        for source in sorted(overlay_dir.rglob("*")):
+            if source.is_file():
+                image_path = "/" + source.relative_to(overlay_dir).as_posix()
+                commands.append(f'add "{source}" "{image_path}"')
+        return commands
+    
+    def _image_has_file(self, wim_path: str, index: int, image_path: str) -> bool:
+        """Check that a file exists inside an image being edited"""
+        if self._pending_wim_update is None:
+            return (self.mount_dir / image_path).exists()
+        
+        # Reads only the image metadata, nothing is extracted
+        result = self.command_runner.run(
+            [self.wimlib_path, 'dir', wim_path, str(index), f'--path=/{image_path}'],
+            capture_output=True, text=True
+        )
+        return result.returncode == 0
+    
     def _mount_wim_image(self, wim_path: str, index: int) -> bool:
         """Mount WIM image using DISM or wimlib"""
         try:
@@ -714,7 +1102,7 @@ class WinPatchEngine:
                         wim_path, str(index), str(self.mount_dir)
                     ]
                 
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = self.command_runner.run(cmd, capture_output=True, text=True)
                 
                 if result.returncode != 0:
                     self.logger.error(f"Failed to mount WIM: {result.stderr}")
@@ -750,7 +1138,7 @@ class WinPatchEngine:
                     else:
                         cmd.append('/Discard')
                 
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = self.command_runner.run(cmd, capture_output=True, text=True, cancellable=False)
                 
                 if result.returncode != 0:
                     self.logger.error(f"Failed to unmount WIM: {result.stderr}")
@@ -765,6 +1153,110 @@ class WinPatchEngine:
             self.logger.error(f"Error unmounting WIM: {e}")
             return False
     
+    def _apply_registry_bypasses(self, bypass_types: List[WindowsBypassType],
+                                 system_hive: Path) -> List[WindowsBypass]:
+        """Write bypass registry values straight into the image's offline hives
+        
+        All values for one hive are applied in a single in-memory pass and the
+        hive is written back once. Bypasses whose hive cannot be edited fall
+        back to install-time registry scripts. Returns the bypasses applied.
+        """
+        bypasses = []
+        for bypass_type in bypass_types:
+            bypass = next((b for b in self.bypass_database if b.bypass_type == bypass_type), None)
+            if bypass and bypass.registry_keys:
+                bypasses.append(bypass)
+        
+        # hive name -> key path -> value name -> (type, value)
+        edits: Dict[str, Dict[str, Dict[str, Tuple[str, Any]]]] = {}
+        failed_hives = set()
+        for bypass in bypasses:
+            for reg_path, keys in bypass.registry_keys.items():
+                try:
+                    hive_name, key_path = split_registry_path(reg_path)
+                except RegistryHiveError:
+                    failed_hives.add(reg_path)
+                    continue
+                edits.setdefault(hive_name, {}).setdefault(key_path, {}).update(keys)
+        
+        per_edition = self._pending_wim_update is not None and len(self._pending_wim_update[1]) > 1
+        for hive_name, hive_edits in edits.items():
+            try:
+                if per_edition:
+                    count = self._apply_edition_hive_edits(hive_name, hive_edits)
+                else:
+                    count = apply_registry_edits(self._hive_for_edit(hive_name), hive_edits)
+                self.logger.info(f"Wrote {count} registry value(s) to offline {hive_name} hive")
+            except (RegistryHiveError, OSError) as e:
+                self.logger.warning(f"Offline {hive_name} hive edit failed ({e}), using registry scripts")
+                failed_hives.add(hive_name)
+                if self._pending_wim_update is not None:
+                    # Don't write an unedited copy back into the image
+                    roots = [self.mount_dir] + [self._edition_overlay_dir(self.mount_dir, index)
+                                                for index in self._pending_wim_update[1]]
+                    for root in roots:
+                        (root / "Windows" / "System32" / "config" / hive_name).unlink(missing_ok=True)
+        
+        applied = []
+        for bypass in bypasses:
+            targets = set()
+            for reg_path in bypass.registry_keys:
+                try:
+                    targets.add(split_registry_path(reg_path)[0])
+                except RegistryHiveError:
+                    targets.add(reg_path)
+            if targets & failed_hives and not self._apply_registry_bypass(bypass, system_hive):
+                continue
+            applied.append(bypass)
+        return applied
+    
+    def _hive_for_edit(self, hive_name: str) -> Path:
+        """Local path of an image hive; pulled out of the WIM in direct update mode"""
+        hive_path = self.mount_dir / "Windows" / "System32" / "config" / hive_name
+        if self._pending_wim_update is None or hive_path.exists():
+            if not hive_path.exists():
+                raise RegistryHiveError(f"{hive_name} hive not found in mounted image")
+            return hive_path
+        
+        wim_path, indexes = self._pending_wim_update
+        if len(indexes) != 1:
+            raise RegistryHiveError("Hive edits need a single image index")
+        return self._extract_image_hive(wim_path, indexes[0], hive_name, self.mount_dir)
+    
+    def _extract_image_hive(self, wim_path: str, index: int, hive_name: str, root: Path) -> Path:
+        """Extract one registry hive of an image below root, keeping its image path"""
+        hive_path = root / "Windows" / "System32" / "config" / hive_name
+        hive_path.parent.mkdir(parents=True, exist_ok=True)
+        result = self.command_runner.run(
+            [self.wimlib_path, 'extract', wim_path, str(index),
+             f'/Windows/System32/config/{hive_name}', f'--dest-dir={hive_path.parent}', '--no-acls'],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0 or not hive_path.exists():
+            raise RegistryHiveError(f"Could not extract {hive_name} hive from {wim_path} "
+                                    f"index {index}: {result.stderr}")
+        return hive_path
+    
+    def _apply_edition_hive_edits(self, hive_name: str,
+                                  hive_edits: Dict[str, Dict[str, Tuple[str, Any]]]) -> int:
+        """Edit every selected edition's own copy of a hive, several at a time
+        
+        Each edition has its own registry, so the hive is extracted into a
+        per-index staging directory and added to that index's update only.
+        """
+        wim_path, indexes = self._pending_wim_update
+        image_name = Path(wim_path).name
+        
+        def edit(index: int) -> int:
+            root = self._edition_overlay_dir(self.mount_dir, index)
+            count = apply_registry_edits(self._extract_image_hive(wim_path, index, hive_name, root),
+                                         hive_edits)
+            self.image_progress.emit(image_name, index, f"{hive_name} hive patched")
+            return count
+        
+        with ThreadPoolExecutor(max_workers=min(len(indexes), EDITION_WORKERS)) as pool:
+            return sum(pool.map(edit, indexes))
+    
     def _apply_registry_bypass(self, bypass: WindowsBypass, system_hive: Path) -> bool:
         """Apply registry bypass modifications using safe offline hive editing"""
         try:
@@ -907,20 +1399,15 @@ class WinPatchEngine:
             self.logger.info("Injecting hardware-specific drivers")
             
             # Find matching drivers for this hardware
-            compatible_drivers = []
-            
-            for driver in self.driver_database:
-                if windows_version in driver.compatible_windows:
-                    # Basic hardware matching - would be more sophisticated in real implementation
-                    if self._driver_matches_hardware(driver, hardware):
-                        compatible_drivers.append(driver)
+            compatible_drivers = self._find_compatible_drivers(hardware, windows_version)
             
             self.logger.info(f"Found {len(compatible_drivers)} compatible drivers")
             
             # Inject each driver
             for driver in compatible_drivers:
                 if self._inject_single_driver(driver):
-                    self.injected_drivers.append(driver)
+                    if driver not in self.injected_drivers:  # once per edition
+                        self.injected_drivers.append(driver)
                     self.logger.info(f"Injected driver: {driver.name}")
             
             return True
@@ -929,6 +1416,23 @@ class WinPatchEngine:
             self.logger.error(f"Failed to inject drivers: {e}")
             return False
     
+    def _find_compatible_drivers(self, hardware: DetectedHardware,
+                                 windows_version: str) -> List[DriverPackage]:
+        """Driver packages that would be injected for this hardware"""
+        repository = self.get_driver_repository()
+        if repository is not None:
+            # Real INF packages matched by hardware ID
+            return [self._repository_package(match, windows_version)
+                    for match in repository.match_hardware(hardware, architecture="x64")]
+        
+        compatible_drivers = []
+        for driver in self.driver_database:
+            if windows_version in driver.compatible_windows:
+                # Basic hardware matching - would be more sophisticated in real implementation
+                if self._driver_matches_hardware(driver, hardware):
+                    compatible_drivers.append(driver)
+        return compatible_drivers
+    
     def _driver_matches_hardware(self, driver: DriverPackage, hardware: DetectedHardware) -> bool:
         """Check if driver matches detected hardware"""
         # Simplified matching - real implementation would use hardware IDs
@@ -941,9 +1445,43 @@ class WinPatchEngine:
         
         return False
     
+    def get_driver_repository(self) -> Optional[DriverRepository]:
+        """Driver folders from windows_driver_repository, rescanned once per engine
+        
+        The scan is incremental, so only INF files added, changed or removed
+        since the last run are parsed.
+        """
+        if self._driver_repository is None:
+            roots = self.config.get("windows_driver_repository") or []
+            if isinstance(roots, str):
+                roots = [roots]
+            if not roots:
+                return None
+            index_path = self.config.get_cache_dir() / "drivers" / "driver_index.sqlite3"
+            self._driver_repository = DriverRepository(index_path, roots)
+            self._driver_repository.scan()
+        return self._driver_repository
+    
+    def _repository_package(self, match: DriverMatch, windows_version: str) -> DriverPackage:
+        """DriverPackage for a matched repository INF"""
+        category = INF_CLASS_CATEGORIES.get(match.driver.driver_class.lower(), "chipset")
+        return DriverPackage(
+            name=match.description or Path(match.driver.inf_path).stem,
+            category=DriverCategory(category),
+            version=match.driver.version,
+            hardware_id=match.hardware_id,
+            inf_path=match.driver.inf_path,
+            driver_files=list(match.driver.files),
+            compatible_windows=[windows_version]
+        )
+    
     def _inject_single_driver(self, driver: DriverPackage) -> bool:
         """Inject a single driver package using DISM"""
         try:
+            # Repository packages carry absolute INF paths, built-in ones bare file names
+            if os.path.isabs(driver.inf_path) or Path(driver.inf_path).is_file():
+                return self._inject_repository_driver(driver)
+            
             if not self.dism_path or self.dism_path == 'wimlib-imagex':
                 self.logger.warning("Driver injection requires DISM")
                 return False
@@ -957,6 +1495,61 @@ class WinPatchEngine:
             self.logger.error(f"Failed to inject driver {driver.name}: {e}")
             return False
     
+    def _inject_repository_driver(self, driver: DriverPackage) -> bool:
+        """Stage only this package's files, then add it to the image or the media
+        
+        DISM adds the driver to the mounted image's driver store. Without DISM
+        the package goes to $WinPEDriver$ on the install media, which Windows
+        Setup loads during installation.
+        """
+        inf_path = Path(driver.inf_path)
+        package_name = f"{inf_path.parent.name}_{inf_path.stem}"
+        use_dism = bool(self.dism_path) and self.dism_path != 'wimlib-imagex'
+        
+        if use_dism:
+            staging_dir = self.workspace_dir / "drivers" / package_name
+        else:
+            staging_dir = self.temp_iso_dir / MEDIA_DRIVER_DIR / package_name
+        
+        staged_inf = staging_dir / inf_path.name
+        if not staged_inf.exists() and not self._stage_repository_driver(driver, staging_dir):
+            return False
+        
+        if not use_dism:
+            self.logger.info(f"Staged {driver.name} for Windows Setup in {MEDIA_DRIVER_DIR}")
+            return True
+        
+        result = self.command_runner.run([
+            self.dism_path, f'/Image:{self.mount_dir}', '/Add-Driver', f'/Driver:{staged_inf}'
+        ], capture_output=True, text=True)
+        if result.returncode != 0:
+            self.logger.error(f"Failed to add driver {driver.name}: {result.stderr}")
+            return False
+        return True
+    
+    def _stage_repository_driver(self, driver: DriverPackage, staging_dir: Path) -> bool:
+        """Stage a repository package, rescanning once if it changed since it was indexed"""
+        repository = self.get_driver_repository()
+        if repository is None:
+            self.logger.warning(f"No driver repository configured for {driver.inf_path}")
+            return False
+        
+        for attempt in range(2):
+            inf = repository.current(driver.inf_path)
+            if inf is None:
+                self.logger.warning(f"Driver {driver.name} is no longer in the repository ({driver.inf_path})")
+                return False
+            try:
+                repository.stage(inf, staging_dir)
+                return True
+            except FileNotFoundError as e:
+                # Package changed between the index check and the copy
+                if attempt:
+                    raise
+                self.logger.info(f"Driver {driver.name} changed while staging ({e}), rescanning")
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        return False
+    
     def _apply_file_modifications(self, bypasses: List[WindowsBypassType]) -> bool:
         """Apply any file modifications for bypasses"""
         try:
@@ -982,26 +1575,28 @@ class WinPatchEngine:
             self.logger.error(f"Failed to apply file modifications: {e}")
             return False
     
-    def _get_windows_edition_index(self, wim_path: str, windows_version: str) -> Optional[int]:
-        """Get the appropriate Windows edition index from WIM/ESD"""
+    def _get_wim_images(self, wim_path: str) -> List[WimImageInfo]:
+        """Editions stored in a WIM/ESD; falls back to the first image when unknown"""
         try:
-            if self.dism_path:
+            if self.dism_path and self.dism_path != 'wimlib-imagex':
                 cmd = [self.dism_path, '/Get-WimInfo', f'/WimFile:{wim_path}']
-                if self.dism_path == 'wimlib-imagex':
-                    cmd = ['wimlib-imagex', 'info', wim_path]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    # Parse output to find appropriate edition (Pro, Home, etc.)
-                    # For now, return index 1 as default
-                    return 1
+            elif self.wimlib_path:
+                cmd = [self.wimlib_path, 'info', wim_path]
+            else:
+                return [WimImageInfo(1)]
             
-            return 1  # Default to first image
+            result = self.command_runner.run(cmd, capture_output=True, text=True)
+            if result.returncode == 0:
+                images = parse_wim_info(result.stdout or "")
+                if images:
+                    return images
+            
+            self.logger.warning(f"Could not list images in {wim_path}, using index 1")
+            return [WimImageInfo(1)]
             
         except Exception as e:
-            self.logger.error(f"Failed to get Windows edition index: {e}")
-            return None
+            self.logger.error(f"Failed to get Windows edition index: {e}, using index 1")
+            return [WimImageInfo(1)]
     
     def _setup_audit_logger(self) -> logging.Logger:
         """Setup dedicated audit logger for security-critical operations"""
@@ -1289,20 +1884,51 @@ class WinPatchEngine:
 </unattend>"""
     
     def _rebuild_iso(self, output_path: str) -> bool:
-        """Rebuild Windows ISO with patches applied"""
+        """Rebuild Windows ISO with patches applied
+        
+        Image files are written beside output_path and renamed over it, so an
+        existing file at output_path is replaced rather than rewritten in place.
+        """
+        if os.path.isdir(output_path):
+            return self._build_iso(output_path)
+        
+        output = Path(output_path)
+        temp_path = output.with_name(f".{output.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            if not self._build_iso(str(temp_path)):
+                return False
+            os.replace(temp_path, output)
+            self.logger.info(f"Patched image written to {output_path}")
+            return True
+        except OSError as e:
+            self.logger.error(f"Failed to write patched image {output_path}: {e}")
+            return False
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+    
+    def _build_iso(self, output_path: str) -> bool:
+        """Build the patched ISO (or USB file tree) at output_path"""
         try:
             self.logger.info("Rebuilding Windows ISO with patches")
             
+            if self.overlay_source:
+                if self._rebuild_iso_overlay(output_path):
+                    return True
+                # Full rebuild needs every file of the source image on disk
+                if not self._complete_extraction():
+                    return False
+            
             if platform.system() == "Windows":
                 # Use oscdimg on Windows
-                result = subprocess.run([
+                result = self.command_runner.run([
                     'oscdimg', '-n', '-m', '-b', 
                     str(self.temp_iso_dir / "boot" / "etfsboot.com"),
                     str(self.temp_iso_dir), output_path
                 ], capture_output=True, text=True)
             else:
                 # Use genisoimage on Linux/macOS
-                result = subprocess.run([
+                result = self.command_runner.run([
                     'genisoimage', '-iso-level', '4', '-udf', '-joliet',
                     '-b', 'boot/etfsboot.com', '-no-emul-boot',
                     '-boot-load-size', '8', '-hide', 'boot.catalog',
@@ -1320,6 +1946,67 @@ class WinPatchEngine:
             self.logger.error(f"Failed to rebuild ISO: {e}")
             return False
     
+    def _use_overlay_rebuild(self) -> bool:
+        """Rebuild by overlaying the source image instead of re-mastering it"""
+        if platform.system() == "Windows":
+            return False  # oscdimg path extracts through a mounted image
+        return bool(self.config.get("windows_overlay_rebuild", True))
+    
+    def _extract_overlay_inputs(self, iso_path: str) -> bool:
+        """Extract only the WIM images; the rest is streamed from the source at rebuild"""
+        try:
+            with ISOReader(iso_path) as reader:
+                if reader.filesystem != "udf" or not reader.exists("sources"):
+                    return False
+                wanted = [path for path in OVERLAY_EXTRACT_PATHS if reader.exists(path)]
+                if not wanted:
+                    return False
+                reader.extract(self.temp_iso_dir, wanted, workers=len(wanted),
+                               is_cancelled=lambda: self.is_cancelled)
+        except (ISOReaderError, OSError) as e:
+            self.logger.warning(f"Overlay extraction unavailable ({e}), extracting the full image")
+            return False
+        
+        self.overlay_source = iso_path
+        self.logger.info(f"Extracted {len(wanted)} image file(s) for overlay rebuild")
+        return True
+    
+    def _rebuild_iso_overlay(self, output_path: str) -> bool:
+        """Write the source image with the workspace files laid over it"""
+        builder = ISOOverlayBuilder(self.overlay_source)
+        for path in sorted(self.temp_iso_dir.rglob("*")):
+            if path.is_file():
+                builder.put(path.relative_to(self.temp_iso_dir).as_posix(), path)
+        
+        try:
+            if os.path.isdir(output_path):
+                # Mounted USB partition: write the merged tree, no intermediate ISO
+                builder.copy_tree(output_path, is_cancelled=lambda: self.is_cancelled)
+            else:
+                builder.write_image(output_path, is_cancelled=lambda: self.is_cancelled)
+        except InterruptedError:
+            raise
+        except (ISOOverlayError, ISOReaderError, OSError) as e:
+            self.logger.warning(f"Overlay rebuild failed ({e}), re-mastering the full image")
+            return False
+        
+        self.logger.info(f"Successfully created patched image: {output_path}")
+        return True
+    
+    def _complete_extraction(self) -> bool:
+        """Extract the files an overlay rebuild would have streamed, keeping patched ones"""
+        try:
+            with ISOReader(self.overlay_source) as reader:
+                missing = [entry.path for entry in reader.walk("/")
+                           if not entry.is_dir and not (self.temp_iso_dir / entry.path).exists()]
+                reader.extract(self.temp_iso_dir, missing, workers=4,
+                               is_cancelled=lambda: self.is_cancelled)
+            self.overlay_source = None
+            return True
+        except (ISOReaderError, OSError) as e:
+            self.logger.error(f"Failed to extract remaining ISO contents: {e}")
+            return False
+    
     def _cleanup_workspace(self):
         """Clean up temporary workspace"""
         try:
@@ -1350,6 +2037,10 @@ class WinPatchEngine:
                 }
                 for driver in self.injected_drivers
             ],
+            "patched_editions": [
+                {"index": edition.index, "name": edition.name, "edition_id": edition.edition_id}
+                for edition in self.patched_editions
+            ],
             "total_bypasses": len(self.applied_bypasses),
             "total_drivers": len(self.injected_drivers)
         }
@@ -0,0 +1,63 @@
+"""
+BootForge Engine Bridges
+Thin Qt adapters that re-emit core engine events as Qt signals, so GUI slots
+run on the GUI thread while the engines stay free of PyQt6.
+"""
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.core.disk_manager import DiskWriter, WriteProgress
+from src.core.usb_builder import StorageBuilder
+
+
+class _EngineBridge(QObject):
+    """Forwards same-named core signals to this object's Qt signals"""
+
+    FORWARDED_SIGNALS: tuple = ()
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        for name in self.FORWARDED_SIGNALS + ("finished",):
+            getattr(engine, name).connect(getattr(self, name).emit)
+
+    def isRunning(self) -> bool:
+        return self.engine.isRunning()
+
+    def wait(self, msecs=None) -> bool:
+        return self.engine.wait(msecs)
+
+
+class StorageBuilderBridge(_EngineBridge):
+    """Qt view of a StorageBuilder"""
+
+    progress_updated = pyqtSignal(object)  # BuildProgress
+    operation_completed = pyqtSignal(bool, str)
+    operation_started = pyqtSignal(str)
+    log_message = pyqtSignal(str, str)  # level, message
+    finished = pyqtSignal()
+
+    FORWARDED_SIGNALS = ("progress_updated", "operation_completed", "operation_started", "log_message")
+
+    def __init__(self, builder: StorageBuilder, parent=None):
+        super().__init__(builder, parent)
+
+    def cancel_build(self):
+        self.engine.cancel_build()
+
+
+class DiskWriterBridge(_EngineBridge):
+    """Qt view of a DiskWriter"""
+
+    progress_updated = pyqtSignal(WriteProgress)
+    operation_completed = pyqtSignal(bool, str)  # success, message
+    operation_started = pyqtSignal(str)  # operation description
+    finished = pyqtSignal()
+
+    FORWARDED_SIGNALS = ("progress_updated", "operation_completed", "operation_started")
+
+    def __init__(self, writer: DiskWriter, parent=None):
+        super().__init__(writer, parent)
+
+    def cancel_operation(self):
+        self.engine.cancel_operation()
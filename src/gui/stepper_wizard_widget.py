@@ -242,9 +242,10 @@ class HardwareDetectionWorker(QThread):
     detection_failed = pyqtSignal(str)  # error_message
     detection_cancelled = pyqtSignal()
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, force_refresh: bool = False):
         super().__init__(parent)
         self.hardware_detector = HardwareDetector()
+        self.force_refresh = force_refresh
         self.hardware_matcher = HardwareMatcher()
         self.vendor_db = VendorDatabase()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
@@ -275,7 +276,7 @@ class HardwareDetectionWorker(QThread):
             
             # Step 2: Detect hardware
             self.detection_progress.emit("Scanning system hardware...", 30)
-            detected_hardware = self.hardware_detector.detect_hardware()
+            detected_hardware = self.hardware_detector.detect_hardware(force_refresh=self.force_refresh)
             
             if self._check_cancelled():
                 return
@@ -555,7 +556,7 @@ class HardwareDetectionStepView(StepView):
                 background-color: #4c2a85;
             }
         """)
-        self.redetect_button.clicked.connect(self._start_detection)
+        self.redetect_button.clicked.connect(lambda: self._start_detection(force_refresh=True))
         redetect_layout.addWidget(self.redetect_button)
         
         redetect_layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
@@ -566,8 +567,8 @@ class HardwareDetectionStepView(StepView):
         self.results_group.setVisible(False)
         self.content_layout.addWidget(self.results_group)
     
-    def _start_detection(self):
-        """Start hardware detection using worker thread"""
+    def _start_detection(self, force_refresh: bool = False):
+        """Start hardware detection using worker thread (force_refresh bypasses the detection cache)"""
         self.logger.info("Starting hardware detection...")
         
         # Update UI state for detection
@@ -581,7 +582,7 @@ class HardwareDetectionStepView(StepView):
         self.results_group.setVisible(False)
         
         # Create and configure worker thread
-        self.detection_worker = HardwareDetectionWorker()
+        self.detection_worker = HardwareDetectionWorker(force_refresh=force_refresh)
         
         # Connect signals
         self.detection_worker.detection_started.connect(self._on_detection_started)
@@ -28,6 +28,7 @@ from src.core.config import Config
 from src.core.hardware_detector import HardwareDetector, DetectedHardware, DetectionConfidence
 from src.core.hardware_matcher import HardwareMatcher, ProfileMatch
 from src.gui.os_image_widget import OSImageSelectionWidget
+from src.gui.engine_bridges import StorageBuilderBridge
 
 
 class RecipeSelectionWidget(QWidget):
@@ -954,6 +955,12 @@ class USBRecipeManagerWidget(QWidget):
         
         # File selection
         self.files_widget.files_updated.connect(self._on_files_updated)
+        
+        # Build engine events, delivered on the GUI thread
+        self.build_bridge = StorageBuilderBridge(self.storage_builder.builder, self)
+        self.build_bridge.progress_updated.connect(self.progress_widget.update_progress)
+        self.build_bridge.log_message.connect(self.progress_widget.add_log_message)
+        self.build_bridge.operation_completed.connect(self._on_build_completed)
     
     def _refresh_devices(self):
         """Refresh USB device list"""
@@ -1182,18 +1189,13 @@ class USBRecipeManagerWidget(QWidget):
             assert self.selected_device is not None
             assert self.selected_profile is not None
             
-            builder = self.storage_builder.create_deployment_usb(
+            self.storage_builder.create_deployment_usb(
                 self.selected_recipe,
                 self.selected_device,
                 self.selected_profile,
                 self.source_files
             )
             
-            # Connect signals
-            builder.progress_updated.connect(self.progress_widget.update_progress)
-            builder.log_message.connect(self.progress_widget.add_log_message)
-            builder.operation_completed.connect(self._on_build_completed)
-            
             # Update UI state
             self.build_btn.setEnabled(False)
             self.cancel_btn.setEnabled(True)
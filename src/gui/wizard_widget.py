@@ -21,6 +21,7 @@ from PyQt6.QtGui import QFont, QPixmap, QPalette
 
 from src.core.disk_manager import DiskManager, DiskInfo, WriteProgress
 from src.gui.stepper_header import StepperHeader, create_stepper_header
+from src.gui.engine_bridges import DiskWriterBridge
 from src.gui.stepper_wizard import WizardController, WizardStep
 
 
@@ -772,19 +773,21 @@ class BootForgeWizard(QWidget):
         self.back_button.setEnabled(False)
         self.next_button.setEnabled(False)
         
+        # Writer events reach the widgets through a Qt bridge (GUI thread)
+        if self.operation_thread is None:
+            self.operation_thread = DiskWriterBridge(self.disk_manager.writer, self)
+            self.operation_thread.progress_updated.connect(self.progress_page.update_progress)
+            self.operation_thread.progress_updated.connect(self.progress_updated.emit)
+            self.operation_thread.operation_started.connect(self._handle_operation_started)
+            self.operation_thread.operation_completed.connect(self._handle_operation_completed)
+        
         # Start operation thread
-        self.operation_thread = self.disk_manager.write_image_to_device(
+        self.disk_manager.write_image_to_device(
             self.wizard_data["image_path"],
             self.wizard_data["target_device"],
-            self.wizard_data["verify_after_write"],
-            self.progress_page.update_progress
+            self.wizard_data["verify_after_write"]
         )
         
-        # Connect signals
-        self.operation_thread.progress_updated.connect(self.progress_updated.emit)
-        self.operation_thread.operation_started.connect(self._handle_operation_started)
-        self.operation_thread.operation_completed.connect(self._handle_operation_completed)
-        
         # Emit started signal
         device_name = self.wizard_data.get("device_info", {}).get("name", "device")
         self.operation_started.emit(f"Writing image to {device_name}")
@@ -0,0 +1,156 @@
+"""Tests for the content-addressed artifact store and the patched-image cache."""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from src.core.artifact_store import ArtifactStore
+from src.core.config import Config
+from src.core.hardware_detector import DetectedHardware
+from src.core.win_patch_engine import WinPatchEngine, WindowsBypassType
+
+
+def _write(path: Path, size: int, fill: bytes = b"x") -> str:
+    path.write_bytes(fill * size)
+    return str(path)
+
+
+def test_put_get_and_fetch_round_trip(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path / "store", max_bytes=1024)
+    key = ArtifactStore.make_key({"iso": "abc", "bypasses": ["tpm"]})
+    source = _write(tmp_path / "image.iso", 100)
+
+    entry = store.put(key, {"image.iso": source}, metadata={"windows_version": "11"})
+
+    assert entry is not None and entry.size_bytes == 100
+    assert store.get(key).metadata == {"windows_version": "11"}
+    assert store.fetch(key, "image.iso", str(tmp_path / "out" / "copy.iso"))
+    assert (tmp_path / "out" / "copy.iso").read_bytes() == b"x" * 100
+    assert not store.fetch("0" * 64, "image.iso", str(tmp_path / "missing.iso"))
+    assert ArtifactStore.make_key({"b": 1, "a": 2}) == ArtifactStore.make_key({"a": 2, "b": 1})
+
+
+def test_store_keeps_private_copies_and_drops_corrupted_entries(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path / "store", max_bytes=1024)
+    source = tmp_path / "output.iso"
+    _write(source, 100)
+    mode = source.stat().st_mode
+
+    entry = store.put("f" * 64, {"image.iso": str(source)})
+
+    # The caller's file is neither shared with the store nor made read-only
+    assert not os.path.samefile(source, entry.file("image.iso"))
+    assert source.stat().st_mode == mode
+    _write(source, 100, b"z")
+    assert store.fetch("f" * 64, "image.iso", str(source))
+    assert source.read_bytes() == b"x" * 100
+    assert not os.path.samefile(source, entry.file("image.iso"))
+
+    # Same-size damage is caught by the digest on fetch, other damage by the size on get
+    cached = entry.file("image.iso")
+    cached.chmod(0o644)
+    _write(cached, 100, b"y")
+    assert not store.fetch("f" * 64, "image.iso", str(tmp_path / "copy.iso"))
+    assert not store.contains("f" * 64)
+    assert not (tmp_path / "copy.iso").exists()
+
+    entry = store.put("f" * 64, {"image.iso": str(source)})
+    entry.file("image.iso").chmod(0o644)
+    _write(entry.file("image.iso"), 50)
+    assert store.get("f" * 64) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path / "store", max_bytes=250)
+    for name in ("a", "b"):
+        store.put(name * 64, {"f": _write(tmp_path / name, 100)})
+        os.utime(tmp_path / name)
+    store.get("a" * 64)  # "b" is now the least recently used entry
+
+    store.put("c" * 64, {"f": _write(tmp_path / "c", 100)})
+
+    assert store.contains("a" * 64)
+    assert not store.contains("b" * 64)
+    assert store.contains("c" * 64)
+    assert store.total_size() == 200
+
+
+def test_artifact_larger_than_budget_is_not_cached(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path / "store", max_bytes=10)
+
+    assert store.put("d" * 64, {"f": _write(tmp_path / "big", 11)}) is None
+    assert store.entries() == []
+
+
+def test_file_digest_is_memoized_until_file_changes(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path / "store", max_bytes=1024)
+    source = tmp_path / "source.iso"
+    _write(source, 10)
+
+    first = store.file_digest(str(source))
+    assert ArtifactStore(tmp_path / "store", max_bytes=1024).file_digest(str(source)) == first
+
+    _write(source, 10, b"y")
+    os.utime(source, ns=(0, 1))
+    assert store.file_digest(str(source)) != first
+
+
+def test_digest_memo_keeps_only_recently_used_files(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("src.core.artifact_store.DIGEST_MEMO_MAX_ENTRIES", 4)
+    store = ArtifactStore(tmp_path / "store", max_bytes=1024)
+    sources = [_write(tmp_path / f"source{i}.iso", 10 + i) for i in range(6)]
+
+    for source in sources[:4]:
+        store.file_digest(source)
+    store.file_digest(sources[0])  # Old enough to be refreshed
+    for source in sources[4:]:
+        store.file_digest(source)
+
+    memo = json.loads((tmp_path / "store" / "digests.json").read_text())
+    assert [key.split("|")[0] for key in memo] == [str(Path(s).resolve()) for s in
+                                                   (sources[3], sources[0], sources[4], sources[5])]
+
+
+def test_concurrent_writers_of_one_key_share_a_single_entry(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path / "store", max_bytes=10 * 1024)
+    key = "e" * 64
+    sources = [_write(tmp_path / f"src{i}", 512) for i in range(4)]
+    results = []
+
+    threads = [threading.Thread(target=lambda s=s: results.append(store.put(key, {"f": s})))
+               for s in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result is not None for result in results)
+    assert [entry.key for entry in store.entries()] == [key]
+    assert list(store.scratch_dir.iterdir()) == []
+
+
+def test_patch_engine_reuses_cached_image(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    engine = WinPatchEngine(Config())
+    monkeypatch.setattr(engine, "_validate_bypass_safety", lambda bypasses, hardware: True)
+    # Any attempt to patch from scratch fails, so success proves a cache hit
+    monkeypatch.setattr(engine, "_setup_workspace", lambda: False)
+
+    iso_path = _write(tmp_path / "win11.iso", 64)
+    hardware = DetectedHardware(cpu_name="Intel Core i5-4570", total_ram_gb=4.0)
+    bypasses = [WindowsBypassType.TPM_BYPASS, WindowsBypassType.CPU_BYPASS]
+    output = tmp_path / "patched.iso"
+
+    assert not engine.patch_windows_image(iso_path, hardware, "11", str(output), bypasses)
+
+    key = engine._image_cache_key(iso_path, hardware, "11", bypasses, True)
+    engine.image_cache.put(key, {"image.iso": _write(tmp_path / "built.iso", 32, b"p")},
+                           metadata={"bypasses": ["cpu_bypass", "tpm_bypass"]})
+
+    assert engine.patch_windows_image(iso_path, hardware, "11", str(output), list(reversed(bypasses)))
+    assert output.read_bytes() == b"p" * 32
+
+    # A different bypass set misses the cache
+    assert not engine.patch_windows_image(iso_path, hardware, "11", str(output),
+                                          [WindowsBypassType.TPM_BYPASS])
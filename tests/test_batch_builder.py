@@ -0,0 +1,168 @@
+"""Tests for the headless batch build orchestrator."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core.batch_builder import (
+    BatchBuilder, BatchJobStatus, BatchManifest, HubBandwidthGovernor, resolve_usb_hub
+)
+from src.core.usb_builder import StorageBuilderEngine
+
+LINUX_RECIPE = "Linux Automated Installation"
+
+
+class RecordingBuilder:
+    """Stands in for StorageBuilder so no device is touched"""
+
+    prepared = []
+    built = []
+    lock = threading.Lock()
+    fail_devices = set()
+
+    def __init__(self) -> None:
+        self.is_cancelled = False
+        self.build_successful = False
+        self.build_log = []
+        self.build_timings = {}
+        self.source_digests = {}
+        self.payload_staging_dir = None
+
+    def configure_build(self, recipe, target_device, hardware_profile, source_files, grub_config=None) -> None:
+        self.target_device = target_device
+        self.source_files = source_files
+
+    def prepare_sources(self, workspace: Path) -> bool:
+        RecordingBuilder.prepared.append(dict(self.source_files))
+        self.source_digests = {name: "digest" for name in self.source_files}
+        return True
+
+    def use_prepared_sources(self, source_digests, payload_staging_dir=None) -> None:
+        self.source_digests = dict(source_digests)
+
+    def cancel_build(self) -> None:
+        self.is_cancelled = True
+
+    def run(self) -> None:
+        time.sleep(0.05)
+        with RecordingBuilder.lock:
+            RecordingBuilder.built.append(self.target_device)
+        if self.target_device in RecordingBuilder.fail_devices:
+            self.build_log.append("[12:00:00] ERROR: Formatting failed")
+        else:
+            self.build_successful = True
+            self.build_timings = {"finalize": 0.01}
+
+
+@pytest.fixture(scope="module")
+def engine() -> StorageBuilderEngine:
+    return StorageBuilderEngine()
+
+
+@pytest.fixture(autouse=True)
+def reset_recorder() -> None:
+    RecordingBuilder.prepared = []
+    RecordingBuilder.built = []
+    RecordingBuilder.fail_devices = set()
+
+
+def _manifest(tmp_path: Path, devices, **extra) -> BatchManifest:
+    iso = tmp_path / "ubuntu.iso"
+    iso.write_bytes(b"iso")
+    data = {
+        "defaults": {"recipe": LINUX_RECIPE, "hardware_profile": "generic_x64",
+                     "source_files": {"linux_iso": "ubuntu.iso"}},
+        "jobs": [{"device": device} for device in devices],
+    }
+    data.update(extra)
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(data))
+    return BatchManifest.load(str(path))
+
+
+def test_manifest_defaults_and_validation(tmp_path: Path) -> None:
+    manifest = _manifest(tmp_path, ["/dev/sdb", "/dev/sdc"])
+
+    assert [job.job_id for job in manifest.jobs] == ["job-001", "job-002"]
+    assert manifest.jobs[0].source_files["linux_iso"] == str(tmp_path / "ubuntu.iso")
+
+    with pytest.raises(ValueError):
+        BatchManifest.from_dict({"jobs": [{"recipe": LINUX_RECIPE, "hardware_profile": "generic_x64"}]})
+
+
+def test_identical_inputs_share_preparation(tmp_path: Path, engine) -> None:
+    manifest = _manifest(tmp_path, ["hub1/sdb", "hub1/sdc", "hub2/sdd"],
+                         bandwidth={"per_stick_mbps": 100, "per_hub_mbps": 1000})
+    report = BatchBuilder(manifest, engine=engine, builder_factory=RecordingBuilder,
+                          workspace=tmp_path / "work").run()
+
+    assert report.success
+    assert len(RecordingBuilder.prepared) == 1
+    assert [r.prep_shared for r in report.results].count(False) == 1
+    assert all(r.source_digests == {"linux_iso": "digest"} for r in report.results)
+    assert sorted(RecordingBuilder.built) == ["hub1/sdb", "hub1/sdc", "hub2/sdd"]
+
+
+def test_failures_and_missing_devices_are_reported(tmp_path: Path, engine) -> None:
+    RecordingBuilder.fail_devices = {"hub1/sdc"}
+    manifest = _manifest(tmp_path, ["hub1/sdb", "hub1/sdc"])
+    manifest.jobs[0].device = None
+    manifest.jobs[0].device_serial = "NOT-PLUGGED-IN"
+
+    batch = BatchBuilder(manifest, engine=engine, builder_factory=RecordingBuilder,
+                         workspace=tmp_path / "work")
+    batch.resolve_devices = lambda: {}
+    report = batch.run()
+
+    statuses = {r.job_id: r.status for r in report.results}
+    assert statuses == {"job-001": BatchJobStatus.SKIPPED, "job-002": BatchJobStatus.FAILED}
+    assert report.results[1].message == "Formatting failed"
+
+    report_path = tmp_path / "report.json"
+    report.write(str(report_path))
+    assert json.loads(report_path.read_text())["jobs"][1]["status"] == "failed"
+
+
+def test_hub_budget_limits_concurrent_builds() -> None:
+    governor = HubBandwidthGovernor(default_budget_mbps=40)
+    assert governor.acquire("usb1", 30)
+    assert governor.acquire("usb2", 30)
+
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: governor.acquire("usb1", 30) and admitted.set())
+    waiter.start()
+    assert not admitted.wait(0.2)
+
+    governor.release("usb1", 30)
+    waiter.join(timeout=2)
+    assert admitted.is_set()
+
+
+def test_hub_admission_counts_builds_not_float_sums() -> None:
+    governor = HubBandwidthGovernor(default_budget_mbps=40)
+    for mbps in (0.1, 0.2):
+        assert governor.acquire("usb1", mbps)
+    for mbps in (0.1, 0.2):
+        governor.release("usb1", mbps)
+    # 0.1 + 0.2 - 0.1 - 0.2 leaves a float residue; the idle hub must still admit an oversized build
+    assert governor.active_builds("usb1") == 0 and governor.in_use("usb1") == 0.0
+    assert governor.acquire("usb1", 500, lambda: governor.active_builds("usb1") > 0)
+
+    # Work without a device is never charged
+    assert governor.acquire(None, 500) and governor.acquire("", 500)
+    governor.release(None, 500)
+    assert governor.in_use("") == 0.0 and governor.active_builds("") == 0
+
+
+def test_resolve_usb_hub_from_sysfs(tmp_path: Path) -> None:
+    device_dir = (tmp_path / "devices/pci0000:00/0000:00:14.0/usb2/2-1/2-1.3/2-1.3:1.0"
+                  / "host6/target6:0:0/6:0:0:0/block/sdb")
+    device_dir.mkdir(parents=True)
+    (tmp_path / "block").mkdir()
+    (tmp_path / "block/sdb").symlink_to(device_dir)
+
+    assert resolve_usb_hub("/dev/sdb1", str(tmp_path)) == "2-1"
+    assert resolve_usb_hub("/dev/sdz", str(tmp_path)) == "default"
@@ -0,0 +1,99 @@
+"""Tests for the build dependency graph executor."""
+
+import threading
+import time
+
+import pytest
+
+from src.core.build_graph import BuildGraph, TaskLane, TaskState
+
+
+def test_tasks_run_after_their_dependencies() -> None:
+    order = []
+    graph = BuildGraph(max_workers=4)
+    graph.add_task("deploy", lambda: order.append("deploy") or True, ["mount", "stage"])
+    graph.add_task("mount", lambda: order.append("mount") or True, lane=TaskLane.DEVICE)
+    graph.add_task("stage", lambda: order.append("stage") or True)
+
+    result = graph.run()
+
+    assert result.success
+    assert order[-1] == "deploy"
+    assert set(result.timings) == {"deploy", "mount", "stage"}
+
+
+def test_prep_work_overlaps_device_work() -> None:
+    device_started = threading.Event()
+    overlapped = []
+
+    def device_op() -> bool:
+        device_started.set()
+        time.sleep(0.2)
+        return True
+
+    def prep_op() -> bool:
+        overlapped.append(device_started.wait(timeout=1.0))
+        return True
+
+    graph = BuildGraph(max_workers=2)
+    graph.add_task("format", device_op, lane=TaskLane.DEVICE)
+    graph.add_task("extract", prep_op)
+
+    assert graph.run().success
+    assert overlapped == [True]
+
+
+def test_device_lane_is_serialized() -> None:
+    active = []
+    peak = []
+
+    def device_op() -> bool:
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+        return True
+
+    graph = BuildGraph(max_workers=4)
+    for name in ("a", "b", "c"):
+        graph.add_task(name, device_op, lane=TaskLane.DEVICE)
+
+    assert graph.run().success
+    assert max(peak) == 1
+
+
+def test_failure_skips_downstream_tasks() -> None:
+    graph = BuildGraph()
+    graph.add_task("partition", lambda: False, lane=TaskLane.DEVICE)
+    graph.add_task("deploy", lambda: True, ["partition"])
+
+    result = graph.run()
+
+    assert not result.success
+    assert result.failed_task == "partition"
+    assert graph.tasks["deploy"].state == TaskState.SKIPPED
+
+
+def test_cancellation_stops_scheduling() -> None:
+    cancelled = threading.Event()
+    graph = BuildGraph(is_cancelled=cancelled.is_set)
+    graph.add_task("first", lambda: cancelled.set() or True)
+    graph.add_task("second", lambda: True, ["first"])
+
+    result = graph.run()
+
+    assert result.cancelled
+    assert graph.tasks["second"].state == TaskState.SKIPPED
+
+
+def test_cycles_and_unknown_dependencies_are_rejected() -> None:
+    graph = BuildGraph()
+    graph.add_task("a", lambda: True, ["b"])
+    graph.add_task("b", lambda: True, ["a"])
+    with pytest.raises(ValueError):
+        graph.run()
+
+    graph = BuildGraph()
+    graph.add_task("a", lambda: True, ["missing"])
+    with pytest.raises(ValueError):
+        graph.topological_order()
@@ -0,0 +1,96 @@
+"""Tests for the shared asynchronous command runner."""
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.core.command_runner import CommandRunner, command_name
+
+PYTHON = sys.executable
+
+
+def test_output_is_captured_and_streamed_line_by_line() -> None:
+    lines = []
+    runner = CommandRunner(output_callback=lambda name, stream, line: lines.append((stream, line)))
+
+    result = runner.run([PYTHON, "-c",
+                         "import sys; print('one'); sys.stdout.write('10%\\r20%\\r'); "
+                         "sys.stderr.write('warn\\n'); sys.exit(3)"])
+
+    assert result.returncode == 3
+    assert result.stdout.startswith("one")
+    assert result.stderr == "warn\n"
+    assert ("stdout", "20%") in lines
+    assert ("stderr", "warn") in lines
+
+
+def test_independent_commands_run_concurrently() -> None:
+    runner = CommandRunner()
+    start = time.monotonic()
+
+    results = runner.run_many([[PYTHON, "-c", "import time; time.sleep(0.5)"]] * 4)
+
+    assert [r.returncode for r in results] == [0, 0, 0, 0]
+    assert time.monotonic() - start < 1.5
+
+
+def test_cancellation_terminates_running_command() -> None:
+    cancelled = threading.Event()
+    runner = CommandRunner(is_cancelled=cancelled.is_set)
+    threading.Timer(0.2, cancelled.set).start()
+    start = time.monotonic()
+
+    result = runner.run([PYTHON, "-c", "import time; time.sleep(30)"])
+
+    assert result.cancelled
+    assert result.returncode != 0
+    assert time.monotonic() - start < 5
+
+    # Cleanup commands still run after the build was cancelled
+    assert runner.run([PYTHON, "-c", "pass"], cancellable=False).returncode == 0
+
+
+def test_timeouts_and_checks_behave_like_subprocess_run() -> None:
+    runner = CommandRunner()
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run([PYTHON, "-c", "import time; time.sleep(30)"], timeout=0.3)
+    with pytest.raises(subprocess.CalledProcessError):
+        runner.run([PYTHON, "-c", "raise SystemExit(1)"], check=True)
+    with pytest.raises(FileNotFoundError):
+        runner.run(["bootforge-no-such-tool"])
+
+
+def test_stdin_is_fed_alongside_the_timeout_and_output_readers(capfd) -> None:
+    runner = CommandRunner()
+    big_input = "x" * (4 * 1024 * 1024)
+
+    echoed = runner.run([PYTHON, "-c", "import sys; sys.stdout.write(sys.stdin.read())"], input=big_input)
+    assert echoed.stdout == big_input
+
+    # A child that never reads its input still times out
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run([PYTHON, "-c", "import time; time.sleep(30)"], input=big_input, timeout=0.5)
+    assert time.monotonic() - start < 5
+
+    # A child that exits without reading is not an error, as with subprocess.run
+    assert runner.run([PYTHON, "-c", "raise SystemExit(4)"], input=big_input).returncode == 4
+
+    uncaptured = runner.run([PYTHON, "-c", "print('to the terminal')"], capture_output=False)
+    assert (uncaptured.returncode, uncaptured.stdout, uncaptured.stderr) == (0, None, None)
+    assert "to the terminal" in capfd.readouterr().out
+
+
+def test_latency_metrics_are_recorded_per_tool() -> None:
+    runner = CommandRunner()
+    runner.run([PYTHON, "-c", "pass"])
+    runner.run([PYTHON, "-c", "raise SystemExit(2)"])
+
+    stats = runner.metrics[command_name([PYTHON])]
+    assert stats.calls == 2
+    assert stats.failures == 1
+    assert stats.max_seconds >= stats.mean_seconds > 0
+    assert command_name(["sudo", "/sbin/mkfs.fat", "-F", "32"]) == "mkfs.fat"
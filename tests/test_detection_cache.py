@@ -0,0 +1,96 @@
+"""Tests for the shared, disk-backed hardware detection cache."""
+
+import threading
+import time
+from pathlib import Path
+
+from src.core.detection_cache import DetectionCache, hotplug_stamp, machine_fingerprint
+from src.core.hardware_detector import DetectedHardware, HardwareDetector
+
+
+def _fake_root(root: Path) -> Path:
+    for path, text in [("proc/sys/kernel/random/boot_id", "boot-1\n"), ("etc/machine-id", "machine-1\n"),
+                       ("sys/block/nvme0n1/size", "1\n"), ("sys/class/net/eth0/address", "aa\n")]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+    return root
+
+
+class CountingDetect:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self) -> DetectedHardware:
+        self.calls += 1
+        time.sleep(self.delay)
+        return DetectedHardware(platform="linux", system_model=f"run {self.calls}")
+
+
+def test_cache_hits_until_reboot_hotplug_or_ttl(tmp_path: Path) -> None:
+    root = _fake_root(tmp_path / "root")
+    cache_file = tmp_path / "detection.pickle"
+    detect = CountingDetect()
+    cache = DetectionCache(cache_file, root=root)
+
+    first = cache.get_or_detect(detect)
+    first.system_model = "edited by a caller"
+    assert cache.get_or_detect(detect).system_model == "run 1"
+    # A new process reads the detection back from disk
+    assert DetectionCache(cache_file, root=root).get_or_detect(detect).system_model == "run 1"
+    assert detect.calls == 1
+
+    (root / "sys/block/sdb").mkdir()
+    assert cache.get_or_detect(detect).system_model == "run 2"
+    (root / "proc/sys/kernel/random/boot_id").write_text("boot-2\n")
+    assert cache.get_or_detect(detect).system_model == "run 3"
+    assert cache.get_or_detect(detect, force_refresh=True).system_model == "run 4"
+
+    expired = DetectionCache(cache_file, ttl=0, root=root)
+    assert expired.get_or_detect(detect).system_model == "run 5"
+    cache.invalidate()
+    assert not cache_file.exists()
+    assert cache.get_or_detect(detect).system_model == "run 6"
+
+    assert machine_fingerprint(root) == "machine-1|boot-2"
+    assert hotplug_stamp(root) != hotplug_stamp(tmp_path)
+
+
+def test_concurrent_callers_share_one_detection(tmp_path: Path) -> None:
+    cache = DetectionCache(tmp_path / "detection.pickle", root=_fake_root(tmp_path / "root"))
+    detect = CountingDetect(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_detect(detect))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert detect.calls == 1
+    assert [hardware.system_model for hardware in results] == ["run 1"] * 4
+    assert len({id(hardware) for hardware in results}) == 4
+
+
+def test_hardware_detector_uses_the_cache(tmp_path: Path) -> None:
+    cache = DetectionCache(tmp_path / "detection.pickle", root=_fake_root(tmp_path / "root"))
+    detector = HardwareDetector(cache=cache)
+    first = detector.detect_hardware()
+    assert first is not None
+    assert HardwareDetector(cache=cache).detect_hardware().detection_time == first.detection_time
+    assert detector.detect_hardware(force_refresh=True).detection_time != first.detection_time
+
+
+def test_disk_copy_is_private_and_leaves_out_identifiers(tmp_path: Path) -> None:
+    cache_file = tmp_path / "detection.pickle"
+    root = _fake_root(tmp_path / "root")
+    detected = DetectedHardware(platform="linux", system_serial="C02XYZ",
+                                network_adapters=[{"name": "eth0", "mac_address": "aa:bb:cc:dd:ee:ff"}],
+                                raw_data={"probe_timings": {"cpu": {}}, "ioreg": "IOPlatformSerialNumber"})
+
+    assert DetectionCache(cache_file, root=root).get_or_detect(lambda: detected).system_serial == "C02XYZ"
+    assert cache_file.stat().st_mode & 0o777 == 0o600
+
+    restored = DetectionCache(cache_file, root=root).get_or_detect(lambda: None)
+    assert restored.system_serial is None
+    assert restored.network_adapters == [{"name": "eth0"}]
+    assert restored.raw_data == {"probe_timings": {"cpu": {}}}
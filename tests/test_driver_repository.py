@@ -0,0 +1,189 @@
+"""Tests for the INF parser and the hardware-ID indexed driver repository."""
+
+import os
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.driver_repository import (
+    DriverRepository, hardware_device_ids, parse_inf, pci_hardware_ids
+)
+from src.core.hardware_detector import DetectedHardware
+from src.core.win_patch_engine import WinPatchEngine, DriverCategory, MEDIA_DRIVER_DIR
+
+E1D_INF = r"""; Intel Ethernet
+[Version]
+Signature   = "$WINDOWS NT$"
+Class       = Net
+Provider    = %Intel%
+CatalogFile = e1d.cat
+DriverVer   = 04/01/2023,12.19.1.37
+
+[Manufacturer]
+%Intel%     = Intel, NTamd64.10.0, NTx86
+
+[Intel.NTamd64.10.0]
+%E15B8.DeviceDesc% = E15B8.ndi, PCI\VEN_8086&DEV_15B8 ; I219-V
+%E15B8OEM.DeviceDesc% = E15B8.ndi, \
+                        PCI\VEN_8086&DEV_15B8&SUBSYS_12345678
+
+[Intel.NTx86]
+%E15B8.DeviceDesc% = E15B8.ndi, PCI\VEN_8086&DEV_15B8
+
+[SourceDisksNames]
+1 = %DiskName%,,,
+
+[SourceDisksFiles.amd64]
+e1d68x64.sys = 1,x64
+
+[Strings]
+Intel = "Intel"
+E15B8.DeviceDesc = "Intel(R) Ethernet Connection (2) I219-V"
+E15B8OEM.DeviceDesc = "OEM I219-V"
+DiskName = "Intel Driver Disk"
+"""
+
+GENERIC_INF = r"""[Version]
+Class = Net
+DriverVer = 01/01/2019,1.0.0.0
+
+[Manufacturer]
+%Vendor% = Models, NTamd64
+
+[Models.NTamd64]
+"Generic Intel NIC" = Generic, PCI\VEN_8086&CC_0200
+
+[Strings]
+Vendor = "Generic"
+"""
+
+
+def _pack(root: Path) -> Path:
+    intel = root / "Intel" / "LAN"
+    (intel / "x64").mkdir(parents=True)
+    (intel / "e1d.inf").write_bytes(b"\xff\xfe" + E1D_INF.encode("utf-16-le"))
+    (intel / "e1d.cat").write_bytes(b"catalog")
+    (intel / "x64" / "e1d68x64.sys").write_bytes(b"driver")
+    (intel / "unrelated.bin").write_bytes(b"x" * 100)
+    (root / "Generic").mkdir()
+    (root / "Generic" / "generic.inf").write_text(GENERIC_INF)
+    return intel / "e1d.inf"
+
+
+def test_inf_models_strings_and_files_are_parsed(tmp_path: Path) -> None:
+    driver = parse_inf(_pack(tmp_path))
+
+    assert (driver.driver_class, driver.provider, driver.version) == ("Net", "Intel", "12.19.1.37")
+    assert driver.date_key == (2023, 4, 1)
+    assert driver.catalog == "e1d.cat"
+    models = {(m.hardware_id, m.architecture): m.description for m in driver.models}
+    assert models == {
+        ("PCI\\VEN_8086&DEV_15B8", "x64"): "Intel(R) Ethernet Connection (2) I219-V",
+        ("PCI\\VEN_8086&DEV_15B8&SUBSYS_12345678", "x64"): "OEM I219-V",
+        ("PCI\\VEN_8086&DEV_15B8", "x86"): "Intel(R) Ethernet Connection (2) I219-V",
+    }
+    assert driver.files == ["e1d.cat", "x64/e1d68x64.sys"]
+
+
+def test_scans_are_incremental(tmp_path: Path) -> None:
+    inf_path = _pack(tmp_path / "drivers")
+    index = tmp_path / "index.sqlite3"
+    repository = DriverRepository(index, [tmp_path / "drivers"])
+
+    assert repository.ensure_indexed() == 2
+    assert DriverRepository(index, [tmp_path / "drivers"]).ensure_indexed() == 0
+    assert repository.scan() == 0
+
+    os.utime(inf_path, ns=(0, 1))
+    (tmp_path / "drivers" / "Generic" / "generic.inf").unlink()
+    assert repository.scan() == 1
+    assert repository.stats()["packages"] == 1
+
+    # A row that no longer matches the file is refreshed on demand
+    Path(inf_path).write_bytes(b"\xff\xfe" + E1D_INF.replace("e1d68x64", "e1d69x64").encode("utf-16-le"))
+    assert "x64/e1d69x64.sys" in repository.current(inf_path).files
+    Path(inf_path).unlink()
+    assert repository.current(inf_path) is None
+
+
+def test_most_specific_hardware_id_wins(tmp_path: Path) -> None:
+    _pack(tmp_path / "drivers")
+    repository = DriverRepository(tmp_path / "index.sqlite3", [tmp_path / "drivers"])
+    repository.ensure_indexed()
+
+    device = pci_hardware_ids("8086", "15b8", subsystem="12345678", revision="31", class_code="020000")
+    best = repository.best_match(device)
+    assert best.hardware_id == "PCI\\VEN_8086&DEV_15B8&SUBSYS_12345678"
+    assert best.description == "OEM I219-V"
+
+    # Unknown device of the same class falls back to the class driver
+    other = repository.best_match(pci_hardware_ids("8086", "1539", class_code="0200"))
+    assert other.driver.inf_path.endswith("generic.inf")
+    assert repository.best_match(pci_hardware_ids("8086", "1539", class_code="0200"), "arm64") is None
+
+    hardware = DetectedHardware(network_adapters=[{"pci_id": "8086:15b8", "pci_class": "0200"}],
+                                gpus=[{"hardware_id": "PCI\\VEN_10DE&DEV_1B81&SUBSYS_1B8110DE\\4&1"}])
+    device_ids = hardware_device_ids(hardware)
+    assert device_ids[0][0] == "PCI\\VEN_10DE&DEV_1B81&SUBSYS_1B8110DE"
+    assert [m.driver.inf_path.endswith("e1d.inf") for m in repository.match_hardware(hardware)] == [True]
+
+
+def test_patch_engine_stages_only_matched_package_files(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    _pack(tmp_path / "drivers")
+    config = Config()
+    config.set("windows_driver_repository", str(tmp_path / "drivers"))
+    engine = WinPatchEngine(config)
+    engine.dism_path = engine.wimlib_path = "wimlib-imagex"
+    hardware = DetectedHardware(network_adapters=[{"pci_id": "8086:15b8", "pci_class": "0200"}])
+
+    package, = engine._find_compatible_drivers(hardware, "11")
+    assert package.category == DriverCategory.NETWORK
+    assert package.name == "Intel(R) Ethernet Connection (2) I219-V"
+
+    assert engine._setup_workspace()
+    try:
+        assert engine._inject_hardware_drivers(hardware, "11")
+        staged = engine.temp_iso_dir / MEDIA_DRIVER_DIR / "LAN_e1d"
+        assert sorted(p.relative_to(staged).as_posix() for p in staged.rglob("*") if p.is_file()) == [
+            "e1d.cat", "e1d.inf", "x64/e1d68x64.sys"]
+        assert engine.injected_drivers == [package]
+    finally:
+        engine._cleanup_workspace()
+
+
+def test_patch_engine_picks_up_repository_changes(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    inf_path = _pack(tmp_path / "drivers")
+    config = Config()
+    config.set("windows_driver_repository", str(tmp_path / "drivers"))
+    hardware = DetectedHardware(network_adapters=[{"pci_id": "8086:15b8", "pci_class": "0200"}])
+    assert WinPatchEngine(config)._find_compatible_drivers(hardware, "11")
+
+    # Removed after the index was built: a new engine rescans and no longer offers it
+    package, = WinPatchEngine(config)._find_compatible_drivers(hardware, "11")
+    Path(inf_path).unlink()
+    engine = WinPatchEngine(config)
+    assert all(not p.inf_path.endswith("e1d.inf") for p in engine._find_compatible_drivers(hardware, "11"))
+
+    # A stale match at stage time is rescanned and reported, not staged from the old row
+    engine.dism_path = engine.wimlib_path = "wimlib-imagex"
+    assert engine._setup_workspace()
+    try:
+        assert not engine._inject_single_driver(package)
+        assert not (engine.temp_iso_dir / MEDIA_DRIVER_DIR / "LAN_e1d").exists()
+    finally:
+        engine._cleanup_workspace()
+
+
+def test_staging_skips_files_outside_the_package(tmp_path: Path) -> None:
+    inf_path = _pack(tmp_path / "drivers")
+    (tmp_path / "secret.txt").write_text("secret")
+    driver = parse_inf(inf_path)
+    driver.files += ["..\\..\\..\\secret.txt", "x64/../../../../secret.txt", "/etc/passwd", "C:/boot.ini"]
+
+    staging = tmp_path / "stage" / "e1d"
+    repository = DriverRepository(tmp_path / "index.sqlite3", [tmp_path / "drivers"])
+    repository.stage(driver, staging)
+
+    staged = sorted(p.relative_to(tmp_path).as_posix() for p in (tmp_path / "stage").rglob("*") if p.is_file())
+    assert staged == ["stage/e1d/e1d.cat", "stage/e1d/e1d.inf", "stage/e1d/x64/e1d68x64.sys"]
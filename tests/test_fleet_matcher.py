@@ -0,0 +1,89 @@
+"""Tests for bulk fleet profile matching."""
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from src.cli.cli_interface import cli
+from src.core.fleet_matcher import FleetMatcher, load_inventory, normalize_record
+from src.core.hardware_matcher import HardwareMatcher
+
+CSV_INVENTORY = """\
+Serial Number,Model Identifier,Processor,Graphics,Memory
+C02A,"MacBookPro11,4",Intel Core i7,Intel Iris Pro Graphics,16 GB
+C02B,"iMac19,1",Intel Core i9,Radeon Pro 580X;Intel UHD Graphics 630,32768 MB
+C02C,"MacBookPro11,4",Intel Core i7,Intel Iris Pro Graphics,16 GB
+"""
+
+
+def test_normalize_record_accepts_common_column_names() -> None:
+    machine = normalize_record({"Serial Number": "C02B", "Model Identifier": "iMac19,1", "Processor": "Intel Core i9",
+                                "Graphics": "Radeon Pro 580X; Intel UHD Graphics 630", "Memory": "32768 MB"})
+    assert (machine.asset_id, machine.model, machine.platform, machine.manufacturer) == (
+        "C02B", "iMac19,1", "mac", "Apple Inc.")
+    assert machine.gpus == ("Radeon Pro 580X", "Intel UHD Graphics 630")
+    assert (machine.ram_gb, machine.architecture) == (32.0, "x86_64")
+
+    pc = normalize_record({"hostname": "ws-1", "make": "Dell Inc.", "model": "OptiPlex 7090", "cpu": "Apple M1",
+                           "ram_gb": 8, "arch": "AMD64"})
+    assert (pc.platform, pc.architecture, pc.ram_gb) == ("", "x86_64", 8.0)
+
+
+def test_batch_results_match_one_at_a_time(tmp_path: Path) -> None:
+    inventory = tmp_path / "fleet.json"
+    records = [
+        {"serial": "A1", "model_identifier": "MacBookPro11,4", "cpu": "Intel Core i7", "ram": "16 GB"},
+        {"serial": "A2", "model_identifier": "MacBookPro14,2", "cpu": "Intel Core i5"},
+        {"serial": "A3", "model_identifier": "MacBookPro11,4", "cpu": "Intel Core i7", "ram": "16 GB"},
+        "not a record",
+    ]
+    inventory.write_text(json.dumps({"machines": records}))
+
+    results = list(FleetMatcher(workers=1, max_results=2, chunk_size=2).match(load_inventory(inventory)))
+    assert [r["record"] for r in results] == [0, 1, 2, 3]
+    assert "error" in results[3]
+
+    matcher = HardwareMatcher()
+    for record, result in zip(records[:3], results):
+        expected = matcher.find_matching_profiles(normalize_record(record).to_hardware(), max_results=2)
+        assert [(m["profile"], m["score"]) for m in result["matches"]] == [
+            (m.profile.name, round(m.match_score, 1)) for m in expected]
+        assert result["asset_id"] == record["serial"]
+
+    upgrade = results[1]
+    assert upgrade["mac_model"] == "MacBookPro14,2"
+    assert upgrade["recommended_macos"] and upgrade["alternatives"]
+    assert upgrade["oclp"]["macos_version"] == upgrade["alternatives"][0]
+
+    pooled = list(FleetMatcher(workers=2, max_results=2, chunk_size=1).match(load_inventory(inventory)))
+    assert pooled == results
+
+
+def test_cli_streams_jsonl(tmp_path: Path) -> None:
+    inventory = tmp_path / "fleet.csv"
+    inventory.write_text(CSV_INVENTORY)
+    output = tmp_path / "results.jsonl"
+
+    result = CliRunner().invoke(cli, ["fleet-match", "-i", str(inventory), "-o", str(output), "--workers", "1"])
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["asset_id"] for line in lines] == ["C02A", "C02B", "C02C"]
+    assert lines[1]["matches"][0]["model"] == "iMac19,1"
+    assert "3/3 machines matched" in result.output
+
+
+def test_only_mac_records_get_mac_recommendations() -> None:
+    records = [
+        {"asset": "pc-1", "manufacturer": "Dell Inc.", "model": "XPS 13 9310", "cpu": "Intel Core i7-1185G7"},
+        {"asset": "mac-1", "model": "macbookpro11,4", "cpu": "Intel Core i7", "platform": "macOS"},
+        {"asset": "mac-2", "manufacturer": "Apple Inc.", "model": "Mystery Mac", "cpu": "Intel Core i5"},
+    ]
+    pc, mac, unknown_mac = FleetMatcher(workers=1, max_results=3).match(records)
+
+    assert pc["matches"] and pc["mac_model"] is None and pc["recommended_macos"] is None
+    assert pc["oclp"] is None and not pc["oclp_required"]
+    assert mac["mac_model"] == "MacBookPro11,4" and mac["recommended_macos"]
+    # A low-confidence guess is reported as a match but not turned into a recommendation
+    assert unknown_mac["matches"] and unknown_mac["matches"][0]["confidence"] == "low"
+    assert unknown_mac["mac_model"] is None
@@ -0,0 +1,71 @@
+"""Tests for the memoized hardware-profile knowledge base."""
+
+import json
+import pickle
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from src.core.hardware_profiles import (
+    HardwareKnowledgeBase, get_default_profiles, get_knowledge_base, get_mac_model_data,
+    get_mac_profiles_by_macos_version, get_mac_profiles_by_oclp_compatibility,
+    get_profiles_by_platform, load_knowledge_base
+)
+
+
+def test_indexes_match_a_full_scan() -> None:
+    profiles = get_default_profiles()
+    for platform in ("mac", "windows", "linux"):
+        assert get_profiles_by_platform(platform) == [p for p in profiles if p.platform == platform]
+    assert get_profiles_by_platform("amiga") == []
+
+    mac_profiles = get_profiles_by_platform("mac")
+    assert get_mac_profiles_by_oclp_compatibility("experimental") == [
+        p for p in mac_profiles if p.oclp_compatibility == "experimental"]
+    assert get_mac_profiles_by_macos_version("14.0", native_only=True) == [
+        p for p in mac_profiles if p.native_macos_support.get("14.0", False)]
+    assert get_mac_profiles_by_macos_version("13.0") == [
+        p for p in mac_profiles
+        if p.native_macos_support.get("13.0", False) or "13.0" in p.required_patches]
+
+
+def test_shared_data_is_read_only() -> None:
+    assert get_mac_model_data() is get_mac_model_data()
+    model_data = get_mac_model_data()["MacBookPro12,1"]
+    with pytest.raises(TypeError):
+        model_data["oclp_compatibility"] = "unsupported"
+    with pytest.raises(AttributeError):
+        model_data["graphics_patches"].append("Extra")
+
+    editable = model_data.copy()
+    editable["model_id"] = "MacBookPro12,1"
+    assert "model_id" not in model_data
+
+    # Callers still get fresh lists and serializable profiles
+    get_default_profiles().clear()
+    assert get_default_profiles()
+    json.dumps(asdict(get_profiles_by_platform("windows")[0]))
+
+
+def test_serialized_artifact_is_reused_until_stale(tmp_path: Path, monkeypatch) -> None:
+    cache_file = tmp_path / "kb.pickle"
+    built = load_knowledge_base(cache_file)
+    assert cache_file.is_file()
+
+    def no_rebuild():
+        raise AssertionError("artifact should have been reused")
+    monkeypatch.setattr(HardwareKnowledgeBase, "build", no_rebuild)
+    loaded = load_knowledge_base(cache_file)
+    assert loaded == built
+    assert loaded.by_model["iMac19,1"].model == "iMac19,1"
+    monkeypatch.undo()
+
+    cached = pickle.loads(cache_file.read_bytes())
+    cached["stamp"] = "stale"
+    cache_file.write_bytes(pickle.dumps(cached))
+    assert load_knowledge_base(cache_file) == get_knowledge_base()
+    assert pickle.loads(cache_file.read_bytes())["stamp"] != "stale"
+
+    cache_file.write_bytes(b"garbage")
+    assert load_knowledge_base(cache_file).mac_models == get_mac_model_data()
@@ -0,0 +1,65 @@
+"""Tests for the indexed candidate shortlist in HardwareMatcher."""
+
+import dataclasses
+
+import pytest
+
+from src.core.hardware_detector import DetectedHardware, DetectionConfidence
+from src.core.hardware_matcher import HardwareMatcher, _SubstringIndex
+from src.core.hardware_profiles import get_default_profiles
+
+HARDWARE = [
+    DetectedHardware(system_model="MacBookPro16,3", system_manufacturer="Apple Inc.", platform="mac",
+                     cpu_name="Intel(R) Core(TM) i7-9750H", cpu_architecture="x86_64",
+                     detection_confidence=DetectionConfidence.HIGH_CONFIDENCE),
+    DetectedHardware(system_model="MacBookPro", system_manufacturer="Apple Inc.", platform="mac",
+                     cpu_name="Apple M1 Pro", cpu_architecture="arm64"),
+    DetectedHardware(system_model="OptiPlex 7090", system_manufacturer="Dell Inc.", platform="windows",
+                     cpu_name="Intel Core i5-10500", cpu_architecture="amd64",
+                     gpus=[{"name": "NVIDIA GeForce RTX 3060"}]),
+    DetectedHardware(system_model="Surface Pro 8", system_manufacturer="Microsoft Corporation",
+                     platform="windows", cpu_architecture="x86_64"),
+    DetectedHardware(system_model="  ", system_manufacturer="LENOVO", platform="linux",
+                     cpu_name="AMD Ryzen 7 5800U", cpu_architecture="x86_64"),
+    DetectedHardware(system_manufacturer="Raspberry Pi Foundation", cpu_architecture="aarch64"),
+]
+
+
+def _full_scan(matcher: HardwareMatcher, hardware: DetectedHardware, max_results: int) -> list:
+    """What find_matching_profiles returned before the index: score every candidate"""
+    matches = [matcher._score_profile_match(hardware, p) for p in matcher._get_candidate_profiles(hardware)]
+    matches = sorted((m for m in matches if m.match_score > 0), key=lambda m: m.match_score, reverse=True)
+    return [(m.profile.name, m.profile.model, m.match_score, m.match_reasons) for m in matches[:max_results]]
+
+
+def _imported_profiles(count: int) -> list:
+    defaults = get_default_profiles()
+    return [
+        dataclasses.replace(defaults[i % len(defaults)], name=f"{defaults[i % len(defaults)].name} #{i}",
+                            model=f"{defaults[i % len(defaults)].model}-{i % 7}",
+                            year=(defaults[i % len(defaults)].year or 2015) + i % 3)
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("profiles", [None, _imported_profiles(1500)], ids=["default", "imported"])
+def test_shortlist_returns_the_same_matches_as_a_full_scan(profiles) -> None:
+    matcher = HardwareMatcher(profiles)
+    for hardware in HARDWARE:
+        for max_results in (1, 3, 5):
+            matches = matcher.find_matching_profiles(hardware, max_results)
+            assert [(m.profile.name, m.profile.model, m.match_score, m.match_reasons)
+                    for m in matches] == _full_scan(matcher, hardware, max_results)
+
+
+def test_substring_index_and_feature_memo() -> None:
+    index = _SubstringIndex(["macbookpro16,1", "imac20,1", "", "optiplex"])
+    assert index.containing("mac") == {0, 1}
+    assert index.containing("plex") == {3}
+    assert index.containing("") == {0, 1, 2, 3}
+
+    matcher = HardwareMatcher()
+    hardware = HARDWARE[0]
+    first = matcher._hardware_features(hardware)
+    assert matcher._hardware_features(dataclasses.replace(hardware)) is first
+    assert matcher._hardware_features(dataclasses.replace(hardware, cpu_name="Apple M2")) is not first
@@ -0,0 +1,86 @@
+"""Tests for running platform hardware probes concurrently with deadlines."""
+
+import threading
+import time
+
+from src.core.hardware_detector import DetectionConfidence, LinuxDetector, MacOSDetector
+
+
+class FakeLinuxDetector(LinuxDetector):
+    """Linux detector whose probes are in-process stand-ins for the real tools"""
+
+    def __init__(self, probe_timeout: float = 1.0):
+        super().__init__(probe_timeout)
+        self.barrier = threading.Barrier(3, timeout=2)
+        self.release = threading.Event()
+
+    def _detect_system_info(self, hardware):
+        self.barrier.wait()
+        hardware.system_manufacturer = "Dell Inc."
+        hardware.system_model = "OptiPlex 7090"
+
+    def _detect_cpu_info(self, hardware):
+        self.barrier.wait()
+        hardware.cpu_name = "Intel Core i5-10500"
+        hardware.raw_data["proc_cpuinfo"] = "model name: Intel Core i5-10500"
+
+    def _detect_memory_info(self, hardware):
+        self.barrier.wait()
+        hardware.total_ram_gb = 16.0
+
+    def _detect_gpu_info(self, hardware):
+        raise RuntimeError("lspci exploded")
+
+    def _detect_network_info(self, hardware):
+        hardware.network_adapters.append({"interface": "eth0"})
+
+    def _detect_storage_info(self, hardware):
+        # Outlives its deadline; whatever it writes afterwards must not leak into the result
+        self.release.wait(5)
+        hardware.storage_devices.append({"name": "sda"})
+
+
+def test_probes_run_concurrently_and_merge_partial_results() -> None:
+    detector = FakeLinuxDetector(probe_timeout=0.5)
+    start = time.monotonic()
+    hardware = detector.detect_hardware()
+    elapsed = time.monotonic() - start
+    detector.release.set()
+
+    # system, cpu and memory only pass the barrier when running side by side
+    assert (hardware.system_model, hardware.cpu_name, hardware.total_ram_gb) == (
+        "OptiPlex 7090", "Intel Core i5-10500", 16.0)
+    assert hardware.network_adapters == [{"interface": "eth0"}]
+    assert hardware.gpus == [] and hardware.storage_devices == []
+    assert hardware.raw_data["proc_cpuinfo"].startswith("model name")
+    assert hardware.detection_confidence == DetectionConfidence.HIGH_CONFIDENCE
+    assert elapsed < 2
+
+    timings = hardware.raw_data["probe_timings"]
+    assert list(timings) == ["system", "cpu", "memory", "gpu", "network", "storage"]
+    assert [timings[name]["status"] for name in timings] == ["ok", "ok", "ok", "error", "ok", "timeout"]
+    assert all(timing["seconds"] >= 0 for timing in timings.values())
+
+
+def test_commands_are_capped_at_the_probe_deadline() -> None:
+    detector = LinuxDetector(probe_timeout=0.2)
+    detector._probe_context.deadline = time.monotonic() - 1
+    assert detector._run_command(["true"]) == ("", "Probe deadline exceeded", -1)
+    detector._probe_context.deadline = None
+    assert detector._run_command(["true"])[2] == 0
+
+
+def test_dependent_mac_probes_share_one_worker() -> None:
+    class FakeMacDetector(MacOSDetector):
+        def _detect_system_info(self, hardware):
+            hardware.system_model = "MacBookPro16,1"
+            hardware.raw_data["sphardware"] = {"chip_type": "Intel Core i9"}
+
+        def _detect_memory_info(self, hardware):
+            pass
+
+        _detect_gpu_info = _detect_network_info = _detect_storage_info = _detect_memory_info
+
+    hardware = FakeMacDetector().detect_hardware()
+    assert (hardware.cpu_name, hardware.cpu_architecture) == ("Intel Core i9", "x86_64")
+    assert set(hardware.raw_data["probe_timings"]) == {"system", "cpu", "memory", "gpu", "network", "storage"}
@@ -0,0 +1,73 @@
+"""Tests for the Qt-free build and write engines."""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from src.core.events import Signal, WorkerThread
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+BLOCK_PYQT6 = """
+import sys
+class _BlockPyQt6:
+    def find_spec(self, name, path=None, target=None):
+        if name == "PyQt6" or name.startswith("PyQt6."):
+            raise ImportError("PyQt6 blocked for headless test")
+sys.meta_path.insert(0, _BlockPyQt6())
+"""
+
+
+class _Counter(WorkerThread):
+    ticked = Signal(int)
+
+    def run(self) -> None:
+        for value in range(3):
+            self.ticked.emit(value)
+
+
+def test_signals_are_per_instance_and_fire_in_worker_thread() -> None:
+    first, second = _Counter(), _Counter()
+    received = []
+    threads = set()
+
+    def on_tick(value: int) -> None:
+        received.append(value)
+        threads.add(threading.current_thread().name)
+
+    first.ticked.connect(on_tick)
+    finished = []
+    first.finished.connect(lambda: finished.append(True))
+
+    first.start()
+    assert first.wait(2000)
+    second.start()
+    assert second.wait(2000)
+
+    assert received == [0, 1, 2]
+    assert finished == [True]
+    assert threads == {"bootforge__Counter"}
+    assert not first.isRunning()
+
+
+def test_failing_slot_does_not_break_emitter() -> None:
+    counter = _Counter()
+    received = []
+    counter.ticked.connect(lambda value: 1 / 0)
+    counter.ticked.connect(received.append)
+
+    counter.run()
+
+    assert received == [0, 1, 2]
+
+
+def test_cli_and_engines_import_without_pyqt6() -> None:
+    script = BLOCK_PYQT6 + (
+        "import src.cli.cli_interface\n"
+        "import src.core.usb_builder, src.core.disk_manager, src.core.batch_builder\n"
+        "assert 'PyQt6' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,120 @@
+"""Tests for rebuilding installer images as an overlay of the source ISO."""
+
+import binascii
+import struct
+from pathlib import Path
+
+import pytest
+
+from src.core.config import Config
+from src.core.iso_overlay import ISOOverlayBuilder, ISOOverlayError
+from src.core.iso_reader import ISOReader
+from src.core.win_patch_engine import WinPatchEngine
+from tests.test_iso_reader import build_iso9660, build_udf_bridge
+
+
+def _assert_tag_valid(image: bytes, offset: int) -> None:
+    tag = image[offset:offset + 16]
+    assert sum(tag[:4] + tag[5:]) & 0xFF == tag[4]
+    crc, crc_length = struct.unpack_from('<HH', tag, 8)
+    assert binascii.crc_hqx(image[offset + 16:offset + 16 + crc_length], 0) == crc
+
+
+def test_replaced_and_added_files_round_trip(tmp_path: Path) -> None:
+    source = tmp_path / "win.iso"
+    expected = build_udf_bridge(source)
+    new_wim = tmp_path / "install.wim"
+    new_wim.write_bytes(b'N' * 5000)
+    unattend = tmp_path / "autounattend.xml"
+    unattend.write_bytes(b'<unattend/>')
+
+    builder = ISOOverlayBuilder(source)
+    builder.put("sources/install.wim", new_wim)
+    builder.put("autounattend.xml", unattend)
+    output = tmp_path / "patched.iso"
+    size = builder.write_image(output)
+
+    assert output.stat().st_size == size
+    with ISOReader(output) as reader:
+        assert reader.filesystem == "udf"
+        assert reader.read_file("sources/install.wim") == b'N' * 5000
+        assert reader.read_file("autounattend.xml") == b'<unattend/>'
+        assert reader.read_file("setup.exe") == expected["setup.exe"]
+        descriptors = [reader.get_entry(p).descriptor_offset
+                       for p in ("sources/install.wim", "autounattend.xml", "")]
+    with ISOReader(output, prefer="iso9660") as reader:
+        assert reader.read_file("README.TXT") == expected["README.TXT"]
+
+    image = output.read_bytes()
+    for offset in descriptors:
+        _assert_tag_valid(image, offset)
+
+
+def test_copy_tree_merges_workspace_files(tmp_path: Path) -> None:
+    source = tmp_path / "win.iso"
+    expected = build_udf_bridge(source)
+    new_wim = tmp_path / "install.wim"
+    new_wim.write_bytes(b'patched')
+
+    builder = ISOOverlayBuilder(source)
+    builder.put("sources/install.wim", new_wim)
+    destination = tmp_path / "usb"
+    destination.mkdir()
+
+    assert builder.copy_tree(destination) == 2
+    assert (destination / "sources" / "install.wim").read_bytes() == b'patched'
+    assert (destination / "setup.exe").read_bytes() == expected["setup.exe"]
+
+
+def test_images_without_udf_are_rejected(tmp_path: Path) -> None:
+    source = tmp_path / "linux.iso"
+    build_iso9660(source)
+    builder = ISOOverlayBuilder(source)
+    builder.put("casper/vmlinuz", source)
+
+    with pytest.raises(ISOOverlayError):
+        builder.write_image(tmp_path / "out.iso")
+
+
+def test_patch_engine_extracts_only_wims_and_overlays_the_rest(tmp_path: Path) -> None:
+    source = tmp_path / "win.iso"
+    expected = build_udf_bridge(source)
+    engine = WinPatchEngine(Config())
+    assert engine._setup_workspace()
+    try:
+        assert engine._extract_iso(str(source))
+        assert engine.overlay_source == str(source)
+        assert not (engine.temp_iso_dir / "setup.exe").exists()
+
+        (engine.temp_iso_dir / "sources" / "install.wim").write_bytes(b'serviced')
+        (engine.temp_iso_dir / "autounattend.xml").write_bytes(b'<unattend/>')
+        output = tmp_path / "patched.iso"
+        assert engine._rebuild_iso(str(output))
+    finally:
+        engine._cleanup_workspace()
+
+    with ISOReader(output) as reader:
+        assert reader.read_file("sources/install.wim") == b'serviced'
+        assert reader.read_file("autounattend.xml") == b'<unattend/>'
+        assert reader.read_file("setup.exe") == expected["setup.exe"]
+
+
+def test_files_in_new_directories_are_added(tmp_path: Path) -> None:
+    source = tmp_path / "win.iso"
+    build_udf_bridge(source)
+    driver = tmp_path / "e1d.sys"
+    driver.write_bytes(b'D' * 3000)
+
+    builder = ISOOverlayBuilder(source)
+    builder.put("$WinPEDriver$/LAN_e1d/x64/e1d.sys", driver)
+    builder.put("sources/$OEM$/setup.cmd", driver)
+    output = tmp_path / "patched.iso"
+    builder.write_image(output)
+
+    with ISOReader(output) as reader:
+        assert reader.read_file("$WinPEDriver$/LAN_e1d/x64/e1d.sys") == b'D' * 3000
+        assert reader.get_entry("$WinPEDriver$/LAN_e1d").is_dir
+        assert reader.read_file("sources/$OEM$/setup.cmd") == b'D' * 3000
+        assert reader.read_file("sources/install.wim")
+        directory = reader.get_entry("$WinPEDriver$").descriptor_offset
+    _assert_tag_valid(output.read_bytes(), directory)
@@ -0,0 +1,261 @@
+"""Tests for the pure-Python ISO9660/UDF reader."""
+
+import struct
+from pathlib import Path
+
+import pytest
+
+from src.core.iso_reader import ISOReader, ISOReaderError, is_iso_image
+
+SECTOR = 2048
+
+
+def _both16(value: int) -> bytes:
+    return struct.pack('<H', value) + struct.pack('>H', value)
+
+
+def _both32(value: int) -> bytes:
+    return struct.pack('<I', value) + struct.pack('>I', value)
+
+
+def _dir_record(name: bytes, lba: int, size: int, flags: int = 0, system_use: bytes = b'') -> bytes:
+    body = bytes([0]) + _both32(lba) + _both32(size) + bytes(7) + bytes([flags, 0, 0]) + _both16(1)
+    body += bytes([len(name)]) + name
+    if len(name) % 2 == 0:
+        body += b'\x00'
+    body += system_use
+    if (len(body) + 1) % 2:
+        body += b'\x00'
+    return bytes([len(body) + 1]) + body
+
+
+def _nm(name: str) -> bytes:
+    raw = name.encode()
+    return b'NM' + bytes([5 + len(raw), 1, 0]) + raw
+
+
+def _volume_descriptor(vd_type: int, root_record: bytes = b'') -> bytes:
+    data = bytearray(SECTOR)
+    data[0] = vd_type
+    data[1:6] = b'CD001'
+    data[6] = 1
+    if vd_type == 1:
+        data[128:132] = _both16(SECTOR)
+        data[156:156 + len(root_record)] = root_record
+    return bytes(data)
+
+
+def _put(image: bytearray, sector: int, data: bytes) -> None:
+    start = sector * SECTOR
+    if len(image) < start + len(data):
+        image.extend(bytes(start + len(data) - len(image)))
+    image[start:start + len(data)] = data
+
+
+def build_iso9660(path: Path, rock_ridge: bool = False) -> dict:
+    """Tiny ISO: /EFI/BOOT/BOOTX64.EFI plus a multi-extent /casper/vmlinuz"""
+    efi_payload = b'MZ-efi-loader' * 50
+    kernel_part1 = b'K' * SECTOR
+    kernel_part2 = b'k' * 700
+
+    su = (lambda name: _nm(name)) if rock_ridge else (lambda name: b'')
+    root_su = (b'SP\x07\x01\xbe\xef\x00' if rock_ridge else b'')
+
+    root = (_dir_record(b'\x00', 18, SECTOR, 2, root_su) + _dir_record(b'\x01', 18, SECTOR, 2)
+            + _dir_record(b'CASPER', 21, SECTOR, 2, su('casper'))
+            + _dir_record(b'EFI', 19, SECTOR, 2, su('EFI')))
+    efi_dir = (_dir_record(b'\x00', 19, SECTOR, 2) + _dir_record(b'\x01', 18, SECTOR, 2)
+               + _dir_record(b'BOOT', 20, SECTOR, 2, su('BOOT')))
+    boot_dir = (_dir_record(b'\x00', 20, SECTOR, 2) + _dir_record(b'\x01', 19, SECTOR, 2)
+                + _dir_record(b'BOOTX64.EFI;1', 22, len(efi_payload), 0, su('BOOTX64.EFI')))
+    casper_dir = (_dir_record(b'\x00', 21, SECTOR, 2) + _dir_record(b'\x01', 18, SECTOR, 2)
+                  + _dir_record(b'VMLINUZ.;1', 23, len(kernel_part1), 0x80, su('vmlinuz'))
+                  + _dir_record(b'VMLINUZ.;1', 24, len(kernel_part2), 0, su('vmlinuz')))
+
+    image = bytearray()
+    _put(image, 16, _volume_descriptor(1, _dir_record(b'\x00', 18, SECTOR, 2)))
+    _put(image, 17, _volume_descriptor(255))
+    for sector, data in ((18, root), (19, efi_dir), (20, boot_dir), (21, casper_dir),
+                         (22, efi_payload), (23, kernel_part1), (24, kernel_part2)):
+        _put(image, sector, data.ljust(SECTOR, b'\x00'))
+    path.write_bytes(bytes(image))
+    return {"EFI/BOOT/BOOTX64.EFI": efi_payload, "casper/vmlinuz": kernel_part1 + kernel_part2}
+
+
+def _tag(tag_id: int) -> bytes:
+    return struct.pack('<H', tag_id) + bytes(14)
+
+
+def _long_ad(length: int, block: int, partition: int = 0) -> bytes:
+    return struct.pack('<IIH', length, block, partition) + bytes(6)
+
+
+def _fid(name: str, block: int, characteristics: int = 0) -> bytes:
+    raw = (b'\x08' + name.encode('latin-1')) if name else b''
+    body = _tag(257) + struct.pack('<H', 1) + bytes([characteristics, len(raw)])
+    body += _long_ad(SECTOR, block) + struct.pack('<H', 0) + raw
+    return body + bytes((-len(body)) % 4)
+
+
+def _file_entry(file_type: int, size: int, ad_type: int, descriptors: bytes) -> bytes:
+    data = bytearray(SECTOR)
+    data[0:16] = _tag(261)
+    data[16 + 11] = file_type
+    data[16 + 18:16 + 20] = struct.pack('<H', ad_type)
+    data[56:64] = struct.pack('<Q', size)
+    data[168:172] = struct.pack('<I', 0)
+    data[172:176] = struct.pack('<I', len(descriptors))
+    data[176:176 + len(descriptors)] = descriptors
+    return bytes(data)
+
+
+def build_udf_bridge(path: Path) -> dict:
+    """Windows-style bridge image: ISO9660 README placeholder plus a UDF tree"""
+    install_wim = b'W' * SECTOR + b'w' * 1000
+    readme = b'This disc contains a UDF file system.'
+    partition_start = 300
+
+    image = bytearray()
+    iso_root = (_dir_record(b'\x00', 21, SECTOR, 2) + _dir_record(b'\x01', 21, SECTOR, 2)
+                + _dir_record(b'README.TXT;1', 22, len(readme)))
+    _put(image, 16, _volume_descriptor(1, _dir_record(b'\x00', 21, SECTOR, 2)))
+    _put(image, 17, _volume_descriptor(255))
+    for sector, ident in ((18, b'BEA01'), (19, b'NSR02'), (20, b'TEA01')):
+        _put(image, sector, (b'\x00' + ident + b'\x01').ljust(SECTOR, b'\x00'))
+    _put(image, 21, iso_root.ljust(SECTOR, b'\x00'))
+    _put(image, 22, readme.ljust(SECTOR, b'\x00'))
+
+    avdp = bytearray(SECTOR)
+    avdp[0:16] = _tag(2)
+    avdp[16:24] = struct.pack('<II', 4 * SECTOR, 257)
+    _put(image, 256, bytes(avdp))
+
+    pd = bytearray(SECTOR)
+    pd[0:16] = _tag(5)
+    pd[22:24] = struct.pack('<H', 0)
+    pd[188:192] = struct.pack('<I', partition_start)
+    _put(image, 257, bytes(pd))
+
+    lvd = bytearray(SECTOR)
+    lvd[0:16] = _tag(6)
+    lvd[212:216] = struct.pack('<I', SECTOR)
+    lvd[248:264] = _long_ad(SECTOR, 0)
+    lvd[268:272] = struct.pack('<I', 1)
+    lvd[440:446] = bytes([1, 6]) + struct.pack('<HH', 1, 0)
+    _put(image, 258, bytes(lvd))
+    _put(image, 259, _tag(8).ljust(SECTOR, b'\x00'))
+
+    fsd = bytearray(SECTOR)
+    fsd[0:16] = _tag(256)
+    fsd[400:416] = _long_ad(SECTOR, 1)
+
+    root_fids = _fid('', 1, 0x0A) + _fid('sources', 2, 0x02) + _fid('setup.exe', 3)
+    sources_fids = _fid('', 1, 0x0A) + _fid('install.wim', 4)
+    blocks = {
+        0: bytes(fsd),
+        1: _file_entry(4, len(root_fids), 3, root_fids),
+        2: _file_entry(4, len(sources_fids), 3, sources_fids),
+        3: _file_entry(5, 5, 3, b'MZexe'),
+        4: _file_entry(5, len(install_wim), 0,
+                       struct.pack('<II', SECTOR, 10) + struct.pack('<II', 1000, 11)),
+        10: install_wim[:SECTOR],
+        11: install_wim[SECTOR:],
+    }
+    for block, data in blocks.items():
+        _put(image, partition_start + block, data.ljust(SECTOR, b'\x00'))
+
+    path.write_bytes(bytes(image))
+    return {"sources/install.wim": install_wim, "setup.exe": b'MZexe', "README.TXT": readme}
+
+
+def test_iso9660_listing_and_multi_extent_read(tmp_path: Path) -> None:
+    iso = tmp_path / "linux.iso"
+    expected = build_iso9660(iso)
+
+    with ISOReader(iso) as reader:
+        assert reader.filesystem == "iso9660"
+        assert [e.name for e in reader.list("/")] == ["CASPER", "EFI"]
+        assert reader.read_file("efi/boot/bootx64.efi") == expected["EFI/BOOT/BOOTX64.EFI"]
+        kernel = reader.get_entry("CASPER/VMLINUZ")
+        assert kernel.size == len(expected["casper/vmlinuz"])
+        assert reader.read_file("CASPER/VMLINUZ") == expected["casper/vmlinuz"]
+
+
+def test_rock_ridge_names_are_preferred(tmp_path: Path) -> None:
+    iso = tmp_path / "rr.iso"
+    expected = build_iso9660(iso, rock_ridge=True)
+
+    with ISOReader(iso) as reader:
+        assert reader.filesystem == "rockridge"
+        assert reader.get_entry("casper/vmlinuz").name == "vmlinuz"
+        assert reader.read_file("casper/vmlinuz") == expected["casper/vmlinuz"]
+
+
+def test_selective_and_full_extraction(tmp_path: Path) -> None:
+    iso = tmp_path / "linux.iso"
+    expected = build_iso9660(iso, rock_ridge=True)
+
+    selected = tmp_path / "selected"
+    with ISOReader(iso) as reader:
+        written = reader.extract(selected, ["EFI/BOOT"])
+    assert [p.relative_to(selected).as_posix() for p in written] == ["EFI/BOOT/BOOTX64.EFI"]
+
+    full = tmp_path / "full"
+    progress = []
+    with ISOReader(iso) as reader:
+        reader.extract(full, workers=3, progress_callback=lambda done, total: progress.append((done, total)))
+    for rel_path, content in expected.items():
+        assert (full / rel_path).read_bytes() == content
+    assert progress[-1][0] == progress[-1][1]
+
+
+def test_udf_is_preferred_on_bridge_images(tmp_path: Path) -> None:
+    iso = tmp_path / "windows.iso"
+    expected = build_udf_bridge(iso)
+
+    with ISOReader(iso) as reader:
+        assert reader.filesystem == "udf"
+        assert sorted(e.name for e in reader.list("/")) == ["setup.exe", "sources"]
+        assert reader.read_file("sources/install.wim") == expected["sources/install.wim"]
+        assert reader.read_file("SETUP.EXE") == expected["setup.exe"]
+
+    with ISOReader(iso, prefer="iso9660") as reader:
+        assert reader.read_file("README.TXT") == expected["README.TXT"]
+
+
+def test_non_iso_files_are_rejected(tmp_path: Path) -> None:
+    bogus = tmp_path / "not.iso"
+    bogus.write_bytes(bytes(64 * SECTOR))
+
+    assert not is_iso_image(bogus)
+    with pytest.raises(ISOReaderError):
+        ISOReader(bogus)
+
+
+def test_names_that_leave_the_directory_are_skipped(tmp_path: Path) -> None:
+    iso = tmp_path / "evil.iso"
+    build_iso9660(iso, rock_ridge=True)
+    iso.write_bytes(iso.read_bytes().replace(_nm('BOOTX64.EFI'), _nm('../evil.efi')))
+    udf = tmp_path / "evil_udf.iso"
+    build_udf_bridge(udf)
+    udf.write_bytes(udf.read_bytes().replace(b'\x08setup.exe', b'\x08../ab.exe'))
+
+    with ISOReader(iso) as reader:
+        assert reader.list("EFI/BOOT") == []
+        reader.extract(tmp_path / "out")
+    with ISOReader(udf) as reader:
+        assert [e.name for e in reader.list("/")] == ["sources"]
+    assert not (tmp_path / "EFI/evil.efi").exists()
+
+
+def test_extraction_refuses_targets_outside_the_destination(tmp_path: Path, monkeypatch) -> None:
+    iso = tmp_path / "linux.iso"
+    build_iso9660(iso)
+
+    with ISOReader(iso) as reader:
+        escaping = reader.get_entry("EFI/BOOT/BOOTX64.EFI")
+        escaping.path = "../escaped.efi"
+        monkeypatch.setattr(reader, "walk", lambda path="/": iter([escaping]))
+        with pytest.raises(ISOReaderError):
+            reader.extract(tmp_path / "out")
+    assert not (tmp_path / "escaped.efi").exists()
@@ -0,0 +1,98 @@
+"""Tests for the sysfs/procfs Linux hardware probe."""
+
+import subprocess
+from pathlib import Path
+
+from src.core.hardware_detector import LinuxDetector
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _fake_root(root: Path) -> Path:
+    _write(root / "sys/class/dmi/id/sys_vendor", "Dell Inc.\n")
+    _write(root / "sys/class/dmi/id/product_name", "OptiPlex 7090\n")
+    _write(root / "proc/cpuinfo", "vendor_id\t: GenuineIntel\nmodel name\t: Intel(R) Core(TM) i5-10500\n"
+                                  "siblings\t: 12\ncpu cores\t: 6\n")
+    _write(root / "proc/meminfo", "MemTotal:       16777216 kB\nMemFree:         1024 kB\n")
+
+    devices = root / "sys/bus/pci/devices"
+    for address, vendor, device, pci_class, revision in [
+        ("0000:00:02.0", "0x8086", "0x9bc8", "0x030000", "0x05"),
+        ("0000:00:1f.6", "0x8086", "0x0d4c", "0x020000", "0x00"),
+        ("0000:01:00.0", "0x10de", "0x2504", "0x030200", "0xa1"),
+        ("0000:00:1f.0", "0x8086", "0x0687", "0x060100", "0x00"),
+    ]:
+        for name, value in [("vendor", vendor), ("device", device), ("class", pci_class), ("revision", revision)]:
+            _write(devices / address / name, value + "\n")
+
+    _write(root / "sys/class/net/lo/address", "00:00:00:00:00:00\n")
+    _write(root / "sys/class/net/eno1/address", "a4:bb:6d:00:11:22\n")
+
+    _write(root / "sys/block/nvme0n1/size", "1000215216\n")
+    _write(root / "sys/block/nvme0n1/device/model", "Samsung SSD 980 1TB   \n")
+    _write(root / "sys/block/sr0/size", "2097151\n")
+    _write(root / "sys/block/sr0/device/type", "5\n")
+    _write(root / "sys/block/loop0/size", "8\n")
+    return root
+
+
+def test_reads_everything_from_sysfs_without_subprocesses(tmp_path: Path, monkeypatch) -> None:
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError(f"unexpected subprocess: {args}")
+    monkeypatch.setattr(subprocess, "run", no_subprocess)
+
+    hardware = LinuxDetector(root=_fake_root(tmp_path)).detect_hardware()
+
+    assert (hardware.system_manufacturer, hardware.system_model) == ("Dell Inc.", "OptiPlex 7090")
+    assert (hardware.cpu_name, hardware.cpu_cores, hardware.cpu_threads) == ("Intel(R) Core(TM) i5-10500", 6, 12)
+    assert hardware.total_ram_gb == 16.0
+
+    assert [(g["pci_id"], g["pci_class"], g["pci_revision"], g["vendor"]) for g in hardware.gpus] == [
+        ("8086:9bc8", "0300", "05", "Intel"), ("10de:2504", "0302", "A1", "NVIDIA")]
+    assert hardware.primary_gpu == hardware.gpus[0]["name"]
+
+    pci_adapters = [a for a in hardware.network_adapters if "pci_id" in a]
+    assert [(a["pci_id"], a["pci_address"]) for a in pci_adapters] == [("8086:0d4c", "0000:00:1f.6")]
+    assert {"interface": "eno1", "mac_address": "a4:bb:6d:00:11:22"} in hardware.network_adapters
+
+    assert hardware.storage_devices == [
+        {"name": "nvme0n1", "model": "Samsung SSD 980 1TB", "size_gb": 1000215216 * 512 / 1024 ** 3}]
+
+
+def test_falls_back_to_system_tools_without_sysfs(tmp_path: Path, monkeypatch) -> None:
+    detector = LinuxDetector(root=tmp_path)
+    commands = []
+
+    def fake_run_command(command, timeout=30):
+        commands.append(command[0])
+        if command[0] == "lspci":
+            return ("01:00.0 VGA compatible controller [0300]: NVIDIA Corporation GA106 [10de:2504] (rev a1)\n"
+                    "00:1f.6 Ethernet controller [0200]: Intel Corporation Ethernet [8086:0d4c]\n", "", 0)
+        return "", "not found", 1
+    monkeypatch.setattr(detector, "_run_command", fake_run_command)
+
+    hardware = detector.detect_hardware()
+    assert sorted(set(commands)) == ["dmidecode", "lsblk", "lspci"]
+    assert [g["pci_id"] for g in hardware.gpus] == ["10de:2504"]
+    assert [a["pci_id"] for a in hardware.network_adapters] == ["8086:0d4c"]
+
+
+def test_architecture_comes_from_the_captured_tree(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("platform.machine", lambda: "riscv64")
+
+    unknown = LinuxDetector(root=_fake_root(tmp_path / "bare")).detect_hardware()
+    assert unknown.cpu_architecture is None
+
+    x86 = _fake_root(tmp_path / "x86")
+    _write(x86 / "proc/cpuinfo", "vendor_id\t: GenuineIntel\nflags\t\t: fpu vme lm sse2\n")
+    assert LinuxDetector(root=x86).detect_hardware().cpu_architecture == "x86_64"
+
+    arm = _fake_root(tmp_path / "arm")
+    _write(arm / "proc/cpuinfo", "processor\t: 0\nCPU architecture: 8\n")
+    assert LinuxDetector(root=arm).detect_hardware().cpu_architecture == "arm64"
+
+    _write(arm / "proc/sys/kernel/arch", "x86_64\n")
+    assert LinuxDetector(root=arm).detect_hardware().cpu_architecture == "x86_64"
@@ -0,0 +1,89 @@
+"""Tests for reusing finished OCLP builds from the artifact cache."""
+
+from pathlib import Path
+
+import pytest
+
+from src.core.hardware_detector import DetectedHardware
+from src.core.oclp_integration import OCLPBootForgeIntegration, OCLPIntegration
+
+MODEL = "MacBookPro12,1"
+
+
+def _fake_workflow(integration: OCLPIntegration, calls: list):
+    """Stand-in for the OCLP run that lays out a finished EFI tree"""
+    def workflow() -> bool:
+        calls.append(integration.target_macos_version)
+        efi = integration.output_dir / "EFI"
+        (efi / "BOOT").mkdir(parents=True)
+        (efi / "OC" / "ACPI").mkdir(parents=True)
+        (efi / "OC" / "Kexts" / "Lilu.kext" / "Contents").mkdir(parents=True)
+        (efi / "BOOT" / "BOOTx64.efi").write_bytes(b"bootloader")
+        (efi / "OC" / "config.plist").write_text("<plist/>")
+        (efi / "OC" / "Kexts" / "Lilu.kext" / "Contents" / "Info.plist").write_text("<plist/>")
+
+        build = integration.current_build
+        build.efi_folder_path = efi
+        build.opencore_efi_path = efi / "BOOT" / "BOOTx64.efi"
+        build.config_plist_path = efi / "OC" / "config.plist"
+        build.kext_files = [efi / "OC" / "Kexts" / "Lilu.kext"]
+        return True
+    return workflow
+
+
+def _build(integration: OCLPIntegration, version: str, calls: list) -> None:
+    integration._execute_build_workflow = _fake_workflow(integration, calls)
+    hardware = DetectedHardware(system_model=MODEL)
+    config = integration.analyze_mac_compatibility(hardware)
+    integration.target_model = MODEL
+    integration.target_config = config
+    integration.target_macos_version = version
+    integration.run()
+
+
+@pytest.fixture
+def home(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+def test_second_build_is_restored_from_cache(home: Path) -> None:
+    calls = []
+    first = OCLPIntegration()
+    _build(first, "13.0", calls)
+    assert first.get_oclp_build_artifacts()
+    assert first.current_build.efi_folder_path.is_dir()  # survives temp cleanup
+
+    second = OCLPIntegration()
+    _build(second, "13.0", calls)
+    assert calls == ["13.0"]
+
+    result = second.get_oclp_build_artifacts()
+    assert result.build_log[-1].startswith("Reused cached OCLP build")
+    assert result.efi_folder_path == second.output_dir / "EFI"
+    assert result.opencore_efi_path.read_bytes() == b"bootloader"
+    assert result.config_plist_path.read_text() == "<plist/>"
+    assert (result.efi_folder_path / "OC" / "ACPI").is_dir()
+    assert [k.name for k in result.kext_files] == ["Lilu.kext"]
+    # Restored files are private copies, not the read-only cache objects
+    result.config_plist_path.write_text("<plist>edited</plist>")
+
+    _build(OCLPIntegration(), "14.0", calls)
+    assert calls == ["13.0", "14.0"]
+
+
+def test_pipeline_helper_returns_cached_build_synchronously(home: Path) -> None:
+    hardware = DetectedHardware(system_model=MODEL)
+    helper = OCLPBootForgeIntegration()
+    assert helper.get_cached_build(hardware, "13.0") is None
+
+    _build(OCLPIntegration(), "13.0", [])
+    result = helper.get_cached_build(hardware, "13.0")
+    assert result.success
+    assert result.model_identifier == MODEL
+    assert result.config_plist_path.is_file()
+    assert helper.get_oclp_build_artifacts() is result
+    assert helper.get_cached_build(hardware, "12.0") is None
+
+    helper.cleanup_oclp_resources()
+    assert not result.efi_folder_path.exists()
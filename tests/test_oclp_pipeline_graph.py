@@ -0,0 +1,225 @@
+"""Tests for the OCLP pipeline's stage graph and checkpoint resume."""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core.error_prevention_recovery import CheckpointManager, OperationPhase
+from src.core.hardware_detector import DetectedHardware
+from src.core.oclp_automation_pipeline import (
+    OCLPAutomationPipeline, PipelineConfiguration, PipelineStage
+)
+from src.core.oclp_integration import OCLPBuildResult, OCLPCompatibility, OCLPConfiguration
+
+STAGES = ["hardware", "compatibility", "acquisition", "patches", "oclp", "usb_prep", "usb", "final"]
+
+
+def _pipeline(tmp_path: Path, calls: list, fail_usb: bool = False, **config) -> OCLPAutomationPipeline:
+    pipeline = OCLPAutomationPipeline(PipelineConfiguration(checkpoint_dir=tmp_path / "checkpoints", **config))
+    installer = tmp_path / "InstallAssistant.pkg"
+    efi = tmp_path / "EFI"
+
+    def stage(name, effect=None, result=True):
+        def execute() -> bool:
+            calls.append(name)
+            if effect:
+                effect()
+            return result
+        return execute
+
+    def detect():
+        pipeline.progress.detected_hardware = DetectedHardware(system_model="MacBookPro12,1")
+
+    def compatibility():
+        pipeline.progress.oclp_config = OCLPConfiguration("MacBookPro12,1", "MacBook Pro",
+                                                          OCLPCompatibility.FULLY_SUPPORTED)
+        pipeline.config.target_macos_version = pipeline.config.target_macos_version or "13.0"
+
+    def acquire():
+        installer.write_bytes(b"installer")
+        pipeline.config.macos_installer_path = installer
+
+    def configure():
+        efi.mkdir(exist_ok=True)
+        pipeline.pipeline_result.oclp_build_result = OCLPBuildResult(
+            True, "MacBookPro12,1", "2.0.0", 1.0, efi_folder_path=efi)
+
+    effects = [detect, compatibility, acquire, None, configure, None, None, None]
+    for number, (name, effect) in enumerate(zip(STAGES, effects), start=1):
+        method = [m for m in dir(pipeline) if m.startswith(f"_execute_stage_{number}_")][0]
+        setattr(pipeline, method, stage(name, effect, not (fail_usb and name == "usb")))
+    pipeline._cleanup_pipeline = lambda: None
+    return pipeline
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def test_failed_run_resumes_after_the_last_good_stage(tmp_path: Path) -> None:
+    calls = []
+    first = _pipeline(tmp_path, calls, fail_usb=True)
+    first.run()
+    assert not first.pipeline_result.success
+    assert sorted(calls) == sorted(STAGES[:7])
+
+    calls.clear()
+    second = _pipeline(tmp_path, calls)
+    second.run()
+    assert second.pipeline_result.success
+    assert calls == ["usb_prep", "usb", "final"]
+    assert second.progress.overall_progress == 100.0
+    assert second.resumed_stages[-1] == PipelineStage.OCLP_CONFIGURATION
+    assert second.progress.detected_hardware.system_model == "MacBookPro12,1"
+    assert second.config.target_macos_version == "13.0"
+    assert second.config.macos_installer_path == tmp_path / "InstallAssistant.pkg"
+    assert second.pipeline_result.oclp_build_result.efi_folder_path == tmp_path / "EFI"
+
+    # A successful run leaves nothing to resume from
+    assert not list((tmp_path / "checkpoints").iterdir())
+
+
+def test_changed_inputs_and_files_invalidate_checkpoints(tmp_path: Path) -> None:
+    calls = []
+    _pipeline(tmp_path, calls, fail_usb=True).run()
+
+    # A different target version invalidates compatibility and everything after it
+    calls.clear()
+    _pipeline(tmp_path, calls, fail_usb=True, target_macos_version="12.0").run()
+    assert sorted(calls) == sorted(STAGES[1:7])
+
+    # A modified installer reruns acquisition only; patches and OCLP do not depend on it
+    (tmp_path / "InstallAssistant.pkg").write_bytes(b"tampered")
+    calls.clear()
+    pipeline = _pipeline(tmp_path, calls, target_macos_version="12.0")
+    pipeline._execute_stage_3_macos_acquisition = lambda: calls.append("acquisition") or True
+    pipeline.run()
+    assert sorted(calls) == sorted(["acquisition", "usb_prep", "usb", "final"])
+
+
+def test_download_overlaps_patching_and_oclp_build(tmp_path: Path) -> None:
+    calls = []
+    pipeline = _pipeline(tmp_path, calls, resume_from_checkpoint=False)
+    oclp_done = threading.Event()
+    seen_progress = []
+
+    def acquisition() -> bool:
+        calls.append("acquisition")
+        pipeline._start_stage(PipelineStage.MACOS_ACQUISITION, "Acquiring macOS Installer", 3)
+        pipeline._update_stage_progress(50.0, "Downloading")
+        # Only finishes if the OCLP stage runs while the download is in flight
+        assert oclp_done.wait(5)
+        seen_progress.append(dict(pipeline.progress.stage_progress_by_stage))
+        pipeline._complete_stage("Acquiring macOS Installer", True)
+        return True
+
+    def oclp() -> bool:
+        calls.append("oclp")
+        pipeline._start_stage(PipelineStage.OCLP_CONFIGURATION, "Configuring OpenCore", 5)
+        pipeline._complete_stage("Configuring OpenCore", True)
+        oclp_done.set()
+        return True
+
+    pipeline._execute_stage_3_macos_acquisition = acquisition
+    pipeline._execute_stage_5_oclp_configuration = oclp
+    pipeline.run()
+
+    assert pipeline.pipeline_result.success
+    assert calls.index("usb") > max(calls.index("acquisition"), calls.index("oclp"))
+    assert seen_progress == [{"macos_acquisition": 50.0, "oclp_configuration": 100.0}]
+
+
+def test_failure_cancels_stages_running_in_parallel(tmp_path: Path) -> None:
+    calls = []
+    pipeline = _pipeline(tmp_path, calls, resume_from_checkpoint=False)
+    download_started = threading.Event()
+
+    def acquisition() -> bool:
+        download_started.set()
+        for _ in range(500):
+            if pipeline.is_cancelled:
+                calls.append("acquisition cancelled")
+                return False
+            time.sleep(0.01)
+        return True
+
+    def patches() -> bool:
+        download_started.wait(5)
+        return False
+
+    pipeline._execute_stage_3_macos_acquisition = acquisition
+    pipeline._execute_stage_4_patch_determination = patches
+    pipeline.run()
+
+    assert not pipeline.pipeline_result.success
+    assert pipeline.pipeline_result.summary_message.endswith("Patch determination failed")
+    assert "acquisition cancelled" in calls
+    assert "usb" not in calls
+
+
+def test_rerunning_the_same_pipeline_resumes_from_its_checkpoints(tmp_path: Path) -> None:
+    calls = []
+    pipeline = _pipeline(tmp_path, calls, fail_usb=True)
+    pipeline.run()
+    assert pipeline.config.target_macos_version == "13.0"
+
+    # Stage 2 filled in the target version; that must not count as a changed input
+    calls.clear()
+    pipeline.run()
+    assert sorted(calls) == sorted(["usb_prep", "usb"])
+    assert PipelineStage.COMPATIBILITY_CHECK in pipeline.resumed_stages
+
+    # A version the caller sets afterwards is still a new input
+    calls.clear()
+    pipeline.config.target_macos_version = "12.0"
+    pipeline.run()
+    assert "compatibility" in calls
+
+
+def test_installer_changed_past_the_first_megabyte_invalidates_its_checkpoint(tmp_path: Path) -> None:
+    manager = CheckpointManager(tmp_path / "checkpoints")
+    installer = tmp_path / "InstallAssistant.pkg"
+    installer.write_bytes(b"\0" * (1024 * 1024 + 16))
+    checkpoint = manager.save_stage_checkpoint("acquisition", OperationPhase.VALIDATION, "hash", {}, [installer])
+    assert manager.verify_file_checksums(checkpoint)
+
+    # Same leading megabyte and size, later mtime
+    with open(installer, "r+b") as f:
+        f.seek(1024 * 1024)
+        f.write(b"\1" * 16)
+    os.utime(installer, ns=(checkpoint.metadata["file_stats"][str(installer)][1] + 10**9,) * 2)
+    assert not manager.verify_file_checksums(checkpoint)
+
+
+def test_user_cancel_is_reported_as_a_cancel(tmp_path: Path) -> None:
+    calls = []
+    pipeline = _pipeline(tmp_path, calls, resume_from_checkpoint=False)
+
+    def acquisition() -> bool:
+        pipeline.cancel_pipeline()
+        return False
+
+    pipeline._execute_stage_3_macos_acquisition = acquisition
+    pipeline.run()
+
+    assert pipeline.pipeline_result.final_stage == PipelineStage.CANCELLED
+    assert pipeline.pipeline_result.summary_message == "Pipeline cancelled"
+    assert "usb" not in calls
+
+
+def test_a_failed_run_does_not_cancel_the_next_one(tmp_path: Path) -> None:
+    calls = []
+    pipeline = _pipeline(tmp_path, calls, fail_usb=True, resume_from_checkpoint=False)
+    pipeline.run()
+    assert pipeline.is_cancelled
+    assert pipeline.pipeline_result.summary_message.endswith("USB creation failed")
+
+    calls.clear()
+    pipeline._execute_stage_7_usb_creation = lambda: calls.append("usb") or True
+    pipeline.run()
+    assert pipeline.pipeline_result.success
+    assert sorted(calls) == sorted(STAGES)
@@ -0,0 +1,73 @@
+"""Tests for warming the OCLP build cache across the compatibility matrix."""
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from src.cli.cli_interface import cli
+from src.core import oclp_prewarm
+from src.core.artifact_store import ArtifactStore
+from src.core.config import Config
+from src.core.oclp_integration import OCLPIntegration
+from src.core.oclp_prewarm import (
+    OCLPPrewarmer, PrewarmStatus, prewarm_targets, workers_for_budget
+)
+from tests.test_oclp_build_cache import MODEL, _build
+
+
+def test_targets_cover_only_versions_that_need_oclp() -> None:
+    assert prewarm_targets([MODEL]) == [(MODEL, "11.0"), (MODEL, "12.0"), (MODEL, "13.0"), (MODEL, "14.0")]
+    assert prewarm_targets([MODEL], ["13.0", "10.15"]) == [(MODEL, "13.0")]
+    assert workers_for_budget(0.0) == 1
+    assert workers_for_budget(1.0) >= workers_for_budget(0.5)
+
+
+def test_runs_collect_cached_pairs_and_resume_after_failures(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    _build(OCLPIntegration(), "13.0", [])
+
+    seen = []
+    prewarmer = OCLPPrewarmer(max_workers=1, progress_callback=lambda r: seen.append(r.pair))
+    report = prewarmer.run([MODEL], ["12.0", "13.0"])
+    statuses = {r.macos_version: r.status for r in report.results}
+    assert statuses["13.0"] == PrewarmStatus.CACHED
+    # OCLP cannot run in the test environment, so the real build fails
+    assert statuses["12.0"] == PrewarmStatus.FAILED
+    assert sorted(seen) == [f"{MODEL}@12.0", f"{MODEL}@13.0"]
+
+    journal = json.loads(prewarmer.state_file.read_text())
+    assert journal[f"{MODEL}@12.0"]["status"] == "failed"
+
+    rerun = OCLPPrewarmer(max_workers=1).run([MODEL], ["12.0", "13.0"])
+    assert [r.status for r in rerun.results] == [PrewarmStatus.SKIPPED, PrewarmStatus.CACHED]
+
+    retried = OCLPPrewarmer(max_workers=1, retry_failed=True).run([MODEL], ["12.0"])
+    assert [r.status for r in retried.results] == [PrewarmStatus.FAILED]
+
+
+def test_workers_build_into_the_parents_cache(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(oclp_prewarm, "_worker_integration", None)
+    config = Config()
+    config.set("oclp_build_cache_gb", 0.5)
+
+    prewarmer = OCLPPrewarmer(config=config, max_workers=1)
+    oclp_prewarm._init_worker(0, prewarmer.config, prewarmer._build_cache_settings())
+    worker_cache = oclp_prewarm._worker_integration.build_cache
+    assert (worker_cache.root, worker_cache.max_bytes) == (prewarmer.integration.build_cache.root, 512 * 1024 ** 2)
+
+    # An integration with its own cache location is honoured too
+    integration = OCLPIntegration(config)
+    integration.build_cache = ArtifactStore(tmp_path / "elsewhere", max_bytes=1024, name="custom")
+    prewarmer = OCLPPrewarmer(integration=integration, config=config, max_workers=1)
+    oclp_prewarm._init_worker(0, prewarmer.config, prewarmer._build_cache_settings())
+    assert oclp_prewarm._worker_integration.build_cache.root == tmp_path / "elsewhere"
+
+
+def test_cli_dry_run_lists_pairs(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    result = CliRunner().invoke(cli, ["oclp-prewarm", "--model", MODEL, "--macos", "14.0", "--dry-run"])
+    assert result.exit_code == 0
+    assert "1 model/macOS pairs" in result.output
+    assert f"{MODEL} → macOS 14.0" in result.output
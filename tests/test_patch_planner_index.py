@@ -0,0 +1,134 @@
+"""Tests for the indexed patch set lookup in PatchPlanner."""
+
+import itertools
+import re
+
+from src.core.hardware_detector import DetectedHardware
+from src.core.patch_pipeline import (
+    PatchAction, PatchCondition, PatchPhase, PatchPlan, PatchPlanner, PatchPriority, PatchSet, PatchType,
+)
+
+HARDWARE = [
+    DetectedHardware(system_model="MacBookPro11,3", system_manufacturer="Apple Inc.",
+                     cpu_architecture="x86_64", total_ram_gb=16),
+    DetectedHardware(system_model="iMac20,1", system_manufacturer="Apple Inc.",
+                     cpu_architecture="arm64", total_ram_gb=4),
+    DetectedHardware(system_model="OptiPlex 7090", system_manufacturer="Dell Inc.", cpu_architecture="x86_64"),
+    DetectedHardware(system_manufacturer="Hackintosh Builders", system_model="MacBook Clone"),
+]
+OS_INFOS = [{"family": family, "version": version}
+            for family, version in itertools.product(["macos", "windows"], ["11.7", "13.4", "10.0", ""])]
+
+CONDITIONS = [
+    None,
+    PatchCondition(os_version=r"1[1-4]\..*"),
+    PatchCondition(hardware_model="MacBookPro.*", cpu_architecture="x86_64"),
+    PatchCondition(minimum_ram_gb=8, exclusion_patterns=["hackintosh"]),
+    PatchCondition(os_version=r"13\..*", hardware_model="iMac.*", minimum_ram_gb=64),
+]
+
+
+def _action(i: int, condition) -> PatchAction:
+    return PatchAction(id=f"action{i}", name=f"Action {i}", description="", patch_type=PatchType.KEXT_INJECTION,
+                       phase=PatchPhase.POST_INSTALL, priority=list(PatchPriority)[i % len(PatchPriority)],
+                       conditions=condition)
+
+
+def _patch_sets() -> list:
+    sets = []
+    targets = itertools.product(["macos", "windows"], [["11.*", "13.*"], ["10.*"], []],
+                                [["MacBook.*", "iMac.*"], ["dell"], []])
+    for i, (family, versions, hardware) in enumerate(targets):
+        conditions = [CONDITIONS[(i + j) % len(CONDITIONS)] for j in range(1 + i % 3)]
+        if i % 4 == 0:
+            conditions = [c for c in conditions if c is not None]
+        sets.append(PatchSet(id=f"set{i}", name=f"Set {i}", description="", version="1.0", target_os=family,
+                             target_versions=versions, target_hardware=hardware,
+                             actions=[_action(i * 10 + j, c) for j, c in enumerate(conditions)]))
+    return sets
+
+
+def _linear_scan(patch_sets: list, hardware: DetectedHardware, os_info: dict, requested=None) -> list:
+    """What _find_applicable_patches computed before the index"""
+    applicable = [ps for ps in patch_sets
+                  if (not requested or ps.id in requested)
+                  and ps.validate_compatibility(hardware, os_info)[0]
+                  and any(action.can_apply(hardware, os_info) for action in ps.actions)]
+    applicable.sort(key=lambda ps: min(action.priority.value for action in ps.actions))
+    return [ps.id for ps in applicable]
+
+
+def _reference_matches(condition: PatchCondition, hardware: DetectedHardware, os_info: dict) -> bool:
+    if condition.os_version and os_info.get("version") and not re.match(condition.os_version, os_info["version"]):
+        return False
+    if condition.hardware_model and hardware.system_model and not re.match(condition.hardware_model,
+                                                                           hardware.system_model):
+        return False
+    if condition.cpu_architecture and hardware.cpu_architecture and \
+            hardware.cpu_architecture != condition.cpu_architecture:
+        return False
+    if condition.minimum_ram_gb and hardware.total_ram_gb and hardware.total_ram_gb < condition.minimum_ram_gb:
+        return False
+    model_text = f"{hardware.system_manufacturer} {hardware.system_model}"
+    return not any(re.search(p, model_text, re.IGNORECASE) for p in condition.exclusion_patterns)
+
+
+def test_compiled_conditions_agree_with_the_field_checks() -> None:
+    for condition in CONDITIONS[1:]:
+        for hardware, os_info in itertools.product(HARDWARE, OS_INFOS):
+            assert condition.matches(hardware, os_info) == _reference_matches(condition, hardware, os_info)
+
+
+def test_index_finds_the_same_patch_sets_as_a_linear_scan() -> None:
+    planner = PatchPlanner()
+    patch_sets = list(planner._patch_sets.values()) + _patch_sets()
+    for patch_set in patch_sets:
+        assert planner.register_patch_set(patch_set)
+
+    for hardware, os_info in itertools.product(HARDWARE, OS_INFOS):
+        for requested in (None, ["set0", "set4", "set13", "missing"]):
+            found = [ps.id for ps in planner._find_applicable_patches(hardware, os_info, requested)]
+            assert found == _linear_scan(patch_sets, hardware, os_info, requested)
+
+
+def test_reregistering_a_set_moves_it_between_os_families() -> None:
+    planner = PatchPlanner()
+    for patch_set in _patch_sets():
+        planner.register_patch_set(patch_set)
+    hardware, os_info = HARDWARE[0], {"family": "linux", "version": "13.4"}
+    assert planner._find_applicable_patches(hardware, os_info) == []
+
+    moved = PatchSet(id="set1", name="Set 1", description="", version="2.0", target_os="linux",
+                     actions=[_action(99, None)])
+    planner.register_patch_set(moved)
+    assert planner._find_applicable_patches(hardware, os_info) == [moved]
+    assert "set1" not in [ps.id for ps in planner._find_applicable_patches(hardware, {"family": "macos",
+                                                                                      "version": "13.4"})]
+    assert list(planner._index["linux"]) == ["set1"]
+
+
+def test_plan_adds_sets_in_one_pass_and_skips_conflicts() -> None:
+    first, second, third = _patch_sets()[:3]
+    first.conflicts = ["set2"]
+    plan = PatchPlan(id="plan", name="Plan", description="", target_hardware=HARDWARE[0],
+                     target_os={"family": "macos", "version": "13.4"})
+    added = plan.add_patch_sets([first, second, third], check_compatibility=False)
+    assert added == [first, second]
+    assert plan.total_actions == len(first.actions) + len(second.actions)
+    assert sum(len(actions) for actions in plan.execution_phases.values()) == plan.total_actions
+    assert not plan.add_patch_set(third)
+
+
+def test_matches_reuses_the_compiled_predicate_until_fields_change(monkeypatch) -> None:
+    condition = PatchCondition(hardware_model="MacBookPro.*")
+    compiles = []
+    original = PatchCondition.compile
+    monkeypatch.setattr(PatchCondition, "compile", lambda self: compiles.append(1) or original(self))
+
+    for _ in range(3):
+        assert condition.matches(HARDWARE[0], OS_INFOS[0])
+    assert len(compiles) == 1
+
+    condition.hardware_model = "iMac.*"
+    assert not condition.matches(HARDWARE[0], OS_INFOS[0])
+    assert len(compiles) == 2
@@ -0,0 +1,59 @@
+"""Tests for the compiled (Mac model, macOS version) patch requirement table."""
+
+from src.core.hardware_profiles import (
+    MATRIX_MACOS_VERSIONS, get_hardware_specific_recommendations, get_mac_model_data,
+    get_mac_oclp_requirements, get_model_macos_support, get_models_requiring_patch,
+    get_patch_requirement_details, get_patch_requirement_table, get_patch_requirements_for_model,
+)
+
+VERSIONS = ["9.0", "10.13", "10.15", "11.0", "12.0", "12.5", "13.0", "14.0", "15.0", "16.0", ""]
+
+
+def _closest_patches(model_data: dict, macos_version: str) -> list:
+    """The lookup the table replaces: exact version, else closest earlier version by string order"""
+    required = model_data.get("required_patches", {})
+    if macos_version in required:
+        return list(required[macos_version])
+    for version in sorted(required, reverse=True):
+        if version <= macos_version:
+            return list(required[version])
+    return []
+
+
+def test_requirements_match_a_direct_lookup() -> None:
+    for model_id, model_data in get_mac_model_data().items():
+        for version in VERSIONS:
+            assert get_patch_requirements_for_model(model_id, version) == _closest_patches(model_data, version)
+            oclp = get_mac_oclp_requirements(model_id, version)
+            assert list(oclp["required_patches"]) == list(model_data.get("required_patches", {}).get(version, []))
+            assert oclp["model_name"] == model_data["name"]
+    assert get_patch_requirements_for_model("Unknown1,1", "13.0") == []
+    assert get_mac_oclp_requirements("Unknown1,1", "13.0") == {}
+
+
+def test_support_and_reverse_lookups() -> None:
+    table = get_patch_requirement_table()
+    mac_models = get_mac_model_data()
+    for model_id, model_data in mac_models.items():
+        support = get_model_macos_support(model_data)
+        assert {v: table.support_status(model_id, v) for v in MATRIX_MACOS_VERSIONS} == support
+
+    for version in table.versions:
+        for patch, count in table.patch_counts(version).items():
+            expected = [m for m, data in mac_models.items()
+                        if patch in data.get("required_patches", {}).get(version, ())]
+            assert get_models_requiring_patch(patch, version) == expected
+            assert count == len(expected)
+    assert get_models_requiring_patch("No Such Patch") == []
+
+
+def test_details_and_cached_recommendations_are_private_copies() -> None:
+    model_id = next(m for m, data in get_mac_model_data().items() if data.get("required_patches"))
+    version = next(iter(get_mac_model_data()[model_id]["required_patches"]))
+    if get_patch_requirement_table().support_status(model_id, version) != "native":
+        details = get_patch_requirement_details(model_id, version)
+        assert details["required_patches"] == get_patch_requirements_for_model(model_id, version)
+
+    first = get_hardware_specific_recommendations(model_id, version)
+    first["warnings"].append("edited")
+    assert "edited" not in get_hardware_specific_recommendations(model_id, version)["warnings"]
@@ -0,0 +1,99 @@
+"""Tests for the memory-mapped pci.ids/usb.ids index and its VendorDatabase fallback."""
+
+import os
+from pathlib import Path
+
+from src.core.pci_ids import IDIndex, build_index, open_ids_index, parse_ids
+from src.core.vendor_database import VendorDatabase
+
+PCI_IDS = """\
+# Sample of the pci.ids format
+10de  NVIDIA Corporation
+\t1b80  GP104 [GeForce GTX 1080]
+\t\t1043 8591  GeForce GTX 1080 Turbo
+1af4  Red Hat, Inc.
+\t1000  Virtio network device
+\t1041  Virtio 1.0 network device
+8086  Intel Corporation
+\t9bc5  CometLake-S GT2 [UHD Graphics 630]
+ffff  Illegal Vendor ID
+C 03  Display controller
+\t00  VGA compatible controller
+"""
+
+USB_IDS = """\
+05ac  Apple, Inc.
+\t12a8  iPhone 5/5C/5S/6/SE/7/8/X/XR
+\t\t00  Interface
+HID 00  Undefined
+\t0001  not a device
+"""
+
+
+def test_parse_skips_subsystems_and_class_sections() -> None:
+    entries = list(parse_ids(PCI_IDS.splitlines()))
+    assert (0x10DE, 0x1B80, "GP104 [GeForce GTX 1080]") in entries
+    assert (0xFFFF, None, "Illegal Vendor ID") in entries
+    assert not any(name.startswith(("GeForce GTX 1080 Turbo", "VGA")) for _, _, name in entries)
+    assert list(parse_ids(USB_IDS.splitlines())) == [
+        (0x05AC, None, "Apple, Inc."), (0x05AC, 0x12A8, "iPhone 5/5C/5S/6/SE/7/8/X/XR")]
+
+
+def test_index_lookups_and_rebuild_when_source_changes(tmp_path: Path) -> None:
+    source = tmp_path / "pci.ids"
+    source.write_text(PCI_IDS)
+    assert build_index(source, tmp_path / "direct.idx") == (4, 4)
+    with IDIndex(tmp_path / "direct.idx") as index:
+        assert index.vendor_name(0x1AF4) == "Red Hat, Inc."
+        assert index.vendor_name(0x0000) is None
+        assert index.vendor_name(0xFFFF) == "Illegal Vendor ID"
+        assert index.device_name(0x1AF4, 0x1041) == "Virtio 1.0 network device"
+        assert index.device_name(0x1AF4, 0x1042) is None
+        assert index.device_name(0x8086, 0x1000) is None
+
+    cache_dir = tmp_path / "cache"
+    index = open_ids_index(source, cache_dir)
+    built_at = (cache_dir / "pci.ids.idx").stat().st_mtime_ns
+    index.close()
+    open_ids_index(source, cache_dir).close()
+    assert (cache_dir / "pci.ids.idx").stat().st_mtime_ns == built_at
+
+    source.write_text(PCI_IDS + "1234  Newly Added Vendor\n")
+    os.utime(source, ns=(built_at + 10**9, built_at + 10**9))
+    with open_ids_index(source, cache_dir) as index:
+        assert index.vendor_name(0x1234) == "Newly Added Vendor"
+
+
+def test_vendor_database_falls_back_to_ids_files(tmp_path: Path) -> None:
+    (tmp_path / "pci.ids").write_text(PCI_IDS)
+    (tmp_path / "usb.ids").write_text(USB_IDS)
+    db = VendorDatabase(pci_ids_path=tmp_path / "pci.ids", usb_ids_path=tmp_path / "usb.ids",
+                        ids_cache_dir=tmp_path / "cache")
+
+    # Curated entries keep their richer data
+    assert db.lookup_vendor("10de").website == "https://nvidia.com"
+    assert db.lookup_device("10de", "1b80").name == "NVIDIA GeForce GTX 1080"
+
+    vendor = db.lookup_vendor("1af4")
+    assert (vendor.vendor_id, vendor.name, vendor.full_name) == ("1AF4", "Red Hat, Inc.", "Red Hat, Inc.")
+    assert db.lookup_vendor("1AF4") is vendor
+    device = db.lookup_device("1af4", "1000")
+    assert (device.vendor_id, device.device_id, device.name) == ("1AF4", "1000", "Virtio network device")
+    assert device.patch_compatibility is vendor.patch_compatibility
+    assert db.lookup_device("8086", "9bc5").name == "CometLake-S GT2 [UHD Graphics 630]"
+
+    assert db.lookup_device("05ac", "12a8", bus="usb").name == "iPhone 5/5C/5S/6/SE/7/8/X/XR"
+    assert db.lookup_device("05ac", "12a8") is None
+    assert db.lookup_vendor("zzzz") is None
+    assert VendorDatabase(pci_ids_path=tmp_path / "missing.ids").lookup_vendor("1af4") is None
+
+
+def test_usb_lookups_skip_the_curated_pci_tables(tmp_path: Path) -> None:
+    (tmp_path / "usb.ids").write_text(USB_IDS)
+    db = VendorDatabase(pci_ids_path=tmp_path / "missing.ids", usb_ids_path=tmp_path / "usb.ids",
+                        ids_cache_dir=tmp_path / "cache")
+
+    assert db.lookup_device("8086", "1539").name == "Intel I211 Gigabit Network Connection"
+    assert db.lookup_device("8086", "1539", bus="usb") is None
+    assert db.lookup_vendor("10de", bus="usb") is None
+    assert db.lookup_vendor("05ac", bus="usb").full_name == "Apple, Inc."
@@ -0,0 +1,79 @@
+"""Tests for the offline registry hive reader/writer."""
+
+import struct
+from pathlib import Path
+
+import pytest
+
+from src.core.registry_hive import (
+    RegistryHive, RegistryHiveError, RegistryValueType, apply_registry_edits, split_registry_path
+)
+
+
+def test_values_and_keys_round_trip_through_a_saved_hive(tmp_path: Path) -> None:
+    hive = RegistryHive.create("SYSTEM")
+    hive.set_value("Setup\\LabConfig", "BypassTPMCheck", "REG_DWORD", 1)
+    hive.set_value("Setup\\LabConfig", "Comment", "REG_SZ", "a value longer than four bytes")
+    hive.set_value("Setup\\LabConfig", "comment", "REG_SZ", "replaced")
+    hive.set_value("Setup", "Paths", RegistryValueType.REG_MULTI_SZ, ["C:\\a", "D:\\b"])
+    hive.set_value("Setup", "Big", "REG_QWORD", 2 ** 40)
+    hive.save(tmp_path / "SYSTEM")
+
+    loaded = RegistryHive.load(tmp_path / "SYSTEM")
+    assert loaded.validate() == 3
+    assert loaded.subkeys() == ["Setup"]
+    assert loaded.values("SETUP\\labconfig") == {
+        "BypassTPMCheck": (RegistryValueType.REG_DWORD, 1),
+        "Comment": (RegistryValueType.REG_SZ, "replaced"),
+    }
+    assert loaded.get_value("Setup", "Paths") == (RegistryValueType.REG_MULTI_SZ, ["C:\\a", "D:\\b"])
+    assert loaded.get_value("Setup", "Big") == (RegistryValueType.REG_QWORD, 2 ** 40)
+    assert loaded.get_value("Missing\\Key", "x") is None
+
+
+def test_large_subkey_lists_stay_sorted_and_indexed(tmp_path: Path) -> None:
+    hive = RegistryHive.create()
+    names = [f"svc{i:04d}" for i in reversed(range(1100))]
+    for name in names:
+        hive.create_key(f"Services\\{name}")
+    hive.save(tmp_path / "hive")
+
+    loaded = RegistryHive.load(tmp_path / "hive")
+    assert loaded.subkeys("Services") == sorted(names)
+    assert loaded.has_key("services\\SVC0500")
+    assert loaded.validate() == 1102
+
+
+def test_edits_are_applied_in_one_pass_and_verified(tmp_path: Path) -> None:
+    hive_path = tmp_path / "SOFTWARE"
+    RegistryHive.create("SOFTWARE").save(hive_path)
+
+    count = apply_registry_edits(hive_path, {
+        "Microsoft\\Windows\\CurrentVersion\\OOBE": {"BypassNRO": ("REG_DWORD", 1)},
+        "Setup": {"A": ("REG_SZ", "x"), "B": ("REG_DWORD", 7)},
+    })
+
+    assert count == 3
+    hive = RegistryHive.load(hive_path)
+    assert hive.get_value("Microsoft\\Windows\\CurrentVersion\\OOBE", "BypassNRO") == \
+        (RegistryValueType.REG_DWORD, 1)
+    assert split_registry_path("HKLM\\SOFTWARE\\Microsoft") == ("SOFTWARE", "Microsoft")
+    with pytest.raises(RegistryHiveError):
+        split_registry_path("HKCU\\Software")
+
+
+def test_dirty_or_corrupt_hives_are_rejected(tmp_path: Path) -> None:
+    data = bytearray(RegistryHive.create().to_bytes())
+
+    dirty = bytearray(data)
+    struct.pack_into("<I", dirty, 4, 2)
+    with pytest.raises(RegistryHiveError, match="dirty"):
+        RegistryHive(bytes(dirty))
+
+    corrupt = bytearray(data)
+    corrupt[100] ^= 0xFF
+    with pytest.raises(RegistryHiveError, match="checksum"):
+        RegistryHive(bytes(corrupt))
+
+    with pytest.raises(RegistryHiveError):
+        RegistryHive(b"not a hive" * 1000)
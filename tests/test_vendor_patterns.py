@@ -0,0 +1,32 @@
+"""Tests for the compiled CPU/GPU pattern matching in VendorDatabase."""
+
+import re
+
+from src.core.vendor_database import PatternSet, VendorDatabase
+
+
+def test_pattern_set_agrees_with_re_search() -> None:
+    patterns = [r"RTX", r"RX\s*\d+", r"Intel.*HD", r"Intel.*UHD", r"Apple.*M\d+", r"a?rm", r"\d+GB"]
+    pattern_set = PatternSet(patterns)
+    texts = ["NVIDIA GeForce RTX 3080", "Radeon rx580", "INTEL uhd 630", "Apple M2 Max",
+             "arm", "16GB", "Intel\nHD", "ınteL HD", "", "nothing here"]
+    for text in texts:
+        expected = [re.search(p, text, re.IGNORECASE) for p in patterns]
+        actual = pattern_set.match_all(text)
+        assert [m and m.group(0) for m in actual] == [m and m.group(0) for m in expected], text
+
+
+def test_identification_results_are_cached_copies() -> None:
+    db = VendorDatabase()
+    cpu = db.identify_cpu("Intel(R) Core(TM) i7-8750H CPU @ 2.20GHz")
+    assert (cpu["vendor"], cpu["family"], cpu["architecture"]) == ("Intel", "Core i7", "x86_64")
+    assert db.identify_cpu("Apple M1 Pro")["family"] == "Apple Silicon M1"
+    assert db.identify_cpu("")["vendor"] == "Unknown"
+
+    cpu["vendor"] = "edited"
+    assert db.identify_cpu("Intel(R) Core(TM) i7-8750H CPU @ 2.20GHz")["vendor"] == "Intel"
+    assert db._identify_cpu_cached.cache_info().hits >= 1
+
+    assert db.identify_gpu_vendor("NVIDIA GeForce RTX 3080")["vendor"] == "NVIDIA"
+    assert db.identify_gpu_vendor("AMD Radeon Pro 560X")["vendor"] == "AMD"
+    assert db.identify_gpu_vendor("Matrox G200")["vendor"] == "Unknown"
@@ -0,0 +1,215 @@
+"""Tests for editing WIM images with batched wimlib updates."""
+
+from pathlib import Path
+
+from src.core.command_runner import CommandResult
+from src.core.config import Config
+from src.core.hardware_detector import DetectedHardware
+from src.core.registry_hive import RegistryHive, RegistryValueType
+from src.core.win_patch_engine import WinPatchEngine, WindowsBypassType, parse_wim_info
+
+WIMLIB_INFO = """WIM Information:
+----------------
+Path:           install.wim
+Image Count:    3
+Boot Index:     0
+
+Available Images:
+-----------------
+Index:                  1
+Name:                   Windows 11 Home
+Description:            Windows 11 Home
+Edition ID:             Core
+Architecture:           x86_64
+Total Bytes:            16012345678
+
+Index:                  2
+Name:                   Windows 11 Pro
+Edition ID:             Professional
+Total Bytes:            16212345678
+
+Index:                  3
+Name:                   Windows 11 Pro N
+Edition ID:             ProfessionalN
+"""
+
+
+def _engine(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    engine = WinPatchEngine(Config())
+    engine.dism_path = engine.wimlib_path = "wimlib-imagex"
+    calls = []
+
+    def fake_run(args, **kwargs):
+        calls.append((list(args), kwargs.get("input")))
+        return CommandResult(args, 0)
+
+    monkeypatch.setattr(engine.command_runner, "run", fake_run)
+    assert engine._setup_workspace()
+    (engine.temp_iso_dir / "sources").mkdir()
+    return engine, calls
+
+
+def test_boot_wim_is_patched_without_mounting(tmp_path: Path, monkeypatch) -> None:
+    engine, calls = _engine(tmp_path, monkeypatch)
+    boot_wim = engine.temp_iso_dir / "sources" / "boot.wim"
+    boot_wim.write_bytes(b"wim")
+
+    assert engine._patch_boot_wim([WindowsBypassType.TPM_BYPASS, WindowsBypassType.RAM_BYPASS])
+
+    verbs = [args[1] for args, _ in calls]
+    assert "mountrw" not in verbs and "unmount" not in verbs
+    # The fake extract produces no hive, so the bypasses fall back to scripts
+    assert verbs == ["dir", "extract", "update"]
+
+    update_args, script = calls[-1]
+    assert update_args == ["wimlib-imagex", "update", str(boot_wim), "2"]
+    added = [line.split('"')[3] for line in script.splitlines()]
+    assert "/Windows/Setup/Scripts/bootforge_bypass_tpm_bypass.reg" in added
+    assert "/Windows/Setup/Scripts/bootforge_bypass_ram_bypass.cmd" in added
+    assert [b.bypass_type for b in engine.applied_bypasses] == [WindowsBypassType.TPM_BYPASS,
+                                                                WindowsBypassType.RAM_BYPASS]
+    # The staging overlay is removed once the update is written
+    assert not any(engine.workspace_dir.glob("overlay_*"))
+    engine._cleanup_workspace()
+
+
+def test_one_batched_update_per_index(tmp_path: Path, monkeypatch) -> None:
+    engine, calls = _engine(tmp_path, monkeypatch)
+    wim_path = str(engine.temp_iso_dir / "sources" / "install.wim")
+
+    assert engine._begin_image_edit(wim_path, [1, 3])
+    assert engine._apply_file_modifications([WindowsBypassType.ONLINE_ACCOUNT_BYPASS])
+    assert engine._finish_image_edit(commit=True)
+
+    assert [args[3] for args, _ in calls] == ["1", "3"]
+    assert calls[0][1] == calls[1][1]
+    assert calls[0][1].count("add ") == 1
+    engine._cleanup_workspace()
+
+
+def test_bypass_values_are_written_into_extracted_hive(tmp_path: Path, monkeypatch) -> None:
+    engine, calls = _engine(tmp_path, monkeypatch)
+    boot_wim = engine.temp_iso_dir / "sources" / "boot.wim"
+    boot_wim.write_bytes(b"wim")
+    updated_hives = []
+
+    def fake_run(args, **kwargs):
+        calls.append((list(args), kwargs.get("input")))
+        if args[1] == "extract":
+            dest_dir = Path(args[-2].split("=", 1)[1])
+            RegistryHive.create("SYSTEM").save(dest_dir / "SYSTEM")
+        elif args[1] == "update":
+            for line in kwargs["input"].splitlines():
+                source, image_path = line.split('"')[1], line.split('"')[3]
+                if image_path.endswith("/config/SYSTEM"):
+                    updated_hives.append(RegistryHive.load(source))
+        return CommandResult(args, 0)
+
+    monkeypatch.setattr(engine.command_runner, "run", fake_run)
+
+    assert engine._patch_boot_wim([WindowsBypassType.TPM_BYPASS, WindowsBypassType.RAM_BYPASS])
+
+    hive, = updated_hives
+    labconfig = hive.values("Setup\\LabConfig")
+    assert labconfig["BypassTPMCheck"] == (RegistryValueType.REG_DWORD, 1)
+    assert labconfig["BypassRAMCheck"] == (RegistryValueType.REG_DWORD, 1)
+    script = calls[-1][1]
+    assert "bootforge_bypass" not in script
+    engine._cleanup_workspace()
+
+
+def test_failed_edit_discards_staged_files(tmp_path: Path, monkeypatch) -> None:
+    engine, calls = _engine(tmp_path, monkeypatch)
+
+    # boot.wim has no SYSTEM hive
+    monkeypatch.setattr(engine, "_image_has_file", lambda *args: False)
+    (engine.temp_iso_dir / "sources" / "boot.wim").write_bytes(b"wim")
+
+    assert not engine._patch_boot_wim([WindowsBypassType.TPM_BYPASS])
+    assert calls == []
+    engine._cleanup_workspace()
+
+
+def test_wim_info_output_is_parsed() -> None:
+    images = parse_wim_info(WIMLIB_INFO)
+    assert [(i.index, i.name, i.edition_id) for i in images] == [
+        (1, "Windows 11 Home", "Core"), (2, "Windows 11 Pro", "Professional"),
+        (3, "Windows 11 Pro N", "ProfessionalN")]
+    assert images[0].size_bytes == 16012345678 and images[0].architecture == "x86_64"
+
+    dism = parse_wim_info("Details for image : install.wim\n\nIndex : 4\n"
+                          "Name : Windows 10 Education\nSize : 15,921,234 bytes\n")
+    assert [(i.index, i.name, i.size_bytes) for i in dism] == [(4, "Windows 10 Education", 15921234)]
+    assert [i.index for i in images if i.matches("pro")] == [2]
+    assert [i.index for i in images if i.matches("ProfessionalN")] == [3]
+
+
+def test_all_editions_are_patched_with_their_own_hives(tmp_path: Path, monkeypatch) -> None:
+    engine, calls = _engine(tmp_path, monkeypatch)
+    install_wim = engine.temp_iso_dir / "sources" / "install.wim"
+    install_wim.write_bytes(b"wim")
+    scripts = {}
+    progress = []
+    engine.image_progress.connect(lambda name, index, status: progress.append((index, status)))
+
+    def fake_run(args, **kwargs):
+        calls.append((list(args), kwargs.get("input")))
+        if args[1] == "info":
+            return CommandResult(args, 0, stdout=WIMLIB_INFO)
+        if args[1] == "extract":
+            dest_dir = Path(args[-2].split("=", 1)[1])
+            RegistryHive.create("SYSTEM").save(dest_dir / "SYSTEM")
+        elif args[1] == "update":
+            scripts[args[3]] = [line.split('"')[1:4:2] for line in kwargs["input"].splitlines()]
+        return CommandResult(args, 0)
+
+    monkeypatch.setattr(engine.command_runner, "run", fake_run)
+
+    assert engine._patch_install_image([WindowsBypassType.TPM_BYPASS], False,
+                                       DetectedHardware(), "11", ["all"])
+
+    assert sorted(scripts) == ["1", "2", "3"]
+    for index, added in scripts.items():
+        hive_sources = [src for src, dest in added if dest == "/Windows/System32/config/SYSTEM"]
+        assert len(hive_sources) == 1 and f"overlay_install_{index}" in hive_sources[0]
+        assert "/Windows/Setup/Scripts/setupcomplete.cmd" in [dest for _, dest in added]
+    assert [e.index for e in engine.patched_editions] == [1, 2, 3]
+    assert {(i, "updated") for i in (1, 2, 3)} <= set(progress)
+    assert engine.get_bypass_summary()["patched_editions"][1]["edition_id"] == "Professional"
+    engine._cleanup_workspace()
+
+
+def test_editions_are_selected_by_name(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path, monkeypatch)
+    images = parse_wim_info(WIMLIB_INFO)
+
+    assert [i.index for i in engine._select_editions(images, ["Pro", "Home"])] == [1, 2]
+    assert [i.index for i in engine._select_editions(images, None)] == [1]
+    assert engine._select_editions(images, ["Enterprise"]) == []
+    engine._cleanup_workspace()
+
+
+def test_edition_selectors_match_whole_edition_names(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path, monkeypatch)
+    images = parse_wim_info("Index: 1\nName: Windows 10 Education\nIndex: 2\nName: Windows 10 Pro Education\n"
+                            "Index: 3\nName: Windows 10 Pro\nIndex: 4\nName: Windows 10 Pro\n")
+
+    assert [i.index for i in images if i.matches("education")] == [1]
+    assert [i.index for i in images if i.matches("PRO EDUCATION")] == [2]
+    assert [i.index for i in engine._select_editions(images, ["Education", "2"])] == [1, 2]
+    # Two images share the name, so the selector cannot pick one
+    assert engine._select_editions(images, ["Pro"]) == []
+    assert [i.index for i in engine._select_editions(images, ["4"])] == [4]
+    engine._cleanup_workspace()
+
+
+def test_listing_failure_falls_back_to_the_first_image(tmp_path: Path, monkeypatch) -> None:
+    engine, _ = _engine(tmp_path, monkeypatch)
+
+    def broken_run(args, **kwargs):
+        raise OSError("wimlib-imagex crashed")
+
+    monkeypatch.setattr(engine.command_runner, "run", broken_run)
+    assert [i.index for i in engine._get_wim_images(str(tmp_path / "install.wim"))] == [1]
+    engine._cleanup_workspace()